@@ -0,0 +1,53 @@
+"""add listing search vector
+
+Revision ID: 2a771e7f4bb4
+Revises: 875f89b65413
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a771e7f4bb4'
+down_revision: Union[str, None] = '875f89b65413'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LISTING_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(city, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(country, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    # Stored generated column: PostgreSQL recomputes it on every INSERT/UPDATE
+    op.add_column(
+        'listings',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(LISTING_SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        )
+    )
+    op.create_index(
+        'idx_listing_search_vector',
+        'listings',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_listing_search_vector', table_name='listings', postgresql_using='gin')
+    op.drop_column('listings', 'search_vector')
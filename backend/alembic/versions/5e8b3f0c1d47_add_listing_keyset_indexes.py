@@ -0,0 +1,29 @@
+"""add listing keyset indexes
+
+Revision ID: 5e8b3f0c1d47
+Revises: 9c4e1d7a2b36
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8b3f0c1d47'
+down_revision: Union[str, None] = '9c4e1d7a2b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Newest-first listing feeds page by (created_at, id) cursors
+    op.create_index('idx_listing_status_created', 'listings', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('idx_listing_host_created', 'listings', ['host_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_listing_host_created', table_name='listings')
+    op.drop_index('idx_listing_status_created', table_name='listings')
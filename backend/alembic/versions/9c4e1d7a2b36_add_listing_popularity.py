@@ -0,0 +1,67 @@
+"""add listing popularity
+
+Revision ID: 9c4e1d7a2b36
+Revises: 2a771e7f4bb4
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e1d7a2b36'
+down_revision: Union[str, None] = '2a771e7f4bb4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'listing_popularity',
+        sa.Column('id', sa.String(length=40), nullable=False),
+        sa.Column('listing_id', sa.String(length=40), nullable=False),
+        sa.Column('booking_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('review_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating', sa.Numeric(precision=3, scale=2), nullable=False, server_default='0'),
+        sa.Column(
+            'popularity_score',
+            sa.Numeric(precision=12, scale=6),
+            sa.Computed('rating * log(review_count + 1) * log(booking_count + 1)', persisted=True),
+            nullable=True
+        ),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_listing_popularity_id'), 'listing_popularity', ['id'], unique=False)
+    op.create_index(op.f('ix_listing_popularity_listing_id'), 'listing_popularity', ['listing_id'], unique=True)
+    op.create_index('idx_listing_popularity_score', 'listing_popularity', ['popularity_score'], unique=False)
+
+    # Backfill from existing bookings
+    op.execute("""
+        INSERT INTO listing_popularity (id, listing_id, booking_count, review_count, rating)
+        SELECT
+            'LIST_' || substr(md5(l.id), 1, 22),
+            l.id,
+            coalesce(b.booking_count, 0),
+            l.review_count,
+            l.rating
+        FROM listings l
+        LEFT JOIN (
+            SELECT listing_id, count(*) AS booking_count
+            FROM bookings
+            WHERE status IN ('confirmed', 'completed')
+            GROUP BY listing_id
+        ) b ON b.listing_id = l.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_listing_popularity_score', table_name='listing_popularity')
+    op.drop_index(op.f('ix_listing_popularity_listing_id'), table_name='listing_popularity')
+    op.drop_index(op.f('ix_listing_popularity_id'), table_name='listing_popularity')
+    op.drop_table('listing_popularity')
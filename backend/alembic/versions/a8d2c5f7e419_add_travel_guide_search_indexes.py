@@ -0,0 +1,76 @@
+"""add travel guide search indexes
+
+Revision ID: a8d2c5f7e419
+Revises: f1c6d8a3b527
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d2c5f7e419'
+down_revision: Union[str, None] = 'f1c6d8a3b527'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRAVEL_GUIDE_LOCATION_VECTOR_SQL = (
+    "to_tsvector('simple', coalesce(destination, '') || ' ' || "
+    "coalesce(city, '') || ' ' || coalesce(country, ''))"
+)
+TRAVEL_GUIDE_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(destination, '') || ' ' || coalesce(city, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(country, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    # Stored generated columns replace the leading-wildcard ILIKE location filters
+    op.add_column(
+        'travel_guides',
+        sa.Column(
+            'location_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(TRAVEL_GUIDE_LOCATION_VECTOR_SQL, persisted=True),
+            nullable=True,
+        )
+    )
+    op.add_column(
+        'travel_guides',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(TRAVEL_GUIDE_SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        )
+    )
+    op.create_index(
+        'idx_travel_guide_location_vector', 'travel_guides', ['location_vector'],
+        unique=False, postgresql_using='gin'
+    )
+    op.create_index(
+        'idx_travel_guide_search_vector', 'travel_guides', ['search_vector'],
+        unique=False, postgresql_using='gin'
+    )
+    op.create_index(
+        'idx_travel_guide_categories', 'travel_guides', ['categories'],
+        unique=False, postgresql_using='gin'
+    )
+    # Keyset pages for sort_by="recent"
+    op.create_index('idx_travel_guide_recent', 'travel_guides', ['status', 'published_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_travel_guide_recent', table_name='travel_guides')
+    op.drop_index('idx_travel_guide_categories', table_name='travel_guides', postgresql_using='gin')
+    op.drop_index('idx_travel_guide_search_vector', table_name='travel_guides', postgresql_using='gin')
+    op.drop_index('idx_travel_guide_location_vector', table_name='travel_guides', postgresql_using='gin')
+    op.drop_column('travel_guides', 'search_vector')
+    op.drop_column('travel_guides', 'location_vector')
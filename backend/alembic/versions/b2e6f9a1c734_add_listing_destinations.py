@@ -0,0 +1,72 @@
+"""add listing destinations
+
+Revision ID: b2e6f9a1c734
+Revises: a8d2c5f7e419
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e6f9a1c734'
+down_revision: Union[str, None] = 'a8d2c5f7e419'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Distinct (city, country) pairs behind search suggestions, replacing
+    # ILIKE '%q%' DISTINCT scans over listings
+    op.create_table(
+        'listing_destinations',
+        sa.Column('id', sa.String(length=40), nullable=False),
+        sa.Column('city', sa.String(length=100), nullable=False),
+        sa.Column('country', sa.String(length=100), nullable=False),
+        sa.Column('city_key', sa.String(length=100), sa.Computed('lower(btrim(city))', persisted=True), nullable=True),
+        sa.Column('country_key', sa.String(length=100), sa.Computed('lower(btrim(country))', persisted=True), nullable=True),
+        sa.Column('listing_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('booking_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('popularity_score', sa.Integer(), sa.Computed('listing_count + 2 * booking_count', persisted=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_listing_destinations_id'), 'listing_destinations', ['id'], unique=False)
+    op.create_index('idx_listing_destination_key', 'listing_destinations', ['country_key', 'city_key'], unique=True)
+    # Prefix (LIKE 'q%') lookups regardless of the database collation
+    op.create_index(
+        'idx_listing_destination_city_prefix', 'listing_destinations', ['city_key'],
+        unique=False, postgresql_ops={'city_key': 'varchar_pattern_ops'}
+    )
+    op.create_index(
+        'idx_listing_destination_country_prefix', 'listing_destinations', ['country_key'],
+        unique=False, postgresql_ops={'country_key': 'varchar_pattern_ops'}
+    )
+
+    # Backfill (same statement as ListingDestinationService.reconcile)
+    op.execute("""
+        INSERT INTO listing_destinations (id, city, country, listing_count, booking_count, created_at, updated_at)
+        SELECT
+            'LIST_' || substr(md5(lower(btrim(l.country)) || '/' || lower(btrim(l.city))), 1, 22),
+            min(btrim(l.city)),
+            min(btrim(l.country)),
+            count(*) FILTER (WHERE l.status = 'active'),
+            coalesce(sum(p.booking_count) FILTER (WHERE l.status = 'active'), 0),
+            now(),
+            now()
+        FROM listings l
+        LEFT JOIN listing_popularity p ON p.listing_id = l.id
+        GROUP BY lower(btrim(l.country)), lower(btrim(l.city))
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_listing_destination_country_prefix', table_name='listing_destinations')
+    op.drop_index('idx_listing_destination_city_prefix', table_name='listing_destinations')
+    op.drop_index('idx_listing_destination_key', table_name='listing_destinations')
+    op.drop_index(op.f('ix_listing_destinations_id'), table_name='listing_destinations')
+    op.drop_table('listing_destinations')
@@ -0,0 +1,52 @@
+"""add listing geo point
+
+Revision ID: b7d2e9a4c815
+Revises: 5e8b3f0c1d47
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geography
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e9a4c815'
+down_revision: Union[str, None] = '5e8b3f0c1d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LISTING_GEO_POINT_SQL = (
+    "CASE WHEN latitude IS NOT NULL AND longitude IS NOT NULL THEN "
+    "ST_SetSRID(ST_MakePoint(longitude::double precision, latitude::double precision), 4326)::geography "
+    "END"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+    # Stored generated column: PostgreSQL recomputes it whenever latitude/longitude change
+    op.add_column(
+        'listings',
+        sa.Column(
+            'geo_point',
+            Geography('POINT', srid=4326, spatial_index=False),
+            sa.Computed(LISTING_GEO_POINT_SQL, persisted=True),
+            nullable=True,
+        )
+    )
+    op.create_index(
+        'idx_listing_geo_point',
+        'listings',
+        ['geo_point'],
+        unique=False,
+        postgresql_using='gist'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_listing_geo_point', table_name='listings', postgresql_using='gist')
+    op.drop_column('listings', 'geo_point')
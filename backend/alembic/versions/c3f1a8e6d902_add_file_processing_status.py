@@ -0,0 +1,40 @@
+"""add file processing status
+
+Revision ID: c3f1a8e6d902
+Revises: b7d2e9a4c815
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f1a8e6d902'
+down_revision: Union[str, None] = 'b7d2e9a4c815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+file_processing_status = postgresql.ENUM(
+    'PENDING', 'PROCESSING', 'READY', 'FAILED', name='fileprocessingstatus'
+)
+
+
+def upgrade() -> None:
+    file_processing_status.create(op.get_bind(), checkfirst=True)
+    op.add_column('files', sa.Column('processing_status', file_processing_status, nullable=True))
+    op.add_column('files', sa.Column('processing_error', sa.Text(), nullable=True))
+    op.add_column('files', sa.Column('variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.create_index(op.f('ix_files_processing_status'), 'files', ['processing_status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_files_processing_status'), table_name='files')
+    op.drop_column('files', 'variants')
+    op.drop_column('files', 'processing_error')
+    op.drop_column('files', 'processing_status')
+    file_processing_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,97 @@
+"""add listing availability bitmaps
+
+Revision ID: c9a4f2d6b813
+Revises: b2e6f9a1c734
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9a4f2d6b813'
+down_revision: Union[str, None] = 'b2e6f9a1c734'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Default AVAILABILITY_HORIZON_DAYS; the nightly rebuild resizes rows if it differs
+HORIZON_DAYS = 365
+
+
+def upgrade() -> None:
+    # One bit per night over the bookable horizon, so search can filter by
+    # date range without probing bookings and blocks per listing
+    op.create_table(
+        'listing_availability_bitmaps',
+        sa.Column('id', sa.String(length=40), nullable=False),
+        sa.Column('listing_id', sa.String(length=40), nullable=False),
+        sa.Column('horizon_start', sa.Date(), nullable=False),
+        sa.Column('blocked_nights', postgresql.BIT(varying=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_listing_availability_bitmaps_id'), 'listing_availability_bitmaps', ['id'], unique=False)
+    op.create_index(
+        op.f('ix_listing_availability_bitmaps_listing_id'), 'listing_availability_bitmaps', ['listing_id'], unique=True
+    )
+
+    # Backfill (same statement as ListingAvailabilityService.rebuild)
+    op.execute(f"""
+        WITH horizon AS (
+            SELECT (now() AT TIME ZONE 'UTC')::date AS start
+        ),
+        spans AS (
+            SELECT
+                b.listing_id,
+                greatest((b.check_in AT TIME ZONE 'UTC')::date, h.start) AS first_night,
+                least((b.check_out AT TIME ZONE 'UTC')::date, h.start + {HORIZON_DAYS}) AS end_night
+            FROM bookings b, horizon h
+            WHERE b.status IN ('pending', 'confirmed', 'checked_in')
+              AND (b.check_out AT TIME ZONE 'UTC')::date > h.start
+              AND (b.check_in AT TIME ZONE 'UTC')::date < h.start + {HORIZON_DAYS}
+            UNION ALL
+            SELECT d.listing_id, d.date, d.date + 1
+            FROM blocked_dates d, horizon h
+            WHERE d.date >= h.start AND d.date < h.start + {HORIZON_DAYS}
+            UNION ALL
+            SELECT c.listing_id, c.date, c.date + 1
+            FROM price_calendars c, horizon h
+            WHERE c.is_blocked
+              AND c.date >= h.start AND c.date < h.start + {HORIZON_DAYS}
+        ),
+        masks AS (
+            SELECT
+                s.listing_id,
+                bit_or(CAST(
+                    repeat('0', s.first_night - h.start)
+                    || repeat('1', s.end_night - s.first_night)
+                    || repeat('0', h.start + {HORIZON_DAYS} - s.end_night)
+                AS bit({HORIZON_DAYS}))) AS blocked_nights
+            FROM spans s, horizon h
+            WHERE s.end_night > s.first_night
+            GROUP BY s.listing_id
+        )
+        INSERT INTO listing_availability_bitmaps (id, listing_id, horizon_start, blocked_nights, created_at, updated_at)
+        SELECT
+            'LIST_' || substr(md5(l.id), 1, 22),
+            l.id,
+            h.start,
+            coalesce(m.blocked_nights, CAST(repeat('0', {HORIZON_DAYS}) AS bit({HORIZON_DAYS}))),
+            now(),
+            now()
+        FROM listings l
+        CROSS JOIN horizon h
+        LEFT JOIN masks m ON m.listing_id = l.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_listing_availability_bitmaps_listing_id'), table_name='listing_availability_bitmaps')
+    op.drop_index(op.f('ix_listing_availability_bitmaps_id'), table_name='listing_availability_bitmaps')
+    op.drop_table('listing_availability_bitmaps')
@@ -0,0 +1,28 @@
+"""add direct upload status
+
+Revision ID: d4b9e2f7a153
+Revises: c3f1a8e6d902
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b9e2f7a153'
+down_revision: Union[str, None] = 'c3f1a8e6d902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER TYPE ... ADD VALUE can't be used in the transaction that adds it
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE fileprocessingstatus ADD VALUE IF NOT EXISTS 'AWAITING_UPLOAD' BEFORE 'PENDING'")
+
+
+def downgrade() -> None:
+    # PostgreSQL can't drop an enum value; clear rows that use it instead
+    op.execute("DELETE FROM files WHERE processing_status = 'AWAITING_UPLOAD'")
@@ -0,0 +1,52 @@
+"""add search snapshot outbox
+
+Revision ID: d6e1b8c4f372
+Revises: c9a4f2d6b813
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6e1b8c4f372'
+down_revision: Union[str, None] = 'c9a4f2d6b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Listings whose search_snapshots row must be rebuilt, written in the same
+    # transaction as the change and drained by the snapshot refresh worker
+    op.create_table(
+        'search_snapshot_outbox',
+        sa.Column('id', sa.String(length=40), nullable=False),
+        sa.Column('listing_id', sa.String(length=40), nullable=False),
+        sa.Column('enqueued_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_search_snapshot_outbox_id'), 'search_snapshot_outbox', ['id'], unique=False)
+    op.create_index(
+        op.f('ix_search_snapshot_outbox_listing_id'), 'search_snapshot_outbox', ['listing_id'], unique=True
+    )
+    op.create_index('idx_search_snapshot_outbox_enqueued', 'search_snapshot_outbox', ['enqueued_at'], unique=False)
+
+    # Nothing has written snapshots so far: queue every listing for the worker
+    op.execute("""
+        INSERT INTO search_snapshot_outbox (id, listing_id, enqueued_at, created_at, updated_at)
+        SELECT 'SEAR_' || substr(md5(l.id), 1, 22), l.id, now(), now(), now()
+        FROM listings l
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_search_snapshot_outbox_enqueued', table_name='search_snapshot_outbox')
+    op.drop_index(op.f('ix_search_snapshot_outbox_listing_id'), table_name='search_snapshot_outbox')
+    op.drop_index(op.f('ix_search_snapshot_outbox_id'), table_name='search_snapshot_outbox')
+    op.drop_table('search_snapshot_outbox')
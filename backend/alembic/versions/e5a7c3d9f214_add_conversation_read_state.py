@@ -0,0 +1,51 @@
+"""add conversation read state
+
+Revision ID: e5a7c3d9f214
+Revises: d4b9e2f7a153
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a7c3d9f214'
+down_revision: Union[str, None] = 'd4b9e2f7a153'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversation_participants', sa.Column('last_read_message_id', sa.String(length=40), nullable=True))
+    op.add_column('conversation_participants', sa.Column('last_read_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('conversation_participants', sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Seed counters from existing messages; from here on they are kept incrementally
+    op.execute("""
+        UPDATE conversation_participants AS cp
+        SET unread_count = counts.unread
+        FROM (
+            SELECT cp2.conversation_id, cp2.user_id, COUNT(m.id) AS unread
+            FROM conversation_participants AS cp2
+            JOIN messages AS m ON m.conversation_id = cp2.conversation_id
+            WHERE m.is_read = false
+              AND (m.sender_id IS NULL OR m.sender_id <> cp2.user_id)
+            GROUP BY cp2.conversation_id, cp2.user_id
+        ) AS counts
+        WHERE cp.conversation_id = counts.conversation_id AND cp.user_id = counts.user_id
+    """)
+
+    # Message history pages by (created_at, id) cursors within a conversation
+    op.drop_index('idx_message_conversation', table_name='messages')
+    op.create_index('idx_message_conversation', 'messages', ['conversation_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_message_conversation', table_name='messages')
+    op.create_index('idx_message_conversation', 'messages', ['conversation_id', 'created_at'], unique=False)
+    op.drop_column('conversation_participants', 'unread_count')
+    op.drop_column('conversation_participants', 'last_read_at')
+    op.drop_column('conversation_participants', 'last_read_message_id')
@@ -0,0 +1,37 @@
+"""rename snapshot calendar rates
+
+Revision ID: e8c2a6f4d915
+Revises: d6e1b8c4f372
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c2a6f4d915'
+down_revision: Union[str, None] = 'd6e1b8c4f372'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rename_keys(old_min: str, old_max: str, new_min: str, new_max: str) -> None:
+    op.execute(f"""
+        UPDATE search_snapshots
+        SET payload = (payload - '{old_min}' - '{old_max}')
+            || jsonb_build_object('{new_min}', payload->'{old_min}', '{new_max}', payload->'{old_max}'),
+            updated_at = now()
+        WHERE payload ? '{old_min}' OR payload ? '{old_max}'
+    """)
+
+
+def upgrade() -> None:
+    # The card's rate range never included seasonal factors or pricing rules;
+    # name it after what it covers (base price and price calendar days)
+    _rename_keys('min_nightly_rate', 'max_nightly_rate', 'min_calendar_rate', 'max_calendar_rate')
+
+
+def downgrade() -> None:
+    _rename_keys('min_calendar_rate', 'max_calendar_rate', 'min_nightly_rate', 'max_nightly_rate')
@@ -0,0 +1,38 @@
+"""add travel guide popularity score
+
+Revision ID: f1c6d8a3b527
+Revises: e5a7c3d9f214
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6d8a3b527'
+down_revision: Union[str, None] = 'e5a7c3d9f214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # "Popular" guide and story feeds read this ranking instead of sorting on two counters
+    for table in ('travel_guides', 'user_stories'):
+        op.add_column(table, sa.Column(
+            'popularity_score',
+            sa.Integer(),
+            sa.Computed('view_count + 10 * like_count', persisted=True),
+            nullable=True
+        ))
+    op.create_index('idx_travel_guide_popular', 'travel_guides', ['status', 'popularity_score', 'id'], unique=False)
+    op.create_index('idx_user_story_popular', 'user_stories', ['status', 'popularity_score', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_user_story_popular', table_name='user_stories')
+    op.drop_index('idx_travel_guide_popular', table_name='travel_guides')
+    op.drop_column('user_stories', 'popularity_score')
+    op.drop_column('travel_guides', 'popularity_score')
@@ -2,6 +2,7 @@
 Celery configuration for background tasks.
 """
 from celery import Celery
+from celery.schedules import crontab
 from app.core.config import get_settings
 from app.core.logging_config import setup_logging
 
@@ -19,6 +20,10 @@ celery_app = Celery(
     include=[
         "app.modules.notifications.tasks",
         "app.modules.payments.tasks",
+        "app.modules.listings.tasks",
+        "app.modules.recommendations.tasks",
+        "app.modules.files.tasks",
+        "app.modules.travel_guides.tasks",
     ]
 )
 
@@ -39,5 +44,47 @@ celery_app.conf.update(
     # Configure Celery logging
     worker_log_format='[%(asctime)s: %(levelname)s/%(processName)s] %(message)s',
     worker_task_log_format='[%(asctime)s: %(levelname)s/%(processName)s][%(task_name)s(%(task_id)s)] %(message)s',
+    # CPU-heavy image work gets its own queue so it can be scaled separately
+    # (workers must consume it: celery -A app.core.celery_app worker -Q celery,images)
+    task_routes={
+        "files.transcode_image": {"queue": "images"},
+        "files.process_direct_upload": {"queue": "images"},
+    },
 )
 
+# Periodic tasks (run with: celery -A app.core.celery_app beat)
+celery_app.conf.beat_schedule = {
+    "reconcile-listing-popularity": {
+        "task": "listings.reconcile_popularity",
+        "schedule": 15 * 60,  # every 15 minutes
+    },
+    "reconcile-listing-destinations": {
+        "task": "listings.reconcile_destinations",
+        "schedule": 15 * 60,  # every 15 minutes
+    },
+    "rebuild-listing-availability": {
+        "task": "listings.rebuild_availability",
+        "schedule": crontab(hour=0, minute=5),  # just after midnight UTC
+    },
+    "refresh-search-snapshots": {
+        "task": "listings.refresh_search_snapshots",
+        "schedule": settings.search_snapshot_refresh_interval_seconds,
+    },
+    "reconcile-search-snapshots": {
+        "task": "listings.reconcile_search_snapshots",
+        "schedule": crontab(hour=0, minute=15),  # after upcoming calendar days roll over
+    },
+    "train-item-cf-model": {
+        "task": "recommendations.train_item_cf",
+        "schedule": 24 * 60 * 60,  # daily
+    },
+    "flush-engagement-counters": {
+        "task": "travel_guides.flush_engagement_counters",
+        "schedule": settings.engagement_flush_interval_seconds,
+    },
+    "expire-direct-uploads": {
+        "task": "files.expire_direct_uploads",
+        "schedule": 60 * 60,  # hourly
+    },
+}
+
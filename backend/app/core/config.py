@@ -312,6 +312,11 @@ class Settings(BaseSettings):
     minio_bucket_name: str = Field(default="safar-files", env="MINIO_BUCKET_NAME")
     minio_use_ssl: bool = Field(default=False, env="MINIO_USE_SSL")
     minio_url: Optional[str] = Field(default=None, env="MINIO_URL")
+    minio_region: Optional[str] = Field(
+        default=None,
+        env="MINIO_REGION",
+        description="Bucket region; set it to skip the region lookup when presigning"
+    )
     
     @validator("minio_url", pre=True)
     def assemble_minio_url(cls, v: Optional[str], values: dict) -> str:
@@ -329,6 +334,16 @@ class Settings(BaseSettings):
         env="MAX_UPLOAD_SIZE",
         description="Maximum upload size in bytes (default: 10MB)"
     )
+    image_transcode_workers: int = Field(
+        default=0,
+        env="IMAGE_TRANSCODE_WORKERS",
+        description="Processes in each API worker's image transcode pool (0 = CPU count)"
+    )
+    direct_upload_expires_seconds: int = Field(
+        default=15 * 60,
+        env="DIRECT_UPLOAD_EXPIRES_SECONDS",
+        description="Lifetime of presigned direct-to-storage upload forms"
+    )
     
     # ============================================================================
     # Email Configuration (SMTP)
@@ -400,6 +415,35 @@ class Settings(BaseSettings):
     # ============================================================================
     openai_api_key: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4o", env="OPENAI_MODEL")
+    openai_base_url: Optional[str] = Field(
+        default=None,
+        env="OPENAI_BASE_URL",
+        description="OpenAI-compatible API endpoint (defaults to api.openai.com)"
+    )
+    openai_timeout_seconds: float = Field(default=60.0, env="OPENAI_TIMEOUT_SECONDS")
+    openai_max_retries: int = Field(default=2, env="OPENAI_MAX_RETRIES")
+    openai_max_connections: int = Field(
+        default=20,
+        env="OPENAI_MAX_CONNECTIONS",
+        description="Connection pool size of the shared OpenAI client (per process)"
+    )
+    travel_plan_cache_ttl_seconds: int = Field(
+        default=21600,
+        env="TRAVEL_PLAN_CACHE_TTL_SECONDS",
+        description="How long generated travel plans are reused for equivalent requests"
+    )
+    
+    # Recommendation model artifacts (item-item collaborative filtering)
+    recommendation_model_dir: str = Field(
+        default="data/models",
+        env="RECOMMENDATION_MODEL_DIR",
+        description="Directory for trained recommendation model artifacts (shared by workers)"
+    )
+    recommendation_model_top_k: int = Field(
+        default=50,
+        env="RECOMMENDATION_MODEL_TOP_K",
+        description="Similar listings kept per listing in the item-item model"
+    )
     
     # ============================================================================
     # Monitoring & Error Tracking
@@ -407,6 +451,29 @@ class Settings(BaseSettings):
     sentry_dsn: Optional[str] = Field(default=None, env="SENTRY_DSN")
     sentry_environment: str = Field(default="development", env="SENTRY_ENVIRONMENT")
     
+    # Request telemetry (buffered in-process, flushed to Redis in batches)
+    request_log_queue_size: int = Field(
+        default=10000,
+        env="REQUEST_LOG_QUEUE_SIZE",
+        description="Max request log records buffered per worker before dropping"
+    )
+    request_log_batch_size: int = Field(default=500, env="REQUEST_LOG_BATCH_SIZE")
+    request_log_flush_interval_seconds: float = Field(default=1.0, env="REQUEST_LOG_FLUSH_INTERVAL_SECONDS")
+    
+    # Analytics event ingestion (buffered in-process, bulk COPY into PostgreSQL)
+    analytics_buffer_max_events: int = Field(
+        default=50000,
+        env="ANALYTICS_BUFFER_MAX_EVENTS",
+        description="Max analytics events buffered per worker before producers wait"
+    )
+    analytics_batch_size: int = Field(default=1000, env="ANALYTICS_BATCH_SIZE")
+    analytics_flush_interval_seconds: float = Field(default=1.0, env="ANALYTICS_FLUSH_INTERVAL_SECONDS")
+    analytics_enqueue_timeout_seconds: float = Field(
+        default=0.5,
+        env="ANALYTICS_ENQUEUE_TIMEOUT_SECONDS",
+        description="How long track_event waits for buffer space before dropping an event"
+    )
+    
     # OpenTelemetry Configuration
     otel_enabled: bool = Field(
         default=False,
@@ -457,6 +524,11 @@ class Settings(BaseSettings):
     rate_limit_enabled: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
     rate_limit_per_minute: int = Field(default=60, env="RATE_LIMIT_PER_MINUTE")
     rate_limit_per_hour: int = Field(default=1000, env="RATE_LIMIT_PER_HOUR")
+    rate_limit_sync_interval_seconds: float = Field(
+        default=1.0,
+        env="RATE_LIMIT_SYNC_INTERVAL_SECONDS",
+        description="How often each worker flushes local rate limit hits to Redis"
+    )
     
     # ============================================================================
     # Booking Configuration
@@ -500,12 +572,74 @@ class Settings(BaseSettings):
     # ============================================================================
     enable_vector_search: bool = Field(default=True, env="ENABLE_VECTOR_SEARCH")
     search_results_limit: int = Field(default=50, env="SEARCH_RESULTS_LIMIT")
+
+    # Travel guide/story view and like counts are buffered in Redis between flushes
+    engagement_flush_interval_seconds: int = Field(
+        default=30,
+        env="ENGAGEMENT_FLUSH_INTERVAL_SECONDS",
+        description="How often buffered view/like counts are written to the database"
+    )
+    search_suggestions_refresh_seconds: int = Field(
+        default=300,
+        env="SEARCH_SUGGESTIONS_REFRESH_SECONDS",
+        description="How often each process rebuilds its in-memory destination suggestion index"
+    )
+    search_suggestions_invalidate_delay_seconds: float = Field(
+        default=5.0,
+        env="SEARCH_SUGGESTIONS_INVALIDATE_DELAY_SECONDS",
+        description="Delay before rebuilding the destination index after a destination change; changes within it share one rebuild"
+    )
+    search_suggestions_cache_ttl_seconds: int = Field(
+        default=300,
+        env="SEARCH_SUGGESTIONS_CACHE_TTL_SECONDS",
+        description="Redis TTL for suggestions served before a process's index is built"
+    )
+    search_cache_ttl_seconds: int = Field(
+        default=60,
+        env="SEARCH_CACHE_TTL_SECONDS",
+        description="Redis TTL for cached search result pages (bounds staleness from changes that aren't invalidated)"
+    )
+    search_cache_local_ttl_seconds: float = Field(
+        default=5,
+        env="SEARCH_CACHE_LOCAL_TTL_SECONDS",
+        description="How long each process serves a search page from its in-memory L1 without asking Redis"
+    )
+    search_cache_invalidation_grace_seconds: int = Field(
+        default=5,
+        env="SEARCH_CACHE_INVALIDATION_GRACE_SECONDS",
+        description="How long search pages matching an invalidated tag aren't cached (should exceed read replica lag; 0 disables)"
+    )
+    availability_horizon_days: int = Field(
+        default=365,
+        env="AVAILABILITY_HORIZON_DAYS",
+        description="Nights ahead covered by listing availability bitmaps (later stays are checked against bookings directly)"
+    )
+    pricing_cache_ttl_seconds: int = Field(
+        default=300,
+        env="PRICING_CACHE_TTL_SECONDS",
+        description="How long a process reuses a listing's compiled pricing rules (edits that call invalidate are picked up right away)"
+    )
+    search_snapshot_refresh_interval_seconds: int = Field(
+        default=15,
+        env="SEARCH_SNAPSHOT_REFRESH_INTERVAL_SECONDS",
+        description="How often the search snapshot outbox is drained (bounds how stale a search card can be)"
+    )
     
     # ============================================================================
     # WebSocket Configuration
     # ============================================================================
     websocket_enabled: bool = Field(default=True, env="WEBSOCKET_ENABLED")
     websocket_heartbeat_interval: int = Field(default=30, env="WEBSOCKET_HEARTBEAT_INTERVAL")
+    websocket_send_queue_size: int = Field(
+        default=256,
+        env="WEBSOCKET_SEND_QUEUE_SIZE",
+        description="Outbound messages buffered per socket before the client is disconnected as too slow"
+    )
+    websocket_send_timeout_seconds: float = Field(
+        default=10.0,
+        env="WEBSOCKET_SEND_TIMEOUT_SECONDS",
+        description="Max time a single socket write may block before the client is disconnected"
+    )
     
     # ============================================================================
     # Validators
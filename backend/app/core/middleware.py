@@ -10,13 +10,13 @@ from typing import Callable
 
 from app.infrastructure.cache.redis import get_redis, CacheService
 from app.core.config import get_settings
+from app.core.rate_limiter import SlidingWindowRateLimiter, get_route_template
 from app.core.security_utils import (
     is_bot_request,
     get_client_ip,
     get_rate_limit_for_request,
     check_suspicious_activity,
     log_request,
-    increment_request_count,
     is_public_route,
 )
 
@@ -57,6 +57,11 @@ class EnhancedRateLimitMiddleware(BaseHTTPMiddleware):
         self._circuit_failure_count = 0
         self._circuit_last_failure = None
         self._circuit_reset_timeout = 60
+        # Decides locally per (client, route template); syncs hits to Redis in batches
+        self._limiter = SlidingWindowRateLimiter(
+            window_seconds=60,
+            sync_interval=settings.rate_limit_sync_interval_seconds,
+        )
         
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         if not settings.rate_limit_enabled:
@@ -93,34 +98,17 @@ class EnhancedRateLimitMiddleware(BaseHTTPMiddleware):
                     return await call_next(request)
         
         path = request.url.path
-        key = f"rate_limit:{client_ip}:{path}"
+        route = get_route_template(request)
+        decision = self._limiter.check(client_ip, route, rate_limit)
         try:
-            redis = await get_redis()
-            current = await redis.get(key)
+            if self._limiter.sync_due():
+                redis = await get_redis()
+                await self._limiter.sync(redis)
+                
+                if self._circuit_failure_count > 0:
+                    self._circuit_failure_count = 0
+                    logger.info("Rate limiting circuit breaker: Reset after successful operation")
             
-            if current and int(current) >= rate_limit:
-                logger.warning(
-                    f"Rate limit exceeded: client_ip={client_ip}, "
-                    f"path={path}, limit={rate_limit}, current={int(current)}"
-                )
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Too many requests. Limit: {rate_limit} requests per minute. Please try again later."
-                )
-            
-            pipe = redis.pipeline()
-            pipe.incr(key)
-            pipe.expire(key, 60)
-            await pipe.execute()
-            
-            await increment_request_count(client_ip)
-            
-            if self._circuit_failure_count > 0:
-                self._circuit_failure_count = 0
-                logger.info("Rate limiting circuit breaker: Reset after successful operation")
-            
-        except HTTPException:
-            raise
         except Exception as e:
             self._circuit_failure_count += 1
             self._circuit_last_failure = time.time()
@@ -149,6 +137,17 @@ class EnhancedRateLimitMiddleware(BaseHTTPMiddleware):
                     f"client_ip={client_ip}"
                 )
         
+        if not decision.allowed:
+            logger.warning(
+                f"Rate limit exceeded: client_ip={client_ip}, "
+                f"path={path}, route={route}, limit={rate_limit}"
+            )
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Too many requests. Limit: {rate_limit} requests per minute. Please try again later.",
+                headers={"Retry-After": str(decision.retry_after)},
+            )
+        
         return await call_next(request)
 
 
@@ -178,7 +177,7 @@ class RequestMonitoringMiddleware(BaseHTTPMiddleware):
         auth_header = request.headers.get("authorization", "")
         is_authenticated = auth_header.startswith("Bearer ")
         
-        if await check_suspicious_activity(client_ip):
+        if check_suspicious_activity(client_ip):
             logger.warning(
                 f"Suspicious activity detected: client_ip={client_ip}, "
                 f"path={request.url.path}"
@@ -191,7 +190,7 @@ class RequestMonitoringMiddleware(BaseHTTPMiddleware):
             response.headers["X-Process-Time"] = f"{response_time:.2f}ms"
             
             try:
-                await log_request(
+                log_request(
                     endpoint=request.url.path,
                     client_ip=client_ip,
                     user_agent=user_agent,
@@ -221,7 +220,7 @@ class RequestMonitoringMiddleware(BaseHTTPMiddleware):
                 )
             
             try:
-                await log_request(
+                log_request(
                     endpoint=request.url.path,
                     client_ip=client_ip,
                     user_agent=user_agent,
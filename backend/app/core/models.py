@@ -14,7 +14,8 @@ from app.modules.listings.models import (
     Amenity, ListingAmenity, ListingRule, ListingAvailability,
     PricingRule, PricingModel, PricingModelRule,
     Calendar, AvailabilityWindow, BlockedDate, SeasonalOverride,
-    PriceCalendar, ListingDraft
+    PriceCalendar, ListingDraft, ListingPopularity, ListingDestination,
+    ListingAvailabilityBitmap
 )
 
 # Bookings - Enhanced
@@ -65,7 +66,7 @@ from app.modules.disputes.models import (
 
 # Analytics
 from app.modules.analytics.models import (
-    AnalyticsEvent, AuditLog, SearchSnapshot
+    AnalyticsEvent, AuditLog, SearchSnapshot, SearchSnapshotOutbox
 )
 
 # Webhooks
@@ -125,6 +126,8 @@ __all__ = [
     "SeasonalOverride",
     "PriceCalendar",
     "ListingDraft",
+    "ListingPopularity",
+    "ListingAvailabilityBitmap",
     
     # Bookings
     "Booking",
@@ -176,6 +179,7 @@ __all__ = [
     "AnalyticsEvent",
     "AuditLog",
     "SearchSnapshot",
+    "SearchSnapshotOutbox",
     
     # Webhooks
     "WebhookEvent",
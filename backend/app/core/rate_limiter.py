@@ -0,0 +1,262 @@
+"""
+Rate limiting engine: in-process token buckets reconciled with a Redis sliding window.
+
+Each worker decides locally from a token bucket per (client, route template), so
+the request path never waits on Redis. Hits are accumulated and periodically
+flushed in one pipeline: a Lua script per bucket records them in a sorted-set
+sliding window and returns the global count, which caps the local bucket so all
+workers converge on the shared limit within one sync interval.
+"""
+import asyncio
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from redis.exceptions import NoScriptError
+from starlette.requests import Request
+from starlette.routing import Match
+
+# Requests that match no route share one key per client (keeps 404 scans from
+# creating a key per probed path).
+UNMATCHED_ROUTE = "unmatched"
+
+ROUTE_TEMPLATE_CACHE_SIZE = 10000
+
+# KEYS[1] = window key
+# ARGV = now_ms, window_ms, hits, limit, member_prefix
+# Returns the number of hits in the window after recording these
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local hits = tonumber(ARGV[3])
+local limit = tonumber(ARGV[4])
+local prefix = ARGV[5]
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+local to_add = math.min(hits, math.max(limit + 1 - count, 0))
+for i = 1, to_add do
+    redis.call('ZADD', key, now, prefix .. ':' .. i)
+end
+if to_add > 0 then
+    redis.call('PEXPIRE', key, window)
+end
+return count + to_add
+"""
+
+SLIDING_WINDOW_SHA = hashlib.sha1(SLIDING_WINDOW_LUA.encode()).hexdigest()
+
+
+def get_route_template(request: Request) -> str:
+    """
+    Resolve the route template (e.g. ``/api/v1/listings/{listing_id}``) for a request.
+
+    Middleware runs before routing, so the app's routes are matched here and the
+    result is cached per path.
+    """
+    path = request.url.path
+    cache = _route_template_cache
+    template = cache.get(path)
+    if template is not None:
+        cache.move_to_end(path)
+        return template
+
+    template = UNMATCHED_ROUTE
+    app = request.scope.get("app")
+    routes = getattr(getattr(app, "router", None), "routes", [])
+    scope = {"type": "http", "path": path, "root_path": "", "method": request.method}
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match != Match.NONE:
+            template = getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_ROUTE)
+            break
+
+    cache[path] = template
+    if len(cache) > ROUTE_TEMPLATE_CACHE_SIZE:
+        cache.popitem(last=False)
+    return template
+
+
+_route_template_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+@dataclass
+class TokenBucket:
+    """Local token bucket refilled continuously at ``limit`` tokens per window."""
+    limit: int
+    window_seconds: float
+    tokens: float
+    updated_at: float
+    pending_hits: int = 0
+    last_seen: float = 0.0
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(float(self.limit), self.tokens + elapsed * self.limit / self.window_seconds)
+            self.updated_at = now
+
+    def try_acquire(self, now: float) -> bool:
+        self.refill(now)
+        self.last_seen = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            self.pending_hits += 1
+            return True
+        return False
+
+    def retry_after(self) -> int:
+        """Seconds until the next token is available."""
+        missing = max(1.0 - self.tokens, 0.0)
+        return max(1, int(missing * self.window_seconds / self.limit + 0.999))
+
+
+@dataclass
+class RateLimitDecision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int = 0
+
+
+@dataclass
+class SlidingWindowRateLimiter:
+    """
+    Per-process rate limiter.
+
+    ``check`` is purely local. ``sync`` flushes pending hits to Redis (one
+    pipelined round trip for every bucket with activity) and tightens local
+    buckets to the global remaining allowance. Redis errors propagate from
+    ``sync`` so callers can apply their circuit breaker; unsynced hits are kept
+    and retried on the next sync.
+    """
+    window_seconds: int = 60
+    sync_interval: float = 1.0
+    counter_window_seconds: int = 3600
+    buckets: Dict[Tuple[str, str], TokenBucket] = field(default_factory=dict)
+    client_hits: Dict[str, int] = field(default_factory=dict)
+    last_sync: float = 0.0
+    _node_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    _sync_seq: int = 0
+    _sync_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def check(self, client_ip: str, route: str, limit: int, now: Optional[float] = None) -> RateLimitDecision:
+        """Consume one token for (client, route) and report whether the request may proceed."""
+        now = time.monotonic() if now is None else now
+        key = (client_ip, route)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(
+                limit=limit,
+                window_seconds=float(self.window_seconds),
+                tokens=float(limit),
+                updated_at=now,
+            )
+            self.buckets[key] = bucket
+        elif bucket.limit != limit:
+            # e.g. the client authenticated and moved to a higher tier
+            bucket.refill(now)
+            bucket.limit = limit
+            bucket.tokens = min(bucket.tokens, float(limit))
+
+        if not bucket.try_acquire(now):
+            return RateLimitDecision(allowed=False, limit=limit, remaining=0, retry_after=bucket.retry_after())
+
+        self.client_hits[client_ip] = self.client_hits.get(client_ip, 0) + 1
+        return RateLimitDecision(allowed=True, limit=limit, remaining=int(bucket.tokens))
+
+    def sync_due(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return now - self.last_sync >= self.sync_interval and not self._sync_lock.locked()
+
+    async def sync(self, redis: Any, now: Optional[float] = None) -> int:
+        """
+        Reconcile pending hits with Redis. Returns the number of buckets flushed.
+
+        Concurrent callers skip instead of waiting: one flush per interval is enough.
+        """
+        if self._sync_lock.locked():
+            return 0
+        async with self._sync_lock:
+            now = time.monotonic() if now is None else now
+            self.last_sync = now
+            self._evict_idle(now)
+
+            batch = [(key, bucket, bucket.pending_hits) for key, bucket in self.buckets.items() if bucket.pending_hits]
+            client_hits = self.client_hits
+            if not batch and not client_hits:
+                return 0
+            self.client_hits = {}
+
+            try:
+                results = await self._flush(redis, batch, client_hits)
+            except Exception:
+                # Keep the hourly counters for the next attempt
+                for client_ip, hits in client_hits.items():
+                    self.client_hits[client_ip] = self.client_hits.get(client_ip, 0) + hits
+                raise
+
+            for (key, bucket, flushed), count in zip(batch, results):
+                # Hits taken while the flush was in flight stay pending
+                bucket.pending_hits -= flushed
+                global_remaining = bucket.limit - int(count) - bucket.pending_hits
+                bucket.tokens = min(bucket.tokens, float(max(global_remaining, 0)))
+            return len(batch)
+
+    async def _flush(self, redis: Any, batch: List[Tuple[Tuple[str, str], TokenBucket, int]],
+                     client_hits: Dict[str, int]) -> List[int]:
+        now_ms = int(time.time() * 1000)
+        window_ms = self.window_seconds * 1000
+        self._sync_seq += 1
+        prefix = f"{self._node_id}:{self._sync_seq}"
+
+        def queue_window(pipe, index):
+            (client_ip, route), bucket, hits = batch[index]
+            pipe.evalsha(
+                SLIDING_WINDOW_SHA, 1, rate_limit_key(client_ip, route),
+                now_ms, window_ms, hits, bucket.limit, f"{prefix}:{index}"
+            )
+
+        pipe = redis.pipeline(transaction=False)
+        for index in range(len(batch)):
+            queue_window(pipe, index)
+        for client_ip, hits in client_hits.items():
+            counter_key = f"request_count:{client_ip}:{self.counter_window_seconds}"
+            pipe.incrby(counter_key, hits)
+            pipe.expire(counter_key, self.counter_window_seconds)
+        results = await pipe.execute(raise_on_error=False)
+
+        # Script cache miss (e.g. Redis restarted): load it and rerun only the
+        # window scripts; the counters above were applied already
+        missing = [index for index, result in enumerate(results[:len(batch)]) if isinstance(result, NoScriptError)]
+        if missing:
+            await redis.script_load(SLIDING_WINDOW_LUA)
+            pipe = redis.pipeline(transaction=False)
+            for index in missing:
+                queue_window(pipe, index)
+            for index, result in zip(missing, await pipe.execute(raise_on_error=False)):
+                results[index] = result
+
+        for result in results[:len(batch)]:
+            if isinstance(result, Exception):
+                raise result
+        return [int(count) for count in results[:len(batch)]]
+
+    def _evict_idle(self, now: float) -> None:
+        idle = [
+            key for key, bucket in self.buckets.items()
+            if not bucket.pending_hits and now - bucket.last_seen > self.window_seconds
+        ]
+        for key in idle:
+            del self.buckets[key]
+
+
+def rate_limit_key(client_ip: str, route: str) -> str:
+    # Braces in templates would act as Redis Cluster hash tags and pin every
+    # client's key for a route to one slot
+    route = route.replace("{", "<").replace("}", ">")
+    return f"rate_limit:{client_ip}:{route}"
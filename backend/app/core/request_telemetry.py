@@ -0,0 +1,181 @@
+"""
+Buffered request telemetry.
+
+Request logs are queued in-process and a background task writes them to Redis
+in pipelined batches, so response latency never waits on telemetry I/O. The
+same pipeline reads back each client's activity counters, which feed a local
+suspicious-activity view checked by the monitoring middleware.
+"""
+import asyncio
+import json
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+from app.core.config import get_settings
+from app.infrastructure.cache.redis import get_redis
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+REQUEST_LOG_KEY = "request_logs"
+REQUEST_LOG_MAX_LEN = 10000
+ENDPOINTS_WINDOW_SECONDS = 3600
+RECENT_WINDOW_SECONDS = 60
+HOURLY_COUNT_WINDOW_SECONDS = 3600
+
+# Thresholds for flagging a client as suspicious
+SUSPICIOUS_HOURLY_REQUESTS = 200
+SUSPICIOUS_DISTINCT_ENDPOINTS = 50
+
+SUSPICIOUS_VIEW_SIZE = 10000
+
+
+def is_suspicious_activity(hour_count: int, endpoint_count: int, recent_count: int) -> bool:
+    """Apply the suspicious-activity thresholds to a client's counters."""
+    # "Recent" is measured against the global per-minute limit so that suspicious
+    # roughly means "well above what we normally allow".
+    per_minute_limit = getattr(settings, "rate_limit_per_minute", 60)
+    return (
+        hour_count > SUSPICIOUS_HOURLY_REQUESTS
+        or endpoint_count > SUSPICIOUS_DISTINCT_ENDPOINTS
+        or recent_count > per_minute_limit
+    )
+
+
+class RequestLogPipeline:
+    """
+    Bounded request-log queue with a background batch flusher.
+
+    ``record`` and ``is_suspicious`` never touch Redis. When the queue is full
+    the oldest records are dropped (and counted) rather than slowing requests.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: Deque[Dict[str, Any]] = deque(maxlen=max_queue)
+        self._suspicious: "OrderedDict[str, bool]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Queue a request log record (must be JSON-serializable)."""
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+        self._queue.append(entry)
+        self._ensure_started()
+        if len(self._queue) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def is_suspicious(self, client_ip: str) -> bool:
+        """Last known suspicious-activity verdict for a client (False until first flush)."""
+        return self._suspicious.get(client_ip, False)
+
+    async def start(self) -> None:
+        self._ensure_started()
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            while self._queue:
+                await self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing request logs on shutdown: {e}")
+
+    def _ensure_started(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while self._queue:
+                    await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error flushing request logs: {e}")
+
+    async def flush(self, redis: Any = None) -> int:
+        """
+        Write one batch to Redis in a single pipeline and refresh the suspicious
+        view for the clients in it. Returns the number of records written; a
+        failed batch is dropped (telemetry is best-effort).
+        """
+        if not self._queue:
+            return 0
+        batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
+        if redis is None:
+            redis = await get_redis()
+
+        endpoints: Dict[str, set] = {}
+        request_counts: Dict[str, int] = {}
+        for entry in batch:
+            client_ip = entry["client_ip"]
+            endpoints.setdefault(client_ip, set()).add(entry["endpoint"])
+            request_counts[client_ip] = request_counts.get(client_ip, 0) + 1
+
+        pipe = redis.pipeline(transaction=False)
+        pipe.lpush(REQUEST_LOG_KEY, *[json.dumps(entry, separators=(",", ":")) for entry in batch])
+        pipe.ltrim(REQUEST_LOG_KEY, 0, REQUEST_LOG_MAX_LEN)
+        for client_ip, client_endpoints in endpoints.items():
+            endpoints_key = f"endpoints:{client_ip}:{ENDPOINTS_WINDOW_SECONDS}"
+            recent_key = f"recent_requests:{client_ip}"
+            pipe.sadd(endpoints_key, *client_endpoints)
+            pipe.expire(endpoints_key, ENDPOINTS_WINDOW_SECONDS)
+            pipe.scard(endpoints_key)
+            pipe.incrby(recent_key, request_counts[client_ip])
+            pipe.expire(recent_key, RECENT_WINDOW_SECONDS)
+            pipe.get(f"request_count:{client_ip}:{HOURLY_COUNT_WINDOW_SECONDS}")
+        results = await pipe.execute()
+
+        # Per client: sadd, expire, scard, incrby, expire, get
+        for index, client_ip in enumerate(endpoints):
+            offset = 2 + index * 6
+            endpoint_count = int(results[offset + 2] or 0)
+            recent_count = int(results[offset + 3] or 0)
+            hour_count = int(results[offset + 5] or 0)
+            self._set_suspicious(client_ip, is_suspicious_activity(hour_count, endpoint_count, recent_count))
+        return len(batch)
+
+    def _set_suspicious(self, client_ip: str, suspicious: bool) -> None:
+        self._suspicious[client_ip] = suspicious
+        self._suspicious.move_to_end(client_ip)
+        if len(self._suspicious) > SUSPICIOUS_VIEW_SIZE:
+            self._suspicious.popitem(last=False)
+
+
+request_log_pipeline = RequestLogPipeline(
+    max_queue=settings.request_log_queue_size,
+    batch_size=settings.request_log_batch_size,
+    flush_interval=settings.request_log_flush_interval_seconds,
+)
@@ -8,6 +8,7 @@ from typing import Optional, Dict, Any
 from fastapi import Request, HTTPException, status
 from app.infrastructure.cache.redis import get_redis
 from app.core.config import get_settings
+from app.core.request_telemetry import request_log_pipeline
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -123,51 +124,17 @@ async def get_request_count(client_ip: str, window_seconds: int = 3600) -> int:
         return 0
 
 
-async def increment_request_count(client_ip: str, window_seconds: int = 3600) -> None:
-    """Increment request count for IP"""
-    try:
-        redis = await get_redis()
-        key = f"request_count:{client_ip}:{window_seconds}"
-        pipe = redis.pipeline()
-        pipe.incr(key)
-        pipe.expire(key, window_seconds)
-        await pipe.execute()
-    except Exception as e:
-        logger.error(f"Error incrementing request count: {e}")
+def check_suspicious_activity(client_ip: str) -> bool:
+    """
+    Check for suspicious activity patterns.
 
-
-async def check_suspicious_activity(client_ip: str) -> bool:
-    """Check for suspicious activity patterns"""
-    try:
-        redis = await get_redis()
-        
-        # Check requests in last hour
-        hour_count = await get_request_count(client_ip, 3600)
-        if hour_count > 200:  # More than 200 requests per hour
-            return True
-        
-        # Check for scraping pattern (many different endpoints)
-        endpoints_key = f"endpoints:{client_ip}:3600"
-        endpoints = await redis.smembers(endpoints_key)
-        if len(endpoints) > 50:  # More than 50 different endpoints
-            return True
-        
-        # Check request frequency (too many requests in short time).
-        # Use global per-minute rate limit from settings instead of a hardcoded value
-        # so that "suspicious" roughly means "well above what we normally allow".
-        recent_key = f"recent_requests:{client_ip}"
-        recent_count = await redis.get(recent_key)
-        per_minute_limit = getattr(settings, "rate_limit_per_minute", 60)
-        if recent_count and int(recent_count) > per_minute_limit:
-            return True
-        
-        return False
-    except Exception as e:
-        logger.error(f"Error checking suspicious activity: {e}")
-        return False
+    Reads the locally cached view refreshed by the request log flusher, so it
+    never waits on Redis.
+    """
+    return request_log_pipeline.is_suspicious(client_ip)
 
 
-async def log_request(
+def log_request(
     endpoint: str,
     client_ip: str,
     user_agent: str,
@@ -176,39 +143,17 @@ async def log_request(
     response_time: float,
     method: str = "GET"
 ) -> None:
-    """Log request for monitoring and analysis"""
-    try:
-        redis = await get_redis()
-        
-        log_entry = {
-            "endpoint": endpoint,
-            "client_ip": client_ip,
-            "user_agent": user_agent,
-            "is_authenticated": is_authenticated,
-            "status_code": status_code,
-            "response_time": response_time,
-            "method": method,
-            "timestamp": str(time.time()),
-        }
-        
-        # Store in Redis list (keep last 10000 requests)
-        await redis.lpush("request_logs", str(log_entry))
-        await redis.ltrim("request_logs", 0, 10000)
-        
-        # Track endpoints per IP
-        endpoints_key = f"endpoints:{client_ip}:3600"
-        await redis.sadd(endpoints_key, endpoint)
-        await redis.expire(endpoints_key, 3600)
-        
-        # Track recent requests
-        recent_key = f"recent_requests:{client_ip}"
-        pipe = redis.pipeline()
-        pipe.incr(recent_key)
-        pipe.expire(recent_key, 60)
-        await pipe.execute()
-        
-    except Exception as e:
-        logger.error(f"Error logging request: {e}")
+    """Queue request for monitoring and analysis (flushed to Redis in batches)"""
+    request_log_pipeline.record({
+        "endpoint": endpoint,
+        "client_ip": client_ip,
+        "user_agent": user_agent,
+        "is_authenticated": is_authenticated,
+        "status_code": status_code,
+        "response_time": round(response_time, 3),
+        "method": method,
+        "timestamp": time.time(),
+    })
 
 
 async def verify_captcha(token: str, client_ip: str) -> bool:
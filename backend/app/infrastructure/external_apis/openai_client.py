@@ -0,0 +1,52 @@
+"""
+Shared OpenAI client.
+
+One ``AsyncOpenAI`` instance per process so requests reuse its pooled HTTP
+connections (and TLS sessions) instead of opening a new client per call.
+"""
+from typing import Optional
+
+import httpx
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Global client instance, created on first use
+openai_client = None
+
+
+def get_openai_client():
+    """Get the shared ``AsyncOpenAI`` client.
+
+    Raises:
+        ValueError: if no OpenAI API key is configured.
+    """
+    global openai_client
+    if openai_client is None:
+        if not settings.openai_api_key:
+            raise ValueError("OpenAI API key is not configured")
+        from openai import AsyncOpenAI
+
+        openai_client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            timeout=settings.openai_timeout_seconds,
+            max_retries=settings.openai_max_retries,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.openai_max_connections,
+                    max_keepalive_connections=settings.openai_max_connections
+                ),
+                timeout=settings.openai_timeout_seconds
+            )
+        )
+    return openai_client
+
+
+async def close_openai_client() -> None:
+    """Close the shared client and its connection pool, if it exists."""
+    global openai_client
+    if openai_client is not None:
+        await openai_client.close()
+        openai_client = None
@@ -3,7 +3,9 @@ CDN (Content Delivery Network) integration for listing images.
 
 Supports Cloudflare and AWS CloudFront with automatic WebP/AVIF conversion.
 """
+import asyncio
 import logging
+from datetime import datetime
 from typing import Optional, Dict, Any
 from pathlib import Path
 from io import BytesIO
@@ -12,6 +14,7 @@ import boto3
 from botocore.exceptions import ClientError
 
 from app.core.config import get_settings
+from app.infrastructure.storage.image_transcoding import run_in_transcode_pool
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -43,6 +46,9 @@ class CDNService:
         """
         Convert image to WebP format.
         
+        CPU-bound and blocking: from async code, call it through
+        ``run_in_transcode_pool``.
+        
         Args:
             image_data: Original image bytes
             quality: WebP quality (1-100, default 85)
@@ -234,7 +240,8 @@ class CDNService:
         # Upload original
         original_key = f"{base_path}/{filename}"
         try:
-            s3_client.put_object(
+            await asyncio.to_thread(
+                s3_client.put_object,
                 Bucket=bucket_name,
                 Key=original_key,
                 Body=image_data,
@@ -250,9 +257,11 @@ class CDNService:
         if optimize:
             if 'webp' in formats:
                 try:
-                    webp_data = CDNService.convert_to_webp(image_data)
+                    # Encoding is CPU-bound: keep it off the event loop
+                    webp_data = await run_in_transcode_pool(CDNService.convert_to_webp, image_data)
                     webp_key = f"{base_path}/{filename}.webp"
-                    s3_client.put_object(
+                    await asyncio.to_thread(
+                        s3_client.put_object,
                         Bucket=bucket_name,
                         Key=webp_key,
                         Body=webp_data,
@@ -265,9 +274,10 @@ class CDNService:
             
             if 'avif' in formats:
                 try:
-                    avif_data = CDNService.convert_to_avif(image_data)
+                    avif_data = await run_in_transcode_pool(CDNService.convert_to_avif, image_data)
                     avif_key = f"{base_path}/{filename}.avif"
-                    s3_client.put_object(
+                    await asyncio.to_thread(
+                        s3_client.put_object,
                         Bucket=bucket_name,
                         Key=avif_key,
                         Body=avif_data,
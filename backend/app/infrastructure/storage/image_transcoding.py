@@ -0,0 +1,127 @@
+"""
+Image transcoding off the event loop.
+
+``transcode_image`` decodes a photo once and produces every responsive size in
+every output format. It is pure CPU work: API code must run it through
+``run_in_transcode_pool`` (a process pool, so it never holds the event loop or
+the GIL), while Celery workers on the ``images`` queue call it directly.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from PIL import Image, ImageOps
+
+from app.core.config import get_settings
+
+try:
+    import pillow_avif  # noqa: F401  (registers the AVIF plugin)
+except ImportError:
+    pass
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+AVIF_AVAILABLE = "AVIF" in Image.SAVE
+
+# Responsive widths (px)
+DEFAULT_VARIANT_WIDTHS = (1600, 1024, 640, 320)
+DEFAULT_VARIANT_FORMATS = ("webp", "avif", "jpeg")
+
+FORMAT_CONTENT_TYPES = {
+    "webp": "image/webp",
+    "avif": "image/avif",
+    "jpeg": "image/jpeg",
+}
+
+# Encoder settings: WebP method 4 is ~3x faster than method 6 for ~2% larger files
+ENCODER_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 82, "method": 4},
+    "avif": {"format": "AVIF", "quality": 60, "speed": 8},
+    "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+
+@dataclass
+class ImageVariant:
+    """One encoded rendition of an image."""
+    name: str
+    format: str
+    width: int
+    height: int
+    data: bytes
+
+    @property
+    def content_type(self) -> str:
+        return FORMAT_CONTENT_TYPES[self.format]
+
+
+def transcode_image(
+    image_data: bytes,
+    widths: Sequence[int] = DEFAULT_VARIANT_WIDTHS,
+    formats: Sequence[str] = DEFAULT_VARIANT_FORMATS,
+) -> Dict[str, ImageVariant]:
+    """
+    Decode ``image_data`` once and encode each width x format variant.
+
+    Sizes are produced largest first, each downscaled from the previous one,
+    so the full-resolution image is only resampled once. Variants are keyed
+    ``w{width}.{format}``; widths above the source size collapse to the source
+    width. AVIF is skipped when the plugin is not installed.
+    """
+    formats = [fmt for fmt in formats if fmt != "avif" or AVIF_AVAILABLE]
+
+    with Image.open(BytesIO(image_data)) as source:
+        # For JPEGs, let libjpeg decode at the smallest scale still >= the largest variant
+        largest = max(widths)
+        if source.format == "JPEG" and source.width > largest * 2:
+            source.draft("RGB", (largest, largest * source.height // source.width))
+        img = ImageOps.exif_transpose(source)
+        has_alpha = "A" in img.getbands() or "transparency" in img.info
+        img = img.convert("RGBA" if has_alpha else "RGB")
+
+    variants: Dict[str, ImageVariant] = {}
+    current = img
+    # Widths above the source collapse to the source width (never upscale)
+    for width in sorted({min(w, img.width) for w in widths}, reverse=True):
+        if width < current.width:
+            height = max(1, round(current.height * width / current.width))
+            current = current.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        for fmt in formats:
+            frame = current.convert("RGB") if fmt == "jpeg" and current.mode != "RGB" else current
+            output = BytesIO()
+            frame.save(output, **ENCODER_OPTIONS[fmt])
+            name = f"w{width}.{fmt}"
+            variants[name] = ImageVariant(
+                name=name, format=fmt, width=frame.width, height=frame.height, data=output.getvalue()
+            )
+    return variants
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_transcode_executor() -> ProcessPoolExecutor:
+    """Process pool shared by this API worker (created on first use)."""
+    global _executor
+    if _executor is None:
+        workers = settings.image_transcode_workers or os.cpu_count() or 1
+        _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+
+async def run_in_transcode_pool(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a picklable CPU-bound image function in the transcode process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_transcode_executor(), fn, *args)
+
+
+def shutdown_transcode_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
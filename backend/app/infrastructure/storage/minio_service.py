@@ -2,6 +2,7 @@
 MinIO storage service for managing object uploads, downloads, and metadata.
 """
 import io
+from datetime import datetime, timedelta, timezone
 from typing import Optional, BinaryIO
 from pathlib import Path
 import logging
@@ -10,6 +11,7 @@ from urllib.parse import urljoin
 from minio import Minio
 from minio.error import S3Error
 from minio.commonconfig import REPLACE
+from minio.datatypes import PostPolicy
 from minio.deleteobjects import DeleteObject
 
 from app.core.config import get_settings
@@ -27,7 +29,8 @@ class MinIOStorageService:
             f"{settings.minio_endpoint}:{settings.minio_port}",
             access_key=settings.minio_access_key,
             secret_key=settings.minio_secret_key,
-            secure=settings.minio_use_ssl
+            secure=settings.minio_use_ssl,
+            region=settings.minio_region
         )
         self.bucket_name = settings.minio_bucket_name
         self._ensure_bucket_exists()
@@ -75,6 +78,39 @@ class MinIOStorageService:
             logger.error(f"Error uploading file to MinIO: {e}")
             raise
     
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        object_name: str,
+        content_type: Optional[str] = None,
+        metadata: Optional[dict] = None,
+        part_size: int = 10 * 1024 * 1024
+    ) -> str:
+        """
+        Upload a stream of unknown length with a multipart upload and return its public URL.
+        
+        Only one ``part_size`` part is held in memory at a time; if reading the
+        stream raises, the multipart upload is aborted.
+        """
+        try:
+            self.client.put_object(
+                bucket_name=self.bucket_name,
+                object_name=object_name,
+                data=stream,
+                length=-1,
+                part_size=part_size,
+                content_type=content_type or "application/octet-stream",
+                metadata=metadata or {}
+            )
+            
+            file_url = self.get_file_url(object_name)
+            logger.info(f"File uploaded successfully: {object_name}")
+            return file_url
+            
+        except S3Error as e:
+            logger.error(f"Error uploading file to MinIO: {e}")
+            raise
+    
     def download_file(self, object_name: str) -> bytes:
         """Download a file from MinIO and return its content as bytes."""
         try:
@@ -90,6 +126,25 @@ class MinIOStorageService:
             logger.error(f"Error downloading file from MinIO: {e}")
             raise
     
+    def read_range(self, object_name: str, offset: int = 0, length: int = 0) -> bytes:
+        """Download part of an object (``length=0`` reads to the end)."""
+        response = None
+        try:
+            response = self.client.get_object(
+                bucket_name=self.bucket_name,
+                object_name=object_name,
+                offset=offset,
+                length=length
+            )
+            return response.read()
+        except S3Error as e:
+            logger.error(f"Error downloading file range from MinIO: {e}")
+            raise
+        finally:
+            if response:
+                response.close()
+                response.release_conn()
+    
     def delete_file(self, object_name: str) -> bool:
         """Delete a single object from MinIO."""
         try:
@@ -156,6 +211,41 @@ class MinIOStorageService:
             logger.error(f"Error generating presigned URL: {e}")
             raise
     
+    def presigned_upload_form(
+        self,
+        object_name: str,
+        content_type: str,
+        max_size: int,
+        expires_seconds: int = 900
+    ) -> dict:
+        """
+        Build a presigned POST form for uploading one object straight to MinIO.
+        
+        The signed policy pins the object key and Content-Type and bounds the
+        body to 1..``max_size`` bytes, so MinIO itself rejects anything else.
+        Returns ``{"url", "fields", "expires_at"}``: the client POSTs
+        ``fields`` plus a ``file`` part as multipart/form-data to ``url``.
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_seconds)
+        policy = PostPolicy(self.bucket_name, expires_at)
+        policy.add_equals_condition("key", object_name)
+        policy.add_equals_condition("Content-Type", content_type)
+        policy.add_content_length_range_condition(1, max_size)
+        
+        try:
+            fields = self.client.presigned_post_policy(policy)
+        except S3Error as e:
+            logger.error(f"Error generating presigned upload form: {e}")
+            raise
+        
+        fields["key"] = object_name
+        fields["Content-Type"] = content_type
+        return {
+            "url": urljoin(settings.minio_url, self.bucket_name),
+            "fields": fields,
+            "expires_at": expires_at
+        }
+    
     def get_file_info(self, object_name: str) -> dict:
         """Return basic metadata about an object stored in MinIO."""
         try:
@@ -1,96 +1,411 @@
 """
 WebSocket manager for chat and notifications.
+
+Each API process ("node") holds its own sockets. Messages are routed through
+Redis pub/sub on per-user and per-room channels, and a node subscribes only
+to the channels of the users and rooms it currently holds, so a publish
+reaches exactly the nodes that have a recipient. Presence is kept in Redis so
+any node can tell whether a user is online. Every socket gets its own send
+queue and writer task, so one slow client can't hold up delivery to the rest:
+a message is JSON-encoded once and the same string is queued on every socket,
+and a socket whose queue fills up (or whose send times out) is closed.
+
+Without Redis (or before ``start``) messages are delivered to local sockets only.
 """
-from typing import Dict, Set
-from fastapi import WebSocket, WebSocketDisconnect
+import asyncio
 import json
 import logging
+import os
+import secrets
+import socket
+import time
+from typing import Dict, Optional, Set
+
+from fastapi import WebSocket
+
+from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+USER_CHANNEL_PREFIX = "ws:user:"
+ROOM_CHANNEL_PREFIX = "ws:room:"
+BROADCAST_CHANNEL = "ws:broadcast"
+PRESENCE_KEY_PREFIX = "ws:presence:"
+
+# Close code for evicted slow consumers ("Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+def user_channel(user_id) -> str:
+    return f"{USER_CHANNEL_PREFIX}{user_id}"
+
+
+def room_channel(room_id: str) -> str:
+    return f"{ROOM_CHANNEL_PREFIX}{room_id}"
+
+
+def presence_key(user_id) -> str:
+    """Sorted set of node ids holding a socket for the user, scored by expiry time."""
+    return f"{PRESENCE_KEY_PREFIX}{user_id}"
+
+
+class _Connection:
+    """A registered socket with its own bounded outbound queue and writer task."""
+
+    def __init__(self, websocket: WebSocket, user_id, queue_size: int, send_timeout: float, on_failure):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.rooms: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.send_timeout = send_timeout
+        self.on_failure = on_failure
+        self.writer: Optional[asyncio.Task] = None
+        self.evicted = False
+
+    def start(self) -> None:
+        self.writer = asyncio.create_task(self._write())
+
+    def enqueue(self, text: str) -> bool:
+        """Queue a serialized message; False if the client is too far behind."""
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _write(self) -> None:
+        while True:
+            text = await self.queue.get()
+            try:
+                # asyncio.timeout, not wait_for: on 3.11 wait_for can swallow
+                # the cancellation from close() when the send has just finished
+                async with asyncio.timeout(self.send_timeout):
+                    await self.websocket.send_text(text)
+            except Exception as e:
+                logger.error(f"Error sending WebSocket message to user {self.user_id}: {e!r}")
+                self.on_failure(self)
+                return
+
+    def close(self) -> None:
+        if self.writer:
+            self.writer.cancel()
 
 
 class ConnectionManager:
-    """WebSocket connection manager."""
-    
-    def __init__(self):
-        # user_id -> Set[WebSocket]
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
+    """WebSocket connection manager with a Redis pub/sub backplane."""
+
+    def __init__(self, queue_size: Optional[int] = None, send_timeout: Optional[float] = None):
+        # user_id -> Set[WebSocket] (sockets on this node)
+        self.active_connections: Dict[str, Set[WebSocket]] = {}
         # room_id -> Set[WebSocket] (for chat rooms)
         self.room_connections: Dict[str, Set[WebSocket]] = {}
-    
-    async def connect(self, websocket: WebSocket, user_id: int):
+        self.node_id = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self.queue_size = queue_size or settings.websocket_send_queue_size
+        self.send_timeout = send_timeout or settings.websocket_send_timeout_seconds
+        self._connections: Dict[WebSocket, _Connection] = {}
+        self._redis = None
+        self._pubsub = None
+        self._tasks: list[asyncio.Task] = []
+        self._background: Set[asyncio.Task] = set()
+
+    @property
+    def backplane_enabled(self) -> bool:
+        return self._pubsub is not None
+
+    async def start(self) -> None:
+        """Connect to the Redis backplane and start listening (call once per process)."""
+        try:
+            from app.infrastructure.cache.redis import get_redis
+
+            redis = await get_redis()
+            pubsub = _pubsub_client(redis).pubsub()
+            await pubsub.subscribe(BROADCAST_CHANNEL)
+        except Exception as e:
+            logger.warning(f"WebSocket backplane unavailable, delivering to local sockets only: {e}")
+            return
+
+        self._redis = redis
+        self._pubsub = pubsub
+        self._tasks = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._heartbeat()),
+        ]
+        logger.info(f"WebSocket backplane started on node {self.node_id}")
+
+    async def stop(self) -> None:
+        """Stop listening, withdraw this node's presence and close socket writers."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._redis is not None and self.active_connections:
+            try:
+                pipe = self._redis.pipeline()
+                for user_id in self.active_connections:
+                    pipe.zrem(presence_key(user_id), self.node_id)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to clear WebSocket presence: {e}")
+
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.aclose()
+            except Exception:
+                pass
+        self._pubsub = None
+        self._redis = None
+
+        writers = [c.writer for c in self._connections.values() if c.writer] + list(self._background)
+        for connection in self._connections.values():
+            connection.close()
+        await asyncio.gather(*writers, return_exceptions=True)
+
+    async def connect(self, websocket: WebSocket, user_id):
         """Accept and register a WebSocket connection for the given user."""
         await websocket.accept()
-        if user_id not in self.active_connections:
-            self.active_connections[user_id] = set()
-        self.active_connections[user_id].add(websocket)
+        connection = _Connection(websocket, user_id, self.queue_size, self.send_timeout, self._evict)
+        connection.start()
+        self._connections[websocket] = connection
+
+        sockets = self.active_connections.setdefault(user_id, set())
+        sockets.add(websocket)
+        if len(sockets) == 1:
+            await self._subscribe(user_channel(user_id))
+            await self._mark_present(user_id)
         logger.info(f"User {user_id} connected via WebSocket")
-    
-    def disconnect(self, websocket: WebSocket, user_id: int):
-        """Remove a WebSocket connection for the given user."""
-        if user_id in self.active_connections:
-            self.active_connections[user_id].discard(websocket)
-            if not self.active_connections[user_id]:
+
+    async def disconnect(self, websocket: WebSocket, user_id):
+        """Remove a WebSocket connection for the given user (idempotent)."""
+        connection = self._connections.pop(websocket, None)
+        if connection is None:
+            return
+        connection.close()
+
+        for room_id in list(connection.rooms):
+            await self._remove_from_room(websocket, room_id)
+
+        sockets = self.active_connections.get(user_id)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
                 del self.active_connections[user_id]
+                await self._unsubscribe(user_channel(user_id))
+                await self._mark_absent(user_id)
         logger.info(f"User {user_id} disconnected from WebSocket")
-    
-    async def send_personal_message(self, message: dict, user_id: int):
-        """Send a personal message to all active connections for a user."""
-        if user_id in self.active_connections:
-            disconnected = set()
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending message to user {user_id}: {e}")
-                    disconnected.add(connection)
-            
-            # Remove disconnected connections
-            for conn in disconnected:
-                self.active_connections[user_id].discard(conn)
-    
+
+    async def send_personal_message(self, message: dict, user_id):
+        """Send a personal message to all of a user's connections, on any node."""
+        await self._publish(user_channel(user_id), message)
+
+    async def send_to_socket(self, websocket: WebSocket, message: dict) -> bool:
+        """Queue a reply (e.g. a pong) on one socket of this node.
+
+        Goes through the socket's writer like any other delivery, so it is
+        never sent concurrently with queued messages. False if the socket
+        isn't registered or was evicted for falling behind.
+        """
+        connection = self._connections.get(websocket)
+        if connection is None:
+            return False
+        return self._queue_on(connection, json.dumps(message, default=str))
+
     async def broadcast(self, message: dict):
-        """Broadcast a message to all connected users."""
-        disconnected = []
-        for user_id, connections in self.active_connections.items():
-            for connection in connections:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to user {user_id}: {e}")
-                    disconnected.append((user_id, connection))
-        
-        # Remove disconnected connections
-        for user_id, conn in disconnected:
-            if user_id in self.active_connections:
-                self.active_connections[user_id].discard(conn)
-    
+        """Broadcast a message to all connected users on every node."""
+        await self._publish(BROADCAST_CHANNEL, message)
+
     async def join_room(self, websocket: WebSocket, room_id: str):
         """Join a room identified by room_id."""
-        if room_id not in self.room_connections:
-            self.room_connections[room_id] = set()
-        self.room_connections[room_id].add(websocket)
-    
-    def leave_room(self, websocket: WebSocket, room_id: str):
+        connection = self._connections.get(websocket)
+        if connection is None:
+            return
+        connection.rooms.add(room_id)
+        sockets = self.room_connections.setdefault(room_id, set())
+        sockets.add(websocket)
+        if len(sockets) == 1:
+            await self._subscribe(room_channel(room_id))
+
+    async def leave_room(self, websocket: WebSocket, room_id: str):
         """Leave a room identified by room_id."""
-        if room_id in self.room_connections:
-            self.room_connections[room_id].discard(websocket)
-    
+        connection = self._connections.get(websocket)
+        if connection is not None:
+            connection.rooms.discard(room_id)
+        await self._remove_from_room(websocket, room_id)
+
     async def send_to_room(self, message: dict, room_id: str):
-        """Send a message to all connections in a room."""
-        if room_id in self.room_connections:
-            disconnected = set()
-            for connection in self.room_connections[room_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error sending to room {room_id}: {e}")
-                    disconnected.add(connection)
-            
-            for conn in disconnected:
-                self.room_connections[room_id].discard(conn)
+        """Send a message to all connections in a room, on any node."""
+        await self._publish(room_channel(room_id), message)
+
+    async def is_user_online(self, user_id) -> bool:
+        """Whether the user has a live socket on any node."""
+        if user_id in self.active_connections:
+            return True
+        if self._redis is None:
+            return False
+        try:
+            return await self._redis.zcount(presence_key(user_id), time.time(), "+inf") > 0
+        except Exception as e:
+            logger.warning(f"WebSocket presence lookup failed for user {user_id}: {e}")
+            return False
+
+    async def _remove_from_room(self, websocket: WebSocket, room_id: str) -> None:
+        sockets = self.room_connections.get(room_id)
+        if sockets is None:
+            return
+        sockets.discard(websocket)
+        if not sockets:
+            del self.room_connections[room_id]
+            await self._unsubscribe(room_channel(room_id))
+
+    async def _publish(self, channel: str, message: dict) -> None:
+        text = json.dumps(message, default=str)
+        if self._redis is not None:
+            try:
+                await self._redis.execute_command("PUBLISH", channel, text)
+                return
+            except Exception as e:
+                logger.warning(f"WebSocket publish to {channel} failed, delivering locally: {e}")
+        self._deliver_local(channel, text)
+
+    def _deliver_local(self, channel: str, text: str) -> int:
+        """Queue a serialized message on every local socket subscribed to ``channel``."""
+        if channel.startswith(USER_CHANNEL_PREFIX):
+            sockets = self.active_connections.get(channel[len(USER_CHANNEL_PREFIX):], ())
+        elif channel.startswith(ROOM_CHANNEL_PREFIX):
+            sockets = self.room_connections.get(channel[len(ROOM_CHANNEL_PREFIX):], ())
+        elif channel == BROADCAST_CHANNEL:
+            sockets = self._connections.keys()
+        else:
+            return 0
+
+        delivered = 0
+        for websocket in list(sockets):
+            connection = self._connections.get(websocket)
+            if connection is not None and self._queue_on(connection, text):
+                delivered += 1
+        return delivered
+
+    def _queue_on(self, connection: _Connection, text: str) -> bool:
+        """Queue ``text`` on a socket, evicting it if its queue is full."""
+        if connection.enqueue(text):
+            return True
+        logger.warning(f"WebSocket send queue full, disconnecting slow client for user {connection.user_id}")
+        self._evict(connection)
+        return False
+
+    def _evict(self, connection: _Connection) -> None:
+        """Close and unregister a socket that can't keep up (or whose sends fail)."""
+        if connection.evicted or self._connections.get(connection.websocket) is not connection:
+            return
+        connection.evicted = True
+        task = asyncio.create_task(self._close_slow_consumer(connection))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _close_slow_consumer(self, connection: _Connection) -> None:
+        await self.disconnect(connection.websocket, connection.user_id)
+        try:
+            await asyncio.wait_for(
+                connection.websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Client too slow"),
+                self.send_timeout
+            )
+        except Exception:
+            pass
+
+    async def _subscribe(self, channel: str) -> None:
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.subscribe(channel)
+        except Exception as e:
+            logger.warning(f"WebSocket subscribe to {channel} failed: {e}")
+
+    async def _unsubscribe(self, channel: str) -> None:
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.unsubscribe(channel)
+        except Exception as e:
+            logger.warning(f"WebSocket unsubscribe from {channel} failed: {e}")
+
+    async def _mark_present(self, user_id) -> None:
+        if self._redis is None:
+            return
+        try:
+            ttl = settings.websocket_heartbeat_interval * 3
+            key = presence_key(user_id)
+            pipe = self._redis.pipeline()
+            pipe.zadd(key, {self.node_id: time.time() + ttl})
+            pipe.expire(key, ttl)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"WebSocket presence update failed for user {user_id}: {e}")
+
+    async def _mark_absent(self, user_id) -> None:
+        if self._redis is None:
+            return
+        try:
+            await self._redis.zrem(presence_key(user_id), self.node_id)
+        except Exception as e:
+            logger.warning(f"WebSocket presence update failed for user {user_id}: {e}")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"WebSocket backplane connection error: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message is None or message.get("type") != "message":
+                continue
+            channel, data = message["channel"], message["data"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            if isinstance(data, bytes):
+                data = data.decode()
+            self._deliver_local(channel, data)
+
+    async def _heartbeat(self) -> None:
+        """Refresh presence for local users; entries of crashed nodes expire on their own."""
+        interval = settings.websocket_heartbeat_interval
+        while True:
+            await asyncio.sleep(interval)
+            if not self.active_connections:
+                continue
+            try:
+                now = time.time()
+                pipe = self._redis.pipeline()
+                for user_id in list(self.active_connections):
+                    key = presence_key(user_id)
+                    pipe.zadd(key, {self.node_id: now + interval * 3})
+                    pipe.zremrangebyscore(key, "-inf", now)
+                    pipe.expire(key, interval * 3)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"WebSocket presence heartbeat failed: {e}")
+
+
+def _pubsub_client(redis):
+    """
+    Client to subscribe with. Redis Cluster forwards classic PUBLISH to every
+    node, so in cluster mode a plain connection to one node is enough.
+    """
+    if hasattr(redis, "pubsub"):
+        return redis
+    from redis import asyncio as aioredis
+
+    node = redis.get_default_node()
+    return aioredis.Redis(
+        host=node.host,
+        port=node.port,
+        password=getattr(settings, "redis_password", None),
+        decode_responses=True
+    )
 
 
 # Global connection manager
 manager = ConnectionManager()
-
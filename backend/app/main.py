@@ -22,6 +22,12 @@ from app.core.middleware import (
     CORSPreflightMiddleware
 )
 from app.core.session_middleware import SessionValidationMiddleware
+from app.core.request_telemetry import request_log_pipeline
+from app.modules.analytics.ingestion import analytics_event_buffer
+from app.infrastructure.storage.image_transcoding import shutdown_transcode_executor
+from app.infrastructure.websocket.manager import manager as websocket_manager
+from app.modules.search.suggestions import destination_index
+from app.infrastructure.external_apis.openai_client import close_openai_client
 from app.api.v1.router import api_router
 
 from app.core.logging_config import setup_logging, get_uvicorn_log_config
@@ -82,8 +88,19 @@ async def lifespan(app: FastAPI):
         else:
             logger.warning("⚠️  Startup validation failed but continuing in non-production mode")
     
+    await request_log_pipeline.start()
+    await analytics_event_buffer.start()
+    await websocket_manager.start()
+    await destination_index.start()
+    
     yield
     logger.info("Shutting down Safar API...")
+    await request_log_pipeline.stop()
+    await analytics_event_buffer.stop()
+    await websocket_manager.stop()
+    await destination_index.stop()
+    shutdown_transcode_executor()
+    await close_openai_client()
     await close_db()
     logger.info("Database connections closed")
 
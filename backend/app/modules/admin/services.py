@@ -12,6 +12,7 @@ from sqlalchemy.orm import selectinload
 from app.repositories.unit_of_work import IUnitOfWork
 from app.modules.users.models import User, UserRole, UserStatus
 from app.modules.listings.models import Listing, ListingStatus
+from app.modules.listings.load_profiles import ADMIN, listing_load_options
 from app.modules.bookings.models import Booking, BookingStatus, Payment, PaymentStatus
 from app.modules.reviews.models import Review
 from app.modules.analytics.service import AnalyticsService
@@ -341,7 +342,7 @@ class AdminService:
         result = await db.execute(
             select(Listing)
             .where(Listing.id == listing_id)
-            .options(selectinload(Listing.host))
+            .options(*listing_load_options(ADMIN))
         )
         return result.scalar_one_or_none()
     
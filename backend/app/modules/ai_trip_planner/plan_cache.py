@@ -0,0 +1,187 @@
+"""
+Travel plan cache and request coalescing.
+
+Generated plans are cached in Redis under a key built from the normalized
+request (destination, duration, budget bucket, travel style, ...), so
+near-identical requests reuse one completion instead of paying for a new
+multi-second generation. Requests that arrive while a plan for the same key
+is still being generated join that generation instead of starting another.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import get_settings
+from app.infrastructure.cache.redis import CacheService
+from app.modules.ai_trip_planner.streaming import ITINERARY_KEY
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "ai:travel_plan:"
+
+# Budgets within the same 25% band share a plan
+BUDGET_BUCKET_RATIO = 1.25
+
+
+def budget_bucket(budget: Decimal) -> int:
+    """Geometric bucket of a budget (each bucket spans ``BUDGET_BUCKET_RATIO``)."""
+    if budget <= 0:
+        return 0
+    return math.floor(math.log(float(budget)) / math.log(BUDGET_BUCKET_RATIO))
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def plan_cache_key(
+    destination: str,
+    duration_days: int,
+    budget: Decimal,
+    currency: str,
+    travelers_count: int,
+    travel_style: Optional[str] = None,
+    preferences: Optional[Dict[str, Any]] = None,
+    natural_language_request: Optional[str] = None
+) -> str:
+    """Cache key for a travel plan request.
+
+    Case, whitespace and small budget differences don't change the key;
+    travel dates aren't part of it (cached itineraries are re-dated).
+    """
+    normalized = {
+        "destination": _normalize_text(destination),
+        "duration": duration_days,
+        "budget": budget_bucket(budget),
+        "currency": currency.upper(),
+        "travelers": travelers_count,
+        "style": _normalize_text(travel_style),
+        "preferences": preferences or {},
+        "request": _normalize_text(natural_language_request),
+    }
+    digest = hashlib.sha256(
+        json.dumps(normalized, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{CACHE_KEY_PREFIX}{settings.openai_model}:{digest}"
+
+
+async def get_cached_plan(key: str) -> Optional[Dict[str, Any]]:
+    """Cached plan for ``key``, or None on a miss (or when Redis is unavailable)."""
+    try:
+        plan = await CacheService.get(key)
+    except Exception as e:
+        logger.warning(f"Travel plan cache read failed: {e}")
+        return None
+    return plan if isinstance(plan, dict) else None
+
+
+async def cache_plan(key: str, plan: Dict[str, Any]) -> None:
+    """Store a generated plan for ``travel_plan_cache_ttl_seconds``."""
+    try:
+        await CacheService.set(key, plan, expire=settings.travel_plan_cache_ttl_seconds)
+    except Exception as e:
+        logger.warning(f"Travel plan cache write failed: {e}")
+
+
+class PlanFlight:
+    """One plan generation, shared by every request waiting on the same key.
+
+    Itinerary days are published as they are generated so each waiter can
+    stream them; ``result`` resolves with the complete plan.
+    """
+
+    def __init__(self):
+        self.days = []
+        self._updated = asyncio.Event()
+        self._done = asyncio.get_running_loop().create_future()
+        # Mark a failure as retrieved even if every waiter has gone away
+        self._done.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    @classmethod
+    def completed(cls, plan: Dict[str, Any]) -> "PlanFlight":
+        """A flight for an already generated (e.g. cached) plan."""
+        flight = cls()
+        for day in plan.get(ITINERARY_KEY) or []:
+            if isinstance(day, dict):
+                flight.days.append(day)
+        flight.finish(plan)
+        return flight
+
+    def add_day(self, day: Dict[str, Any]) -> None:
+        self.days.append(day)
+        self._notify()
+
+    def finish(self, plan: Dict[str, Any]) -> None:
+        if not self._done.done():
+            self._done.set_result(plan)
+        self._notify()
+
+    def fail(self, error: BaseException) -> None:
+        if not self._done.done():
+            self._done.set_exception(error)
+        self._notify()
+
+    def _notify(self) -> None:
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def stream_days(self):
+        """Yield every itinerary day, waiting for new ones until the plan is done."""
+        index = 0
+        while True:
+            while index < len(self.days):
+                yield self.days[index]
+                index += 1
+            if self._done.done():
+                return
+            await self._updated.wait()
+
+    async def result(self) -> Dict[str, Any]:
+        """The complete plan; re-raises the generation error if it failed."""
+        # Shielded: a waiter giving up must not cancel the plan for the others
+        return await asyncio.shield(self._done)
+
+
+class PlanCoalescer:
+    """Runs at most one plan generation per cache key at a time (per process)."""
+
+    def __init__(self):
+        self._flights: Dict[str, PlanFlight] = {}
+        self._tasks = set()
+
+    def join(self, key: str, generate: Callable[[PlanFlight], Awaitable[None]]) -> PlanFlight:
+        """Join the in-flight generation for ``key``, or start one with ``generate``.
+
+        ``generate`` publishes days to the flight and finishes it with the plan;
+        it runs in its own task so it completes even if its first caller leaves.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = PlanFlight()
+            self._flights[key] = flight
+            task = asyncio.create_task(self._run(key, flight, generate))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return flight
+
+    async def _run(self, key: str, flight: PlanFlight, generate) -> None:
+        try:
+            await generate(flight)
+        except Exception as e:
+            flight.fail(e)
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.fail(RuntimeError("Travel plan generation ended without a plan"))
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+
+plan_coalescer = PlanCoalescer()
@@ -1,12 +1,15 @@
 """
 AI travel planner routes.
 """
+import json
+import logging
 from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date, timedelta
 
-from app.core.database import get_db
+from app.core.database import get_db, AsyncSessionLocal
 from app.core.dependencies import get_current_active_user
 from app.core.config import get_settings
 from app.modules.users.models import User
@@ -14,15 +17,24 @@ from app.modules.ai_trip_planner.schemas import (
     TravelPlanRequest, TravelPlanResponse
 )
 from app.modules.ai_trip_planner.services import AITravelPlannerService
+from app.infrastructure.external_apis.openai_client import get_openai_client
 from app.core.id import ID
 
 router = APIRouter(prefix="/ai/travel-planner", tags=["AI Travel Planner"])
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 
 @router.post("", response_model=TravelPlanResponse, status_code=status.HTTP_201_CREATED)
 async def create_travel_plan(
     plan_request: TravelPlanRequest,
+    stream: bool = Query(
+        False,
+        description=(
+            "Stream NDJSON events: one per itinerary day as it is generated, then the saved plan "
+            "(or an error event if the plan could not be saved)"
+        )
+    ),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
@@ -41,9 +53,7 @@ async def create_travel_plan(
             detail="End date must be after start date"
         )
     
-    # Generate travel plan using AI
-    travel_plan = await AITravelPlannerService.generate_travel_plan(
-        db=db,
+    plan_kwargs = dict(
         user_id=current_user.id,
         destination=plan_request.destination,
         start_date=plan_request.start_date,
@@ -57,6 +67,43 @@ async def create_travel_plan(
         natural_language_request=plan_request.natural_language_request
     )
     
+    if stream:
+        # Once the stream starts the 201 is sent: set up the provider client
+        # while a failure can still be returned as an error status
+        try:
+            get_openai_client()
+        except Exception as e:
+            logger.error(f"AI provider client unavailable: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="AI service is not configured"
+            )
+        
+        async def events():
+            try:
+                # The request's session is closed before a streamed body is sent
+                async with AsyncSessionLocal() as stream_db:
+                    async for event in AITravelPlannerService.stream_travel_plan(db=stream_db, **plan_kwargs):
+                        if event["type"] == "plan":
+                            event = {
+                                "type": "plan",
+                                "plan": TravelPlanResponse.model_validate(event["plan"]).model_dump(mode="json")
+                            }
+                        yield json.dumps(event) + "\n"
+            except Exception as e:
+                # Too late for a status code: end the stream with an error event
+                logger.error(f"Streaming travel plan failed for user {current_user.id}: {e}")
+                yield json.dumps({"type": "error", "detail": "Travel plan generation failed"}) + "\n"
+        
+        return StreamingResponse(
+            events(),
+            media_type="application/x-ndjson",
+            status_code=status.HTTP_201_CREATED
+        )
+    
+    # Generate travel plan using AI
+    travel_plan = await AITravelPlannerService.generate_travel_plan(db=db, **plan_kwargs)
+    
     return travel_plan
 
 
@@ -1,11 +1,13 @@
 """
 Travel planner schemas.
 """
-from datetime import date
+from datetime import date, datetime
 from typing import Optional, Dict, Any, List
 from decimal import Decimal
 from pydantic import BaseModel, Field, ConfigDict
 
+from app.core.id import ID
+
 
 class TravelPlanRequest(BaseModel):
     """Travel plan request schema."""
@@ -39,7 +41,7 @@ class TravelPlanResponse(BaseModel):
     """Travel plan response schema."""
     model_config = ConfigDict(from_attributes=True)
     
-    id: int
+    id: ID
     destination: str
     start_date: date
     end_date: date
@@ -62,5 +64,5 @@ class TravelPlanResponse(BaseModel):
     total_estimated_cost: Optional[Decimal] = None
     is_saved: bool
     is_booked: bool
-    created_at: date
+    created_at: datetime
 
@@ -1,26 +1,67 @@
 """
 AI travel planner services.
 """
-from datetime import date, datetime
-from typing import Optional, Dict, Any, List
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, List, AsyncIterator
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 import json
 
 from app.core.config import get_settings
+from app.infrastructure.external_apis.openai_client import get_openai_client
 from app.modules.ai_trip_planner.models import TravelPlan
+from app.modules.ai_trip_planner.plan_cache import (
+    PlanFlight, cache_plan, get_cached_plan, plan_cache_key, plan_coalescer
+)
 from app.modules.ai_trip_planner.prompts import get_travel_plan_prompt
+from app.modules.ai_trip_planner.streaming import ITINERARY_KEY, ItineraryStreamParser
 
 settings = get_settings()
 
+SYSTEM_PROMPT = "You are an expert travel planner. Generate detailed, practical travel plans in JSON format."
+
+
+def align_itinerary_day(day: Dict[str, Any], start_date: date) -> Dict[str, Any]:
+    """Re-date an itinerary day for a trip starting on ``start_date``.
+
+    Cached plans are shared between requests with different travel dates.
+    """
+    day_number = day.get("day")
+    if not isinstance(day_number, int) or day_number < 1:
+        return day
+    return {**day, "date": (start_date + timedelta(days=day_number - 1)).isoformat()}
+
+
+async def _generate_plan(flight: PlanFlight, cache_key: str, prompt: str) -> None:
+    """Stream a completion, publishing itinerary days to ``flight`` as they complete."""
+    client = get_openai_client()
+    stream = await client.chat.completions.create(
+        model=settings.openai_model,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        response_format={"type": "json_object"},
+        stream=True
+    )
+    parser = ItineraryStreamParser()
+    async for chunk in stream:
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        for day in parser.feed(chunk.choices[0].delta.content):
+            flight.add_day(day)
+
+    ai_response = parser.result()
+    await cache_plan(cache_key, ai_response)
+    flight.finish(ai_response)
+
 
 class AITravelPlannerService:
     """AI travel planner service."""
-    
+
     @staticmethod
-    async def generate_travel_plan(
-        db: AsyncSession,
-        user_id: int,
+    async def _plan_flight(
         destination: str,
         start_date: date,
         end_date: date,
@@ -28,120 +69,200 @@ class AITravelPlannerService:
         budget: Decimal,
         currency: str,
         travelers_count: int,
-        travel_style: Optional[str] = None,
-        user_preferences: Optional[Dict[str, Any]] = None,
-        natural_language_request: Optional[str] = None
+        travel_style: Optional[str],
+        user_preferences: Optional[Dict[str, Any]],
+        natural_language_request: Optional[str]
+    ) -> tuple[PlanFlight, str]:
+        """The cached plan for this request, or the (possibly shared) generation producing it."""
+        prompt = get_travel_plan_prompt(
+            destination=destination,
+            start_date=start_date.isoformat(),
+            end_date=end_date.isoformat(),
+            duration_days=duration_days,
+            budget=float(budget),
+            currency=currency,
+            travelers_count=travelers_count,
+            travel_style=travel_style,
+            preferences=user_preferences or {},
+            natural_language_request=natural_language_request
+        )
+        cache_key = plan_cache_key(
+            destination, duration_days, budget, currency, travelers_count,
+            travel_style, user_preferences, natural_language_request
+        )
+
+        cached = await get_cached_plan(cache_key)
+        if cached is not None:
+            return PlanFlight.completed(cached), prompt
+
+        flight = plan_coalescer.join(
+            cache_key, lambda flight: _generate_plan(flight, cache_key, prompt)
+        )
+        return flight, prompt
+
+    @staticmethod
+    async def _save_plan(
+        db: AsyncSession,
+        request: Dict[str, Any],
+        ai_response: Optional[Dict[str, Any]],
+        prompt: Optional[str],
+        error: Optional[Exception] = None
     ) -> TravelPlan:
-        """Generate a travel plan using AI."""
-        if not settings.openai_api_key:
-            raise ValueError("OpenAI API key is not configured")
-        
-        try:
-            from openai import AsyncOpenAI
-            
-            client = AsyncOpenAI(api_key=settings.openai_api_key)
-            
-            # Build prompt
-            prompt = get_travel_plan_prompt(
-                destination=destination,
-                start_date=start_date.isoformat(),
-                end_date=end_date.isoformat(),
-                duration_days=duration_days,
-                budget=float(budget),
-                currency=currency,
-                travelers_count=travelers_count,
-                travel_style=travel_style,
-                preferences=user_preferences or {},
-                natural_language_request=natural_language_request
-            )
-            
-            # Call OpenAI API
-            response = await client.chat.completions.create(
-                model=settings.openai_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert travel planner. Generate detailed, practical travel plans in JSON format."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                response_format={"type": "json_object"}
+        """Persist a generated plan, or the basic fallback plan when generation failed."""
+        if ai_response is None:
+            # Fallback: Create a basic plan without AI
+            travel_plan = TravelPlan(
+                **request,
+                plan_title=f"Trip to {request['destination']}",
+                plan_summary=f"A {request['duration_days']}-day trip to {request['destination']}",
+                daily_itinerary=[],
+                recommended_properties=[],
+                recommended_activities=[],
+                recommended_restaurants=[],
+                transportation_suggestions=[],
+                ai_model_used=None,
+                ai_prompt=None,
+                ai_response={"error": str(error)},
+                is_saved=False,
+                is_booked=False
             )
-            
-            # Parse response
-            ai_response = json.loads(response.choices[0].message.content)
-            
-            # Create travel plan
+        else:
+            costs = ai_response.get("costs", {})
             travel_plan = TravelPlan(
-                user_id=user_id,
-                destination=destination,
-                start_date=start_date,
-                end_date=end_date,
-                duration_days=duration_days,
-                budget=budget,
-                currency=currency,
-                travelers_count=travelers_count,
-                travel_style=travel_style,
-                preferences=user_preferences or {},
+                **request,
                 plan_title=ai_response.get("title"),
                 plan_summary=ai_response.get("summary"),
-                daily_itinerary=ai_response.get("daily_itinerary", []),
+                daily_itinerary=[
+                    align_itinerary_day(day, request["start_date"])
+                    for day in ai_response.get(ITINERARY_KEY, [])
+                    if isinstance(day, dict)
+                ],
                 recommended_listings=ai_response.get("recommended_listing_ids", []),
                 recommended_activities=ai_response.get("activities", []),
                 recommended_restaurants=ai_response.get("restaurants", []),
                 transportation_suggestions=ai_response.get("transportation", []),
-                estimated_accommodation_cost=Decimal(str(ai_response.get("costs", {}).get("accommodation", 0))),
-                estimated_activities_cost=Decimal(str(ai_response.get("costs", {}).get("activities", 0))),
-                estimated_food_cost=Decimal(str(ai_response.get("costs", {}).get("food", 0))),
-                estimated_transportation_cost=Decimal(str(ai_response.get("costs", {}).get("transportation", 0))),
-                total_estimated_cost=Decimal(str(ai_response.get("costs", {}).get("total", 0))),
+                estimated_accommodation_cost=Decimal(str(costs.get("accommodation", 0))),
+                estimated_activities_cost=Decimal(str(costs.get("activities", 0))),
+                estimated_food_cost=Decimal(str(costs.get("food", 0))),
+                estimated_transportation_cost=Decimal(str(costs.get("transportation", 0))),
+                total_estimated_cost=Decimal(str(costs.get("total", 0))),
                 ai_model_used=settings.openai_model,
                 ai_prompt=prompt,
                 ai_response=ai_response,
                 is_saved=False,
                 is_booked=False
             )
-            
-            db.add(travel_plan)
-            await db.commit()
-            await db.refresh(travel_plan)
-            
-            return travel_plan
-            
+
+        db.add(travel_plan)
+        await db.commit()
+        await db.refresh(travel_plan)
+
+        return travel_plan
+
+    @staticmethod
+    async def generate_travel_plan(
+        db: AsyncSession,
+        user_id: int,
+        destination: str,
+        start_date: date,
+        end_date: date,
+        duration_days: int,
+        budget: Decimal,
+        currency: str,
+        travelers_count: int,
+        travel_style: Optional[str] = None,
+        user_preferences: Optional[Dict[str, Any]] = None,
+        natural_language_request: Optional[str] = None
+    ) -> TravelPlan:
+        """Generate a travel plan using AI.
+
+        Equivalent requests are served from the plan cache, and concurrent
+        ones share a single completion.
+        """
+        if not settings.openai_api_key:
+            raise ValueError("OpenAI API key is not configured")
+
+        request = AITravelPlannerService._request_fields(
+            user_id, destination, start_date, end_date, duration_days, budget,
+            currency, travelers_count, travel_style, user_preferences
+        )
+        ai_response, prompt, error = None, None, None
+        try:
+            flight, prompt = await AITravelPlannerService._plan_flight(
+                destination, start_date, end_date, duration_days, budget, currency,
+                travelers_count, travel_style, user_preferences, natural_language_request
+            )
+            ai_response = await flight.result()
         except Exception as e:
-            # Fallback: Create a basic plan without AI
-            travel_plan = TravelPlan(
-                user_id=user_id,
-                destination=destination,
-                start_date=start_date,
-                end_date=end_date,
-                duration_days=duration_days,
-                budget=budget,
-                currency=currency,
-                travelers_count=travelers_count,
-                travel_style=travel_style,
-                preferences=user_preferences or {},
-                plan_title=f"Trip to {destination}",
-                plan_summary=f"A {duration_days}-day trip to {destination}",
-                daily_itinerary=[],
-                recommended_properties=[],
-                recommended_activities=[],
-                recommended_restaurants=[],
-                transportation_suggestions=[],
-                ai_model_used=None,
-                ai_prompt=None,
-                ai_response={"error": str(e)},
-                is_saved=False,
-                is_booked=False
+            error = e
+
+        return await AITravelPlannerService._save_plan(db, request, ai_response, prompt, error)
+
+    @staticmethod
+    async def stream_travel_plan(
+        db: AsyncSession,
+        user_id: int,
+        destination: str,
+        start_date: date,
+        end_date: date,
+        duration_days: int,
+        budget: Decimal,
+        currency: str,
+        travelers_count: int,
+        travel_style: Optional[str] = None,
+        user_preferences: Optional[Dict[str, Any]] = None,
+        natural_language_request: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Generate a travel plan, yielding itinerary days as they are generated.
+
+        Yields ``{"type": "day", "day": {...}}`` events, then a final
+        ``{"type": "plan", "plan": TravelPlan}`` once the plan is saved.
+        """
+        if not settings.openai_api_key:
+            raise ValueError("OpenAI API key is not configured")
+
+        request = AITravelPlannerService._request_fields(
+            user_id, destination, start_date, end_date, duration_days, budget,
+            currency, travelers_count, travel_style, user_preferences
+        )
+        ai_response, prompt, error = None, None, None
+        try:
+            flight, prompt = await AITravelPlannerService._plan_flight(
+                destination, start_date, end_date, duration_days, budget, currency,
+                travelers_count, travel_style, user_preferences, natural_language_request
             )
-            
-            db.add(travel_plan)
-            await db.commit()
-            await db.refresh(travel_plan)
-            
-            return travel_plan
+            async for day in flight.stream_days():
+                yield {"type": "day", "day": align_itinerary_day(day, start_date)}
+            ai_response = await flight.result()
+        except Exception as e:
+            error = e
+
+        travel_plan = await AITravelPlannerService._save_plan(db, request, ai_response, prompt, error)
+        yield {"type": "plan", "plan": travel_plan}
 
+    @staticmethod
+    def _request_fields(
+        user_id: int,
+        destination: str,
+        start_date: date,
+        end_date: date,
+        duration_days: int,
+        budget: Decimal,
+        currency: str,
+        travelers_count: int,
+        travel_style: Optional[str],
+        user_preferences: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """TravelPlan columns taken directly from the request."""
+        return {
+            "user_id": user_id,
+            "destination": destination,
+            "start_date": start_date,
+            "end_date": end_date,
+            "duration_days": duration_days,
+            "budget": budget,
+            "currency": currency,
+            "travelers_count": travelers_count,
+            "travel_style": travel_style,
+            "preferences": user_preferences or {},
+        }
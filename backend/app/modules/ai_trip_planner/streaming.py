@@ -0,0 +1,73 @@
+"""
+Incremental parsing of streamed travel plans.
+
+The model streams one JSON object; itinerary days are emitted as soon as
+each element of its ``daily_itinerary`` array is complete, long before the
+rest of the plan (restaurants, costs, ...) has been generated.
+"""
+import json
+from typing import Any, Dict, List
+
+ITINERARY_KEY = "daily_itinerary"
+
+
+class ItineraryStreamParser:
+    """Scans streamed JSON text and returns itinerary days as they complete."""
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+        self._in_itinerary = False
+        self._day_start = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add streamed text; return the itinerary days completed by it."""
+        self.text += chunk
+        days = []
+        text = self.text
+        while self._pos < len(text):
+            ch = text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        # Top-level keys (and string values); the key is the last string before its value
+                        self._last_string = text[self._string_start + 1:self._pos]
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._depth == 2 and self._last_string == ITINERARY_KEY:
+                    self._in_itinerary = True
+                elif ch == "{" and self._in_itinerary and self._depth == 3:
+                    self._day_start = self._pos
+            elif ch in "}]":
+                if self._in_itinerary and self._depth == 3 and self._day_start is not None:
+                    try:
+                        days.append(json.loads(text[self._day_start:self._pos + 1]))
+                    except ValueError:
+                        pass
+                    self._day_start = None
+                elif self._in_itinerary and self._depth == 2:
+                    self._in_itinerary = False
+                self._depth -= 1
+            self._pos += 1
+        return days
+
+    def result(self) -> Dict[str, Any]:
+        """Parse the complete streamed document.
+
+        Raises:
+            ValueError: if the streamed text isn't valid JSON.
+        """
+        return json.loads(self.text)
@@ -0,0 +1,205 @@
+"""
+Buffered analytics event ingestion.
+
+``AnalyticsService.track_event`` appends events to an in-process buffer and
+returns immediately; a background task bulk-loads them into
+``analytics_events`` with asyncpg ``COPY`` through a staging table.
+
+Delivery is at-least-once: a batch leaves the buffer only after its transaction
+commits, failed batches are retried with backoff, and event ids are assigned at
+enqueue time so a retried batch is de-duplicated by ``ON CONFLICT (id)``.
+When the buffer is full, producers wait (up to a timeout) for the flusher to
+catch up instead of growing memory without bound.
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# (id, user_id, event_name, source, payload_json, recorded_at)
+EventRecord = Tuple[str, Optional[str], str, str, str, datetime]
+
+ANALYTICS_EVENT_COLUMNS = ("id", "user_id", "event_name", "source", "payload", "recorded_at")
+
+STAGING_TABLE = "analytics_events_staging"
+
+CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+    id varchar(40) NOT NULL,
+    user_id varchar(40),
+    event_name varchar(100) NOT NULL,
+    source varchar(50) NOT NULL,
+    payload jsonb NOT NULL,
+    recorded_at timestamptz NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+# Events for users deleted in the meantime keep the row with a NULL user
+# (same outcome as the FK's ON DELETE SET NULL) instead of failing the batch.
+MERGE_STAGING_SQL = f"""
+INSERT INTO analytics_events (id, user_id, event_name, source, payload, recorded_at)
+SELECT s.id, u.id, s.event_name, s.source, s.payload, s.recorded_at
+FROM {STAGING_TABLE} s
+LEFT JOIN users u ON u.id = s.user_id
+ON CONFLICT (id) DO NOTHING
+"""
+
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+
+def serialize_payload(payload: Optional[dict]) -> str:
+    return json.dumps(payload or {}, separators=(",", ":"), default=str)
+
+
+async def copy_analytics_events(conn: Any, records: Sequence[EventRecord]) -> None:
+    """Bulk-load records on an asyncpg connection in one transaction."""
+    async with conn.transaction():
+        await conn.execute(CREATE_STAGING_SQL)
+        await conn.copy_records_to_table(STAGING_TABLE, records=records, columns=ANALYTICS_EVENT_COLUMNS)
+        await conn.execute(MERGE_STAGING_SQL)
+
+
+async def write_analytics_events(records: Sequence[EventRecord]) -> None:
+    """Default writer: COPY a batch through a pooled application connection."""
+    from app.core.database import engine
+
+    async with engine.connect() as connection:
+        raw = await connection.get_raw_connection()
+        await copy_analytics_events(raw.driver_connection, records)
+
+
+class AnalyticsEventBuffer:
+    """Bounded event buffer with a single background flusher."""
+
+    def __init__(
+        self,
+        writer: Callable[[Sequence[EventRecord]], Awaitable[None]] = write_analytics_events,
+        max_events: int = 50000,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        enqueue_timeout: float = 0.5,
+    ):
+        self.writer = writer
+        self.max_events = max_events
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.dropped = 0
+        self.failures = 0
+        self._events: Deque[EventRecord] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    async def put(self, record: EventRecord) -> bool:
+        """
+        Buffer one event. Returns False if it had to be dropped because the
+        buffer stayed full for ``enqueue_timeout`` seconds.
+        """
+        self._ensure_started()
+        if len(self._events) >= self.max_events:
+            self._wakeup.set()
+            self._space.clear()
+            try:
+                await asyncio.wait_for(self._space.wait(), timeout=self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                pass
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                logger.error(
+                    f"Analytics buffer full, dropping event: event_name={record[2]}, "
+                    f"buffered={len(self._events)}, dropped_total={self.dropped}"
+                )
+                return False
+
+        self._events.append(record)
+        if len(self._events) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def start(self) -> None:
+        self._ensure_started()
+
+    async def stop(self) -> None:
+        """Stop the background flusher and write out everything still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            while self._events:
+                await self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing analytics events on shutdown ({len(self._events)} left): {e}")
+
+    async def flush(self) -> int:
+        """
+        Write the oldest batch. Records are removed only after the writer
+        succeeds, so a failure leaves them in place for the next attempt.
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._events:
+                return 0
+            count = min(self.batch_size, len(self._events))
+            batch = [self._events[i] for i in range(count)]
+            await self.writer(batch)
+            for _ in range(count):
+                self._events.popleft()
+            if self._space is not None:
+                self._space.set()
+            return count
+
+    def _ensure_started(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        delay = self.flush_interval
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while self._events:
+                    await self.flush()
+                delay = self.flush_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                delay = min(max(delay, self.flush_interval) * 2, MAX_RETRY_DELAY_SECONDS)
+                logger.error(
+                    f"Analytics flush failed, retrying in {delay:.1f}s: "
+                    f"buffered={len(self._events)}, error={e}"
+                )
+
+
+analytics_event_buffer = AnalyticsEventBuffer(
+    max_events=settings.analytics_buffer_max_events,
+    batch_size=settings.analytics_batch_size,
+    flush_interval=settings.analytics_flush_interval_seconds,
+    enqueue_timeout=settings.analytics_enqueue_timeout_seconds,
+)
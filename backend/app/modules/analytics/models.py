@@ -3,7 +3,7 @@ Analytics models (from the Prisma schema).
 """
 from datetime import datetime
 from sqlalchemy import (
-    Column, String, Integer, DateTime, Index, ForeignKey
+    Column, String, Integer, DateTime, Index, ForeignKey, func
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
@@ -64,3 +64,19 @@ class SearchSnapshot(BaseModel):
         Index("idx_search_snapshot_indexed", "indexed_at"),
     )
 
+
+class SearchSnapshotOutbox(BaseModel):
+    """
+    Listings whose search snapshot must be rebuilt.
+    Written in the same transaction as the listing, photo or review change;
+    drained by the snapshot refresh worker.
+    """
+    __tablename__ = "search_snapshot_outbox"
+    
+    listing_id = Column(String(40), ForeignKey("listings.id", ondelete="CASCADE"), unique=True, nullable=False, index=True)
+    enqueued_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index("idx_search_snapshot_outbox_enqueued", "enqueued_at"),
+    )
+
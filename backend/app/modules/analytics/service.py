@@ -11,11 +11,15 @@ from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
 from app.modules.analytics.models import AnalyticsEvent, AuditLog
+from app.modules.analytics.ingestion import analytics_event_buffer, serialize_payload
 from app.modules.bookings.models import Booking, BookingStatus, PaymentStatus
 from app.modules.listings.models import Listing, ListingStatus
 from app.modules.reviews.models import Review
 from app.modules.users.models import User
-from app.core.id import ID
+from app.core.id import ID, generate_typed_id
+
+# Same prefix BaseModel derives from the table name
+ANALYTICS_EVENT_ID_PREFIX = "ANAL"
 
 
 class AnalyticsService:
@@ -23,33 +27,44 @@ class AnalyticsService:
     
     @staticmethod
     async def track_event(
-        db: AsyncSession,
+        db: Optional[AsyncSession],
         user_id: Optional[ID],
         event_name: str,
         source: str,
         payload: Optional[Dict[str, Any]] = None
     ) -> AnalyticsEvent:
         """
-        Track an analytics event.
+        Track an analytics event (fire-and-forget).
+        
+        The event is buffered and bulk-inserted by a background flusher, so this
+        never touches the caller's session or transaction.
         
         Args:
+            db: Unused; kept for call-site compatibility
             user_id: Optional user ID
             event_name: Event name (e.g., 'listing_viewed', 'booking_created')
             source: Source of event ('web', 'mobile', 'api')
             payload: Optional event data
         
         Returns:
-            AnalyticsEvent model
+            Unsaved AnalyticsEvent with its final id
         """
         event = AnalyticsEvent(
+            id=generate_typed_id(ANALYTICS_EVENT_ID_PREFIX),
             user_id=user_id,
             event_name=event_name,
             source=source,
-            payload=payload or {}
+            payload=payload or {},
+            recorded_at=datetime.now(timezone.utc)
         )
-        db.add(event)
-        await db.commit()
-        await db.refresh(event)
+        await analytics_event_buffer.put((
+            event.id,
+            event.user_id,
+            event.event_name,
+            event.source,
+            serialize_payload(event.payload),
+            event.recorded_at,
+        ))
         return event
     
     @staticmethod
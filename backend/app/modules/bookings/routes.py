@@ -243,6 +243,15 @@ async def complete_booking(
     booking.status = BookingStatus.COMPLETED
     booking.completed_at = func.now()
     
+    from app.modules.listings.popularity_service import ListingPopularityService
+    from app.modules.listings.availability_service import ListingAvailabilityService
+    await ListingPopularityService.apply_booking_transition(
+        db, booking.listing_id, old_status, BookingStatus.COMPLETED.value
+    )
+    await ListingAvailabilityService.apply_booking_transition(
+        db, booking.listing_id, old_status, BookingStatus.COMPLETED.value
+    )
+    
     await db.commit()
     await db.refresh(booking, ["timeline_events"])
     
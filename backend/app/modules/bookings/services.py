@@ -14,6 +14,7 @@ from app.domain.entities.booking import BookingEntity
 from app.domain.entities.listing import ListingEntity
 from app.modules.bookings.schemas import BookingCreate
 from app.modules.bookings.models import BookingStatus, PaymentStatus
+from app.modules.listings.pricing import pricing_engine
 from app.core.id import generate_typed_id, ID
 from app.core.config import get_settings
 
@@ -82,14 +83,31 @@ class BookingService:
                 detail=f"Minimum stay is {listing.min_stay_nights} nights"
             )
         
-        # Use domain logic to calculate price
-        total_price = listing.calculate_total_price(nights)
+        # Convert datetime to date if needed
+        check_in_date = check_in.date() if isinstance(check_in, datetime) else check_in
+        check_out_date = check_out.date() if isinstance(check_out, datetime) else check_out
+        if check_out_date <= check_in_date:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Check-out must be after check-in"
+            )
         
         # Add security deposit
         security_deposit = listing.security_deposit or Decimal("0")
         
-        # Calculate breakdown
-        base_price = listing.base_price * nights
+        # Calculate breakdown (nightly rates from the listing's pricing rules)
+        quote = await pricing_engine.quote(uow.db, listing, check_in_date, check_out_date)
+        if quote.min_nights and nights < quote.min_nights:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Minimum stay for these dates is {quote.min_nights} nights"
+            )
+        if quote.max_nights and nights > quote.max_nights:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Maximum stay for these dates is {quote.max_nights} nights"
+            )
+        base_price = quote.total
         cleaning_fee = listing.cleaning_fee or Decimal("0")
         service_fee = (base_price * listing.service_fee) / 100 if listing.service_fee else Decimal("0")
         
@@ -105,10 +123,6 @@ class BookingService:
             # Calculate subtotal before discount for coupon validation
             subtotal_before_discount = base_price + cleaning_fee + service_fee
             
-            # Convert datetime to date if needed
-            check_in_date = check_in.date() if isinstance(check_in, datetime) else check_in
-            check_out_date = check_out.date() if isinstance(check_out, datetime) else check_out
-            
             # Validate and calculate coupon discount
             # Note: guest_id not available in this context, will validate without user-specific checks
             try:
@@ -383,6 +397,16 @@ class BookingService:
                 # Update the booking with the new status
                 created = await uow.bookings.update(created)
             
+            # Keep materialized popularity in step (same transaction)
+            from app.modules.listings.popularity_service import ListingPopularityService
+            from app.modules.listings.availability_service import ListingAvailabilityService
+            await ListingPopularityService.apply_booking_transition(
+                uow.db, booking_data.listing_id, None, created.status
+            )
+            await ListingAvailabilityService.apply_booking_transition(
+                uow.db, booking_data.listing_id, None, created.status
+            )
+            
             try:
                 await uow.commit()
             except IntegrityError as e:
@@ -509,6 +533,15 @@ class BookingService:
         booking.cancellation_reason = reason
         
         updated = await uow.bookings.update(booking)
+        
+        from app.modules.listings.popularity_service import ListingPopularityService
+        from app.modules.listings.availability_service import ListingAvailabilityService
+        await ListingPopularityService.apply_booking_transition(
+            uow.db, booking.listing_id, old_status, BookingStatus.CANCELLED.value
+        )
+        await ListingAvailabilityService.apply_booking_transition(
+            uow.db, booking.listing_id, old_status, BookingStatus.CANCELLED.value
+        )
         await uow.commit()
         
         # Track analytics event
@@ -648,6 +681,15 @@ class BookingService:
         booking.status = BookingStatus.CONFIRMED.value
         booking.confirmed_at = datetime.utcnow()
         
+        from app.modules.listings.popularity_service import ListingPopularityService
+        from app.modules.listings.availability_service import ListingAvailabilityService
+        await ListingPopularityService.apply_booking_transition(
+            db, booking.listing_id, old_status, BookingStatus.CONFIRMED.value
+        )
+        await ListingAvailabilityService.apply_booking_transition(
+            db, booking.listing_id, old_status, BookingStatus.CONFIRMED.value
+        )
+        
         await db.flush()
         await db.refresh(booking)
         
@@ -3,6 +3,7 @@ File models.
 """
 from sqlalchemy import Column, String, Integer, Enum as SQLEnum, ForeignKey, Text
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB
 import enum
 
 from app.shared.base import BaseModel
@@ -27,6 +28,15 @@ class FileCategory(str, enum.Enum):
     OTHER = "other"
 
 
+class FileProcessingStatus(str, enum.Enum):
+    """Background processing status (direct-upload validation, image transcoding)."""
+    AWAITING_UPLOAD = "awaiting_upload"  # Presigned upload issued, not yet confirmed
+    PENDING = "pending"
+    PROCESSING = "processing"
+    READY = "ready"
+    FAILED = "failed"
+
+
 class File(BaseModel):
     """Files table."""
     __tablename__ = "files"
@@ -48,6 +58,11 @@ class File(BaseModel):
     description = Column(Text, nullable=True)
     file_metadata = Column("metadata", Text, nullable=True)  # JSON string
     
+    # Background processing (NULL for files that aren't processed)
+    processing_status = Column(SQLEnum(FileProcessingStatus), nullable=True, index=True)
+    processing_error = Column(Text, nullable=True)
+    variants = Column(JSONB, nullable=True)  # {"w640.webp": {"url", "width", "height", "size", "content_type"}}
+    
     # Relationships
     uploader = relationship("User", lazy="selectin")
 
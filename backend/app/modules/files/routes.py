@@ -7,10 +7,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_active_user
+from app.core.id import ID
 from app.modules.users.models import User
-from app.modules.files.models import FileCategory
-from app.modules.files.schemas import FileResponse, FileUploadResponse
-from app.modules.files.services import save_file
+from app.modules.files.models import File as FileModel, FileCategory
+from app.modules.files.schemas import (
+    FileResponse, FileUploadResponse, DirectUploadRequest, DirectUploadResponse
+)
+from app.modules.files.services import save_file, create_direct_upload, confirm_direct_upload
 
 router = APIRouter(prefix="/files", tags=["Files"])
 
@@ -55,3 +58,59 @@ async def upload_multiple_files(
         "files": uploaded_files
     }
 
+
+@router.post("/direct-uploads", response_model=DirectUploadResponse, status_code=status.HTTP_201_CREATED)
+async def create_direct_file_upload(
+    upload_request: DirectUploadRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a presigned form for uploading a file straight to storage (then confirm it)."""
+    file_record, upload = await create_direct_upload(
+        upload_request.filename,
+        upload_request.content_type,
+        upload_request.file_size,
+        upload_request.category,
+        current_user.id,
+        db
+    )
+    
+    return {
+        "file": file_record,
+        "upload_url": upload["url"],
+        "fields": upload["fields"],
+        "expires_at": upload["expires_at"]
+    }
+
+
+@router.post("/{file_id}/confirm", response_model=FileResponse, status_code=status.HTTP_202_ACCEPTED)
+async def confirm_direct_file_upload(
+    file_id: ID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Confirm a direct upload; validation and image variants are processed in the background."""
+    file_record = await db.get(FileModel, file_id)
+    if not file_record or file_record.uploaded_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    return await confirm_direct_upload(file_record, db)
+
+
+
+@router.get("/{file_id}", response_model=FileResponse)
+async def get_file(
+    file_id: ID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get an uploaded file, including its image processing status and variants."""
+    file_record = await db.get(FileModel, file_id)
+    if not file_record or file_record.uploaded_by != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+    return file_record
@@ -1,9 +1,10 @@
 """
 File schemas.
 """
-from typing import Optional
-from pydantic import BaseModel, ConfigDict
-from app.modules.files.models import FileType, FileCategory
+from datetime import datetime
+from typing import Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from app.modules.files.models import FileType, FileCategory, FileProcessingStatus
 from app.core.id import ID
 
 
@@ -21,7 +22,10 @@ class FileResponse(BaseModel):
     file_size: int
     uploaded_by: ID
     description: Optional[str] = None
-    created_at: str
+    processing_status: Optional[FileProcessingStatus] = None
+    processing_error: Optional[str] = None
+    variants: Optional[Dict[str, Dict[str, Any]]] = None
+    created_at: datetime
 
 
 class FileUploadResponse(BaseModel):
@@ -29,3 +33,19 @@ class FileUploadResponse(BaseModel):
     message: str
     file: FileResponse
 
+
+
+class DirectUploadRequest(BaseModel):
+    """Request a presigned form for uploading straight to storage."""
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: str = Field(..., max_length=100)
+    file_size: int = Field(..., gt=0, description="Size in bytes; the upload may not exceed it")
+    category: FileCategory = FileCategory.OTHER
+
+
+class DirectUploadResponse(BaseModel):
+    """Presigned upload form: POST ``fields`` plus a ``file`` part to ``upload_url``."""
+    file: FileResponse
+    upload_url: str
+    fields: Dict[str, str]
+    expires_at: datetime
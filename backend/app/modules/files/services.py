@@ -2,15 +2,18 @@
 File service utilities for validating, storing, and deleting uploaded files.
 """
 import os
+import json
+import asyncio
+import hashlib
 import secrets
 import logging
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional, Tuple
 from fastapi import UploadFile, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
-from app.modules.files.models import File, FileType, FileCategory
+from app.modules.files.models import File, FileType, FileCategory, FileProcessingStatus
 from app.core.id import ID
 
 logger = logging.getLogger(__name__)
@@ -41,6 +44,9 @@ ALLOWED_AUDIO_TYPES = {
     "audio/mpeg", "audio/wav", "audio/ogg", "audio/mp4"
 }
 
+# Raster images that get responsive WebP/AVIF/JPEG variants in the background
+TRANSCODABLE_IMAGE_TYPES = {"image/jpeg", "image/jpg", "image/png", "image/webp"}
+
 ALLOWED_MIME_TYPES = (
     ALLOWED_IMAGE_TYPES | 
     ALLOWED_DOCUMENT_TYPES | 
@@ -54,6 +60,74 @@ MAX_DOCUMENT_SIZE = 10 * 1024 * 1024  # 10MB
 MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100MB
 MAX_AUDIO_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Leading bytes read for magic-number content validation
+CONTENT_SNIFF_SIZE = 1024
+
+# Streaming upload buffers: memory per upload is bounded by these, not by file size
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+MULTIPART_PART_SIZE = 10 * 1024 * 1024  # 10MB (S3/MinIO minimum part size is 5MB)
+
+
+class FileTooLargeError(ValueError):
+    """Raised while streaming an upload that exceeds its size limit."""
+
+
+class HashingReader:
+    """
+    Read-only file wrapper that hashes and counts bytes as they are read and
+    aborts once ``max_size`` is exceeded.
+    """
+    
+    def __init__(self, raw: BinaryIO, max_size: int):
+        self.raw = raw
+        self.max_size = max_size
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+    
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.raw.read(size)
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise FileTooLargeError(
+                f"File size exceeds maximum allowed size of {self.max_size / (1024 * 1024)}MB"
+            )
+        self._sha256.update(chunk)
+        return chunk
+    
+    def hexdigest(self) -> str:
+        return self._sha256.hexdigest()
+
+
+def get_max_file_size(file_type: FileType) -> int:
+    """Maximum upload size in bytes for a file type."""
+    return {
+        FileType.IMAGE: MAX_IMAGE_SIZE,
+        FileType.DOCUMENT: MAX_DOCUMENT_SIZE,
+        FileType.VIDEO: MAX_VIDEO_SIZE,
+        FileType.AUDIO: MAX_AUDIO_SIZE,
+        FileType.OTHER: settings.max_upload_size
+    }.get(file_type, settings.max_upload_size)
+
+
+def stream_to_disk(source: BinaryIO, destination: Path, max_size: int) -> Tuple[int, str]:
+    """
+    Copy ``source`` to ``destination`` chunk by chunk (blocking; run in a thread).
+    
+    Writes to a ``.part`` file and renames it into place, so a rejected or
+    failed upload never leaves a partial file behind. Returns (size, sha256).
+    """
+    reader = HashingReader(source, max_size)
+    partial = destination.with_name(destination.name + ".part")
+    try:
+        with open(partial, "wb") as out:
+            while chunk := reader.read(UPLOAD_CHUNK_SIZE):
+                out.write(chunk)
+        os.replace(partial, destination)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return reader.size, reader.hexdigest()
+
 
 def get_file_type_from_mime(mime_type: str) -> FileType:
     """Determine the high-level file type from a MIME type."""
@@ -90,13 +164,7 @@ def validate_file_size(file: UploadFile, file_type: FileType) -> Tuple[bool, Opt
     file_size = file.file.tell()
     file.file.seek(0)  # Reset to beginning
     
-    max_size = {
-        FileType.IMAGE: MAX_IMAGE_SIZE,
-        FileType.DOCUMENT: MAX_DOCUMENT_SIZE,
-        FileType.VIDEO: MAX_VIDEO_SIZE,
-        FileType.AUDIO: MAX_AUDIO_SIZE,
-        FileType.OTHER: settings.max_upload_size
-    }.get(file_type, settings.max_upload_size)
+    max_size = get_max_file_size(file_type)
     
     if file_size > max_size:
         max_mb = max_size / (1024 * 1024)
@@ -105,25 +173,21 @@ def validate_file_size(file: UploadFile, file_type: FileType) -> Tuple[bool, Opt
     return True, None
 
 
-async def validate_file_content(file: UploadFile) -> Tuple[bool, Optional[str]]:
-    """Validate file content using python-magic when available."""
+def validate_content_bytes(head: bytes, content_type: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Check the leading bytes of a file against its declared MIME type (python-magic)."""
     if not MAGIC_AVAILABLE:
         # Skip content validation if magic is not available
         return True, None
     
     try:
-        # Read first chunk for magic number detection
-        content = await file.read(1024)
-        await file.seek(0)  # Reset
-        
         # Use python-magic to detect actual file type
         mime = magic.Magic(mime=True)
-        detected_mime = mime.from_buffer(content)
+        detected_mime = mime.from_buffer(head)
         
         # Verify detected MIME matches declared MIME
-        if file.content_type and detected_mime != file.content_type:
+        if content_type and detected_mime != content_type:
             # Allow some flexibility for similar types
-            if not (detected_mime.startswith(file.content_type.split('/')[0])):
+            if not (detected_mime.startswith(content_type.split('/')[0])):
                 return False, f"File content does not match declared type. Detected: {detected_mime}"
         
         return True, None
@@ -132,6 +196,18 @@ async def validate_file_content(file: UploadFile) -> Tuple[bool, Optional[str]]:
         return True, None
 
 
+async def validate_file_content(file: UploadFile) -> Tuple[bool, Optional[str]]:
+    """Validate file content using python-magic when available."""
+    if not MAGIC_AVAILABLE:
+        return True, None
+    
+    # Read first chunk for magic number detection
+    content = await file.read(CONTENT_SNIFF_SIZE)
+    await file.seek(0)  # Reset
+    
+    return validate_content_bytes(content, file.content_type)
+
+
 def generate_unique_filename(original_filename: str) -> str:
     """Generate a unique filename while preserving the original extension."""
     ext = Path(original_filename).suffix
@@ -157,7 +233,7 @@ async def save_file(
     # Determine file type
     file_type = get_file_type_from_mime(file.content_type)
     
-    # Validate file size
+    # Validate file size (early reject; the streaming copy below enforces it too)
     is_valid, error = validate_file_size(file, file_type)
     if not is_valid:
         raise HTTPException(
@@ -176,58 +252,70 @@ async def save_file(
     # Generate unique filename
     unique_filename = generate_unique_filename(file.filename)
     
-    # Read file content
-    content = await file.read()
-    file_size = len(content)
+    max_size = get_max_file_size(file_type)
+    await file.seek(0)
     
-    # Determine storage path based on category
-    if settings.storage_type == "local":
-        # Local storage
-        category_path = category.value
-        upload_dir = Path("uploads") / category_path
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = upload_dir / unique_filename
-        file_url = f"/uploads/{category_path}/{unique_filename}"
+    # Content is streamed in chunks from the spooled upload (never read whole),
+    # in a worker thread so disk and MinIO I/O don't block the event loop.
+    # Size and SHA-256 are computed as the bytes go through.
+    try:
+        if settings.storage_type == "local":
+            # Local storage
+            category_path = category.value
+            upload_dir = Path("uploads") / category_path
+            upload_dir.mkdir(parents=True, exist_ok=True)
+            
+            file_path = upload_dir / unique_filename
+            file_url = f"/uploads/{category_path}/{unique_filename}"
+            
+            # Save file
+            file_size, checksum = await asyncio.to_thread(stream_to_disk, file.file, file_path, max_size)
         
-        # Save file
-        with open(file_path, "wb") as f:
-            f.write(content)
+        elif settings.storage_type == "minio":
+            # MinIO storage
+            from app.infrastructure.storage.minio_service import get_minio_service
+            
+            minio_service = get_minio_service()
+            category_path = category.value
+            object_name = f"{category_path}/{unique_filename}"
+            
+            # Multipart upload to MinIO (one part buffered at a time)
+            reader = HashingReader(file.file, max_size)
+            file_url = await asyncio.to_thread(
+                minio_service.upload_stream,
+                stream=reader,
+                object_name=object_name,
+                content_type=file.content_type,
+                metadata={
+                    "original_filename": file.filename,
+                    "category": category.value,
+                    "file_type": file_type.value
+                },
+                part_size=MULTIPART_PART_SIZE
+            )
+            file_path = object_name  # Store object name as path
+            file_size, checksum = reader.size, reader.hexdigest()
     
-    elif settings.storage_type == "minio":
-        # MinIO storage
-        from app.infrastructure.storage.minio_service import get_minio_service
-        
-        minio_service = get_minio_service()
-        category_path = category.value
-        object_name = f"{category_path}/{unique_filename}"
+        elif settings.storage_type == "s3":
+            # S3 storage (to be implemented)
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                detail="S3 storage not yet implemented"
+            )
         
-        # Upload to MinIO
-        file_url = minio_service.upload_file(
-            file_data=content,
-            object_name=object_name,
-            content_type=file.content_type,
-            metadata={
-                "original_filename": file.filename,
-                "category": category.value,
-                "file_type": file_type.value
-            }
-        )
-        file_path = object_name  # Store object name as path
-    
-    elif settings.storage_type == "s3":
-        # S3 storage (to be implemented)
-        raise HTTPException(
-            status_code=status.HTTP_501_NOT_IMPLEMENTED,
-            detail="S3 storage not yet implemented"
-        )
-    
-    else:
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Storage type {settings.storage_type} is not supported"
+            )
+    except FileTooLargeError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Storage type {settings.storage_type} is not supported"
+            detail=str(e)
         )
     
+    transcode = file.content_type in TRANSCODABLE_IMAGE_TYPES
+    
     # Create file record
     file_record = File(
         filename=unique_filename,
@@ -238,16 +326,161 @@ async def save_file(
         file_category=category,
         mime_type=file.content_type,
         file_size=file_size,
-        uploaded_by=user_id
+        file_metadata=json.dumps({"sha256": checksum}),
+        uploaded_by=user_id,
+        processing_status=FileProcessingStatus.PENDING if transcode else None
+    )
+    
+    db.add(file_record)
+    await db.commit()
+    await db.refresh(file_record)
+    
+    if transcode:
+        # Variants are produced by a Celery worker on the "images" queue,
+        # never on the API event loop
+        try:
+            from app.modules.files.tasks import transcode_image_file
+            transcode_image_file.delay(file_record.id)
+        except Exception as e:
+            logger.error(f"Failed to queue image transcoding for file {file_record.id}: {e}")
+    
+    return file_record
+
+
+async def create_direct_upload(
+    filename: str,
+    content_type: str,
+    file_size: int,
+    category: FileCategory,
+    user_id: ID,
+    db: AsyncSession
+) -> Tuple[File, dict]:
+    """
+    Start a direct-to-storage upload: record the file and presign a POST form.
+    
+    The client uploads the bytes straight to MinIO with the returned form, then
+    calls ``confirm_direct_upload``; the API process never handles the body.
+    """
+    if settings.storage_type != "minio":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Direct uploads require MinIO storage"
+        )
+    
+    if content_type not in ALLOWED_MIME_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type {content_type} is not allowed"
+        )
+    
+    file_type = get_file_type_from_mime(content_type)
+    max_size = get_max_file_size(file_type)
+    if file_size > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size exceeds maximum allowed size of {max_size / (1024 * 1024)}MB"
+        )
+    
+    from app.infrastructure.storage.minio_service import get_minio_service
+    
+    minio_service = get_minio_service()
+    unique_filename = generate_unique_filename(filename)
+    object_name = f"{category.value}/{unique_filename}"
+    
+    # The signed policy caps the body at the declared size
+    upload = await asyncio.to_thread(
+        minio_service.presigned_upload_form,
+        object_name=object_name,
+        content_type=content_type,
+        max_size=file_size,
+        expires_seconds=settings.direct_upload_expires_seconds
+    )
+    
+    file_record = File(
+        filename=unique_filename,
+        original_filename=filename,
+        file_path=object_name,
+        file_url=minio_service.get_file_url(object_name),
+        file_type=file_type,
+        file_category=category,
+        mime_type=content_type,
+        file_size=file_size,  # Declared; replaced by the stored size on confirm
+        uploaded_by=user_id,
+        processing_status=FileProcessingStatus.AWAITING_UPLOAD
     )
     
     db.add(file_record)
     await db.commit()
     await db.refresh(file_record)
     
+    return file_record, upload
+
+
+async def confirm_direct_upload(file_record: File, db: AsyncSession) -> File:
+    """
+    Confirm that a direct upload reached storage and queue its processing.
+    
+    Content validation and image variants run in a Celery worker.
+    """
+    if file_record.processing_status != FileProcessingStatus.AWAITING_UPLOAD:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="File upload has already been confirmed"
+        )
+    
+    from app.infrastructure.storage.minio_service import get_minio_service
+    
+    minio_service = get_minio_service()
+    if not await asyncio.to_thread(minio_service.file_exists, file_record.file_path):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File has not been uploaded yet"
+        )
+    
+    info = await asyncio.to_thread(minio_service.get_file_info, file_record.file_path)
+    file_record.file_size = info["size"]
+    file_record.processing_status = FileProcessingStatus.PENDING
+    await db.commit()
+    await db.refresh(file_record)
+    
+    try:
+        from app.modules.files.tasks import process_direct_upload
+        process_direct_upload.delay(file_record.id)
+    except Exception as e:
+        logger.error(f"Failed to queue processing for direct upload {file_record.id}: {e}")
+    
     return file_record
 
 
+def variant_storage_path(file_path: str, variant_name: str) -> str:
+    """Storage path for a variant: ``<dir>/<stem>/<variant_name>`` next to the original."""
+    path = Path(file_path)
+    return str(path.parent / path.stem / variant_name)
+
+
+def read_stored_file(file_path: str) -> bytes:
+    """Read an uploaded file's bytes from the configured storage backend (blocking)."""
+    if settings.storage_type == "minio":
+        from app.infrastructure.storage.minio_service import get_minio_service
+        return get_minio_service().download_file(file_path)
+    return Path(file_path).read_bytes()
+
+
+def write_stored_file(file_path: str, data: bytes, content_type: str) -> str:
+    """Write bytes to the configured storage backend (blocking) and return the public URL."""
+    if settings.storage_type == "minio":
+        from app.infrastructure.storage.minio_service import get_minio_service
+        return get_minio_service().upload_file(
+            file_data=data,
+            object_name=file_path,
+            content_type=content_type
+        )
+    path = Path(file_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return "/" + path.as_posix()
+
+
 async def delete_file(
     file_record: File,
     db: AsyncSession
@@ -258,17 +491,25 @@ async def delete_file(
     
     try:
         # Delete from storage
+        variant_paths = [
+            variant_storage_path(file_record.file_path, name)
+            for name in (file_record.variants or {})
+        ]
+        
         if settings.storage_type == "local":
             # Delete local file
-            file_path = Path(file_record.file_path)
-            if file_path.exists():
-                file_path.unlink()
+            for path in [file_record.file_path, *variant_paths]:
+                file_path = Path(path)
+                if file_path.exists():
+                    file_path.unlink()
         
         elif settings.storage_type == "minio":
             # Delete from MinIO
             from app.infrastructure.storage.minio_service import get_minio_service
             minio_service = get_minio_service()
             minio_service.delete_file(file_record.file_path)  # file_path contains object_name for MinIO
+            if variant_paths:
+                minio_service.delete_files(variant_paths)
         
         elif settings.storage_type == "s3":
             # S3 deletion (to be implemented)
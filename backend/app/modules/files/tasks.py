@@ -0,0 +1,144 @@
+"""
+File background tasks (direct-upload processing and image transcoding on the dedicated "images" queue).
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.core.celery_app import celery_app
+from app.core.database import AsyncSessionLocal
+from app.core.id import ID
+from app.infrastructure.storage.image_transcoding import transcode_image
+from app.modules.files.models import File, FileProcessingStatus
+from app.modules.files.services import (
+    CONTENT_SNIFF_SIZE, TRANSCODABLE_IMAGE_TYPES, read_stored_file, validate_content_bytes,
+    variant_storage_path, write_stored_file
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def _transcode_image_file_async(file_id: ID) -> dict:
+    """Generate and store responsive variants for an uploaded image."""
+    async with AsyncSessionLocal() as db:
+        file_record = await db.get(File, file_id)
+        if not file_record:
+            logger.warning(f"Image transcoding skipped, file not found: file_id={file_id}")
+            return {"file_id": file_id, "status": "missing"}
+        if file_record.processing_status == FileProcessingStatus.READY:
+            return {"file_id": file_id, "status": FileProcessingStatus.READY.value}
+
+        file_record.processing_status = FileProcessingStatus.PROCESSING
+        await db.commit()
+
+        try:
+            original = await asyncio.to_thread(read_stored_file, file_record.file_path)
+            # CPU-bound, but this is a worker process: nothing else waits on this loop
+            variants = transcode_image(original)
+
+            stored = {}
+            for name, variant in variants.items():
+                url = await asyncio.to_thread(
+                    write_stored_file,
+                    variant_storage_path(file_record.file_path, name),
+                    variant.data,
+                    variant.content_type
+                )
+                stored[name] = {
+                    "url": url,
+                    "width": variant.width,
+                    "height": variant.height,
+                    "size": len(variant.data),
+                    "content_type": variant.content_type,
+                }
+
+            file_record.variants = stored
+            file_record.processing_status = FileProcessingStatus.READY
+            file_record.processing_error = None
+        except Exception as e:
+            logger.error(f"Image transcoding failed: file_id={file_id}, error={e}", exc_info=True)
+            file_record.processing_status = FileProcessingStatus.FAILED
+            file_record.processing_error = str(e)[:1000]
+
+        await db.commit()
+        return {"file_id": file_id, "status": file_record.processing_status.value}
+
+
+@celery_app.task(name="files.transcode_image")
+def transcode_image_file(file_id: ID):
+    """Transcode an uploaded image into responsive WebP/AVIF/JPEG variants (Celery task)."""
+    return asyncio.run(_transcode_image_file_async(file_id))
+
+
+async def _process_direct_upload_async(file_id: ID) -> dict:
+    """Validate a confirmed direct upload, then transcode it if it's an image."""
+    from app.infrastructure.storage.minio_service import get_minio_service
+    
+    minio_service = get_minio_service()
+    async with AsyncSessionLocal() as db:
+        file_record = await db.get(File, file_id)
+        if not file_record:
+            logger.warning(f"Direct upload processing skipped, file not found: file_id={file_id}")
+            return {"file_id": file_id, "status": "missing"}
+        if file_record.processing_status != FileProcessingStatus.PENDING:
+            return {"file_id": file_id, "status": file_record.processing_status.value}
+        
+        head = await asyncio.to_thread(
+            minio_service.read_range, file_record.file_path, 0, CONTENT_SNIFF_SIZE
+        )
+        is_valid, error = validate_content_bytes(head, file_record.mime_type)
+        if not is_valid:
+            logger.warning(f"Direct upload rejected: file_id={file_id}, error={error}")
+            await asyncio.to_thread(minio_service.delete_file, file_record.file_path)
+            file_record.processing_status = FileProcessingStatus.FAILED
+            file_record.processing_error = error
+            await db.commit()
+            return {"file_id": file_id, "status": FileProcessingStatus.FAILED.value}
+        
+        if file_record.mime_type not in TRANSCODABLE_IMAGE_TYPES:
+            file_record.processing_status = FileProcessingStatus.READY
+            await db.commit()
+            return {"file_id": file_id, "status": FileProcessingStatus.READY.value}
+    
+    return await _transcode_image_file_async(file_id)
+
+
+@celery_app.task(name="files.process_direct_upload")
+def process_direct_upload(file_id: ID):
+    """Validate and post-process a file uploaded straight to storage (Celery task)."""
+    return asyncio.run(_process_direct_upload_async(file_id))
+
+
+async def _expire_direct_uploads_async() -> dict:
+    """Remove direct uploads that were never confirmed (and any orphaned objects)."""
+    from app.core.config import get_settings
+    from app.infrastructure.storage.minio_service import get_minio_service
+    
+    settings = get_settings()
+    # Grace period past form expiry for uploads still in flight
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.direct_upload_expires_seconds) - timedelta(hours=1)
+    
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(File).where(
+                File.processing_status == FileProcessingStatus.AWAITING_UPLOAD,
+                File.created_at < cutoff
+            )
+        )
+        stale = result.scalars().all()
+        if stale:
+            await asyncio.to_thread(get_minio_service().delete_files, [f.file_path for f in stale])
+            for file_record in stale:
+                await db.delete(file_record)
+            await db.commit()
+    
+    logger.info(f"Expired {len(stale)} unconfirmed direct uploads")
+    return {"expired": len(stale)}
+
+
+@celery_app.task(name="files.expire_direct_uploads")
+def expire_direct_uploads():
+    """Clean up unconfirmed direct uploads (Celery periodic task)."""
+    return asyncio.run(_expire_direct_uploads_async())
@@ -0,0 +1,248 @@
+"""
+Listing availability service.
+Maintains the ``listing_availability_bitmaps`` table and builds the date-range
+filter search uses.
+"""
+import logging
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import (
+    Date, Integer, Text, and_, case, cast, exists, func, literal, not_, select, text, type_coerce
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.listings.models import (
+    BlockedDate, Listing, ListingAvailabilityBitmap, PriceCalendar
+)
+from app.modules.bookings.models import Booking, BookingStatus
+from app.core.config import get_settings
+from app.core.id import ID
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Booking statuses that hold a listing's nights (same set as the bookings
+# exclusion constraint and BookingRepository.check_availability)
+BLOCKING_BOOKING_STATUSES = frozenset({
+    BookingStatus.PENDING.value,
+    BookingStatus.CONFIRMED.value,
+    BookingStatus.CHECKED_IN.value,
+})
+
+
+def _status_value(status) -> Optional[str]:
+    """Normalize enum or string statuses to their string value."""
+    if status is None:
+        return None
+    return status.value if hasattr(status, "value") else str(status)
+
+
+def holds_nights_changed(old_status, new_status) -> bool:
+    """Whether a booking status transition frees or takes the booking's nights."""
+    was_held = _status_value(old_status) in BLOCKING_BOOKING_STATUSES
+    is_held = _status_value(new_status) in BLOCKING_BOOKING_STATUSES
+    return was_held != is_held
+
+
+def _rebuild_sql(horizon_days: int, single_listing: bool):
+    """Statement recomputing bitmaps for every listing, or for ``:listing_id``.
+
+    Each booking or block becomes a horizon-wide mask with its nights set, and
+    ``bit_or`` folds a listing's masks into one bit string. Bookings are
+    converted to nights in UTC, like the booking flow stores them.
+    """
+    days = int(horizon_days)
+    booking_filter = "AND listing_id = :listing_id" if single_listing else ""
+    listing_filter = "WHERE l.id = :listing_id" if single_listing else ""
+    return text(f"""
+        WITH spans AS (
+            SELECT
+                listing_id,
+                greatest((check_in AT TIME ZONE 'UTC')::date, CAST(:start AS date)) AS first_night,
+                least((check_out AT TIME ZONE 'UTC')::date, CAST(:start AS date) + {days}) AS end_night
+            FROM bookings
+            WHERE status IN ('pending', 'confirmed', 'checked_in')
+              AND (check_out AT TIME ZONE 'UTC')::date > CAST(:start AS date)
+              AND (check_in AT TIME ZONE 'UTC')::date < CAST(:start AS date) + {days}
+              {booking_filter}
+            UNION ALL
+            SELECT listing_id, date, date + 1
+            FROM blocked_dates
+            WHERE date >= CAST(:start AS date) AND date < CAST(:start AS date) + {days}
+              {booking_filter}
+            UNION ALL
+            SELECT listing_id, date, date + 1
+            FROM price_calendars
+            WHERE is_blocked
+              AND date >= CAST(:start AS date) AND date < CAST(:start AS date) + {days}
+              {booking_filter}
+        ),
+        masks AS (
+            SELECT
+                listing_id,
+                bit_or(CAST(
+                    repeat('0', first_night - CAST(:start AS date))
+                    || repeat('1', end_night - first_night)
+                    || repeat('0', CAST(:start AS date) + {days} - end_night)
+                AS bit({days}))) AS blocked_nights
+            FROM spans
+            WHERE end_night > first_night
+            GROUP BY listing_id
+        )
+        INSERT INTO listing_availability_bitmaps (id, listing_id, horizon_start, blocked_nights, created_at, updated_at)
+        SELECT
+            'LIST_' || substr(md5(l.id), 1, 22),
+            l.id,
+            CAST(:start AS date),
+            coalesce(m.blocked_nights, CAST(repeat('0', {days}) AS bit({days}))),
+            now(),
+            now()
+        FROM listings l
+        LEFT JOIN masks m ON m.listing_id = l.id
+        {listing_filter}
+        ON CONFLICT (listing_id) DO UPDATE SET
+            horizon_start = EXCLUDED.horizon_start,
+            blocked_nights = EXCLUDED.blocked_nights,
+            updated_at = now()
+        WHERE listing_availability_bitmaps.horizon_start IS DISTINCT FROM EXCLUDED.horizon_start
+           OR listing_availability_bitmaps.blocked_nights IS DISTINCT FROM EXCLUDED.blocked_nights
+    """)
+
+
+def _ensure_row_sql(horizon_days: int):
+    """Statement inserting an empty bitmap row for ``:listing_id`` if it has none.
+
+    Gives ``refresh`` a row to lock; the rebuild in the same transaction
+    overwrites it.
+    """
+    days = int(horizon_days)
+    return text(f"""
+        INSERT INTO listing_availability_bitmaps (id, listing_id, horizon_start, blocked_nights, created_at, updated_at)
+        VALUES (
+            'LIST_' || substr(md5(:listing_id), 1, 22),
+            :listing_id,
+            CAST(:start AS date),
+            CAST(repeat('0', {days}) AS bit({days})),
+            now(),
+            now()
+        )
+        ON CONFLICT (listing_id) DO NOTHING
+    """)
+
+
+def _overlap_free(check_in: date, check_out: date):
+    """Exact availability from bookings and blocks (the bitmap's source data)."""
+    stay_start = cast(literal(check_in), Date)
+    stay_end = cast(literal(check_out), Date)
+    booked = exists().where(
+        Booking.listing_id == Listing.id,
+        Booking.status.in_(BLOCKING_BOOKING_STATUSES),
+        cast(func.timezone('UTC', Booking.check_in), Date) < stay_end,
+        cast(func.timezone('UTC', Booking.check_out), Date) > stay_start,
+    )
+    blocked = exists().where(
+        BlockedDate.listing_id == Listing.id,
+        BlockedDate.date >= stay_start,
+        BlockedDate.date < stay_end,
+    )
+    calendar_blocked = exists().where(
+        PriceCalendar.listing_id == Listing.id,
+        PriceCalendar.is_blocked == True,
+        PriceCalendar.date >= stay_start,
+        PriceCalendar.date < stay_end,
+    )
+    return and_(not_(booked), not_(blocked), not_(calendar_blocked))
+
+
+def join_availability_bitmap(query):
+    """Outer-join each listing's bitmap row onto ``query`` (needed by ``availability_filter``)."""
+    return query.outerjoin(
+        ListingAvailabilityBitmap, ListingAvailabilityBitmap.listing_id == Listing.id
+    )
+
+
+def availability_filter(check_in: date, check_out: date):
+    """Filter keeping listings that are free every night from check-in to check-out.
+
+    Checks the stay's bits in the bitmap row ``join_availability_bitmap``
+    joined onto the query, so the bitmaps are read in the same scan as the
+    listings. Only listings without a row (and stays past the row's horizon)
+    fall back to probing bookings, blocked dates and the price calendar.
+    """
+    nights = (check_out - check_in).days
+    if nights <= 0:
+        raise ValueError("check_out must be after check_in")
+
+    bitmap = ListingAvailabilityBitmap
+    stay_start = cast(literal(check_in), Date)
+    # date - date and date + integer are integer/date arithmetic in PostgreSQL
+    offset = type_coerce(stay_start - bitmap.horizon_start, Integer)
+    horizon_end = type_coerce(bitmap.horizon_start + func.length(bitmap.blocked_nights), Date)
+    covered = and_(
+        bitmap.listing_id.isnot(None),
+        offset >= 0,
+        horizon_end >= cast(literal(check_out), Date),
+    )
+    stay_bits = cast(func.substring(bitmap.blocked_nights, offset + 1, nights), Text)
+    return case(
+        (covered, func.strpos(stay_bits, '1') == 0),
+        else_=_overlap_free(check_in, check_out),
+    )
+
+
+class ListingAvailabilityService:
+    """Incremental maintenance and rebuilds of listing availability bitmaps."""
+
+    @staticmethod
+    async def apply_booking_transition(
+        db: AsyncSession,
+        listing_id: ID,
+        old_status,
+        new_status
+    ) -> None:
+        """Refresh the listing's bitmap if a booking status transition frees or takes nights.
+
+        Runs in the caller's transaction (does NOT commit); the booking change
+        must already be flushed or pending in the session.
+        """
+        if not holds_nights_changed(old_status, new_status):
+            return
+        await ListingAvailabilityService.refresh(db, listing_id)
+
+    @staticmethod
+    async def refresh(db: AsyncSession, listing_id: ID) -> None:
+        """Recompute one listing's bitmap from its bookings and blocks.
+
+        Call after writing a listing's blocked dates or price calendar. Runs in
+        the caller's transaction (does NOT commit).
+        """
+        await db.flush()
+        params = {"start": datetime.now(timezone.utc).date(), "listing_id": listing_id}
+        horizon_days = settings.availability_horizon_days
+        
+        # Serialize refreshes of the same listing on its bitmap row. Once the
+        # lock is granted, the rebuild (a new READ COMMITTED snapshot) sees the
+        # bookings committed by the transaction that held it, so neither
+        # transaction overwrites the other's nights.
+        await db.execute(_ensure_row_sql(horizon_days), params)
+        await db.execute(
+            select(ListingAvailabilityBitmap.id)
+            .where(ListingAvailabilityBitmap.listing_id == listing_id)
+            .with_for_update()
+        )
+        await db.execute(_rebuild_sql(horizon_days, single_listing=True), params)
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, start: Optional[date] = None) -> int:
+        """Recompute every listing's bitmap with the horizon starting at ``start``.
+
+        ``start`` defaults to today (UTC). Moves the horizon forward and corrects drift from writes that bypass
+        the services. Returns the number of rows inserted or changed.
+        """
+        result = await db.execute(
+            _rebuild_sql(settings.availability_horizon_days, single_listing=False),
+            {"start": start or datetime.now(timezone.utc).date()}
+        )
+        await db.commit()
+        return result.rowcount or 0
@@ -0,0 +1,117 @@
+"""
+Listing destination service.
+Maintains the ``listing_destinations`` table behind search suggestions.
+"""
+import logging
+from typing import Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.listings.models import ListingDestination, ListingStatus
+
+logger = logging.getLogger(__name__)
+
+Destination = Tuple[str, str]  # (city, country)
+
+
+def destination_key(destination: Destination) -> Tuple[str, str]:
+    """Normalized (country, city) key, matching the table's generated key columns."""
+    city, country = destination
+    return country.strip().lower(), city.strip().lower()
+
+
+def active_destination(listing) -> Optional[Destination]:
+    """The destination a listing counts towards, or None if it isn't active."""
+    status = listing.status.value if hasattr(listing.status, "value") else listing.status
+    if status != ListingStatus.ACTIVE.value or not listing.city or not listing.country:
+        return None
+    return listing.city, listing.country
+
+
+# Full recompute from listings and listing_popularity (used by the reconcile job)
+RECONCILE_SQL = text("""
+    INSERT INTO listing_destinations (id, city, country, listing_count, booking_count, created_at, updated_at)
+    SELECT
+        'LIST_' || substr(md5(lower(btrim(l.country)) || '/' || lower(btrim(l.city))), 1, 22),
+        min(btrim(l.city)),
+        min(btrim(l.country)),
+        count(*) FILTER (WHERE l.status = 'active'),
+        coalesce(sum(p.booking_count) FILTER (WHERE l.status = 'active'), 0),
+        now(),
+        now()
+    FROM listings l
+    LEFT JOIN listing_popularity p ON p.listing_id = l.id
+    GROUP BY lower(btrim(l.country)), lower(btrim(l.city))
+    ON CONFLICT (country_key, city_key) DO UPDATE SET
+        listing_count = EXCLUDED.listing_count,
+        booking_count = EXCLUDED.booking_count,
+        updated_at = now()
+    WHERE listing_destinations.listing_count IS DISTINCT FROM EXCLUDED.listing_count
+       OR listing_destinations.booking_count IS DISTINCT FROM EXCLUDED.booking_count
+""")
+
+# Destinations no listing refers to any more
+PRUNE_SQL = text("""
+    DELETE FROM listing_destinations d
+    WHERE NOT EXISTS (
+        SELECT 1 FROM listings l
+        WHERE lower(btrim(l.country)) = d.country_key AND lower(btrim(l.city)) = d.city_key
+    )
+""")
+
+
+class ListingDestinationService:
+    """Incremental maintenance and reconciliation of listing destinations."""
+
+    @staticmethod
+    async def apply_listing_change(
+        db: AsyncSession,
+        before: Optional[Destination],
+        after: Optional[Destination]
+    ) -> bool:
+        """Move one active listing from destination ``before`` to ``after``.
+
+        Either side is None when the listing wasn't (or isn't) active. Runs in
+        the caller's transaction (does NOT commit). Returns True if any
+        destination count changed.
+        """
+        if before is not None and after is not None and destination_key(before) == destination_key(after):
+            return False
+        if before is not None:
+            await ListingDestinationService._upsert(db, before, -1)
+        if after is not None:
+            await ListingDestinationService._upsert(db, after, 1)
+        return before is not None or after is not None
+
+    @staticmethod
+    async def _upsert(db: AsyncSession, destination: Destination, delta: int) -> None:
+        city, country = destination
+        stmt = insert(ListingDestination).values(
+            city=city.strip(),
+            country=country.strip(),
+            listing_count=max(delta, 0),
+            booking_count=0,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ListingDestination.country_key, ListingDestination.city_key],
+            set_={
+                "listing_count": func.greatest(ListingDestination.listing_count + delta, 0),
+                "updated_at": func.now(),
+            }
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def reconcile(db: AsyncSession) -> int:
+        """Recompute every destination's listing and booking counts.
+
+        Corrects drift from writes that bypass the listing service (e.g. bulk
+        status updates) and picks up booking changes. Returns the number of
+        rows inserted, changed or removed.
+        """
+        changed = (await db.execute(RECONCILE_SQL)).rowcount or 0
+        changed += (await db.execute(PRUNE_SQL)).rowcount or 0
+        await db.commit()
+        return changed
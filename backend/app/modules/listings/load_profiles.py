@@ -0,0 +1,92 @@
+"""
+Listing load profiles.
+
+Listing relationships are declared ``lazy="raise_on_sql"``: a ``select(Listing)``
+loads the listing row and nothing else, and touching a relationship that wasn't
+loaded raises instead of silently issuing a query per row. Call sites name the
+shape they need with one of these profiles:
+
+    select(Listing).options(*listing_load_options(CARD))
+    selectinload(Wishlist.listing).options(*listing_load_options(CARD))
+
+Every relationship is loaded with its own SELECT ... IN over the whole page, so
+a profile costs one query per relationship regardless of page size. Related
+users, host profiles and agencies are loaded without their own relationships:
+``User`` still eagerly loads its bookings, reviews and messages, which a listing
+never needs.
+"""
+from functools import lru_cache
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.modules.listings.models import Listing, ListingAmenity
+
+# Search results, feeds, recommendations, premium placements (ListingResponse)
+CARD = "card"
+# The listing page: card plus host, amenities and house rules
+DETAIL = "detail"
+# Booking creation and other row-locking checks: columns only
+BOOKING_CHECK = "booking-check"
+# Moderation views: ownership (host, host profile, agency) plus media
+ADMIN = "admin"
+
+
+def _owner() -> Tuple[LoaderOption, ...]:
+    return (
+        selectinload(Listing.host).raiseload("*"),
+        selectinload(Listing.host_profile).raiseload("*"),
+    )
+
+
+def _card() -> Tuple[LoaderOption, ...]:
+    return (
+        selectinload(Listing.photos),
+        selectinload(Listing.images),
+        selectinload(Listing.location),
+    )
+
+
+def _detail() -> Tuple[LoaderOption, ...]:
+    return _card() + _owner() + (
+        selectinload(Listing.amenities).selectinload(ListingAmenity.amenity),
+        selectinload(Listing.rules),
+    )
+
+
+def _booking_check() -> Tuple[LoaderOption, ...]:
+    # Explicit, so a relationship switched back to an eager default can't add
+    # queries while the listing row is locked
+    return (raiseload("*"),)
+
+
+def _admin() -> Tuple[LoaderOption, ...]:
+    return _owner() + (
+        selectinload(Listing.agency).raiseload("*"),
+        selectinload(Listing.photos),
+        selectinload(Listing.images),
+    )
+
+
+# Built on first use: creating loader options configures the mappers, which
+# needs every model module imported
+_PROFILE_BUILDERS: Dict[str, Callable[[], Tuple[LoaderOption, ...]]] = {
+    CARD: _card,
+    DETAIL: _detail,
+    BOOKING_CHECK: _booking_check,
+    ADMIN: _admin,
+}
+
+
+@lru_cache(maxsize=None)
+def listing_load_options(profile: str) -> Tuple[LoaderOption, ...]:
+    """Loader options for a named listing load profile.
+
+    Raises:
+        ValueError: if ``profile`` isn't a known profile.
+    """
+    builder = _PROFILE_BUILDERS.get(profile)
+    if builder is None:
+        raise ValueError(f"Unknown listing load profile: {profile}")
+    return builder()
@@ -6,10 +6,10 @@ from datetime import datetime, date
 from typing import Optional
 from sqlalchemy import (
     Column, String, Boolean, Integer, DateTime, Enum as SQLEnum,
-    Text, JSON, Index, ForeignKey, Numeric, Date, ARRAY, CheckConstraint
+    Text, JSON, Index, ForeignKey, Numeric, Date, ARRAY, CheckConstraint, Computed
 )
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID, INET, JSONB
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import UUID, INET, JSONB, TSVECTOR, BIT
 from geoalchemy2 import Geography
 import enum
 
@@ -33,6 +33,26 @@ class ListingType(str, enum.Enum):
     EXPERIENCE = "experience"
 
 
+# Weighted full-text document: title (A) > summary/description (B) > city/country (C).
+# Kept as a stored generated column so PostgreSQL maintains it on every insert/update.
+LISTING_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(city, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(country, '')), 'C')"
+)
+
+# WGS84 geography point derived from the legacy latitude/longitude columns.
+# Stored generated column so it can never drift from lat/lng; GiST indexed for
+# meter-based ST_DWithin radius filters and KNN (<->) distance ordering.
+LISTING_GEO_POINT_SQL = (
+    "CASE WHEN latitude IS NOT NULL AND longitude IS NOT NULL THEN "
+    "ST_SetSRID(ST_MakePoint(longitude::double precision, latitude::double precision), 4326)::geography "
+    "END"
+)
+
+
 class ListingStatus(str, enum.Enum):
     """Listing status."""
     DRAFT = "draft"
@@ -117,6 +137,21 @@ class Listing(BaseModel):
     # Metadata
     listing_metadata = Column("metadata", JSONB, default=dict, nullable=True)
     
+    # Full-text search document (GIN indexed, maintained by PostgreSQL).
+    # Deferred so regular listing loads don't ship the tsvector over the wire.
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(LISTING_SEARCH_VECTOR_SQL, persisted=True), nullable=True)
+    )
+    
+    # Geographic point for radius search/distance sort (GiST indexed, maintained by PostgreSQL)
+    geo_point = deferred(
+        Column(
+            Geography('POINT', srid=4326, spatial_index=False),
+            Computed(LISTING_GEO_POINT_SQL, persisted=True),
+            nullable=True
+        )
+    )
+    
     # Computed properties for API compatibility
     @property
     def price_per_night(self) -> float:
@@ -126,28 +161,28 @@ class Listing(BaseModel):
         return float(self.base_price)
     
     # Relationships - Existing
-    host = relationship("User", foreign_keys=[host_id], lazy="selectin")
-    host_profile = relationship("HostProfile", foreign_keys=[host_profile_id], lazy="selectin")
-    agency = relationship("Agency", lazy="selectin")
-    photos = relationship("ListingPhoto", back_populates="listing", cascade="all, delete-orphan", lazy="selectin")
-    images = relationship("ListingImage", back_populates="listing", cascade="all, delete-orphan", lazy="selectin")
-    amenities = relationship("ListingAmenity", back_populates="listing", cascade="all, delete-orphan", lazy="selectin")
-    rules = relationship("ListingRule", back_populates="listing", cascade="all, delete-orphan", lazy="selectin")
-    availability = relationship("ListingAvailability", back_populates="listing", cascade="all, delete-orphan", lazy="selectin")
-    pricing_rules = relationship("PricingRule", back_populates="listing", cascade="all, delete-orphan", lazy="selectin")
-    bookings = relationship("Booking", back_populates="listing", lazy="selectin")
-    reviews = relationship("Review", back_populates="listing", lazy="selectin")
-    wishlists = relationship("Wishlist", back_populates="listing", lazy="selectin")
+    host = relationship("User", foreign_keys=[host_id], lazy="raise_on_sql")
+    host_profile = relationship("HostProfile", foreign_keys=[host_profile_id], lazy="raise_on_sql")
+    agency = relationship("Agency", lazy="raise_on_sql")
+    photos = relationship("ListingPhoto", back_populates="listing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    images = relationship("ListingImage", back_populates="listing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    amenities = relationship("ListingAmenity", back_populates="listing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    rules = relationship("ListingRule", back_populates="listing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    availability = relationship("ListingAvailability", back_populates="listing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    pricing_rules = relationship("PricingRule", back_populates="listing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    bookings = relationship("Booking", back_populates="listing", lazy="raise_on_sql")
+    reviews = relationship("Review", back_populates="listing", lazy="raise_on_sql")
+    wishlists = relationship("Wishlist", back_populates="listing", lazy="raise_on_sql")
     
     # Relationships - New from Prisma
-    location = relationship("ListingLocation", back_populates="listing", uselist=False, cascade="all, delete-orphan", lazy="selectin")
-    calendar = relationship("Calendar", back_populates="listing", uselist=False, cascade="all, delete-orphan", lazy="selectin")
-    seasonal_overrides = relationship("SeasonalOverride", back_populates="listing", cascade="all, delete-orphan", lazy="selectin")
-    price_calendars = relationship("PriceCalendar", back_populates="listing", cascade="all, delete-orphan", lazy="selectin")
-    blocked_dates = relationship("BlockedDate", back_populates="listing", cascade="all, delete-orphan", lazy="selectin")
-    pricing_model = relationship("PricingModel", back_populates="listing", uselist=False, cascade="all, delete-orphan", lazy="selectin")
-    draft = relationship("ListingDraft", back_populates="listing", uselist=False, cascade="all, delete-orphan", lazy="selectin")
-    search_snapshot = relationship("SearchSnapshot", back_populates="listing", uselist=False, cascade="all, delete-orphan", lazy="selectin")
+    location = relationship("ListingLocation", back_populates="listing", uselist=False, cascade="all, delete-orphan", lazy="raise_on_sql")
+    calendar = relationship("Calendar", back_populates="listing", uselist=False, cascade="all, delete-orphan", lazy="raise_on_sql")
+    seasonal_overrides = relationship("SeasonalOverride", back_populates="listing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    price_calendars = relationship("PriceCalendar", back_populates="listing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    blocked_dates = relationship("BlockedDate", back_populates="listing", cascade="all, delete-orphan", lazy="raise_on_sql")
+    pricing_model = relationship("PricingModel", back_populates="listing", uselist=False, cascade="all, delete-orphan", lazy="raise_on_sql")
+    draft = relationship("ListingDraft", back_populates="listing", uselist=False, cascade="all, delete-orphan", lazy="raise_on_sql")
+    search_snapshot = relationship("SearchSnapshot", back_populates="listing", uselist=False, cascade="all, delete-orphan", lazy="raise_on_sql")
     
     # Indexes
     __table_args__ = (
@@ -159,6 +194,11 @@ class Listing(BaseModel):
         Index("idx_listing_rating", "rating", "review_count"),
         Index("idx_listing_premium_featured", "is_premium", "is_featured", "status"),
         Index("idx_listing_premium_priority", "is_premium", "premium_priority", "status"),
+        Index("idx_listing_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_listing_geo_point", "geo_point", postgresql_using="gist"),
+        # Keyset pagination of newest-first feeds: (created_at, id) cursors
+        Index("idx_listing_status_created", "status", "created_at", "id"),
+        Index("idx_listing_host_created", "host_id", "created_at", "id"),
     )
 
 
@@ -240,7 +280,7 @@ class Amenity(BaseModel):
     is_featured = Column(Boolean, default=False, nullable=False)
     
     # Relationships
-    listings = relationship("ListingAmenity", back_populates="amenity", lazy="selectin")
+    listings = relationship("ListingAmenity", back_populates="amenity", lazy="raise_on_sql")
 
 
 class ListingAmenity(BaseModel):
@@ -472,3 +512,82 @@ class ListingDraft(BaseModel):
     listing = relationship("Listing", back_populates="draft", uselist=False, lazy="selectin")
     host_profile = relationship("HostProfile", lazy="selectin")
 
+
+
+# rating * log(review_count + 1) * log(booking_count + 1), same formula search used inline
+LISTING_POPULARITY_SCORE_SQL = (
+    "rating * log(review_count + 1) * log(booking_count + 1)"
+)
+
+
+class ListingPopularity(BaseModel):
+    """
+    Materialized listing popularity.
+    One row per listing, maintained incrementally from booking status transitions
+    and reconciled periodically; search reads ``popularity_score`` directly.
+    """
+    __tablename__ = "listing_popularity"
+    
+    listing_id = Column(String(40), ForeignKey("listings.id", ondelete="CASCADE"), unique=True, nullable=False, index=True)
+    booking_count = Column(Integer, default=0, nullable=False)  # confirmed + completed bookings
+    review_count = Column(Integer, default=0, nullable=False)
+    rating = Column(Numeric(3, 2), default=0, nullable=False)
+    popularity_score = Column(
+        Numeric(12, 6),
+        Computed(LISTING_POPULARITY_SCORE_SQL, persisted=True),
+        nullable=True
+    )
+    
+    __table_args__ = (
+        Index("idx_listing_popularity_score", "popularity_score"),
+    )
+
+
+# Suggestion ranking: a booking counts for more than one more listing
+LISTING_DESTINATION_SCORE_SQL = "listing_count + 2 * booking_count"
+
+
+class ListingDestination(BaseModel):
+    """
+    Distinct listing destinations (city, country) for search suggestions.
+    ``listing_count`` (active listings) is maintained from listing writes;
+    ``booking_count`` and any drift are corrected by the periodic reconcile.
+    """
+    __tablename__ = "listing_destinations"
+    
+    city = Column(String(100), nullable=False)
+    country = Column(String(100), nullable=False)
+    # Case-insensitive match keys; suggestions are prefix matches on these
+    city_key = Column(String(100), Computed("lower(btrim(city))", persisted=True))
+    country_key = Column(String(100), Computed("lower(btrim(country))", persisted=True))
+    listing_count = Column(Integer, default=0, nullable=False)
+    booking_count = Column(Integer, default=0, nullable=False)
+    popularity_score = Column(Integer, Computed(LISTING_DESTINATION_SCORE_SQL, persisted=True))
+    
+    __table_args__ = (
+        Index("idx_listing_destination_key", "country_key", "city_key", unique=True),
+        Index(
+            "idx_listing_destination_city_prefix", "city_key",
+            postgresql_ops={"city_key": "varchar_pattern_ops"}
+        ),
+        Index(
+            "idx_listing_destination_country_prefix", "country_key",
+            postgresql_ops={"country_key": "varchar_pattern_ops"}
+        ),
+    )
+
+
+class ListingAvailabilityBitmap(BaseModel):
+    """
+    Unbookable nights per listing over the bookable horizon.
+    Bit ``i`` of ``blocked_nights`` is set when the night of
+    ``horizon_start + i`` is taken by a booking, a ``BlockedDate`` or a blocked
+    ``PriceCalendar`` day. Refreshed from booking writes and rebuilt nightly,
+    which also moves the horizon forward; search tests a stay against these
+    bits instead of probing bookings and blocks per listing.
+    """
+    __tablename__ = "listing_availability_bitmaps"
+    
+    listing_id = Column(String(40), ForeignKey("listings.id", ondelete="CASCADE"), unique=True, nullable=False, index=True)
+    horizon_start = Column(Date, nullable=False)  # Night of bit 0
+    blocked_nights = Column(BIT(varying=True), nullable=False)  # One bit per night, '1' = unavailable
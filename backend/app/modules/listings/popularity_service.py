@@ -0,0 +1,125 @@
+"""
+Listing popularity service.
+Maintains the materialized ``listing_popularity`` table used by search ranking.
+"""
+import logging
+from typing import Optional
+
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.listings.models import Listing, ListingPopularity
+from app.modules.bookings.models import BookingStatus
+from app.core.id import ID
+
+logger = logging.getLogger(__name__)
+
+# Booking statuses that count towards a listing's popularity
+POPULAR_BOOKING_STATUSES = frozenset({
+    BookingStatus.CONFIRMED.value,
+    BookingStatus.COMPLETED.value,
+})
+
+
+def _status_value(status) -> Optional[str]:
+    """Normalize enum or string statuses to their string value."""
+    if status is None:
+        return None
+    return status.value if hasattr(status, "value") else str(status)
+
+
+def popularity_delta(old_status, new_status) -> int:
+    """Return the booking_count change caused by a booking status transition."""
+    was_counted = _status_value(old_status) in POPULAR_BOOKING_STATUSES
+    is_counted = _status_value(new_status) in POPULAR_BOOKING_STATUSES
+    return int(is_counted) - int(was_counted)
+
+
+# Full recompute from source tables in a single statement (used by the reconcile job)
+RECONCILE_SQL = text("""
+    INSERT INTO listing_popularity (id, listing_id, booking_count, review_count, rating, created_at, updated_at)
+    SELECT
+        'LIST_' || substr(md5(l.id), 1, 22),
+        l.id,
+        coalesce(b.booking_count, 0),
+        l.review_count,
+        l.rating,
+        now(),
+        now()
+    FROM listings l
+    LEFT JOIN (
+        SELECT listing_id, count(*) AS booking_count
+        FROM bookings
+        WHERE status IN ('confirmed', 'completed')
+        GROUP BY listing_id
+    ) b ON b.listing_id = l.id
+    ON CONFLICT (listing_id) DO UPDATE SET
+        booking_count = EXCLUDED.booking_count,
+        review_count = EXCLUDED.review_count,
+        rating = EXCLUDED.rating,
+        updated_at = now()
+    WHERE listing_popularity.booking_count IS DISTINCT FROM EXCLUDED.booking_count
+       OR listing_popularity.review_count IS DISTINCT FROM EXCLUDED.review_count
+       OR listing_popularity.rating IS DISTINCT FROM EXCLUDED.rating
+""")
+
+
+class ListingPopularityService:
+    """Incremental maintenance and reconciliation of listing popularity."""
+
+    @staticmethod
+    async def apply_booking_transition(
+        db: AsyncSession,
+        listing_id: ID,
+        old_status,
+        new_status
+    ) -> None:
+        """Apply a booking status transition to the listing's popularity row.
+
+        Upserts the row in the caller's transaction (does NOT commit), adjusting
+        booking_count by the transition delta and refreshing rating/review_count
+        from the listing. No-op when the transition doesn't change the count.
+        """
+        delta = popularity_delta(old_status, new_status)
+        if delta == 0:
+            return
+        await ListingPopularityService._upsert(db, listing_id, delta)
+
+    @staticmethod
+    async def refresh_rating(db: AsyncSession, listing_id: ID) -> None:
+        """Copy the listing's current rating/review_count into its popularity row."""
+        await ListingPopularityService._upsert(db, listing_id, 0)
+
+    @staticmethod
+    async def _upsert(db: AsyncSession, listing_id: ID, delta: int) -> None:
+        review_count = select(Listing.review_count).where(Listing.id == listing_id).scalar_subquery()
+        rating = select(Listing.rating).where(Listing.id == listing_id).scalar_subquery()
+
+        stmt = insert(ListingPopularity).values(
+            listing_id=listing_id,
+            booking_count=max(delta, 0),
+            review_count=func.coalesce(review_count, 0),
+            rating=func.coalesce(rating, 0),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ListingPopularity.listing_id],
+            set_={
+                "booking_count": func.greatest(ListingPopularity.booking_count + delta, 0),
+                "review_count": stmt.excluded.review_count,
+                "rating": stmt.excluded.rating,
+                "updated_at": func.now(),
+            }
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def reconcile(db: AsyncSession) -> int:
+        """Recompute every listing's popularity from bookings and listings.
+
+        Corrects drift from missed transitions (e.g. bulk status updates) and picks
+        up review changes. Returns the number of rows inserted or changed.
+        """
+        result = await db.execute(RECONCILE_SQL)
+        await db.commit()
+        return result.rowcount or 0
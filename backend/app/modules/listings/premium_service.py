@@ -8,10 +8,10 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func, case
-from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
 from app.modules.listings.models import Listing, ListingStatus
+from app.modules.listings.load_profiles import CARD, listing_load_options
 from app.core.id import ID
 
 logger = logging.getLogger(__name__)
@@ -221,10 +221,7 @@ class PremiumListingService:
             conditions.append(Listing.country.ilike(f"%{country}%"))
         
         query = select(Listing).where(and_(*conditions)).options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.location)
+            *listing_load_options(CARD)
         ).order_by(
             Listing.premium_priority.desc(),
             Listing.rating.desc(),
@@ -263,10 +260,7 @@ class PremiumListingService:
             conditions.append(Listing.country.ilike(f"%{country}%"))
         
         query = select(Listing).where(and_(*conditions)).options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.location)
+            *listing_load_options(CARD)
         ).order_by(
             Listing.premium_priority.desc(),
             Listing.rating.desc()
@@ -0,0 +1,399 @@
+"""
+Nightly pricing engine.
+
+Quotes a stay night by night from the listing's base price and its pricing
+tables:
+
+1. ``SeasonalOverride.price_factor`` multiplies the base price on the nights
+   inside a season.
+2. ``PricingRule`` rows that target nights (by date window and/or weekday;
+   ``weekend`` rules without a weekday mean Friday and Saturday nights)
+   apply their percentage as a multiplier, then their fixed amount.
+3. ``PriceCalendar.nightly_rate`` replaces the rate for that night outright
+   (only days in the listing's currency).
+4. ``length_of_stay`` rules apply to every night, calendar nights included.
+
+A rule only applies when the stay's length is within its
+``min_nights``/``max_nights``. ``last_minute`` rules depend on when the stay
+is booked, which the rule rows don't describe; they are skipped. A season's
+``min_nights``/``max_nights`` restrict the length of stays that include its
+nights and are reported on the quote.
+
+Each listing's rule set is compiled once into NumPy arrays and evaluated for a
+whole date range at a time. Compiled sets are cached per process;
+``invalidate`` bumps a per-listing version in Redis that every process checks
+on lookup, so a rule, season or calendar edit is quoted right away. Compiled
+sets are also reloaded after ``PRICING_CACHE_TTL_SECONDS``, which bounds
+staleness when Redis is down or a write skipped ``invalidate``.
+"""
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time as dt_time, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
+
+from app.infrastructure.cache.redis import get_redis
+from app.modules.listings.models import PriceCalendar, PricingRule, SeasonalOverride
+from app.core.config import get_settings
+from app.core.id import ID
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LENGTH_OF_STAY = "length_of_stay"
+WEEKEND = "weekend"
+
+# Rule types conditioned on the booking date rather than on the nights
+SKIPPED_RULE_TYPES = frozenset({"last_minute"})
+
+# day_of_week codes in compiled rules (0-6 are Monday-Sunday)
+ANY_DAY = -1
+WEEKEND_DAYS = -2
+
+# Open-ended rule/season bounds as day ordinals
+_MIN_DAY = date.min.toordinal()
+_MAX_DAY = date.max.toordinal()
+
+_NO_MAX_NIGHTS = np.iinfo(np.int64).max
+
+# Most listings kept compiled per process (least recently used are evicted)
+CACHE_MAX_LISTINGS = 50000
+
+CENTS = Decimal("0.01")
+
+VERSION_KEY_PREFIX = "pricing:version:"
+
+
+@dataclass(frozen=True)
+class CompiledPricing:
+    """A listing's pricing rows as arrays (day ordinals, one entry per row)."""
+    rule_start: np.ndarray  # first night, inclusive
+    rule_end: np.ndarray  # last night, inclusive
+    rule_day_of_week: np.ndarray
+    rule_min_nights: np.ndarray
+    rule_max_nights: np.ndarray
+    rule_multiplier: np.ndarray  # 1 + percentage / 100 (1 for fixed rules)
+    rule_fixed: np.ndarray  # amount added per night (0 for percentage rules)
+    rule_whole_stay: np.ndarray  # length_of_stay rules also apply to calendar nights
+    season_start: np.ndarray  # first night, inclusive
+    season_end: np.ndarray  # exclusive
+    season_factor: np.ndarray
+    season_min_nights: np.ndarray
+    season_max_nights: np.ndarray
+    calendar_days: np.ndarray  # sorted
+    calendar_rates: np.ndarray
+    currency: Optional[str] = None  # calendar days in other currencies were dropped
+    compiled_at: float = 0.0
+    version: int = 0  # the listing's Redis pricing version when compiled
+
+
+@dataclass(frozen=True)
+class StayQuote:
+    """Accommodation price of a stay (before cleaning and service fees)."""
+    listing_id: ID
+    nightly_rates: List[Decimal]
+    total: Decimal
+    currency: str
+    # Stay length limits of the seasons the stay falls in (None when unrestricted)
+    min_nights: Optional[int] = None
+    max_nights: Optional[int] = None
+
+    @property
+    def average_nightly_rate(self) -> Decimal:
+        return (self.total / len(self.nightly_rates)).quantize(CENTS)
+
+
+def _night_after(moment: datetime) -> int:
+    """Ordinal of the first night starting at or after ``moment``."""
+    return moment.date().toordinal() + (1 if moment.time() != dt_time.min else 0)
+
+
+def _supported_rules(rules: Iterable[PricingRule]) -> List[PricingRule]:
+    supported = []
+    for rule in rules:
+        if rule.is_active is False:
+            continue
+        if rule.rule_type in SKIPPED_RULE_TYPES:
+            logger.warning(
+                f"Skipping {rule.rule_type} pricing rule {rule.id} of listing {rule.listing_id}: "
+                f"booking-date rules are not supported"
+            )
+            continue
+        supported.append(rule)
+    return supported
+
+
+def _calendar_in_currency(calendar: Iterable[PriceCalendar], currency: Optional[str]) -> List[PriceCalendar]:
+    days = []
+    for day in calendar:
+        if currency is not None and day.currency is not None and day.currency != currency:
+            logger.warning(
+                f"Skipping {day.currency} price calendar day {day.date} of listing {day.listing_id}: "
+                f"listing is priced in {currency}"
+            )
+            continue
+        days.append(day)
+    return sorted(days, key=lambda day: day.date)
+
+
+def compile_pricing(
+    rules: Iterable[PricingRule],
+    seasons: Iterable[SeasonalOverride],
+    calendar: Iterable[PriceCalendar],
+    currency: Optional[str] = None
+) -> CompiledPricing:
+    """Compile one listing's active rules, seasons and calendar days.
+
+    With ``currency`` (the listing's), calendar days priced in another
+    currency are skipped.
+    """
+    rules = _supported_rules(rules)
+    seasons = list(seasons)
+    calendar = _calendar_in_currency(calendar, currency)
+
+    def day_of_week(rule) -> int:
+        if rule.day_of_week is not None:
+            return rule.day_of_week
+        return WEEKEND_DAYS if rule.rule_type == WEEKEND else ANY_DAY
+
+    percentage = [rule.modifier_type != "fixed" for rule in rules]
+    modifiers = [float(rule.price_modifier) for rule in rules]
+    return CompiledPricing(
+        rule_start=np.array([r.start_date.toordinal() if r.start_date else _MIN_DAY for r in rules], dtype=np.int64),
+        rule_end=np.array([r.end_date.toordinal() if r.end_date else _MAX_DAY for r in rules], dtype=np.int64),
+        rule_day_of_week=np.array([day_of_week(r) for r in rules], dtype=np.int64),
+        rule_min_nights=np.array([r.min_nights or 0 for r in rules], dtype=np.int64),
+        rule_max_nights=np.array([r.max_nights or _NO_MAX_NIGHTS for r in rules], dtype=np.int64),
+        rule_multiplier=np.array([1 + m / 100 if p else 1.0 for m, p in zip(modifiers, percentage)], dtype=np.float64),
+        rule_fixed=np.array([0.0 if p else m for m, p in zip(modifiers, percentage)], dtype=np.float64),
+        rule_whole_stay=np.array([r.rule_type == LENGTH_OF_STAY for r in rules], dtype=bool),
+        season_start=np.array([s.starts_at.date().toordinal() for s in seasons], dtype=np.int64),
+        season_end=np.array([_night_after(s.ends_at) for s in seasons], dtype=np.int64),
+        season_factor=np.array([float(s.price_factor) if s.price_factor is not None else 1.0 for s in seasons], dtype=np.float64),
+        season_min_nights=np.array([s.min_nights or 0 for s in seasons], dtype=np.int64),
+        season_max_nights=np.array([s.max_nights or _NO_MAX_NIGHTS for s in seasons], dtype=np.int64),
+        calendar_days=np.array([day.date.toordinal() for day in calendar], dtype=np.int64),
+        calendar_rates=np.array([float(day.nightly_rate) for day in calendar], dtype=np.float64),
+        currency=currency,
+        compiled_at=time.monotonic(),
+    )
+
+
+def _apply_rules(rates: np.ndarray, applies: np.ndarray, compiled: CompiledPricing) -> np.ndarray:
+    """Apply the rules selected by ``applies`` (rules x nights) to ``rates``."""
+    multiplier = np.prod(np.where(applies, compiled.rule_multiplier[:, None], 1.0), axis=0)
+    fixed = np.sum(np.where(applies, compiled.rule_fixed[:, None], 0.0), axis=0)
+    return rates * multiplier + fixed
+
+
+def nightly_rates(compiled: CompiledPricing, base_price: float, check_in: date, check_out: date) -> np.ndarray:
+    """Rate of every night from ``check_in`` up to ``check_out``, rounded to cents."""
+    days = np.arange(check_in.toordinal(), check_out.toordinal(), dtype=np.int64)
+    nights = len(days)
+    rates = np.full(nights, float(base_price))
+    if nights == 0:
+        return rates
+
+    if compiled.season_factor.size:
+        in_season = (days >= compiled.season_start[:, None]) & (days < compiled.season_end[:, None])
+        rates *= np.prod(np.where(in_season, compiled.season_factor[:, None], 1.0), axis=0)
+
+    if compiled.rule_multiplier.size:
+        weekday = (days - 1) % 7  # ordinal 1 (0001-01-01) is a Monday
+        rule_day = compiled.rule_day_of_week[:, None]
+        on_day = (
+            (rule_day == ANY_DAY)
+            | (rule_day == weekday)
+            | ((rule_day == WEEKEND_DAYS) & ((weekday == 4) | (weekday == 5)))
+        )
+        stay_fits = (compiled.rule_min_nights <= nights) & (nights <= compiled.rule_max_nights)
+        applies = (
+            (days >= compiled.rule_start[:, None])
+            & (days <= compiled.rule_end[:, None])
+            & on_day
+            & stay_fits[:, None]
+        )
+        whole_stay = compiled.rule_whole_stay[:, None]
+        rates = _apply_rules(rates, applies & ~whole_stay, compiled)
+    else:
+        applies = whole_stay = None
+
+    if compiled.calendar_days.size:
+        index = np.minimum(np.searchsorted(compiled.calendar_days, days), compiled.calendar_days.size - 1)
+        rates = np.where(compiled.calendar_days[index] == days, compiled.calendar_rates[index], rates)
+
+    if applies is not None:
+        rates = _apply_rules(rates, applies & whole_stay, compiled)
+
+    return np.round(np.maximum(rates, 0.0), 2)
+
+
+def stay_night_limits(
+    compiled: CompiledPricing, check_in: date, check_out: date
+) -> Tuple[Optional[int], Optional[int]]:
+    """Tightest ``(min_nights, max_nights)`` of the seasons with a night in the stay."""
+    if not compiled.season_factor.size:
+        return None, None
+    overlaps = (compiled.season_start < check_out.toordinal()) & (compiled.season_end > check_in.toordinal())
+    min_nights = int(compiled.season_min_nights[overlaps].max(initial=0))
+    max_nights = int(compiled.season_max_nights[overlaps].min(initial=_NO_MAX_NIGHTS))
+    return min_nights or None, max_nights if max_nights != _NO_MAX_NIGHTS else None
+
+
+class PricingEngine:
+    """Quotes stays for one or many listings from cached compiled rule sets."""
+
+    def __init__(self, max_listings: int = CACHE_MAX_LISTINGS):
+        self._compiled: "OrderedDict[ID, CompiledPricing]" = OrderedDict()
+        self._max_listings = max_listings
+
+    async def quote_many(
+        self,
+        db: AsyncSession,
+        listings: Sequence,
+        check_in: date,
+        check_out: date
+    ) -> Dict[ID, StayQuote]:
+        """Quote the stay for every listing (anything with ``id``, ``base_price``, ``currency``).
+
+        Loads and compiles the rule sets that aren't cached (three queries for
+        all of them together), then prices each listing's nights in one
+        vectorized pass.
+        """
+        if check_out <= check_in:
+            raise ValueError("check_out must be after check_in")
+        if not listings:
+            return {}
+        compiled = await self._get_compiled(db, listings)
+
+        quotes = {}
+        for listing in listings:
+            pricing = compiled[listing.id]
+            rates = nightly_rates(pricing, float(listing.base_price), check_in, check_out)
+            nightly = [Decimal(str(rate)).quantize(CENTS) for rate in rates.tolist()]
+            min_nights, max_nights = stay_night_limits(pricing, check_in, check_out)
+            quotes[listing.id] = StayQuote(
+                listing_id=listing.id,
+                nightly_rates=nightly,
+                total=sum(nightly, Decimal("0")),
+                currency=listing.currency,
+                min_nights=min_nights,
+                max_nights=max_nights,
+            )
+        return quotes
+
+    async def quote(self, db: AsyncSession, listing, check_in: date, check_out: date) -> StayQuote:
+        """Quote one listing's stay."""
+        return (await self.quote_many(db, [listing], check_in, check_out))[listing.id]
+
+    def clear(self) -> None:
+        self._compiled.clear()
+
+    async def invalidate(self, *listing_ids: ID) -> None:
+        """Drop listings' compiled pricing in every process.
+
+        Call after committing a change to their pricing rules, seasonal
+        overrides or price calendar. Without Redis, other processes pick the
+        change up after ``PRICING_CACHE_TTL_SECONDS``.
+        """
+        listing_ids = list(dict.fromkeys(listing_ids))
+        if not listing_ids:
+            return
+        for listing_id in listing_ids:
+            self._compiled.pop(listing_id, None)
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline(transaction=False)
+            for listing_id in listing_ids:
+                pipe.incr(f"{VERSION_KEY_PREFIX}{listing_id}")
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Pricing version bump failed for listings {listing_ids}: {e}")
+
+    @staticmethod
+    async def _versions(listing_ids: List[ID]) -> Optional[Dict[ID, int]]:
+        """Current pricing versions, or None if Redis can't be reached."""
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline(transaction=False)
+            # Single-key reads so the pipeline also works on Redis Cluster
+            for listing_id in listing_ids:
+                pipe.get(f"{VERSION_KEY_PREFIX}{listing_id}")
+            values = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Pricing version lookup failed, using cache TTL: {e}")
+            return None
+        return {listing_id: int(value or 0) for listing_id, value in zip(listing_ids, values)}
+
+    async def _get_compiled(self, db: AsyncSession, listings: Sequence) -> Dict[ID, CompiledPricing]:
+        currencies = {listing.id: listing.currency for listing in listings}
+        # Read before loading: an edit committed meanwhile leaves the new
+        # compile one version behind, so the next lookup recompiles again
+        versions = await self._versions(list(currencies))
+        now = time.monotonic()
+
+        compiled: Dict[ID, CompiledPricing] = {}
+        for listing_id, currency in currencies.items():
+            cached = self._compiled.get(listing_id)
+            if cached is None or cached.currency != currency:
+                continue
+            # The TTL also bounds writes that skipped ``invalidate``
+            fresh = now - cached.compiled_at < settings.pricing_cache_ttl_seconds
+            if fresh and (versions is None or cached.version == versions[listing_id]):
+                self._compiled.move_to_end(listing_id)
+                compiled[listing_id] = cached
+
+        missing = {
+            listing_id: currency for listing_id, currency in currencies.items() if listing_id not in compiled
+        }
+        if missing:
+            loaded = await self._load(db, missing)
+            for listing_id, pricing in loaded.items():
+                pricing = replace(pricing, version=(versions or {}).get(listing_id, 0))
+                self._compiled[listing_id] = pricing
+                compiled[listing_id] = pricing
+            while len(self._compiled) > self._max_listings:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    @staticmethod
+    async def _load(db: AsyncSession, currencies: Dict[ID, str]) -> Dict[ID, CompiledPricing]:
+        """Compile rule sets for the listings in ``currencies`` (id to currency) from three bulk queries."""
+        listing_ids = list(currencies)
+        rules = await db.execute(
+            select(PricingRule)
+            .where(PricingRule.listing_id.in_(listing_ids), PricingRule.is_active == True)
+            .options(raiseload("*"))
+        )
+        seasons = await db.execute(
+            select(SeasonalOverride)
+            .where(SeasonalOverride.listing_id.in_(listing_ids))
+            .options(raiseload("*"))
+        )
+        # Past calendar days can't be quoted
+        today = datetime.now(timezone.utc).date()
+        calendar = await db.execute(
+            select(PriceCalendar)
+            .where(PriceCalendar.listing_id.in_(listing_ids), PriceCalendar.date >= today)
+            .options(raiseload("*"))
+        )
+
+        by_listing = {listing_id: ([], [], []) for listing_id in listing_ids}
+        for slot, result in enumerate((rules, seasons, calendar)):
+            for row in result.scalars():
+                by_listing[row.listing_id][slot].append(row)
+        return {
+            listing_id: compile_pricing(*rows, currency=currencies[listing_id])
+            for listing_id, rows in by_listing.items()
+        }
+
+
+# Process-wide engine (compiled rule sets are shared by all requests)
+pricing_engine = PricingEngine()
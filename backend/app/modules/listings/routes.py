@@ -24,6 +24,7 @@ from app.modules.listings.schemas import (
     ListingPhotoResponse, ListingImageResponse
 )
 from app.modules.listings.services import ListingService
+from app.modules.listings.load_profiles import CARD, DETAIL
 from app.core.id import ID
 
 router = APIRouter(prefix="/listings", tags=["Listings"])
@@ -33,6 +34,7 @@ router = APIRouter(prefix="/listings", tags=["Listings"])
 async def list_listings(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides skip)"),
     city: Optional[str] = None,
     country: Optional[str] = None,
     listing_type: Optional[ListingType] = None,
@@ -55,39 +57,56 @@ async def list_listings(
         min_price=min_price,
         max_price=max_price,
         min_guests=min_guests,
-        status=status
+        status=status,
+        cursor=cursor
     )
     
-    # Convert domain entities to response models
-    # Note: In production, you'd use a mapper or converter
-    items = []
-    for listing in listings:
-        # Convert ListingEntity to ListingResponse
-        # This is simplified - you'd use a proper mapper
-        from app.modules.listings.models import Listing as ListingModel
-        from sqlalchemy import select
-        from sqlalchemy.orm import selectinload
-        
-        result = await uow.db.execute(
-            select(ListingModel)
-            .where(ListingModel.id == listing.id)
-            .options(
-                selectinload(ListingModel.photos),
-                selectinload(ListingModel.images),
-                selectinload(ListingModel.host),
-                selectinload(ListingModel.host_profile)
-            )
-        )
-        listing_model = result.scalar_one_or_none()
-        if listing_model:
-            # Convert SQLAlchemy model to Pydantic schema
-            items.append(ListingResponse.model_validate(listing_model))
+    # One query per card relationship for the whole page (the repository
+    # returns column-only entities)
+    listing_models = await ListingService.load_listing_models(
+        uow, [listing.id for listing in listings], CARD
+    )
+    items = [ListingResponse.model_validate(listing_model) for listing_model in listing_models]
     
     return {
         "items": items,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": ListingService.next_page_cursor(listings, limit)
+    }
+
+
+@router.get("/mine", response_model=ListingListResponse)
+async def list_my_listings(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides skip)"),
+    current_user: User = Depends(require_host),
+    uow: IUnitOfWork = Depends(get_unit_of_work)
+) -> Any:
+    """
+    List the current host's listings in every status, newest first.
+    """
+    listings, total = await ListingService.get_host_listings(
+        uow=uow,
+        host_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        cursor=cursor
+    )
+    
+    listing_models = await ListingService.load_listing_models(
+        uow, [listing.id for listing in listings], CARD
+    )
+    items = [ListingResponse.model_validate(listing_model) for listing_model in listing_models]
+    
+    return {
+        "items": items,
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": ListingService.next_page_cursor(listings, limit)
     }
 
 
@@ -112,27 +131,9 @@ async def get_listing(
         )
     
     # Get full model with relationships
-    from app.modules.listings.models import Listing as ListingModel
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
     from decimal import Decimal
     
-    result = await uow.db.execute(
-        select(ListingModel)
-        .where(ListingModel.id == listing.id)
-        .options(
-            selectinload(ListingModel.photos),
-            selectinload(ListingModel.images),
-            selectinload(ListingModel.host),
-            selectinload(ListingModel.host_profile),
-            selectinload(ListingModel.amenities),
-            selectinload(ListingModel.rules),
-            selectinload(ListingModel.reviews),
-            selectinload(ListingModel.location),
-            selectinload(ListingModel.calendar)
-        )
-    )
-    listing_model = result.scalar_one_or_none()
+    listing_model = await ListingService.load_listing_model(uow, listing.id, DETAIL)
     
     if not listing_model:
         raise HTTPException(
@@ -218,6 +219,7 @@ async def get_listing(
     # Check if listing is in user's wishlist
     is_favorite = False
     try:
+        from sqlalchemy import select
         from app.modules.wishlist.models import Wishlist
         wishlist_result = await uow.db.execute(
             select(Wishlist).where(
@@ -235,6 +237,22 @@ async def get_listing(
     response.can_book = True
     # TODO: Add viewed_recently check if needed
     
+    # Signed-in views feed the item-item recommendation model
+    try:
+        from app.modules.analytics.service import AnalyticsService
+        from app.modules.recommendations.cf_model import VIEW_EVENT_NAME
+        await AnalyticsService.track_event(
+            db=uow.db,
+            user_id=optional_user.id,
+            event_name=VIEW_EVENT_NAME,
+            source="api",
+            payload={"listing_id": str(listing_id)}
+        )
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.warning(f"Failed to track listing view analytics: {e}")
+    
     return response
 
 
@@ -254,20 +272,7 @@ async def create_listing(
     )
     
     # Get full model with relationships
-    from app.modules.listings.models import Listing as ListingModel
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
-    
-    result = await uow.db.execute(
-        select(ListingModel)
-        .where(ListingModel.id == listing.id)
-        .options(
-            selectinload(ListingModel.photos),
-            selectinload(ListingModel.images),
-            selectinload(ListingModel.location)
-        )
-    )
-    listing_model = result.scalar_one_or_none()
+    listing_model = await ListingService.load_listing_model(uow, listing.id, CARD)
     
     # Convert SQLAlchemy model to Pydantic schema
     return ListingResponse.model_validate(listing_model)
@@ -299,19 +304,7 @@ async def update_listing(
     )
     
     # Get full model
-    from app.modules.listings.models import Listing as ListingModel
-    from sqlalchemy import select
-    from sqlalchemy.orm import selectinload
-    
-    result = await uow.db.execute(
-        select(ListingModel)
-        .where(ListingModel.id == listing.id)
-        .options(
-            selectinload(ListingModel.photos),
-            selectinload(ListingModel.images)
-        )
-    )
-    listing_model = result.scalar_one_or_none()
+    listing_model = await ListingService.load_listing_model(uow, listing.id, CARD)
     
     # Convert SQLAlchemy model to Pydantic schema
     return ListingResponse.model_validate(listing_model)
@@ -399,15 +392,7 @@ async def create_listing_location(
     await uow.commit()
     
     # Get full listing model
-    from app.modules.listings.models import Listing as ListingModel
-    from sqlalchemy.orm import selectinload
-    
-    result = await uow.db.execute(
-        select(ListingModel)
-        .where(ListingModel.id == listing_id)
-        .options(selectinload(ListingModel.location))
-    )
-    listing_model = result.scalar_one_or_none()
+    listing_model = await ListingService.load_listing_model(uow, listing_id, CARD)
     
     # Convert SQLAlchemy model to Pydantic schema
     return ListingResponse.model_validate(listing_model)
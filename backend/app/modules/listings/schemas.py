@@ -208,6 +208,7 @@ class ListingListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class ListingLocationCreate(BaseModel):
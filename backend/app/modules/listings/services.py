@@ -7,10 +7,18 @@ from fastapi import HTTPException, status
 from decimal import Decimal
 import re
 
+from sqlalchemy import select
+
 from app.repositories.unit_of_work import IUnitOfWork
 from app.domain.entities.listing import ListingEntity
 from app.modules.listings.schemas import ListingCreate, ListingUpdate
-from app.modules.listings.models import ListingStatus, ListingType
+from app.modules.listings.models import Listing, ListingStatus, ListingType
+from app.modules.listings.load_profiles import listing_load_options
+from app.modules.listings.destination_service import ListingDestinationService, active_destination
+from app.modules.listings.snapshot_service import SearchSnapshotService
+from app.modules.search.result_cache import search_result_cache, search_scope
+from app.repositories.listings import listing_feed_cursor
+from app.shared.pagination import InvalidCursorError
 from app.core.id import generate_typed_id, ID
 
 
@@ -33,6 +41,37 @@ class ListingService:
         """Get listing by slug."""
         return await uow.listings.get_by_slug(slug)
     
+    @staticmethod
+    async def load_listing_models(
+        uow: IUnitOfWork,
+        listing_ids: List[ID],
+        profile: str
+    ) -> List[Listing]:
+        """Listing models for ``listing_ids``, in that order, loaded with a load profile.
+        
+        One query for the listings plus one per relationship in the profile,
+        however many ids are given. Ids that don't exist are skipped.
+        """
+        if not listing_ids:
+            return []
+        result = await uow.db.execute(
+            select(Listing)
+            .where(Listing.id.in_(listing_ids))
+            .options(*listing_load_options(profile))
+        )
+        by_id = {model.id: model for model in result.scalars()}
+        return [by_id[listing_id] for listing_id in listing_ids if listing_id in by_id]
+    
+    @staticmethod
+    async def load_listing_model(
+        uow: IUnitOfWork,
+        listing_id: ID,
+        profile: str
+    ) -> Optional[Listing]:
+        """Listing model loaded with a load profile, or None if it doesn't exist."""
+        models = await ListingService.load_listing_models(uow, [listing_id], profile)
+        return models[0] if models else None
+    
     @staticmethod
     async def list_listings(
         uow: IUnitOfWork,
@@ -44,21 +83,30 @@ class ListingService:
         min_price: Optional[float] = None,
         max_price: Optional[float] = None,
         min_guests: Optional[int] = None,
-        status: Optional[ListingStatus] = ListingStatus.ACTIVE
+        status: Optional[ListingStatus] = ListingStatus.ACTIVE,
+        cursor: Optional[str] = None
     ) -> Tuple[List[ListingEntity], int]:
         """List listings with optional filters."""
-        return await uow.listings.search(
-            query=None,
-            city=city,
-            country=country,
-            listing_type=listing_type,
-            min_price=min_price,
-            max_price=max_price,
-            min_guests=min_guests,
-            status=status.value if status else ListingStatus.ACTIVE.value,
-            skip=skip,
-            limit=limit
-        )
+        try:
+            return await uow.listings.search(
+                query=None,
+                city=city,
+                country=country,
+                listing_type=listing_type,
+                min_price=min_price,
+                max_price=max_price,
+                min_guests=min_guests,
+                status=status.value if status else ListingStatus.ACTIVE.value,
+                skip=skip,
+                limit=limit,
+                cursor=cursor
+            )
+        except InvalidCursorError as e:
+            # ``status`` is shadowed by the listing status filter here
+            raise HTTPException(
+                status_code=400,
+                detail=str(e)
+            )
     
     @staticmethod
     async def search_listings(
@@ -71,21 +119,29 @@ class ListingService:
         max_price: Optional[float] = None,
         min_guests: Optional[int] = None,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        cursor: Optional[str] = None
     ) -> Tuple[List[ListingEntity], int]:
         """Search listings with text and filter criteria."""
-        return await uow.listings.search(
-            query=query,
-            city=city,
-            country=country,
-            listing_type=listing_type,
-            min_price=min_price,
-            max_price=max_price,
-            min_guests=min_guests,
-            status=ListingStatus.ACTIVE.value,
-            skip=skip,
-            limit=limit
-        )
+        try:
+            return await uow.listings.search(
+                query=query,
+                city=city,
+                country=country,
+                listing_type=listing_type,
+                min_price=min_price,
+                max_price=max_price,
+                min_guests=min_guests,
+                status=ListingStatus.ACTIVE.value,
+                skip=skip,
+                limit=limit,
+                cursor=cursor
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
     
     @staticmethod
     async def create_listing(
@@ -176,12 +232,12 @@ class ListingService:
             )
             uow.db.add(location)
         
+        await SearchSnapshotService.enqueue(uow.db, created.id)
         await uow.commit()
         
         # Invalidate search cache and trigger recommendation reindex
         try:
-            from app.infrastructure.cache.redis import CacheService
-            await CacheService.delete_pattern("search:*")
+            await search_result_cache.invalidate_listing(created.id, after=search_scope(created))
             
             from app.modules.recommendations.ml_service import MLRecommendationEngine
             ml_engine = MLRecommendationEngine()
@@ -217,6 +273,9 @@ class ListingService:
                 detail="Not authorized to update this listing"
             )
         
+        destination_before = active_destination(listing)
+        search_before = search_scope(listing)
+        
         # Track if images changed for CDN purge
         images_changed = False
         old_listing = await uow.listings.get_by_id(listing_id)
@@ -243,12 +302,18 @@ class ListingService:
             )
         
         updated = await uow.listings.update(listing)
+        destination_changed = await ListingDestinationService.apply_listing_change(
+            uow.db, destination_before, active_destination(listing)
+        )
+        await SearchSnapshotService.enqueue(uow.db, listing_id)
         await uow.commit()
         
         # Invalidate search cache and trigger recommendation reindex
         try:
-            from app.infrastructure.cache.redis import CacheService
-            await CacheService.delete_pattern("search:*")
+            await search_result_cache.invalidate_listing(listing_id, search_before, search_scope(listing))
+            if destination_changed:
+                from app.modules.search.suggestions import destination_index
+                destination_index.invalidate()
             
             from app.modules.recommendations.ml_service import MLRecommendationEngine
             ml_engine = MLRecommendationEngine()
@@ -308,12 +373,17 @@ class ListingService:
             )
         
         deleted = await uow.listings.delete(listing_id)
+        destination_changed = await ListingDestinationService.apply_listing_change(
+            uow.db, active_destination(listing), None
+        )
         await uow.commit()
         
         # Invalidate search cache and trigger recommendation reindex
         try:
-            from app.infrastructure.cache.redis import CacheService
-            await CacheService.delete_pattern("search:*")
+            await search_result_cache.invalidate_listing(listing_id, before=search_scope(listing))
+            if destination_changed:
+                from app.modules.search.suggestions import destination_index
+                destination_index.invalidate()
             
             from app.modules.recommendations.ml_service import MLRecommendationEngine
             ml_engine = MLRecommendationEngine()
@@ -330,10 +400,24 @@ class ListingService:
         uow: IUnitOfWork,
         host_id: ID,
         skip: int = 0,
-        limit: int = 100
-    ) -> List[ListingEntity]:
-        """Get all listings for a given host."""
-        return await uow.listings.get_by_host(host_id, skip=skip, limit=limit)
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ListingEntity], int]:
+        """A page of a host's listings (any status), newest first, and their total."""
+        try:
+            listings = await uow.listings.get_by_host(host_id, skip=skip, limit=limit, cursor=cursor)
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        total = await uow.listings.count({"host_id": host_id})
+        return listings, total
+    
+    @staticmethod
+    def next_page_cursor(listings: List[ListingEntity], limit: int) -> Optional[str]:
+        """Opaque cursor for the listing feed page after ``listings``."""
+        return listing_feed_cursor(listings, limit)
     
     @staticmethod
     def _generate_slug(title: str) -> str:
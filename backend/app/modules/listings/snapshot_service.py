@@ -0,0 +1,196 @@
+"""
+Search snapshot service.
+Maintains ``search_snapshots``: one denormalized row per listing holding
+everything a search result card shows, so search never loads photos, hosts or
+amenities per result.
+
+Listing, photo and review writes call ``enqueue`` in their own transaction,
+which records the listing in ``search_snapshot_outbox``. The refresh worker
+drains the outbox in batches and rebuilds those snapshots from source tables;
+a nightly reconcile rebuilds every row (host renames, calendar days rolling
+off, writes that bypassed ``enqueue``).
+"""
+import logging
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy import String, text
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.analytics.models import SearchSnapshotOutbox
+from app.modules.search.result_cache import search_result_cache
+from app.core.id import ID
+
+logger = logging.getLogger(__name__)
+
+# Outbox rows claimed (and snapshots rebuilt) per transaction
+REFRESH_BATCH_SIZE = 500
+
+# Card payload per listing. The primary photo falls back to the first image.
+# The calendar rate range spans the base price and upcoming price calendar
+# days only: seasonal factors and pricing rules depend on the stay, so dated
+# searches quote those through the pricing engine instead.
+CARD_PAYLOAD_SQL = """
+    SELECT
+        l.id AS listing_id,
+        jsonb_build_object(
+            'id', l.id,
+            'slug', l.slug,
+            'title', l.title,
+            'listing_type', l.listing_type,
+            'city', l.city,
+            'country', l.country,
+            'latitude', l.latitude,
+            'longitude', l.longitude,
+            'bedrooms', l.bedrooms,
+            'beds', l.beds,
+            'bathrooms', l.bathrooms,
+            'max_guests', l.max_guests,
+            'is_premium', l.is_premium,
+            'is_featured', l.is_featured,
+            'rating', l.rating,
+            'review_count', l.review_count,
+            'base_price', l.base_price,
+            'currency', l.currency,
+            'cleaning_fee', l.cleaning_fee,
+            'min_calendar_rate', least(l.base_price, calendar.min_rate),
+            'max_calendar_rate', greatest(l.base_price, calendar.max_rate),
+            'primary_photo_url', coalesce(photo.url, image.url),
+            'host_display_name', coalesce(
+                nullif(btrim(u.full_name), ''),
+                nullif(btrim(concat_ws(' ', u.first_name, u.last_name)), ''),
+                u.username
+            ),
+            'amenity_keys', coalesce(amenities.keys, '[]'::jsonb)
+        ) AS payload
+    FROM listings l
+    LEFT JOIN host_profiles hp ON hp.id = l.host_profile_id
+    LEFT JOIN users u ON u.id = coalesce(l.host_id, hp.user_id)
+    LEFT JOIN LATERAL (
+        SELECT p.url FROM listing_photos p
+        WHERE p.listing_id = l.id
+        ORDER BY p.is_primary DESC, p.display_order, p.id
+        LIMIT 1
+    ) photo ON true
+    LEFT JOIN LATERAL (
+        SELECT i.url FROM listing_images i
+        WHERE i.listing_id = l.id
+        ORDER BY i.position, i.id
+        LIMIT 1
+    ) image ON true
+    LEFT JOIN LATERAL (
+        SELECT jsonb_agg(a.key ORDER BY a.key) AS keys
+        FROM listing_amenities la
+        JOIN amenities a ON a.id = la.amenity_id
+        WHERE la.listing_id = l.id
+    ) amenities ON true
+    LEFT JOIN LATERAL (
+        SELECT min(c.nightly_rate) AS min_rate, max(c.nightly_rate) AS max_rate
+        FROM price_calendars c
+        WHERE c.listing_id = l.id
+          AND NOT c.is_blocked
+          AND c.date >= (now() AT TIME ZONE 'UTC')::date
+    ) calendar ON true
+"""
+
+
+def _upsert_sql(listing_filter: str):
+    """Statement rebuilding the snapshots of the listings matching ``listing_filter``."""
+    return text(f"""
+        INSERT INTO search_snapshots (id, listing_id, payload, indexed_at, created_at, updated_at)
+        SELECT 'SEAR_' || substr(md5(c.listing_id), 1, 22), c.listing_id, c.payload, now(), now(), now()
+        FROM ({CARD_PAYLOAD_SQL} {listing_filter}) c
+        ON CONFLICT (listing_id) DO UPDATE SET
+            payload = EXCLUDED.payload,
+            indexed_at = now(),
+            updated_at = now()
+        WHERE search_snapshots.payload IS DISTINCT FROM EXCLUDED.payload
+        RETURNING listing_id
+    """)
+
+
+REFRESH_SQL = _upsert_sql("WHERE l.id = ANY(:listing_ids)")
+RECONCILE_SQL = _upsert_sql("")
+PAYLOADS_SQL = text(f"{CARD_PAYLOAD_SQL} WHERE l.id = ANY(:listing_ids)").columns(
+    listing_id=String, payload=JSONB
+)
+
+# Oldest pending listings; rows another worker is draining are skipped
+CLAIM_SQL = text("""
+    DELETE FROM search_snapshot_outbox
+    WHERE id IN (
+        SELECT id FROM search_snapshot_outbox
+        ORDER BY enqueued_at
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING listing_id
+""")
+
+
+class SearchSnapshotService:
+    """Outbox-driven maintenance of listing search snapshots."""
+
+    @staticmethod
+    async def enqueue(db: AsyncSession, *listing_ids: ID) -> None:
+        """Mark listings' snapshots for rebuilding.
+
+        Call after any change to what a search card shows: the listing itself,
+        its photos, images or amenities, or its reviews. Runs in the caller's
+        transaction (does NOT commit), so a rebuild is queued only if the
+        change commits.
+        """
+        listing_ids = list(dict.fromkeys(listing_ids))
+        if not listing_ids:
+            return
+        stmt = insert(SearchSnapshotOutbox).values(
+            [{"listing_id": listing_id} for listing_id in listing_ids]
+        ).on_conflict_do_nothing(index_elements=[SearchSnapshotOutbox.listing_id])
+        await db.execute(stmt)
+
+    @staticmethod
+    async def refresh_pending(db: AsyncSession, batch_size: int = REFRESH_BATCH_SIZE) -> int:
+        """Drain the outbox, rebuilding snapshots one batch per transaction.
+
+        A listing changed again while its batch is being rebuilt is enqueued
+        again and picked up by the next batch. Returns the number of listings
+        processed.
+        """
+        processed = 0
+        while True:
+            result = await db.execute(CLAIM_SQL, {"batch_size": batch_size})
+            listing_ids = [row[0] for row in result.all()]
+            changed = []
+            if listing_ids:
+                result = await db.execute(REFRESH_SQL, {"listing_ids": listing_ids})
+                changed = [row[0] for row in result.all()]
+            await db.commit()
+            # Cached search pages showing the old cards
+            await search_result_cache.invalidate_listings(changed)
+            processed += len(listing_ids)
+            if len(listing_ids) < batch_size:
+                return processed
+
+    @staticmethod
+    async def build_payloads(db: AsyncSession, listing_ids: Iterable[ID]) -> Dict[ID, Dict[str, Any]]:
+        """Card payloads computed from source tables (read-only).
+
+        Used for listings whose snapshot hasn't been written yet.
+        """
+        listing_ids: List[ID] = list(listing_ids)
+        if not listing_ids:
+            return {}
+        result = await db.execute(PAYLOADS_SQL, {"listing_ids": listing_ids})
+        return {row.listing_id: row.payload for row in result}
+
+    @staticmethod
+    async def reconcile(db: AsyncSession) -> int:
+        """Rebuild every listing's snapshot.
+
+        Returns the number of snapshots inserted or changed.
+        """
+        result = await db.execute(RECONCILE_SQL)
+        changed = [row[0] for row in result.all()]
+        await db.commit()
+        await search_result_cache.invalidate_listings(changed)
+        return len(changed)
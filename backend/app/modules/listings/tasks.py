@@ -0,0 +1,85 @@
+"""
+Listing background tasks.
+"""
+import asyncio
+import logging
+
+from app.core.celery_app import celery_app
+from app.core.database import AsyncSessionLocal
+from app.modules.listings.popularity_service import ListingPopularityService
+from app.modules.listings.destination_service import ListingDestinationService
+from app.modules.listings.availability_service import ListingAvailabilityService
+from app.modules.listings.snapshot_service import SearchSnapshotService
+
+logger = logging.getLogger(__name__)
+
+
+async def _reconcile_listing_popularity_async() -> int:
+    """Recompute the listing_popularity table from source data."""
+    async with AsyncSessionLocal() as db:
+        changed = await ListingPopularityService.reconcile(db)
+        logger.info(f"Listing popularity reconciled: {changed} rows changed")
+        return changed
+
+
+@celery_app.task(name="listings.reconcile_popularity")
+def reconcile_listing_popularity():
+    """Reconcile materialized listing popularity (Celery periodic task)."""
+    return asyncio.run(_reconcile_listing_popularity_async())
+
+
+async def _reconcile_listing_destinations_async() -> int:
+    """Recompute the listing_destinations table from source data."""
+    async with AsyncSessionLocal() as db:
+        changed = await ListingDestinationService.reconcile(db)
+        logger.info(f"Listing destinations reconciled: {changed} rows changed")
+        return changed
+
+
+@celery_app.task(name="listings.reconcile_destinations")
+def reconcile_listing_destinations():
+    """Reconcile search suggestion destinations (Celery periodic task)."""
+    return asyncio.run(_reconcile_listing_destinations_async())
+
+
+async def _rebuild_listing_availability_async() -> int:
+    """Recompute listing availability bitmaps from today's horizon."""
+    async with AsyncSessionLocal() as db:
+        changed = await ListingAvailabilityService.rebuild(db)
+        logger.info(f"Listing availability bitmaps rebuilt: {changed} rows changed")
+        return changed
+
+
+@celery_app.task(name="listings.rebuild_availability")
+def rebuild_listing_availability():
+    """Move availability bitmaps to today's horizon and fix drift (Celery periodic task)."""
+    return asyncio.run(_rebuild_listing_availability_async())
+
+
+async def _refresh_search_snapshots_async() -> int:
+    """Rebuild the search snapshots of listings waiting in the outbox."""
+    async with AsyncSessionLocal() as db:
+        refreshed = await SearchSnapshotService.refresh_pending(db)
+        if refreshed:
+            logger.info(f"Search snapshots refreshed for {refreshed} listings")
+        return refreshed
+
+
+@celery_app.task(name="listings.refresh_search_snapshots")
+def refresh_search_snapshots():
+    """Drain the search snapshot outbox (Celery periodic task)."""
+    return asyncio.run(_refresh_search_snapshots_async())
+
+
+async def _reconcile_search_snapshots_async() -> int:
+    """Rebuild every listing's search snapshot from source data."""
+    async with AsyncSessionLocal() as db:
+        changed = await SearchSnapshotService.reconcile(db)
+        logger.info(f"Search snapshots reconciled: {changed} rows changed")
+        return changed
+
+
+@celery_app.task(name="listings.reconcile_search_snapshots")
+def reconcile_search_snapshots():
+    """Reconcile search snapshots (Celery periodic task)."""
+    return asyncio.run(_reconcile_search_snapshots_async())
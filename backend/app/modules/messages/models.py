@@ -3,7 +3,7 @@ Message and conversation models.
 Enhanced with the conversation model from the Prisma schema.
 """
 from sqlalchemy import (
-    Column, String, Boolean, DateTime,
+    Column, String, Boolean, DateTime, Integer,
     Text, Index, ForeignKey, Table
 )
 from sqlalchemy.orm import relationship
@@ -18,6 +18,10 @@ conversation_participants = Table(
     Base.metadata,
     Column('conversation_id', String(40), ForeignKey('conversations.id', ondelete='CASCADE'), primary_key=True),
     Column('user_id', String(40), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    # Read state, maintained incrementally so listing conversations never counts messages
+    Column('last_read_message_id', String(40), nullable=True),
+    Column('last_read_at', DateTime(timezone=True), nullable=True),
+    Column('unread_count', Integer, nullable=False, server_default='0'),
     Index('idx_conv_participants', 'conversation_id', 'user_id')
 )
 
@@ -81,7 +85,7 @@ class Message(BaseModel):
     booking = relationship("Booking", foreign_keys=[booking_id], back_populates="messages", lazy="selectin")
     
     __table_args__ = (
-        Index("idx_message_conversation", "conversation_id", "created_at"),
+        Index("idx_message_conversation", "conversation_id", "created_at", "id"),
         Index("idx_message_sender_receiver", "sender_id", "receiver_id", "is_read"),
         Index("idx_message_booking", "booking_id", "created_at"),
     )
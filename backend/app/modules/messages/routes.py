@@ -56,14 +56,16 @@ async def get_conversations(
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
-    """Get all conversations for the current user with pagination."""
-    conversations = await MessageService.get_user_conversations(db, current_user.id)
+    """Get all conversations for the current user with pagination.
     
-    total = len(conversations)
-    paginated = conversations[skip:skip + limit]
+    Each conversation includes the user's unread count and its latest message.
+    """
+    conversations, total = await MessageService.get_user_conversations(
+        db, current_user.id, skip, limit
+    )
     
     return {
-        "items": paginated,
+        "items": conversations,
         "total": total,
         "skip": skip,
         "limit": limit
@@ -129,19 +131,21 @@ async def get_conversation_messages(
     conversation_id: ID,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides skip)"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ) -> Any:
-    """Get paginated messages for a conversation."""
+    """Get paginated messages for a conversation, newest first."""
     messages, total = await MessageService.get_conversation(
-        db, conversation_id, current_user.id, skip, limit
+        db, conversation_id, current_user.id, skip, limit, cursor
     )
     
     return {
         "items": messages,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": MessageService.next_page_cursor(messages, limit)
     }
 
 
@@ -218,13 +222,16 @@ async def websocket_endpoint(websocket: WebSocket, user_id: ID, token: str = Non
             return
         
         await manager.connect(websocket, user_id)
+        # Host dashboard events (booking updates) are sent to this room
+        await manager.join_room(websocket, f"host_dashboard_{user_id}")
         try:
             while True:
                 data = await websocket.receive_json()
                 
                 # Handle different message types
                 if data.get("type") == "ping":
-                    await websocket.send_json({"type": "pong"})
+                    # Through the socket's queue: only its writer task sends on it
+                    await manager.send_to_socket(websocket, {"type": "pong"})
                 elif data.get("type") == "message":
                     # Forward message to receiver
                     receiver_id = data.get("receiver_id")
@@ -234,6 +241,8 @@ async def websocket_endpoint(websocket: WebSocket, user_id: ID, token: str = Non
                             "message": data.get("message")
                         }, receiver_id)
         except WebSocketDisconnect:
-            manager.disconnect(websocket, user_id)
+            pass
+        finally:
+            await manager.disconnect(websocket, user_id)
     except ImportError:
         await websocket.close(code=1003, reason="WebSocket manager not available")
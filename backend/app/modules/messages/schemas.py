@@ -2,7 +2,7 @@
 Message and conversation schemas, enhanced with the Conversation model.
 """
 from typing import Optional, List
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from datetime import datetime
 from app.core.id import ID
 
@@ -52,8 +52,16 @@ class ConversationResponse(BaseModel):
     listing_id: Optional[ID] = None
     participants: List[ID] = []
     messages: List[MessageResponse] = []
+    unread_count: int = 0
+    last_read_message_id: Optional[ID] = None
     created_at: datetime
     updated_at: datetime
+    
+    @field_validator('participants', mode='before')
+    @classmethod
+    def participant_ids(cls, v):
+        # ORM conversations carry User objects; responses expose their IDs
+        return [getattr(p, 'id', p) for p in v or []]
 
 
 class ConversationListResponse(BaseModel):
@@ -67,9 +75,10 @@ class ConversationListResponse(BaseModel):
 class MessageListResponse(BaseModel):
     """Schema for a paginated list of messages."""
     items: List[MessageResponse]
-    total: int
+    total: Optional[int] = None  # Only counted for the first page
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class ConversationSummaryResponse(BaseModel):
@@ -4,16 +4,35 @@ Enhanced with the Conversation model.
 """
 from typing import List, Optional
 from datetime import datetime
-from sqlalchemy import select, func, or_, and_
+from sqlalchemy import select, func, or_, and_, update, tuple_, literal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, noload, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException, status
 
-from app.modules.messages.models import Message, Conversation
+from app.modules.messages.models import Message, Conversation, conversation_participants
 from app.modules.messages.schemas import MessageCreate, ConversationCreate
 from app.modules.users.models import User
+from app.shared.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_condition
 from app.core.id import ID
 
+# Message history is read newest first; cursors encode (created_at, id)
+HISTORY_SORT = "history"
+
+
+def message_history_cursor(messages: List[Message], limit: int) -> Optional[str]:
+    """Cursor for the history page after ``messages`` (None when the page wasn't full)."""
+    if not messages or len(messages) < limit:
+        return None
+    last = messages[-1]
+    return encode_cursor(HISTORY_SORT, [last.created_at, last.id])
+
+
+def _not_sent_by(user_id: ID):
+    """Messages that count as incoming for ``user_id`` (system messages have no sender)."""
+    return or_(Message.sender_id.is_(None), Message.sender_id != user_id)
+
+
 class MessageService:
     """Service layer for working with messages and conversations."""
     
@@ -26,8 +45,6 @@ class MessageService:
     ) -> Conversation:
         """Get an existing conversation for the given participants or create a new one."""
         # Check if conversation exists
-        from app.modules.messages.models import conversation_participants
-        
         # Find conversation with exact participants
         result = await db.execute(
             select(Conversation)
@@ -106,6 +123,25 @@ class MessageService:
         )
         
         db.add(message)
+        await db.flush()
+        
+        if conversation_id:
+            # One UPDATE keeps every other participant's unread counter current
+            await db.execute(
+                update(conversation_participants)
+                .where(
+                    conversation_participants.c.conversation_id == conversation_id,
+                    conversation_participants.c.user_id != sender_id
+                )
+                .values(unread_count=conversation_participants.c.unread_count + 1)
+            )
+            await db.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .values(updated_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        
         await db.commit()
         await db.refresh(message)
         
@@ -117,13 +153,19 @@ class MessageService:
         conversation_id: ID,
         user_id: ID,
         skip: int = 0,
-        limit: int = 50
-    ) -> tuple[List[Message], int]:
-        """Get a conversation's messages for a participant, with pagination."""
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> tuple[List[Message], Optional[int]]:
+        """Get a conversation's messages for a participant, newest first.
+        
+        Pages by ``cursor`` (from ``message_history_cursor``) when given, which
+        seeks on the (conversation_id, created_at, id) index; ``skip`` is kept
+        for older clients. The total is only counted for the first page and is
+        None for cursor pages.
+        """
         # Verify user is participant
-        from app.modules.messages.models import conversation_participants
         participant_check = await db.execute(
-            select(conversation_participants)
+            select(conversation_participants.c.user_id)
             .where(
                 conversation_participants.c.conversation_id == conversation_id,
                 conversation_participants.c.user_id == user_id
@@ -137,41 +179,103 @@ class MessageService:
         
         query = select(Message).where(Message.conversation_id == conversation_id)
         
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
+        total = None
+        if cursor:
+            try:
+                created_at, message_id = decode_cursor(cursor, HISTORY_SORT, 2)
+            except InvalidCursorError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+            query = query.where(keyset_condition(
+                [Message.created_at, Message.id], [created_at, message_id], descending=True
+            ))
+        else:
+            total_result = await db.execute(
+                select(func.count(Message.id)).where(Message.conversation_id == conversation_id)
+            )
+            total = total_result.scalar()
+            query = query.offset(skip)
         
-        # Get paginated results
-        query = query.options(
-            selectinload(Message.sender),
-            selectinload(Message.receiver)
-        ).offset(skip).limit(limit).order_by(Message.created_at.desc())
+        # Responses only use message columns; don't drag in senders, listings or the
+        # conversation (and, through it, every other message) for each page
+        query = query.options(raiseload("*")).order_by(
+            Message.created_at.desc(), Message.id.desc()
+        ).limit(limit)
         
         result = await db.execute(query)
         messages = result.scalars().all()
         
         return messages, total
     
+    @staticmethod
+    def next_page_cursor(messages: List[Message], limit: int) -> Optional[str]:
+        """Opaque cursor for the history page after ``messages``."""
+        return message_history_cursor(messages, limit)
+    
     @staticmethod
     async def get_user_conversations(
         db: AsyncSession,
-        user_id: ID
-    ) -> List[Conversation]:
-        """Get all conversations for the given user."""
-        from app.modules.messages.models import conversation_participants
+        user_id: ID,
+        skip: int = 0,
+        limit: int = 50
+    ) -> tuple[List[Conversation], int]:
+        """Get a page of the user's conversations, most recently active first.
         
-        query = select(Conversation).join(conversation_participants).where(
+        Each conversation carries the user's ``unread_count`` and
+        ``last_read_message_id`` and, in ``messages``, only its latest message.
+        The page takes a fixed number of queries regardless of its size.
+        """
+        is_participant = and_(
+            conversation_participants.c.conversation_id == Conversation.id,
             conversation_participants.c.user_id == user_id
-        ).options(
-            selectinload(Conversation.participants),
-            selectinload(Conversation.messages)
-        ).order_by(Conversation.updated_at.desc())
+        )
+        total_result = await db.execute(
+            select(func.count()).select_from(conversation_participants)
+            .where(conversation_participants.c.user_id == user_id)
+        )
+        total = total_result.scalar()
         
-        result = await db.execute(query)
-        conversations = result.scalars().unique().all()
+        result = await db.execute(
+            select(
+                Conversation,
+                conversation_participants.c.unread_count,
+                conversation_participants.c.last_read_message_id
+            )
+            .join(conversation_participants, is_participant)
+            .options(
+                selectinload(Conversation.participants).load_only(User.id).raiseload("*"),
+                noload(Conversation.messages),
+                noload(Conversation.automations),
+                noload(Conversation.booking),
+                noload(Conversation.listing)
+            )
+            .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        conversations = []
+        for conversation, unread_count, last_read_message_id in result.all():
+            conversation.unread_count = unread_count
+            conversation.last_read_message_id = last_read_message_id
+            conversations.append(conversation)
+        
+        if conversations:
+            # Latest message per conversation in one pass over idx_message_conversation
+            latest_result = await db.execute(
+                select(Message)
+                .where(Message.conversation_id.in_([c.id for c in conversations]))
+                .options(raiseload("*"))
+                .distinct(Message.conversation_id)
+                .order_by(Message.conversation_id, Message.created_at.desc(), Message.id.desc())
+            )
+            latest = {message.conversation_id: message for message in latest_result.scalars()}
+            for conversation in conversations:
+                message = latest.get(conversation.id)
+                set_committed_value(conversation, "messages", [message] if message else [])
         
-        return conversations
+        return conversations, total
     
     @staticmethod
     async def mark_as_read(
@@ -179,7 +283,13 @@ class MessageService:
         message_id: ID,
         user_id: ID
     ) -> Message:
-        """Mark a single message as read for the given user."""
+        """Mark a single message as read for the given user.
+
+        In a conversation, reading a message also reads the ones before it:
+        the reader's read pointer moves up to it and their unread counter is
+        recounted from the incoming messages after it. Other participants'
+        read state is untouched.
+        """
         result = await db.execute(
             select(Message).where(Message.id == message_id)
         )
@@ -197,10 +307,67 @@ class MessageService:
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized"
             )
+        is_participant = None
+        if message.conversation_id:
+            is_participant = and_(
+                conversation_participants.c.conversation_id == message.conversation_id,
+                conversation_participants.c.user_id == user_id
+            )
+            participant_check = await db.execute(
+                select(conversation_participants.c.user_id).where(is_participant)
+            )
+            if not participant_check.first():
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Not authorized"
+                )
+        
+        if message.sender_id == user_id:
+            return message
+        
+        changed = False
+        if is_participant is not None:
+            message_key = tuple_(Message.created_at, Message.id)
+            read_key = tuple_(literal(message.created_at), literal(message.id))
+            read_pointer = (
+                select(message_key)
+                .where(Message.id == conversation_participants.c.last_read_message_id)
+                .scalar_subquery()
+            )
+            still_unread = (
+                select(func.count())
+                .select_from(Message)
+                .where(
+                    Message.conversation_id == message.conversation_id,
+                    _not_sent_by(user_id),
+                    message_key > read_key
+                )
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                update(conversation_participants)
+                .where(
+                    is_participant,
+                    # Never move the pointer back to an older message
+                    or_(
+                        conversation_participants.c.last_read_message_id.is_(None),
+                        read_pointer < read_key
+                    )
+                )
+                .values(
+                    unread_count=still_unread,
+                    last_read_message_id=message.id,
+                    last_read_at=func.now()
+                )
+            )
+            changed = result.rowcount > 0
         
         if not message.is_read:
             message.is_read = True
             message.read_at = datetime.utcnow()
+            changed = True
+        
+        if changed:
             await db.commit()
             await db.refresh(message)
         
@@ -212,38 +379,48 @@ class MessageService:
         conversation_id: ID,
         user_id: ID,
     ) -> int:
-        """Mark all messages in a conversation as read for the given user."""
-        from app.modules.messages.models import conversation_participants
+        """Mark all messages in a conversation as read for the given user.
         
-        # Verify user is participant
-        participant_check = await db.execute(
-            select(conversation_participants)
+        Moves the participant's read pointer to the latest message and clears
+        their unread counter, then flags the incoming messages in one bulk
+        UPDATE. Returns how many messages were newly marked read.
+        """
+        latest_message_id = (
+            select(Message.id)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(conversation_participants)
             .where(
                 conversation_participants.c.conversation_id == conversation_id,
                 conversation_participants.c.user_id == user_id
             )
+            .values(
+                unread_count=0,
+                last_read_message_id=latest_message_id,
+                last_read_at=func.now()
+            )
         )
-        if not participant_check.first():
+        # No participant row updated: the user isn't in this conversation
+        if result.rowcount == 0:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized"
             )
         
-        # Mark all unread messages as read
         result = await db.execute(
-            select(Message).where(
+            update(Message)
+            .where(
                 Message.conversation_id == conversation_id,
-                Message.receiver_id == user_id,
+                _not_sent_by(user_id),
                 Message.is_read == False
             )
+            .values(is_read=True, read_at=func.now())
+            .execution_options(synchronize_session=False)
         )
-        messages = result.scalars().all()
-        
-        count = 0
-        for message in messages:
-            message.is_read = True
-            message.read_at = datetime.utcnow()
-            count += 1
         
         await db.commit()
-        return count
+        return result.rowcount
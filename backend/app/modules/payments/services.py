@@ -554,13 +554,24 @@ class PaymentService:
         # Update booking (within locked transaction)
         booking.payment_status = PaymentStatus.COMPLETED
         booking.payment_intent_id = payment_intent_id
+        previous_status = booking.status
         booking.status = BookingStatus.CONFIRMED
         booking.paid_at = datetime.utcnow()
         
+        from app.modules.listings.popularity_service import ListingPopularityService
+        from app.modules.listings.availability_service import ListingAvailabilityService
+        await ListingPopularityService.apply_booking_transition(
+            db, booking.listing_id, previous_status, BookingStatus.CONFIRMED.value
+        )
+        
         # Note: Transaction commit is managed by caller (UnitOfWork or route handler)
         # CRITICAL: Flush to check for unique constraint violations before commit
         try:
             await db.flush()  # Flush to get payment ID and check constraints
+            # Rebuilds the bitmap from the flushed booking row
+            await ListingAvailabilityService.apply_booking_transition(
+                db, booking.listing_id, previous_status, BookingStatus.CONFIRMED.value
+            )
             
             # Award loyalty points after successful payment (async, non-blocking)
             # Points will be awarded when booking is completed (after checkout)
@@ -0,0 +1,370 @@
+"""
+Item-item collaborative filtering model.
+
+Trained offline (Celery) from bookings, wishlists, reviews and listing views
+into a versioned directory of ``.npy`` arrays. API workers memory-map the
+latest version once and answer similar-listing and per-user lookups from
+memory without touching the database.
+
+Artifact layout::
+
+    {RECOMMENDATION_MODEL_DIR}/item_cf/
+        LATEST                  # name of the current version directory
+        20261017T120000000000Z/
+            meta.json
+            listing_ids.npy     # sorted listing ids (row index of every array below)
+            neighbors.npy       # (n_listings, top_k) int32 row indices, -1 padded
+            similarities.npy    # (n_listings, top_k) float32 cosine similarities
+            user_ids.npy        # sorted user ids
+            user_indptr.npy     # CSR index pointer into user_items/user_weights
+            user_items.npy      # listing row indices each user interacted with
+            user_weights.npy    # interaction strength per (user, listing)
+"""
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.modules.bookings.models import Booking, BookingStatus
+from app.modules.reviews.models import Review
+from app.modules.wishlist.models import Wishlist
+from app.modules.analytics.models import AnalyticsEvent
+from app.core.id import ID
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MODEL_NAME = "item_cf"
+LATEST_FILE = "LATEST"
+KEEP_VERSIONS = 3
+RELOAD_CHECK_SECONDS = 60
+
+# Implicit-feedback strength per interaction source
+BOOKING_WEIGHT = 3.0
+WISHLIST_WEIGHT = 2.0
+REVIEW_WEIGHT = 2.0  # scaled by overall_rating / 5
+VIEW_WEIGHT = 0.5  # scaled by log(1 + views)
+VIEW_EVENT_NAME = "listing_viewed"
+VIEW_LOOKBACK_DAYS = 90
+
+ARRAY_NAMES = (
+    "listing_ids", "neighbors", "similarities",
+    "user_ids", "user_indptr", "user_items", "user_weights",
+)
+
+
+async def fetch_interactions(db: AsyncSession) -> Tuple[List[str], List[str], List[float]]:
+    """Collect (user_id, listing_id, weight) implicit-feedback triples from all sources."""
+    user_ids: List[str] = []
+    listing_ids: List[str] = []
+    weights: List[float] = []
+
+    def add(rows: Iterable, weight_fn) -> None:
+        for user_id, listing_id, value in rows:
+            if user_id and listing_id:
+                user_ids.append(str(user_id))
+                listing_ids.append(str(listing_id))
+                weights.append(weight_fn(value))
+
+    # Confirmed/completed bookings
+    bookings = await db.execute(
+        select(Booking.guest_id, Booking.listing_id, func.count(Booking.id))
+        .where(Booking.status.in_([BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value]))
+        .group_by(Booking.guest_id, Booking.listing_id)
+    )
+    add(bookings.all(), lambda count: BOOKING_WEIGHT)
+
+    # Wishlisted listings
+    wishlists = await db.execute(
+        select(Wishlist.user_id, Wishlist.listing_id, func.count(Wishlist.id))
+        .group_by(Wishlist.user_id, Wishlist.listing_id)
+    )
+    add(wishlists.all(), lambda count: WISHLIST_WEIGHT)
+
+    # Reviews, weighted by rating
+    reviews = await db.execute(
+        select(Review.guest_id, Review.listing_id, func.max(Review.overall_rating))
+        .group_by(Review.guest_id, Review.listing_id)
+    )
+    add(reviews.all(), lambda rating: REVIEW_WEIGHT * float(rating or 0) / 5.0)
+
+    # Recent listing views
+    viewed_listing = AnalyticsEvent.payload["listing_id"].astext
+    views = await db.execute(
+        select(AnalyticsEvent.user_id, viewed_listing, func.count(AnalyticsEvent.id))
+        .where(
+            and_(
+                AnalyticsEvent.event_name == VIEW_EVENT_NAME,
+                AnalyticsEvent.user_id.isnot(None),
+                AnalyticsEvent.recorded_at >= datetime.now(timezone.utc) - timedelta(days=VIEW_LOOKBACK_DAYS)
+            )
+        )
+        .group_by(AnalyticsEvent.user_id, viewed_listing)
+    )
+    add(views.all(), lambda count: VIEW_WEIGHT * float(np.log1p(count)))
+
+    return user_ids, listing_ids, weights
+
+
+def build_item_cf_arrays(
+    user_ids: Sequence[str],
+    listing_ids: Sequence[str],
+    weights: Sequence[float],
+    top_k: int
+) -> Dict[str, np.ndarray]:
+    """Build the model arrays from interaction triples.
+
+    Item vectors are the columns of the user x listing interaction matrix
+    (duplicate triples are summed); similarity is cosine, keeping the
+    ``top_k`` most similar listings per listing.
+    """
+    from scipy import sparse  # training-only dependency
+
+    users, user_index = np.unique(np.asarray(user_ids, dtype=str), return_inverse=True)
+    listings, listing_index = np.unique(np.asarray(listing_ids, dtype=str), return_inverse=True)
+
+    interactions = sparse.csr_matrix(
+        (np.asarray(weights, dtype=np.float32), (user_index, listing_index)),
+        shape=(len(users), len(listings))
+    )
+    interactions.sum_duplicates()
+
+    # Cosine similarity between listing columns
+    norms = np.sqrt(np.asarray(interactions.multiply(interactions).sum(axis=0)).ravel())
+    norms[norms == 0] = 1.0
+    normalized = (interactions @ sparse.diags(1.0 / norms)).tocsc()
+    similarity = (normalized.T @ normalized).tocsr()
+    similarity = (similarity - sparse.diags(similarity.diagonal())).tocsr()
+    similarity.eliminate_zeros()
+
+    neighbors = np.full((len(listings), top_k), -1, dtype=np.int32)
+    similarities = np.zeros((len(listings), top_k), dtype=np.float32)
+    for row in range(len(listings)):
+        start, end = similarity.indptr[row], similarity.indptr[row + 1]
+        if start == end:
+            continue
+        cols = similarity.indices[start:end]
+        vals = similarity.data[start:end]
+        if len(vals) > top_k:
+            keep = np.argpartition(-vals, top_k - 1)[:top_k]
+            cols, vals = cols[keep], vals[keep]
+        order = np.argsort(-vals, kind="stable")
+        neighbors[row, :len(order)] = cols[order]
+        similarities[row, :len(order)] = vals[order]
+
+    return {
+        "listing_ids": listings,
+        "neighbors": neighbors,
+        "similarities": similarities,
+        "user_ids": users,
+        "user_indptr": interactions.indptr.astype(np.int64),
+        "user_items": interactions.indices.astype(np.int32),
+        "user_weights": interactions.data.astype(np.float32),
+    }
+
+
+def _model_root(model_dir: Optional[str] = None) -> Path:
+    return Path(model_dir or settings.recommendation_model_dir) / MODEL_NAME
+
+
+def save_item_cf_model(
+    arrays: Dict[str, np.ndarray],
+    meta: Dict[str, Any],
+    model_dir: Optional[str] = None
+) -> Path:
+    """Write a new model version and atomically point LATEST at it."""
+    root = _model_root(model_dir)
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    staging = root / f".{version}.tmp"
+    staging.mkdir(parents=True)
+
+    for name in ARRAY_NAMES:
+        np.save(staging / f"{name}.npy", arrays[name])
+    (staging / "meta.json").write_text(json.dumps({**meta, "version": version}))
+
+    target = root / version
+    staging.rename(target)
+
+    latest_tmp = root / f".{LATEST_FILE}.tmp"
+    latest_tmp.write_text(version)
+    os.replace(latest_tmp, root / LATEST_FILE)
+
+    # Old versions stay readable for workers that still have them mapped
+    versions = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(old, ignore_errors=True)
+
+    return target
+
+
+class ItemCFModel:
+    """Read-only, memory-mapped item-item model."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta = json.loads((path / "meta.json").read_text())
+        self.version = self.meta["version"]
+        for name in ARRAY_NAMES:
+            setattr(self, name, np.load(path / f"{name}.npy", mmap_mode="r"))
+
+    @staticmethod
+    def _position(sorted_ids: np.ndarray, key: str) -> int:
+        """Row of ``key`` in a sorted id array, or -1."""
+        pos = int(np.searchsorted(sorted_ids, key))
+        if pos < len(sorted_ids) and sorted_ids[pos] == key:
+            return pos
+        return -1
+
+    def has_user(self, user_id: ID) -> bool:
+        """Whether the user had any interactions at training time."""
+        return self._position(self.user_ids, str(user_id)) >= 0
+
+    def similar(self, listing_id: ID, limit: int) -> List[Tuple[str, float]]:
+        """Most similar listings to ``listing_id`` as (listing_id, similarity) pairs."""
+        row = self._position(self.listing_ids, str(listing_id))
+        if row < 0:
+            return []
+        neighbors = self.neighbors[row]
+        similarities = self.similarities[row]
+        return [
+            (str(self.listing_ids[n]), float(s))
+            for n, s in zip(neighbors[:limit], similarities[:limit])
+            if n >= 0
+        ]
+
+    def _user_item_scores(self, user_id: ID) -> Tuple[np.ndarray, np.ndarray]:
+        """Aggregate neighbor similarity over the user's history.
+
+        Returns sorted listing rows (excluding ones the user already
+        interacted with) and their scores.
+        """
+        user = self._position(self.user_ids, str(user_id))
+        if user < 0:
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+
+        start, end = self.user_indptr[user], self.user_indptr[user + 1]
+        items = np.asarray(self.user_items[start:end])
+        weights = np.asarray(self.user_weights[start:end])
+
+        neighbors = self.neighbors[items]
+        scores = self.similarities[items] * weights[:, None]
+        mask = (neighbors >= 0) & ~np.isin(neighbors, items)
+
+        rows, inverse = np.unique(neighbors[mask], return_inverse=True)
+        return rows, np.bincount(inverse, weights=scores[mask])
+
+    def recommend(
+        self,
+        user_id: ID,
+        limit: int,
+        exclude: Optional[Iterable[ID]] = None
+    ) -> List[Tuple[str, float]]:
+        """Top listings for a user as (listing_id, score) pairs."""
+        rows, scores = self._user_item_scores(user_id)
+        if exclude:
+            excluded = [self._position(self.listing_ids, str(listing_id)) for listing_id in exclude]
+            keep = ~np.isin(rows, excluded)
+            rows, scores = rows[keep], scores[keep]
+
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [(str(self.listing_ids[rows[i]]), float(scores[i])) for i in order]
+
+    def score(self, user_id: ID, listing_ids: Sequence[ID]) -> np.ndarray:
+        """Collaborative scores (0-1, relative to the user's best match) for given listings."""
+        result = np.zeros(len(listing_ids))
+        rows, scores = self._user_item_scores(user_id)
+        if not len(rows):
+            return result
+
+        wanted = np.array([self._position(self.listing_ids, str(listing_id)) for listing_id in listing_ids])
+        pos = np.minimum(np.searchsorted(rows, wanted), len(rows) - 1)
+        found = (wanted >= 0) & (rows[pos] == wanted)
+        result[found] = scores[pos[found]]
+        best = scores.max()
+        # Only zero-weight interactions: nothing to rank by
+        if best <= 0:
+            return np.zeros(len(listing_ids))
+        return result / best
+
+
+def load_item_cf_model(model_dir: Optional[str] = None) -> Optional[ItemCFModel]:
+    """Load the latest published model version (None if none was trained yet)."""
+    root = _model_root(model_dir)
+    try:
+        version = (root / LATEST_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+    return ItemCFModel(root / version)
+
+
+_model: Optional[ItemCFModel] = None
+_checked_at = 0.0
+
+
+def get_item_cf_model() -> Optional[ItemCFModel]:
+    """Return this worker's model, loading it once and picking up new versions.
+
+    LATEST is re-checked at most every RELOAD_CHECK_SECONDS; a failed load
+    keeps serving the previous version.
+    """
+    global _model, _checked_at
+    now = time.monotonic()
+    if now - _checked_at < RELOAD_CHECK_SECONDS:
+        return _model
+    _checked_at = now
+
+    root = _model_root()
+    try:
+        version = (root / LATEST_FILE).read_text().strip()
+    except FileNotFoundError:
+        return _model
+
+    if _model is None or _model.version != version:
+        try:
+            _model = ItemCFModel(root / version)
+            logger.info(f"Loaded item CF model {version} ({len(_model.listing_ids)} listings)")
+        except Exception as e:
+            logger.warning(f"Failed to load item CF model {version}: {e}")
+    return _model
+
+
+async def train_item_cf_model(
+    db: AsyncSession,
+    top_k: Optional[int] = None,
+    model_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """Train and publish a new item-item model from current interaction data."""
+    top_k = top_k or settings.recommendation_model_top_k
+    started = time.monotonic()
+
+    user_ids, listing_ids, weights = await fetch_interactions(db)
+    if not user_ids:
+        logger.info("Item CF training skipped: no interactions")
+        return {"status": "skipped", "training_samples": 0}
+
+    arrays = build_item_cf_arrays(user_ids, listing_ids, weights, top_k)
+    meta = {
+        "algorithm": MODEL_NAME,
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "training_samples": len(user_ids),
+        "users": int(len(arrays["user_ids"])),
+        "listings": int(len(arrays["listing_ids"])),
+        "top_k": top_k,
+    }
+    path = save_item_cf_model(arrays, meta, model_dir)
+    meta.update({
+        "status": "success",
+        "version": path.name,
+        "duration_seconds": round(time.monotonic() - started, 3),
+    })
+    logger.info(f"Trained item CF model {path.name}: {meta}")
+    return meta
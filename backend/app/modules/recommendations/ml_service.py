@@ -11,14 +11,16 @@ from decimal import Decimal
 import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, case, text
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased
 from fastapi import HTTPException, status
 
 from app.modules.listings.models import Listing, ListingStatus
+from app.modules.listings.load_profiles import CARD, listing_load_options
 from app.modules.bookings.models import Booking, BookingStatus
 from app.modules.reviews.models import Review
 from app.modules.wishlist.models import Wishlist
 from app.modules.analytics.models import AnalyticsEvent
+from app.modules.recommendations.cf_model import ItemCFModel, get_item_cf_model
 from app.core.id import ID
 from app.core.config import get_settings
 
@@ -35,7 +37,6 @@ class MLRecommendationEngine:
     def __init__(self):
         self.model_cache = {}
         self.feature_cache = {}
-        self.last_training_time = None
     
     async def get_ml_recommendations(
         self,
@@ -60,6 +61,13 @@ class MLRecommendationEngine:
         """
         exclude_listing_ids = exclude_listing_ids or []
         
+        # Collaborative recommendations straight from the offline item-item model
+        model = self._item_cf_model()
+        if algorithm == "collaborative" and model is not None and model.has_user(user_id):
+            return await self._model_recommendations(
+                db, model, user_id, limit, exclude_listing_ids
+            )
+        
         # Get user features
         user_features = await self._get_user_features(db, user_id)
         
@@ -197,8 +205,8 @@ class MLRecommendationEngine:
         
         # Get review behavior
         reviews_result = await db.execute(
-            select(func.avg(Review.rating), func.count(Review.id))
-            .where(Review.user_id == user_id)
+            select(func.avg(Review.overall_rating), func.count(Review.id))
+            .where(Review.guest_id == user_id)
         )
         review_stats = reviews_result.first()
         
@@ -239,6 +247,50 @@ class MLRecommendationEngine:
         except Exception as e:
             logger.warning(f"Failed to trigger reindex for listing {listing_id}: {e}")
     
+    def _item_cf_model(self) -> Optional[ItemCFModel]:
+        """The worker's memory-mapped item-item model (None until one is trained)."""
+        model = get_item_cf_model()
+        if model is not None:
+            self.model_cache["item_cf"] = model
+        return model
+    
+    async def _model_recommendations(
+        self,
+        db: AsyncSession,
+        model: ItemCFModel,
+        user_id: ID,
+        limit: int,
+        exclude_ids: List[ID]
+    ) -> List[Dict[str, Any]]:
+        """Recommendations ranked by the item-item model (one listing fetch)."""
+        # Over-fetch: some recommended listings may since have been deactivated
+        ranked = model.recommend(user_id, limit * 3, exclude=exclude_ids)
+        if not ranked:
+            return []
+        
+        result = await db.execute(
+            select(Listing).where(
+                and_(
+                    Listing.id.in_([listing_id for listing_id, _ in ranked]),
+                    Listing.status == ListingStatus.ACTIVE.value
+                )
+            ).options(
+                *listing_load_options(CARD)
+            )
+        )
+        listings = {listing.id: listing for listing in result.scalars().all()}
+        top_score = ranked[0][1] or 1.0
+        
+        return [
+            {
+                "listing": listings[listing_id],
+                "score": score / top_score,
+                "algorithm": "collaborative"
+            }
+            for listing_id, score in ranked
+            if listing_id in listings
+        ][:limit]
+    
     async def _get_candidate_listings(
         self,
         db: AsyncSession,
@@ -270,10 +322,7 @@ class MLRecommendationEngine:
             conditions.append(Listing.id.notin_(booked_ids))
         
         query = select(Listing).where(and_(*conditions)).options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.amenities)
+            *listing_load_options(CARD)
         ).order_by(
             Listing.rating.desc(),
             Listing.review_count.desc()
@@ -291,45 +340,28 @@ class MLRecommendationEngine:
     ) -> List[float]:
         """
         Hybrid scoring: Combines collaborative, content-based, and popularity scores.
+        
+        Signals are fetched in bulk (one collaborative query for the whole
+        candidate set) and scored as NumPy arrays, so cost stays flat as the
+        candidate count grows.
         """
-        scores = []
+        features = self._candidate_feature_arrays(candidates)
         
-        for listing in candidates:
-            # Collaborative score (0-1)
-            collab_score = await self._compute_collaborative_score(
-                db, user_id, listing.id
-            )
-            
-            # Content-based score (0-1)
-            content_score = await self._compute_content_score(
-                user_features, listing
-            )
-            
-            # Popularity score (0-1)
-            popularity_score = await self._compute_popularity_score(listing)
-            
-            # Location match score (0-1)
-            location_score = await self._compute_location_score(
-                user_features, listing
-            )
-            
-            # Price match score (0-1)
-            price_score = await self._compute_price_score(
-                user_features, listing
-            )
-            
-            # Weighted combination
-            hybrid_score = (
-                collab_score * 0.3 +
-                content_score * 0.25 +
-                popularity_score * 0.2 +
-                location_score * 0.15 +
-                price_score * 0.1
-            )
-            
-            scores.append(hybrid_score)
+        # Collaborative score (0-1)
+        collab_scores = await self._collaborative_scores(
+            db, user_id, [listing.id for listing in candidates]
+        )
         
-        return scores
+        # Weighted combination
+        hybrid_scores = (
+            collab_scores * 0.3 +
+            self._content_scores(user_features, features) * 0.25 +
+            self._popularity_scores(features) * 0.2 +
+            self._location_scores(user_features, features) * 0.15 +
+            self._price_scores(user_features, features) * 0.1
+        )
+        
+        return hybrid_scores.tolist()
     
     async def _collaborative_scoring(
         self,
@@ -339,15 +371,10 @@ class MLRecommendationEngine:
         candidates: List[Listing]
     ) -> List[float]:
         """Collaborative filtering score using user-item matrix."""
-        scores = []
-        
-        for listing in candidates:
-            score = await self._compute_collaborative_score(
-                db, user_id, listing.id
-            )
-            scores.append(score)
-        
-        return scores
+        scores = await self._collaborative_scores(
+            db, user_id, [listing.id for listing in candidates]
+        )
+        return scores.tolist()
     
     async def _content_scoring(
         self,
@@ -357,27 +384,14 @@ class MLRecommendationEngine:
         candidates: List[Listing]
     ) -> List[float]:
         """Content-based scoring."""
-        scores = []
-        
-        for listing in candidates:
-            content_score = await self._compute_content_score(
-                user_features, listing
-            )
-            location_score = await self._compute_location_score(
-                user_features, listing
-            )
-            price_score = await self._compute_price_score(
-                user_features, listing
-            )
-            
-            score = (
-                content_score * 0.4 +
-                location_score * 0.35 +
-                price_score * 0.25
-            )
-            scores.append(score)
+        features = self._candidate_feature_arrays(candidates)
         
-        return scores
+        scores = (
+            self._content_scores(user_features, features) * 0.4 +
+            self._location_scores(user_features, features) * 0.35 +
+            self._price_scores(user_features, features) * 0.25
+        )
+        return scores.tolist()
     
     async def _neural_scoring(
         self,
@@ -393,82 +407,172 @@ class MLRecommendationEngine:
         # For now, use enhanced hybrid scoring as approximation
         return await self._hybrid_scoring(db, user_id, user_features, candidates)
     
-    async def _compute_collaborative_score(
+    @staticmethod
+    def _candidate_feature_arrays(candidates: List[Listing]) -> Dict[str, np.ndarray]:
+        """Column-wise feature arrays for a candidate set (one entry per listing)."""
+        return {
+            "listing_type": np.array([listing.listing_type for listing in candidates], dtype=object),
+            "city": np.array([listing.city for listing in candidates], dtype=object),
+            "country": np.array([listing.country for listing in candidates], dtype=object),
+            "rating": np.array([float(listing.rating or 0) for listing in candidates], dtype=np.float64),
+            "review_count": np.array([listing.review_count or 0 for listing in candidates], dtype=np.float64),
+            "base_price": np.array([float(listing.base_price) for listing in candidates], dtype=np.float64),
+        }
+    
+    async def _collaborative_scores(
         self,
         db: AsyncSession,
         user_id: ID,
-        listing_id: ID
-    ) -> float:
-        """Compute collaborative filtering score."""
-        # Find users who booked this listing
-        similar_users_result = await db.execute(
-            select(Booking.guest_id)
+        listing_ids: List[ID]
+    ) -> np.ndarray:
+        """
+        Compute collaborative filtering scores for many listings.
+        
+        Served from the offline item-item model when it knows the user (no
+        database access). Otherwise one query: for each listing, the other
+        guests who booked it and how many bookings those guests made in
+        total, normalized to 0-1 (saturating at 10).
+        """
+        if not listing_ids:
+            return np.zeros(0, dtype=np.float64)
+        
+        model = self._item_cf_model()
+        if model is not None and model.has_user(user_id):
+            return model.score(user_id, listing_ids)
+        
+        counted_statuses = [BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value]
+        
+        # Users (other than this one) who booked each candidate
+        co_bookers = (
+            select(Booking.listing_id, Booking.guest_id)
             .where(
                 and_(
-                    Booking.listing_id == listing_id,
+                    Booking.listing_id.in_(listing_ids),
                     Booking.guest_id != user_id,
-                    Booking.status.in_([BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value])
+                    Booking.status.in_(counted_statuses)
                 )
             )
             .distinct()
-            .limit(100)
+            .subquery()
         )
-        similar_users = [row[0] for row in similar_users_result.all()]
-        
-        if not similar_users:
-            return 0.0
         
-        # Find common bookings between user and similar users
-        common_bookings_result = await db.execute(
-            select(func.count(Booking.id))
+        # Total bookings made by each of those users (an index probe per co-booker,
+        # rather than aggregating the whole bookings table)
+        guest_bookings = aliased(Booking)
+        guest_booking_count = (
+            select(func.count(guest_bookings.id))
             .where(
                 and_(
-                    Booking.guest_id.in_(similar_users),
-                    Booking.guest_id != user_id,
-                    Booking.status.in_([BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value])
+                    guest_bookings.guest_id == co_bookers.c.guest_id,
+                    guest_bookings.status.in_(counted_statuses)
                 )
             )
+            .scalar_subquery()
         )
-        common_count = common_bookings_result.scalar() or 0
+        per_guest = select(
+            co_bookers.c.listing_id,
+            guest_booking_count.label("booking_count")
+        ).subquery()
+        
+        result = await db.execute(
+            select(per_guest.c.listing_id, func.sum(per_guest.c.booking_count))
+            .group_by(per_guest.c.listing_id)
+        )
+        common_counts = {row[0]: float(row[1] or 0) for row in result.all()}
+        
+        counts = np.array([common_counts.get(listing_id, 0.0) for listing_id in listing_ids], dtype=np.float64)
         
         # Normalize score (0-1)
-        score = min(1.0, common_count / 10.0)
-        return score
+        return np.minimum(1.0, counts / 10.0)
     
-    async def _compute_content_score(
-        self,
-        user_features: Dict[str, Any],
-        listing: Listing
-    ) -> float:
-        """Compute content-based similarity score."""
-        score = 0.0
-        
+    @staticmethod
+    def _content_scores(user_features: Dict[str, Any], features: Dict[str, np.ndarray]) -> np.ndarray:
+        """Content-based similarity scores."""
         # Type match
         preferred_types = [pt["type"] for pt in user_features.get("preferred_types", [])]
-        if listing.listing_type in preferred_types:
-            score += 0.4
-        
-        # Amenities match (simplified)
-        score += 0.2  # Base score
+        type_match = np.isin(features["listing_type"], preferred_types)
         
+        # Amenities match (simplified): 0.2 base score
         # Rating match
-        if listing.rating >= 4.5:
-            score += 0.4
-        elif listing.rating >= 4.0:
-            score += 0.2
+        rating = features["rating"]
+        rating_boost = np.select([rating >= 4.5, rating >= 4.0], [0.4, 0.2], default=0.0)
         
-        return min(1.0, score)
+        return np.minimum(1.0, 0.2 + type_match * 0.4 + rating_boost)
     
-    async def _compute_popularity_score(self, listing: Listing) -> float:
-        """Compute popularity score."""
+    @staticmethod
+    def _popularity_scores(features: Dict[str, np.ndarray]) -> np.ndarray:
+        """Popularity scores."""
         # Normalize rating (0-1)
-        rating_score = float(listing.rating) / 5.0
+        rating_score = features["rating"] / 5.0
         
         # Normalize review count (log scale)
-        import math
-        review_score = min(1.0, math.log10(listing.review_count + 1) / 3.0)
+        review_score = np.minimum(1.0, np.log10(features["review_count"] + 1) / 3.0)
         
-        return (rating_score * 0.6 + review_score * 0.4)
+        return rating_score * 0.6 + review_score * 0.4
+    
+    @staticmethod
+    def _location_scores(user_features: Dict[str, Any], features: Dict[str, np.ndarray]) -> np.ndarray:
+        """Location match scores."""
+        preferred_locations = user_features.get("preferred_locations", [])
+        size = len(features["city"])
+        
+        if not preferred_locations:
+            return np.full(size, 0.5)  # Neutral score if no preference
+        
+        # The first preferred location that matches (by city, else country) wins,
+        # so apply them in reverse and let earlier ones overwrite later ones
+        scores = np.full(size, 0.3)  # Different location
+        for loc in reversed(preferred_locations):
+            scores = np.where(
+                features["city"] == loc["city"],
+                1.0,
+                np.where(features["country"] == loc["country"], 0.7, scores)
+            )
+        return scores
+    
+    @staticmethod
+    def _price_scores(user_features: Dict[str, Any], features: Dict[str, np.ndarray]) -> np.ndarray:
+        """Price match scores."""
+        avg_price = user_features.get("avg_price", 0.0)
+        min_price = user_features.get("min_price", 0.0)
+        max_price = user_features.get("max_price", 0.0)
+        
+        price = features["base_price"]
+        
+        if avg_price == 0:
+            return np.full(len(price), 0.5)  # Neutral if no price history
+        
+        return np.select(
+            [
+                (price >= min_price) & (price <= max_price),  # Within user's range
+                (price >= avg_price * 0.7) & (price <= avg_price * 1.3),
+                (price >= avg_price * 0.5) & (price <= avg_price * 1.5),
+            ],
+            [1.0, 0.8, 0.5],
+            default=0.2
+        )
+    
+    async def _compute_collaborative_score(
+        self,
+        db: AsyncSession,
+        user_id: ID,
+        listing_id: ID
+    ) -> float:
+        """Compute collaborative filtering score."""
+        scores = await self._collaborative_scores(db, user_id, [listing_id])
+        return float(scores[0])
+    
+    async def _compute_content_score(
+        self,
+        user_features: Dict[str, Any],
+        listing: Listing
+    ) -> float:
+        """Compute content-based similarity score."""
+        return float(self._content_scores(user_features, self._candidate_feature_arrays([listing]))[0])
+    
+    async def _compute_popularity_score(self, listing: Listing) -> float:
+        """Compute popularity score."""
+        return float(self._popularity_scores(self._candidate_feature_arrays([listing]))[0])
     
     async def _compute_location_score(
         self,
@@ -476,18 +580,7 @@ class MLRecommendationEngine:
         listing: Listing
     ) -> float:
         """Compute location match score."""
-        preferred_locations = user_features.get("preferred_locations", [])
-        
-        if not preferred_locations:
-            return 0.5  # Neutral score if no preference
-        
-        for loc in preferred_locations:
-            if listing.city == loc["city"]:
-                return 1.0
-            elif listing.country == loc["country"]:
-                return 0.7
-        
-        return 0.3  # Different location
+        return float(self._location_scores(user_features, self._candidate_feature_arrays([listing]))[0])
     
     async def _compute_price_score(
         self,
@@ -495,24 +588,7 @@ class MLRecommendationEngine:
         listing: Listing
     ) -> float:
         """Compute price match score."""
-        avg_price = user_features.get("avg_price", 0.0)
-        min_price = user_features.get("min_price", 0.0)
-        max_price = user_features.get("max_price", 0.0)
-        
-        if avg_price == 0:
-            return 0.5  # Neutral if no price history
-        
-        listing_price = float(listing.base_price)
-        
-        # Check if price is within user's range
-        if min_price <= listing_price <= max_price:
-            return 1.0
-        elif avg_price * 0.7 <= listing_price <= avg_price * 1.3:
-            return 0.8
-        elif avg_price * 0.5 <= listing_price <= avg_price * 1.5:
-            return 0.5
-        else:
-            return 0.2
+        return float(self._price_scores(user_features, self._candidate_feature_arrays([listing]))[0])
     
     async def train_model(
         self,
@@ -520,26 +596,21 @@ class MLRecommendationEngine:
         algorithm: str = "hybrid"
     ) -> Dict[str, Any]:
         """
-        Train recommendation model (placeholder for actual ML training).
-        In production, this would train actual ML models.
+        Queue training of the item-item collaborative filtering model.
+        
+        Training runs on a Celery worker (also scheduled nightly) and publishes
+        a new artifact version; API workers pick it up on their next reload check.
         """
-        # Get training data
-        bookings_result = await db.execute(
-            select(func.count(Booking.id))
-            .where(
-                Booking.status.in_([BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value])
-            )
-        )
-        booking_count = bookings_result.scalar() or 0
+        from app.modules.recommendations.tasks import train_item_cf_model
         
-        # Update cache timestamp
-        self.last_training_time = datetime.now(timezone.utc)
+        task = train_item_cf_model.delay()
         
+        model = self._item_cf_model()
         return {
             "algorithm": algorithm,
-            "training_samples": booking_count,
-            "trained_at": self.last_training_time.isoformat(),
-            "status": "success"
+            "task_id": task.id,
+            "current_version": model.version if model else None,
+            "status": "queued"
         }
     
     async def get_recommendation_explanation(
@@ -123,8 +123,8 @@ async def train_recommendation_model(
     db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
-    Train recommendation model (admin only).
-    In production, this would be a scheduled task.
+    Queue training of the item-item recommendation model (admin only).
+    Also runs nightly via Celery beat; workers load the new version automatically.
     """
     result = await ml_engine.train_model(db=db, algorithm=algorithm)
     return result
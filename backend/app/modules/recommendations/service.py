@@ -7,13 +7,14 @@ from typing import List, Optional, Dict, Any
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, or_, case
-from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
 from app.modules.listings.models import Listing, ListingStatus
+from app.modules.listings.load_profiles import CARD, listing_load_options
 from app.modules.bookings.models import Booking, BookingStatus
 from app.modules.reviews.models import Review
 from app.modules.wishlist.models import Wishlist
+from app.modules.recommendations.cf_model import get_item_cf_model
 from app.core.id import ID
 
 
@@ -161,10 +162,7 @@ class RecommendationService:
                 Listing.rating >= 4.0  # Only recommend highly-rated listings
             )
         ).options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.amenities)
+            *listing_load_options(CARD)
         ).order_by(
             Listing.rating.desc(),
             Listing.review_count.desc()
@@ -242,10 +240,7 @@ class RecommendationService:
             conditions.append(Listing.base_price.between(price_min, price_max))
         
         query = select(Listing).where(and_(*conditions)).options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.amenities)
+            *listing_load_options(CARD)
         ).order_by(
             Listing.rating.desc(),
             Listing.review_count.desc()
@@ -286,10 +281,7 @@ class RecommendationService:
         query = select(Listing).outerjoin(
             booking_counts, Listing.id == booking_counts.c.listing_id
         ).where(and_(*conditions)).options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.amenities)
+            *listing_load_options(CARD)
         ).order_by(
             (Listing.rating * func.coalesce(func.log(booking_counts.c.booking_count + 1), 0)).desc(),
             Listing.review_count.desc()
@@ -306,7 +298,8 @@ class RecommendationService:
     ) -> List[Listing]:
         """
         Get listings similar to a given listing.
-        Based on location, type, price range, and amenities.
+        Uses the offline item-item model (co-booked/wishlisted/viewed listings)
+        when available, topped up by location, type and price range.
         """
         # Validate inputs
         if limit <= 0 or limit > 50:
@@ -333,12 +326,35 @@ class RecommendationService:
                 detail="Listing not found"
             )
         
+        listing_options = listing_load_options(CARD)
+        
+        # Listings other guests engaged with alongside this one (in-memory model lookup)
+        similar: List[Listing] = []
+        model = get_item_cf_model()
+        if model is not None:
+            similar_ids = [similar_id for similar_id, _ in model.similar(listing_id, limit * 2)]
+            if similar_ids:
+                model_result = await db.execute(
+                    select(Listing).where(
+                        and_(
+                            Listing.id.in_(similar_ids),
+                            Listing.status == ListingStatus.ACTIVE.value
+                        )
+                    ).options(*listing_options)
+                )
+                by_id = {found.id: found for found in model_result.scalars().all()}
+                similar = [by_id[similar_id] for similar_id in similar_ids if similar_id in by_id][:limit]
+                if len(similar) >= limit:
+                    return similar
+        
         # Find similar listings
         conditions = [
             Listing.id != listing_id,
             Listing.status == ListingStatus.ACTIVE.value,
             Listing.rating >= 4.0
         ]
+        if similar:
+            conditions.append(Listing.id.notin_([found.id for found in similar]))
         
         # Same city or country
         if listing.city:
@@ -358,18 +374,13 @@ class RecommendationService:
         price_max = listing.base_price * Decimal("1.4")
         conditions.append(Listing.base_price.between(price_min, price_max))
         
-        query = select(Listing).where(and_(*conditions)).options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.amenities)
-        ).order_by(
+        query = select(Listing).where(and_(*conditions)).options(*listing_options).order_by(
             Listing.rating.desc(),
             Listing.review_count.desc()
-        ).limit(limit)
+        ).limit(limit - len(similar))
         
         result = await db.execute(query)
-        return list(result.scalars().all())
+        return similar + list(result.scalars().all())
     
     @staticmethod
     async def get_trending_listings(
@@ -425,10 +436,7 @@ class RecommendationService:
                 Listing.status == ListingStatus.ACTIVE.value
             )
         ).options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.amenities)
+            *listing_load_options(CARD)
         ).order_by(Listing.rating.desc()).limit(limit)
         
         result = await db.execute(query)
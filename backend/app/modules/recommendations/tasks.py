@@ -0,0 +1,23 @@
+"""
+Recommendation background tasks.
+"""
+import asyncio
+import logging
+
+from app.core.celery_app import celery_app
+from app.core.database import AsyncSessionLocal
+from app.modules.recommendations.cf_model import train_item_cf_model as train_item_cf
+
+logger = logging.getLogger(__name__)
+
+
+async def _train_item_cf_model_async() -> dict:
+    """Train and publish a new item-item collaborative filtering model."""
+    async with AsyncSessionLocal() as db:
+        return await train_item_cf(db)
+
+
+@celery_app.task(name="recommendations.train_item_cf")
+def train_item_cf_model():
+    """Train the item-item recommendation model (Celery task, also run nightly)."""
+    return asyncio.run(_train_item_cf_model_async())
@@ -26,7 +26,9 @@ class ReviewService:
         """Create a new review for a listing and optional booking."""
         # Check if listing exists
         result = await db.execute(
-            select(Listing).where(Listing.id == review_data.listing_id)
+            select(Listing)
+            .where(Listing.id == review_data.listing_id)
+            .options(selectinload(Listing.host_profile).raiseload("*"))
         )
         listing = result.scalar_one_or_none()
         
@@ -128,7 +130,18 @@ class ReviewService:
         if listing:
             listing.rating = avg_rating or 0
             listing.review_count = count or 0
+            await db.flush()
+            
+            from app.modules.listings.popularity_service import ListingPopularityService
+            from app.modules.listings.snapshot_service import SearchSnapshotService
+            await ListingPopularityService.refresh_rating(db, listing_id)
+            await SearchSnapshotService.enqueue(db, listing_id)
             await db.commit()
+            
+            # Rating sorts and filters read the listing row directly
+            from app.modules.search.result_cache import search_result_cache, search_scope
+            scope = search_scope(listing)
+            await search_result_cache.invalidate_listing(listing_id, scope, scope)
     
     @staticmethod
     async def create_host_response(
@@ -0,0 +1,259 @@
+"""
+Search result cache with tag-based invalidation.
+
+Search responses are cached in Redis under a key built from the normalized
+request parameters, behind a small per-process L1 with a few seconds' TTL.
+
+Every entry is added to Redis sets ("tags") that say which listing changes can
+affect it:
+
+- one scope tag for its location/type filter: ``city:<filter>`` (lower-cased,
+  whitespace collapsed), else ``country:<country>``, else
+  ``type:<listing_type>``, else ``all``;
+- ``listing:<id>`` for every listing on the page.
+
+A changed listing invalidates the scope tags it matches before and after the
+change (its whole city name and each word of it, its country, its type and
+``all``) plus its own listing tag: a handful of tags in a couple of pipelined
+round trips, no keyspace scan. The city filter is a substring match, so a
+filter naming only part of a word ("par" for Paris) is not invalidated by
+listings newly matching it; those show up within ``SEARCH_CACHE_TTL_SECONDS``.
+
+Pages are computed on a read replica, which can still return the old rows
+after the primary commit that triggered the invalidation. Invalidating a tag
+therefore also marks it for ``SEARCH_CACHE_INVALIDATION_GRACE_SECONDS``, and
+pages with a marked tag aren't cached; the grace period should exceed the
+replica lag.
+Other processes' L1 entries expire on their own (``SEARCH_CACHE_LOCAL_TTL_SECONDS``);
+changes that aren't invalidated explicitly (bookings, pricing rules) show up
+within ``SEARCH_CACHE_TTL_SECONDS``.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.infrastructure.cache.redis import get_redis
+from app.modules.listings.models import ListingStatus
+from app.core.config import get_settings
+from app.core.id import ID
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+RESULT_KEY_PREFIX = "search:result:"
+TAG_KEY_PREFIX = "search:tag:"
+INVALIDATED_KEY_PREFIX = "search:invalidated:"
+
+ALL_TAG = "all"
+
+# Entries kept in each process's L1 (least recently used are evicted)
+LOCAL_MAX_ENTRIES = 2000
+
+# (city, country, listing_type) of an active listing
+ListingScope = Tuple[str, str, str]
+
+
+def search_cache_key(params: Dict[str, Any]) -> str:
+    """Cache key for a search request.
+
+    ``params`` are the request's search parameters. Unset values are dropped,
+    the free-text query is case- and whitespace-normalized and the city filter
+    lower-cased, so equivalent requests share a key.
+    """
+    normalized = {name: value for name, value in params.items() if value is not None}
+    if normalized.get("query"):
+        normalized["query"] = " ".join(normalized["query"].lower().split())
+    if normalized.get("city"):
+        normalized["city"] = normalized["city"].lower()
+    digest = hashlib.sha256(
+        json.dumps(normalized, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{RESULT_KEY_PREFIX}{digest}"
+
+
+def _listing_type_value(listing_type) -> Optional[str]:
+    if listing_type is None:
+        return None
+    return listing_type.value if hasattr(listing_type, "value") else str(listing_type)
+
+
+def _city_tag_value(city: str) -> str:
+    return " ".join(city.lower().split())
+
+
+def search_cache_tags(
+    city: Optional[str],
+    country: Optional[str],
+    listing_type,
+    listing_ids: Iterable[ID]
+) -> List[str]:
+    """Tags of a cached page: its scope tag and its listings."""
+    # ILIKE wildcards in the filter match cities the substring tags can't name
+    if city and not any(char in city for char in "%_\\"):
+        scope = f"city:{_city_tag_value(city)}"
+    elif country:
+        scope = f"country:{country.lower()}"
+    elif listing_type:
+        scope = f"type:{_listing_type_value(listing_type)}"
+    else:
+        scope = ALL_TAG
+    return [scope] + [f"listing:{listing_id}" for listing_id in listing_ids]
+
+
+def search_scope(listing) -> Optional[ListingScope]:
+    """The scope a listing is searchable in, or None if it isn't active."""
+    status = listing.status.value if hasattr(listing.status, "value") else listing.status
+    if status != ListingStatus.ACTIVE.value:
+        return None
+    return listing.city or "", listing.country or "", _listing_type_value(listing.listing_type) or ""
+
+
+def scope_tags(scope: ListingScope) -> Set[str]:
+    """Scope tags a listing in ``scope`` invalidates (city filters naming its city or a word of it)."""
+    city, country, listing_type = scope
+    city = _city_tag_value(city)
+    tags = {f"city:{word}" for word in city.split()}
+    if city:
+        tags.add(f"city:{city}")
+    tags.update({f"country:{country.lower()}", f"type:{listing_type}", ALL_TAG})
+    return tags
+
+
+class SearchResultCache:
+    """Redis-backed search result cache with a short-lived local L1."""
+
+    def __init__(self, local_max_entries: int = LOCAL_MAX_ENTRIES):
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._local_max_entries = local_max_entries
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Cached response for ``key``, or None on a miss (or when Redis is unavailable)."""
+        local = self._local.get(key)
+        if local is not None:
+            expires_at, value = local
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                return value
+            del self._local[key]
+
+        try:
+            redis = await get_redis()
+            raw = await redis.get(key)
+        except Exception as e:
+            logger.warning(f"Search cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self._store_local(key, value)
+        return value
+
+    async def set(self, key: str, value: Any, tags: Iterable[str]) -> None:
+        """Cache a JSON-serializable response under ``key`` and register it with ``tags``.
+
+        Nothing is cached if any of ``tags`` was invalidated within the grace
+        period: the page may have been read before the replica saw the change.
+        """
+        tags = list(tags)
+        ttl = settings.search_cache_ttl_seconds
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline(transaction=False)
+            pipe.set(key, json.dumps(value), ex=ttl)
+            for tag in tags:
+                tag_key = f"{TAG_KEY_PREFIX}{tag}"
+                pipe.sadd(tag_key, key)
+                # A tag set lives as long as its newest entry
+                pipe.expire(tag_key, ttl)
+            # Checked after registering: an invalidation either marks the tag
+            # before this check or reads the tag set after the entry joined it
+            for tag in tags:
+                pipe.exists(f"{INVALIDATED_KEY_PREFIX}{tag}")
+            results = await pipe.execute()
+            if any(results[len(results) - len(tags):]):
+                await redis.delete(key)
+                return
+        except Exception as e:
+            logger.warning(f"Search cache write failed: {e}")
+            return
+        self._store_local(key, value)
+
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        """Delete every entry registered with any of ``tags``.
+
+        One pipelined round trip marks the tags as recently invalidated and
+        reads and drops the tag sets, another deletes their entries. Returns
+        the number of entry keys deleted.
+        """
+        tags = set(tags)
+        if not tags:
+            return 0
+        grace = settings.search_cache_invalidation_grace_seconds
+        try:
+            redis = await get_redis()
+            pipe = redis.pipeline(transaction=False)
+            # Marked before the tag sets are read (see ``set``)
+            if grace > 0:
+                for tag in tags:
+                    pipe.set(f"{INVALIDATED_KEY_PREFIX}{tag}", 1, ex=grace)
+            for tag in tags:
+                pipe.smembers(f"{TAG_KEY_PREFIX}{tag}")
+                pipe.delete(f"{TAG_KEY_PREFIX}{tag}")
+            results = await pipe.execute()
+            if grace > 0:
+                results = results[len(tags):]
+            keys = sorted(set().union(*results[::2]))
+            if keys:
+                # Single-key deletes so the pipeline also works on Redis Cluster
+                pipe = redis.pipeline(transaction=False)
+                for key in keys:
+                    pipe.delete(key)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Search cache invalidation failed: {e}")
+            self._local.clear()
+            return 0
+        for key in keys:
+            self._local.pop(key, None)
+        return len(keys)
+
+    async def invalidate_listing(
+        self,
+        listing_id: ID,
+        before: Optional[ListingScope] = None,
+        after: Optional[ListingScope] = None
+    ) -> int:
+        """Invalidate entries a listing change can affect.
+
+        ``before``/``after`` are the listing's ``search_scope`` before and
+        after the change (None when it wasn't, or isn't, active). Call after
+        the change has committed.
+        """
+        tags = {f"listing:{listing_id}"}
+        for scope in (before, after):
+            if scope is not None:
+                tags |= scope_tags(scope)
+        return await self.invalidate(tags)
+
+    async def invalidate_listings(self, listing_ids: Iterable[ID]) -> int:
+        """Invalidate the cached pages showing any of ``listing_ids``.
+
+        For changes to what a listing's card shows, not to what it matches.
+        """
+        return await self.invalidate(f"listing:{listing_id}" for listing_id in listing_ids)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    def _store_local(self, key: str, value: Any) -> None:
+        self._local[key] = (time.monotonic() + settings.search_cache_local_ttl_seconds, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self._local_max_entries:
+            self._local.popitem(last=False)
+
+
+# Process-wide cache (the L1 is shared by all requests)
+search_result_cache = SearchResultCache()
@@ -1,19 +1,21 @@
 """
 Search API routes.
 """
+from datetime import date
 from typing import Any, Optional
 from fastapi import APIRouter, Depends, Query
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db, get_read_db
 from app.core.dependencies import get_current_user
 from app.modules.users.models import User
 from app.modules.search.schemas import (
-    SearchRequest, SearchResponse, SearchSuggestionsResponse
+    ListingCardResponse, SearchRequest, SearchResponse, SearchSuggestionsResponse
 )
-from app.modules.search.services import SearchService
+from app.modules.search.services import SearchService, SearchCountMode
+from app.modules.search.result_cache import search_cache_key, search_cache_tags, search_result_cache
 from app.modules.listings.models import ListingType
-from app.modules.listings.schemas import ListingResponse
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
@@ -32,13 +34,26 @@ async def search_listings(
     latitude: float = Query(None, ge=-90, le=90),
     longitude: float = Query(None, ge=-180, le=180),
     radius_km: float = Query(None, ge=0, le=1000),
+    check_in: Optional[date] = Query(None, description="Only listings available from this night (requires check_out)"),
+    check_out: Optional[date] = Query(None, description="Departure date; the night before it is the last one checked"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    sort_by: str = Query("relevance", description="Sort by: relevance, price_asc, price_desc, rating, newest, popularity"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides skip)"),
+    sort_by: Optional[str] = Query(
+        None,
+        description=(
+            "Sort by: relevance, price_asc, price_desc, rating, newest, popularity, distance "
+            "(default: distance when latitude/longitude are given, else relevance)"
+        )
+    ),
     enable_personalization: bool = Query(True, description="Enable personalization boost"),
     enable_popularity_boost: bool = Query(True, description="Enable popularity boost"),
     enable_location_boost: bool = Query(True, description="Enable location boost"),
     ab_test_variant: str = Query(None, description="A/B test variant (variant_a, variant_b, variant_c)"),
+    count_mode: SearchCountMode = Query(
+        SearchCountMode.EXACT,
+        description="Total count: exact, estimate (capped 'at least N'), or none (has_more only)"
+    ),
     current_user: Optional[User] = Depends(get_current_user),
     db: AsyncSession = Depends(get_read_db)  # Use read replica for search queries
 ) -> Any:
@@ -50,7 +65,12 @@ async def search_listings(
     - Personalization boost (based on user's booking history)
     - Popularity boost (based on bookings and reviews)
     - Location boost (boost listings closer to search location)
+    - Date availability: ``check_in``/``check_out`` exclude listings booked or blocked on any night
     - A/B testing support for ranking algorithms
+    - Single-query paging; ``count_mode`` trades total accuracy for latency
+    - Keyset pagination: pass ``next_cursor`` back as ``cursor`` for the next page
+    - Result cards read from denormalized search snapshots (no per-result joins)
+    - Pages cached by normalized parameters; listing changes invalidate only the pages they affect
     """
     # Determine A/B test variant (simple hash-based assignment)
     if not ab_test_variant and current_user:
@@ -59,8 +79,7 @@ async def search_listings(
         variant_num = user_hash % 3
         ab_test_variant = ["variant_a", "variant_b", "variant_c"][variant_num]
     
-    listings, total = await SearchService.search_listings(
-        db=db,
+    search_params = dict(
         query=query,
         city=city,
         country=country,
@@ -73,27 +92,51 @@ async def search_listings(
         latitude=latitude,
         longitude=longitude,
         radius_km=radius_km,
+        check_in=check_in,
+        check_out=check_out,
         skip=skip,
         limit=limit,
         sort_by=sort_by,
-        user_id=str(current_user.id) if current_user else None,
+        cursor=cursor,
+        # Personalized results are cached per user
+        user_id=str(current_user.id) if current_user and enable_personalization else None,
         enable_personalization=enable_personalization,
         enable_popularity_boost=enable_popularity_boost,
         enable_location_boost=enable_location_boost,
-        ab_test_variant=ab_test_variant
+        ab_test_variant=ab_test_variant,
+        count_mode=count_mode,
     )
+    cache_key = search_cache_key(search_params)
+    cached = await search_result_cache.get(cache_key)
+    if cached is not None:
+        return {**cached, "query": query}
     
-    # Convert SQLAlchemy models to Pydantic schemas
-    items = [ListingResponse.model_validate(listing) for listing in listings]
+    page = await SearchService.search_page(db=db, as_cards=True, **search_params)
     
-    return {
+    # Cards come straight from the listings' search snapshots
+    items = [ListingCardResponse.model_validate(card) for card in page.items]
+    for item in items:
+        quote = page.stay_quotes.get(item.id)
+        if quote:
+            item.stay_total_price = quote.total
+            item.stay_average_nightly_rate = quote.average_nightly_rate
+    
+    response = jsonable_encoder({
         "items": items,
-        "total": total,
+        "total": page.total,
+        "total_is_exact": page.total_is_exact,
+        "has_more": page.has_more,
+        "next_cursor": page.next_cursor,
+        "count_mode": count_mode.value,
         "skip": skip,
         "limit": limit,
         "query": query,
         "ab_test_variant": ab_test_variant
-    }
+    })
+    await search_result_cache.set(
+        cache_key, response, search_cache_tags(city, country, listing_type, [item.id for item in items])
+    )
+    return response
 
 
 @router.get("/suggestions", response_model=SearchSuggestionsResponse)
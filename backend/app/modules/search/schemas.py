@@ -1,9 +1,11 @@
 """
 Search schemas.
 """
-from typing import Optional
-from pydantic import BaseModel, Field
-from app.modules.listings.schemas import ListingResponse
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from app.core.id import ID
 
 
 class SearchRequest(BaseModel):
@@ -20,14 +22,55 @@ class SearchRequest(BaseModel):
     latitude: Optional[float] = Field(None, ge=-90, le=90)
     longitude: Optional[float] = Field(None, ge=-180, le=180)
     radius_km: Optional[float] = Field(None, ge=0, le=1000)
+    check_in: Optional[date] = None
+    check_out: Optional[date] = None
     skip: int = Field(0, ge=0)
     limit: int = Field(50, ge=1, le=100)
 
 
+class ListingCardResponse(BaseModel):
+    """A search result card, served from the listing's search snapshot."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: ID
+    slug: str
+    title: str
+    listing_type: str
+    city: str
+    country: str
+    latitude: Optional[Decimal] = None
+    longitude: Optional[Decimal] = None
+    bedrooms: int = 0
+    beds: int = 0
+    bathrooms: Decimal = Decimal("0")
+    max_guests: int = 1
+    is_premium: bool = False
+    is_featured: bool = False
+    rating: Decimal = Decimal("0")
+    review_count: int = 0
+    base_price: Decimal
+    currency: str = "USD"
+    cleaning_fee: Optional[Decimal] = None
+    # Base price and upcoming price calendar days (no seasonal factors or pricing rules)
+    min_calendar_rate: Optional[Decimal] = None
+    max_calendar_rate: Optional[Decimal] = None
+    primary_photo_url: Optional[str] = None
+    host_display_name: Optional[str] = None
+    amenity_keys: List[str] = []
+    
+    # Accommodation price of the searched stay (dated searches only)
+    stay_total_price: Optional[Decimal] = None
+    stay_average_nightly_rate: Optional[Decimal] = None
+
+
 class SearchResponse(BaseModel):
     """Schema for search responses."""
-    items: list[ListingResponse]
-    total: int
+    items: list[ListingCardResponse]
+    total: Optional[int] = None  # None when count_mode is "none"
+    total_is_exact: bool = True  # False for capped estimates ("at least total")
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # Pass back as ``cursor`` to fetch the next page
+    count_mode: str = "exact"
     skip: int
     limit: int
     query: Optional[str] = None
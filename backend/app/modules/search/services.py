@@ -2,25 +2,99 @@
 Search services for listings.
 Enhanced with PostgreSQL full-text search and PostGIS geographic search.
 """
-from typing import List, Optional, Tuple
-from sqlalchemy import select, func, or_, and_, text, case
+import enum
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select, func, or_, and_, case, cast, literal, Float
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import aliased
+from fastapi import HTTPException, status
+from geoalchemy2 import Geography
 
-from app.modules.listings.models import Listing, ListingStatus, ListingType
+from app.modules.listings.models import (
+    Listing, ListingStatus, ListingType, ListingPopularity, ListingDestination
+)
+from app.modules.listings.load_profiles import CARD, listing_load_options
+from app.modules.listings.availability_service import availability_filter, join_availability_bitmap
+from app.modules.listings.pricing import StayQuote, pricing_engine
+from app.modules.listings.snapshot_service import SearchSnapshotService
+from app.modules.analytics.models import SearchSnapshot
 from app.modules.bookings.models import Booking, BookingStatus
 from app.modules.wishlist.models import Wishlist
+from app.modules.search.suggestions import destination_index, normalize
+from app.shared.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_condition
+from app.infrastructure.cache.redis import CacheService
 from app.core.config import get_settings
+from app.core.id import ID
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Upper bound for "at least N results" totals in estimate count mode
+SEARCH_COUNT_CAP = 1000
+
+# A/B ranking weights: (relevance, popularity, personalization)
+RANKING_WEIGHTS = {
+    "variant_b": (0.3, 0.5, 0.2),  # More weight on popularity
+    "variant_c": (0.3, 0.2, 0.5),  # More weight on personalization
+}
+DEFAULT_RANKING_WEIGHTS = (0.4, 0.3, 0.3)  # Variant A: balanced
+
+SORT_OPTIONS = ("relevance", "price_asc", "price_desc", "rating", "newest", "popularity", "distance")
+
+
+def resolve_sort(sort_by: Optional[str], has_location: bool) -> str:
+    """The sort a search uses.
+
+    Without a sort (or with an unknown one), searches around a location are
+    nearest-first and others by relevance. ``distance`` without a location
+    also falls back to relevance.
+    """
+    if sort_by in SORT_OPTIONS and sort_by != "distance":
+        return sort_by
+    return "distance" if has_location else "relevance"
+
+
+class SearchCountMode(str, enum.Enum):
+    """How a search request computes its total result count."""
+    EXACT = "exact"  # count(*) OVER () on the page query (single round trip)
+    ESTIMATE = "estimate"  # capped "at least N" count, cheap for deep result sets
+    NONE = "none"  # no total, only has_more (cheapest; for cursor-style clients)
+
+
+@dataclass
+class SearchPage:
+    """A page of search results with pagination metadata.
+
+    ``items`` holds listing models, or card payloads from the listings'
+    search snapshots when the page was requested ``as_cards``.
+    """
+    items: List[Any]
+    total: Optional[int]
+    total_is_exact: bool = True
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # Opaque keyset cursor for the next page
+    stay_quotes: Dict[ID, StayQuote] = field(default_factory=dict)  # By listing id, for dated searches
 
 
 class SearchService:
     """Search service for listings."""
     
     @staticmethod
-    async def search_listings(
+    async def search_listings(db: AsyncSession, **params) -> Tuple[List[Listing], Optional[int]]:
+        """
+        Search listings and return ``(listings, total)``.
+        
+        Accepts the same keyword arguments as :meth:`search_page`; ``total`` is
+        None when ``count_mode`` is ``none``.
+        """
+        page = await SearchService.search_page(db, **params)
+        return page.items, page.total
+    
+    @staticmethod
+    async def search_page(
         db: AsyncSession,
         query: Optional[str] = None,
         city: Optional[str] = None,
@@ -34,69 +108,54 @@ class SearchService:
         latitude: Optional[float] = None,
         longitude: Optional[float] = None,
         radius_km: Optional[float] = None,
+        check_in: Optional[date] = None,  # Only listings free every night from check_in
+        check_out: Optional[date] = None,  # up to (not including) check_out
         skip: int = 0,
         limit: int = 50,
-        sort_by: Optional[str] = "relevance",  # relevance, price_asc, price_desc, rating, newest
+        sort_by: Optional[str] = None,  # relevance, price_asc, price_desc, rating, newest, popularity, distance
+        cursor: Optional[str] = None,  # Keyset cursor from a previous page (takes precedence over skip)
         user_id: Optional[str] = None,  # For personalization
         enable_personalization: bool = True,  # Enable personalization boost
         enable_popularity_boost: bool = True,  # Enable popularity boost
         enable_location_boost: bool = True,  # Enable location boost
-        ab_test_variant: Optional[str] = None  # A/B testing variant
-    ) -> Tuple[List[Listing], int]:
+        ab_test_variant: Optional[str] = None,  # A/B testing variant
+        count_mode: SearchCountMode = SearchCountMode.EXACT,
+        as_cards: bool = False  # Return snapshot card payloads instead of listing models
+    ) -> SearchPage:
         """
         Search listings with enhanced full-text search and PostGIS geographic search.
         
         Uses PostgreSQL full-text search for better relevance ranking and PostGIS
-        for accurate geographic distance calculations.
+        for accurate geographic distance calculations. Scoring, filtering, paging
+        and (depending on ``count_mode``) the total all come from one statement.
+        With ``as_cards`` that statement also returns each result's search
+        snapshot, so building the page loads no listing relationships.
         """
-        # Base query
-        search_query = select(Listing).where(Listing.status == ListingStatus.ACTIVE.value)
+        count_mode = SearchCountMode(count_mode)
+        sort_by = resolve_sort(sort_by, latitude is not None and longitude is not None)
+        filters = [Listing.status == ListingStatus.ACTIVE.value]
+        # Joins the filters read from (applied to the page and count queries alike)
+        filter_joins = []
         
-        # Enhanced text search with PostgreSQL full-text search
+        # Enhanced text search with PostgreSQL full-text search.
+        # Matches against the stored, weighted ``search_vector`` column so the
+        # GIN index (idx_listing_search_vector) drives the filter; ranking is
+        # only computed for rows that already matched.
         if query:
-            # Create search vector from query using concatenation
-            search_vector = func.to_tsvector('english', 
-                func.concat_ws(' ',
-                    func.coalesce(Listing.title, ''),
-                    func.coalesce(Listing.description, ''),
-                    func.coalesce(Listing.city, ''),
-                    func.coalesce(Listing.country, '')
-                )
-            )
             query_vector = func.plainto_tsquery('english', query)
+            filters.append(Listing.search_vector.op('@@')(query_vector))
             
-            # Calculate relevance score
-            relevance_score = func.ts_rank(search_vector, query_vector)
-            
-            # Add full-text search condition using @@ operator
-            search_query = search_query.where(
-                search_vector.op('@@')(query_vector)
-            ).add_columns(relevance_score.label('relevance'))
+            # Relevance score (title > description > city/country weights)
+            relevance = func.ts_rank(Listing.search_vector, query_vector)
         else:
-            # No text query, add constant relevance
-            search_query = search_query.add_columns(func.literal(0.0).label('relevance'))
+            relevance = literal(0.0)
         
-        # Calculate popularity score (bookings + reviews)
+        # Popularity score (bookings + reviews), read from the materialized
+        # listing_popularity table instead of aggregating bookings per request
         if enable_popularity_boost:
-            # Get booking counts for popularity
-            booking_counts = select(
-                Booking.listing_id,
-                func.count(Booking.id).label('booking_count')
-            ).where(
-                Booking.status.in_([BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value])
-            ).group_by(Booking.listing_id).subquery()
-            
-            # Popularity score: rating * log(review_count + 1) * log(booking_count + 1)
-            popularity_score = (
-                func.coalesce(Listing.rating, 0) * 
-                func.coalesce(func.log(Listing.review_count + 1), 0) * 
-                func.coalesce(func.log(booking_counts.c.booking_count + 1), 0)
-            )
-            search_query = search_query.outerjoin(
-                booking_counts, Listing.id == booking_counts.c.listing_id
-            ).add_columns(popularity_score.label('popularity'))
+            popularity = func.coalesce(ListingPopularity.popularity_score, 0)
         else:
-            search_query = search_query.add_columns(func.literal(0.0).label('popularity'))
+            popularity = literal(0.0)
         
         # Calculate personalization score (if user_id provided)
         if enable_personalization and user_id:
@@ -104,46 +163,63 @@ class SearchService:
             user_bookings = select(Booking.listing_id).where(
                 Booking.guest_id == user_id,
                 Booking.status.in_([BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value])
-            ).subquery()
+            )
             
             # Get user's wishlist
             user_wishlist = select(Wishlist.listing_id).where(
                 Wishlist.user_id == user_id
-            ).subquery()
+            )
+            
+            # Aliased so the preference subqueries don't correlate with the outer listing
+            booked_listing = aliased(Listing)
             
             # Personalization boost: listings in user's preferred types/cities
-            personalization_score = case(
-                (Listing.id.in_(select(user_wishlist.c.listing_id)), 2.0),  # High boost for wishlist
-                (Listing.id.in_(select(user_bookings.c.listing_id)), 1.5),  # Medium boost for previously booked
+            personalization = case(
+                (Listing.id.in_(user_wishlist), 2.0),  # High boost for wishlist
+                (Listing.id.in_(user_bookings), 1.5),  # Medium boost for previously booked
                 (Listing.listing_type.in_(
-                    select(Listing.listing_type).where(Listing.id.in_(select(user_bookings.c.listing_id)))
+                    select(booked_listing.listing_type).where(booked_listing.id.in_(user_bookings))
                 ), 1.2),  # Boost for preferred listing types
                 (Listing.city.in_(
-                    select(Listing.city).where(Listing.id.in_(select(user_bookings.c.listing_id)))
+                    select(booked_listing.city).where(booked_listing.id.in_(user_bookings))
                 ), 1.1),  # Boost for preferred cities
                 else_=1.0
             )
-            search_query = search_query.add_columns(personalization_score.label('personalization'))
         else:
-            search_query = search_query.add_columns(func.literal(1.0).label('personalization'))
+            personalization = literal(1.0)
+        
+        # Geographic distance (km) from the search location, measured in meters on
+        # the stored, GiST-indexed geography point (accurate at any latitude)
+        distance = None
+        if latitude is not None and longitude is not None:
+            search_point = cast(
+                func.ST_SetSRID(func.ST_MakePoint(longitude, latitude), 4326),
+                Geography(geometry_type='POINT', srid=4326)
+            )
+            distance = func.ST_Distance(Listing.geo_point, search_point) / 1000.0
+            
+            # Enhanced geographic search with PostGIS (index-assisted radius filter)
+            if radius_km:
+                filters.append(
+                    func.ST_DWithin(Listing.geo_point, search_point, radius_km * 1000.0)
+                )
+            if sort_by == "distance":
+                # Nearest-first ordering only makes sense for listings with a location
+                filters.append(Listing.geo_point.isnot(None))
         
-        # Calculate location boost (if location provided)
-        if enable_location_boost and latitude and longitude:
-            # Boost listings closer to search location
-            # Normalize distance to 0-1 scale (closer = higher boost)
+        # Calculate location boost (boost listings closer to search location)
+        if enable_location_boost and distance is not None:
             max_distance = radius_km if radius_km else 50.0  # Default 50km
             location_boost = case(
-                (text('distance') <= max_distance * 0.1, 1.5),  # Very close: 50% boost
-                (text('distance') <= max_distance * 0.3, 1.3),  # Close: 30% boost
-                (text('distance') <= max_distance * 0.5, 1.1),  # Medium: 10% boost
+                (distance <= max_distance * 0.1, 1.5),  # Very close: 50% boost
+                (distance <= max_distance * 0.3, 1.3),  # Close: 30% boost
+                (distance <= max_distance * 0.5, 1.1),  # Medium: 10% boost
                 else_=1.0
             )
-            search_query = search_query.add_columns(location_boost.label('location_boost'))
         else:
-            search_query = search_query.add_columns(func.literal(1.0).label('location_boost'))
+            location_boost = literal(1.0)
         
         # Premium/Featured boost
-        from datetime import datetime, timezone
         now = datetime.now(timezone.utc)
         premium_boost = case(
             (
@@ -168,129 +244,218 @@ class SearchService:
             ),
             else_=1.0
         )
-        search_query = search_query.add_columns(premium_boost.label('premium_boost'))
-        
-        # A/B Testing: Apply different ranking algorithms based on variant
-        if ab_test_variant == "variant_b":
-            # Variant B: More weight on popularity
-            final_score = (
-                func.coalesce(text('relevance'), 0) * 0.3 +
-                func.coalesce(text('popularity'), 0) * 0.5 +
-                func.coalesce(text('personalization'), 1.0) * 0.2
-            ) * func.coalesce(text('location_boost'), 1.0) * func.coalesce(text('premium_boost'), 1.0)
-        elif ab_test_variant == "variant_c":
-            # Variant C: More weight on personalization
-            final_score = (
-                func.coalesce(text('relevance'), 0) * 0.3 +
-                func.coalesce(text('popularity'), 0) * 0.2 +
-                func.coalesce(text('personalization'), 1.0) * 0.5
-            ) * func.coalesce(text('location_boost'), 1.0) * func.coalesce(text('premium_boost'), 1.0)
-        else:
-            # Default (variant A): Balanced approach
-            final_score = (
-                func.coalesce(text('relevance'), 0) * 0.4 +
-                func.coalesce(text('popularity'), 0) * 0.3 +
-                func.coalesce(text('personalization'), 1.0) * 0.3
-            ) * func.coalesce(text('location_boost'), 1.0) * func.coalesce(text('premium_boost'), 1.0)
         
-        search_query = search_query.add_columns(final_score.label('final_score'))
+        # A/B Testing: Apply different ranking weights based on variant
+        w_relevance, w_popularity, w_personalization = RANKING_WEIGHTS.get(
+            ab_test_variant, DEFAULT_RANKING_WEIGHTS
+        )
+        final_score = (
+            relevance * w_relevance +
+            popularity * w_popularity +
+            personalization * w_personalization
+        ) * location_boost * premium_boost
         
         # Location filters
         if city:
-            search_query = search_query.where(Listing.city.ilike(f"%{city}%"))
+            filters.append(Listing.city.ilike(f"%{city}%"))
         if country:
-            search_query = search_query.where(Listing.country == country)
+            filters.append(Listing.country == country)
         
         # Listing type filter
         if listing_type:
-            search_query = search_query.where(Listing.listing_type == listing_type.value)
+            filters.append(Listing.listing_type == listing_type.value)
         
         # Price filters
         if min_price:
-            search_query = search_query.where(Listing.base_price >= min_price)
+            filters.append(Listing.base_price >= min_price)
         if max_price:
-            search_query = search_query.where(Listing.base_price <= max_price)
+            filters.append(Listing.base_price <= max_price)
         
         # Guest capacity filter
         if min_guests:
-            search_query = search_query.where(Listing.max_guests >= min_guests)
+            filters.append(Listing.max_guests >= min_guests)
         
         # Bedrooms filter
         if min_bedrooms:
-            search_query = search_query.where(Listing.bedrooms >= min_bedrooms)
+            filters.append(Listing.bedrooms >= min_bedrooms)
         
         # Bathrooms filter
         if min_bathrooms:
-            search_query = search_query.where(Listing.bathrooms >= min_bathrooms)
+            filters.append(Listing.bathrooms >= min_bathrooms)
         
-        # Enhanced geographic search with PostGIS
-        if latitude and longitude and radius_km:
-            # Use PostGIS ST_DWithin for accurate distance calculation
-            # Convert radius from km to degrees (approximate: 1 degree ≈ 111 km)
-            radius_degrees = radius_km / 111.0
-            
-            # PostGIS distance calculation
-            # Note: This assumes PostGIS is installed and location is stored as POINT
-            # If using separate lat/lng columns, convert to POINT first
-            search_query = search_query.where(
-                func.ST_DWithin(
-                    func.ST_MakePoint(Listing.longitude, Listing.latitude),
-                    func.ST_MakePoint(longitude, latitude),
-                    radius_degrees
+        # Date availability: bookings, blocked dates and blocked calendar days,
+        # read from the listing's precomputed availability bitmap
+        if check_in or check_out:
+            if not (check_in and check_out) or check_out <= check_in:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="check_in and check_out must both be given, with check_out after check_in"
                 )
+            filter_joins.append(join_availability_bitmap)
+            filters.append(availability_filter(check_in, check_out))
+        
+        if as_cards:
+            # Price columns ride along for stay quotes
+            result_columns = (
+                Listing.id, Listing.base_price, Listing.currency, SearchSnapshot.payload.label('card')
             )
-            
-            # Calculate distance for sorting
-            distance_expr = func.ST_Distance(
-                func.ST_MakePoint(Listing.longitude, Listing.latitude),
-                func.ST_MakePoint(longitude, latitude)
-            ) * 111.0  # Convert to km
-            search_query = search_query.add_columns(distance_expr.label('distance'))
         else:
-            search_query = search_query.add_columns(func.literal(None).label('distance'))
-        
-        # Get total count
-        count_query = select(func.count()).select_from(search_query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar()
-        
-        # Apply sorting
-        if sort_by == "relevance":
-            # Use final_score for relevance sorting (includes all boosts)
-            search_query = search_query.order_by(func.desc(text('final_score')))
-        elif sort_by == "price_asc":
-            search_query = search_query.order_by(Listing.base_price.asc())
+            result_columns = (Listing,)
+        
+        search_query = select(
+            *result_columns,
+            relevance.label('relevance'),
+            popularity.label('popularity'),
+            personalization.label('personalization'),
+            location_boost.label('location_boost'),
+            premium_boost.label('premium_boost'),
+            final_score.label('final_score'),
+            (distance if distance is not None else literal(None)).label('distance'),
+        ).where(*filters)
+        for join in filter_joins:
+            search_query = join(search_query)
+        
+        if enable_popularity_boost:
+            search_query = search_query.outerjoin(
+                ListingPopularity, ListingPopularity.listing_id == Listing.id
+            )
+        if as_cards:
+            search_query = search_query.outerjoin(
+                SearchSnapshot, SearchSnapshot.listing_id == Listing.id
+            )
+        
+        # Apply sorting. Every sort is a single-direction key ending in
+        # Listing.id, so pages are stable and cursors can use a row comparison.
+        if sort_by == "price_asc":
+            sort_keys, descending = [Listing.base_price], False
         elif sort_by == "price_desc":
-            search_query = search_query.order_by(Listing.base_price.desc())
+            sort_keys, descending = [Listing.base_price], True
         elif sort_by == "rating":
-            search_query = search_query.order_by(Listing.rating.desc(), Listing.review_count.desc())
+            sort_keys, descending = [Listing.rating, Listing.review_count], True
         elif sort_by == "newest":
-            search_query = search_query.order_by(Listing.created_at.desc())
+            sort_keys, descending = [Listing.created_at], True
         elif sort_by == "popularity":
-            search_query = search_query.order_by(func.desc(text('popularity')))
-        elif latitude and longitude:
-            # Sort by distance if location provided
-            search_query = search_query.order_by(text('distance'))
+            sort_keys, descending = [popularity], True
+        elif sort_by == "distance":
+            # KNN operator: PostgreSQL walks the GiST index nearest-first
+            sort_keys, descending = [Listing.geo_point.op('<->', return_type=Float)(search_point)], False
         else:
-            # Default: use final_score (includes all boosts)
-            search_query = search_query.order_by(func.desc(text('final_score')))
-        
-        # Get paginated results with relationships
-        search_query = search_query.options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.host_profile),
-            selectinload(Listing.amenities)
-        ).offset(skip).limit(limit)
+            # relevance: use final_score (includes all boosts)
+            sort_keys, descending = [final_score], True
+        sort_keys.append(Listing.id)
         
-        result = await db.execute(search_query)
+        sort_columns = [key.label(f"sort_key_{i}") for i, key in enumerate(sort_keys)]
+        search_query = search_query.add_columns(*sort_columns).order_by(
+            *[column.desc() if descending else column.asc() for column in sort_columns]
+        )
         
-        # Extract listings from result (may include additional columns like relevance, distance)
+        # Total count in the same round trip as the page
+        if count_mode == SearchCountMode.EXACT:
+            if cursor:
+                # The window would only count rows after the cursor
+                search_query = search_query.add_columns(
+                    SearchService._capped_count(filters, filter_joins, None).label('total_count')
+                )
+            else:
+                search_query = search_query.add_columns(func.count().over().label('total_count'))
+        elif count_mode == SearchCountMode.ESTIMATE:
+            search_query = search_query.add_columns(
+                SearchService._capped_count(filters, filter_joins).label('total_count')
+            )
+        
+        # Keyset pagination: continue strictly after the cursor's sort key
+        if cursor:
+            try:
+                after = decode_cursor(cursor, sort_by, len(sort_keys))
+            except InvalidCursorError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+            search_query = search_query.where(keyset_condition(sort_keys, after, descending))
+            skip = 0
+        
+        # Get paginated results (one extra row tells us whether there is a next page)
+        if not as_cards:
+            search_query = search_query.options(*listing_load_options(CARD))
+        search_query = search_query.offset(skip).limit(limit + 1)
+        
+        result = await db.execute(search_query)
         rows = result.all()
-        listings = [row[0] if isinstance(row, tuple) else row for row in rows]
         
-        return listings, total
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if as_cards:
+            items = await SearchService._cards(db, rows)
+            priced = rows
+        else:
+            items = priced = [row[0] for row in rows]
+        next_cursor = None
+        if has_more:
+            last = rows[-1]._mapping
+            next_cursor = encode_cursor(sort_by, [last[column.name] for column in sort_columns])
+        
+        # Price the requested stay for the whole page at once
+        stay_quotes = {}
+        if check_in and priced:
+            stay_quotes = await pricing_engine.quote_many(db, priced, check_in, check_out)
+        
+        if count_mode == SearchCountMode.NONE:
+            return SearchPage(
+                items=items,
+                total=None,
+                total_is_exact=False,
+                has_more=has_more,
+                next_cursor=next_cursor,
+                stay_quotes=stay_quotes
+            )
+        
+        if rows:
+            total = rows[0].total_count
+        elif skip == 0 and not cursor:
+            total = 0
+        else:
+            # Page past the end: the count column has no row to ride on
+            cap = SEARCH_COUNT_CAP if count_mode == SearchCountMode.ESTIMATE else None
+            total = (await db.execute(select(SearchService._capped_count(filters, filter_joins, cap)))).scalar()
+        
+        return SearchPage(
+            items=items,
+            total=total,
+            total_is_exact=count_mode == SearchCountMode.EXACT or total < SEARCH_COUNT_CAP,
+            has_more=has_more,
+            next_cursor=next_cursor,
+            stay_quotes=stay_quotes
+        )
+    
+    @staticmethod
+    async def _cards(db: AsyncSession, rows) -> List[Dict[str, Any]]:
+        """Card payloads of a page's rows, in page order.
+
+        Listings whose snapshot the refresh worker hasn't written yet (e.g.
+        just activated) are built from source tables in one extra query.
+        """
+        missing = [row.id for row in rows if row.card is None]
+        built = await SearchSnapshotService.build_payloads(db, missing)
+        return [
+            row.card if row.card is not None else built[row.id]
+            for row in rows
+            if row.card is not None or row.id in built
+        ]
+    
+    @staticmethod
+    def _capped_count(filters: list, joins: Sequence = (), cap: Optional[int] = SEARCH_COUNT_CAP):
+        """Scalar subquery counting matching listings, stopping after ``cap`` rows.
+        
+        Only evaluates the filters (no scoring), so PostgreSQL can stop as soon
+        as the cap is reached.
+        """
+        matching = select(Listing.id).where(*filters)
+        for join in joins:
+            matching = join(matching)
+        if cap is not None:
+            matching = matching.limit(cap)
+        return select(func.count()).select_from(matching.subquery()).scalar_subquery()
     
     @staticmethod
     async def get_search_suggestions(
@@ -298,38 +463,54 @@ class SearchService:
         query: str,
         limit: int = 10
     ) -> List[dict]:
-        """Return city and country search suggestions for the given query."""
-        suggestions = []
-        
-        # City suggestions
-        city_query = select(Listing.city).where(
-            Listing.city.ilike(f"%{query}%"),
-            Listing.status == ListingStatus.ACTIVE.value
-        ).distinct().limit(limit)
-        city_result = await db.execute(city_query)
-        cities = city_result.scalars().all()
-        
-        for city in cities:
-            suggestions.append({
-                "type": "city",
-                "text": city,
-                "value": city
-            })
-        
-        # Country suggestions
-        country_query = select(Listing.country).where(
-            Listing.country.ilike(f"%{query}%"),
-            Listing.status == ListingStatus.ACTIVE.value
-        ).distinct().limit(limit)
-        country_result = await db.execute(country_query)
-        countries = country_result.scalars().all()
-        
-        for country in countries:
-            suggestions.append({
-                "type": "country",
-                "text": country,
-                "value": country
-            })
-        
-        return suggestions[:limit]
+        """Return city and country search suggestions for the given query.
+        
+        Suggestions are destinations whose name starts with the query, cities
+        before countries, each ranked by popularity. Served from this
+        process's in-memory destination index (which also matches later words,
+        "york" -> "New York"); until that is built, from Redis or the
+        prefix-indexed ``listing_destinations`` table.
+        """
+        suggestions = destination_index.suggest(query, limit)
+        if suggestions is not None:
+            return suggestions
+        
+        prefix = normalize(query)
+        cache_key = f"search:suggestions:{limit}:{prefix}"
+        try:
+            cached = await CacheService.get(cache_key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            logger.warning(f"Suggestion cache read failed: {e}")
+        
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        active = ListingDestination.listing_count > 0
+        city_result = await db.execute(
+            select(ListingDestination.city)
+            .where(ListingDestination.city_key.like(pattern, escape="\\"), active)
+            .order_by(ListingDestination.popularity_score.desc(), ListingDestination.city_key)
+            .limit(limit * 2)
+        )
+        cities = list(dict.fromkeys(city_result.scalars().all()))[:limit]
+        suggestions = [{"type": "city", "text": city, "value": city} for city in cities]
+        
+        if len(suggestions) < limit:
+            country_result = await db.execute(
+                select(func.min(ListingDestination.country))
+                .where(ListingDestination.country_key.like(pattern, escape="\\"), active)
+                .group_by(ListingDestination.country_key)
+                .order_by(func.sum(ListingDestination.popularity_score).desc(), ListingDestination.country_key)
+                .limit(limit - len(suggestions))
+            )
+            suggestions.extend(
+                {"type": "country", "text": country, "value": country}
+                for country in country_result.scalars().all()
+            )
+        
+        try:
+            await CacheService.set(cache_key, suggestions, expire=settings.search_suggestions_cache_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Suggestion cache write failed: {e}")
+        return suggestions
 
@@ -0,0 +1,265 @@
+"""
+In-process destination index for search suggestions.
+
+Each API process keeps the ``listing_destinations`` table in memory as a
+sorted array of normalized match keys. A suggestion lookup is a bisect for the
+prefix range plus a top-k by popularity, so keystroke-rate autocomplete never
+touches Redis or PostgreSQL. Short prefixes, whose ranges cover most of the
+array, are answered from a top-k precomputed at build time; longer ones are
+memoized, since many users type the same few thousand prefixes.
+
+The index is rebuilt in the background every ``refresh_interval`` seconds and
+``invalidate_delay`` seconds after this process changes a listing's
+destination, so a burst of changes shares one rebuild. Until the first build
+completes, ``suggest`` returns None and callers fall back to the database.
+"""
+import asyncio
+import heapq
+import logging
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import get_settings
+from app.core.database import AsyncSessionLocal, get_read_replica_session
+from app.modules.listings.models import ListingDestination
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CITY = "city"
+COUNTRY = "country"
+
+# Largest ``limit`` the suggestions route accepts
+MAX_SUGGESTIONS = 20
+# Prefixes up to this length are served from precomputed top-k lists
+SHORT_PREFIX_LENGTH = 2
+# Longer prefixes' results are memoized until the next rebuild (cleared when full)
+MEMO_SIZE = 50000
+
+DestinationRow = Tuple[str, str, int]  # (city, country, popularity_score)
+# (-score, text): natural tuple order is best-first, ties by name.
+# The kind (city/country) is implied by which index holds the entry.
+Entry = Tuple[int, str]
+
+
+def normalize(value: str) -> str:
+    """Match key for a query or place name (case- and surrounding-space-insensitive)."""
+    return " ".join(value.lower().split())
+
+
+def _match_keys(name: str) -> List[str]:
+    """Keys a name is found under: the full name and every later word in it.
+
+    "New York" is suggested for "new" and for "york".
+    """
+    key = normalize(name)
+    keys = [key]
+    for position, char in enumerate(key):
+        if char == " ":
+            keys.append(key[position + 1:])
+    return keys
+
+
+class _PrefixIndex:
+    """Sorted (key, entry) arrays for one suggestion type."""
+
+    def __init__(self, entries: Iterable[Tuple[str, int]]):
+        keyed = sorted(
+            (match_key, -score, name)
+            for name, score in entries
+            for match_key in _match_keys(name)
+        )
+        self.keys = [key for key, _, _ in keyed]
+        self.entries: List[Entry] = [(negated, name) for _, negated, name in keyed]
+        self.short: Dict[str, List[Entry]] = {}
+        short = defaultdict(list)
+        for key, entry in zip(self.keys, self.entries):
+            for length in range(1, min(SHORT_PREFIX_LENGTH, len(key)) + 1):
+                short[key[:length]].append(entry)
+        for prefix, candidates in short.items():
+            self.short[prefix] = _top(candidates, MAX_SUGGESTIONS)
+        self._memo: Dict[Tuple[str, int], List[Entry]] = {}
+
+    def top(self, prefix: str, limit: int) -> List[Entry]:
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            return self.short.get(prefix, [])[:limit]
+        memo_key = (prefix, limit)
+        top = self._memo.get(memo_key)
+        if top is None:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + "\uffff", start)
+            top = _top(self.entries[start:end], limit)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[memo_key] = top
+        return top
+
+
+def _top(entries: Sequence[Entry], limit: int) -> List[Entry]:
+    """Highest-scoring distinct names, best first (ties by name)."""
+    ranked = heapq.nsmallest(limit * 2, entries)
+    seen, top = set(), []
+    for entry in ranked:
+        if entry[1] not in seen:
+            seen.add(entry[1])
+            top.append(entry)
+    if len(top) < limit and len(ranked) < len(entries):
+        # A name matched under several of its words; rank the full range
+        return _top_exhaustive(entries, limit)
+    return top[:limit]
+
+
+def _top_exhaustive(entries: Sequence[Entry], limit: int) -> List[Entry]:
+    best: Dict[str, int] = {}
+    for negated, name in entries:
+        best[name] = min(negated, best.get(name, negated))
+    return heapq.nsmallest(limit, ((negated, name) for name, negated in best.items()))
+
+
+def _build_indexes(rows: Iterable[DestinationRow]) -> Tuple[_PrefixIndex, _PrefixIndex]:
+    """City and country prefix indexes for destination ``rows``."""
+    cities: Dict[str, Tuple[str, int]] = {}
+    countries: Dict[str, Tuple[str, int]] = {}
+    for city, country, score in rows:
+        score = score or 0
+        # One suggestion per distinct city name (as before), ranked by its
+        # most popular destination; countries rank by all their cities
+        city_key, country_key = normalize(city), normalize(country)
+        if city_key not in cities or score > cities[city_key][1]:
+            cities[city_key] = (city.strip(), score)
+        country_name, total = countries.get(country_key, (country.strip(), 0))
+        countries[country_key] = (country_name, total + score)
+    return _PrefixIndex(cities.values()), _PrefixIndex(countries.values())
+
+
+async def load_destination_rows() -> List[DestinationRow]:
+    """Read destinations with active listings (from a read replica when configured)."""
+    session_factory = get_read_replica_session() or AsyncSessionLocal
+    async with session_factory() as db:
+        result = await db.execute(
+            select(
+                ListingDestination.city,
+                ListingDestination.country,
+                ListingDestination.popularity_score,
+            ).where(ListingDestination.listing_count > 0)
+        )
+        return [tuple(row) for row in result.all()]
+
+
+class DestinationIndex:
+    """Process-local city/country prefix index, rebuilt in the background."""
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[Sequence[DestinationRow]]] = load_destination_rows,
+        refresh_interval: float = 300.0,
+        retry_interval: float = 10.0,
+        invalidate_delay: float = 5.0,
+    ):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.invalidate_delay = invalidate_delay
+        self.loaded_at: Optional[float] = None
+        self._cities: Optional[_PrefixIndex] = None
+        self._countries: Optional[_PrefixIndex] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._cities is not None
+
+    def build(self, rows: Iterable[DestinationRow]) -> None:
+        """Replace the index contents with ``rows``."""
+        self._install(*_build_indexes(rows))
+
+    def _install(self, cities: _PrefixIndex, countries: _PrefixIndex) -> None:
+        self._cities, self._countries = cities, countries
+        self.loaded_at = time.monotonic()
+
+    def suggest(self, query: str, limit: int = 10) -> Optional[List[dict]]:
+        """City then country suggestions for ``query``, each ranked by popularity.
+
+        Returns None if the index hasn't been built yet.
+        """
+        cities, countries = self._cities, self._countries
+        if cities is None:
+            return None
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        suggestions = [
+            {"type": CITY, "text": name, "value": name}
+            for _, name in cities.top(prefix, limit)
+        ]
+        if len(suggestions) < limit:
+            suggestions.extend(
+                {"type": COUNTRY, "text": name, "value": name}
+                for _, name in countries.top(prefix, limit - len(suggestions))
+            )
+        return suggestions
+
+    async def refresh(self) -> int:
+        """Rebuild from the destinations table. Returns the number of destinations."""
+        rows = await self.loader()
+        # Sorting a large table would stall the event loop; lookups keep using
+        # the previous index until the new one is installed
+        self._install(*await asyncio.to_thread(_build_indexes, rows))
+        return len(rows)
+
+    def invalidate(self) -> None:
+        """Mark the index stale (a listing in this process changed destination).
+
+        The background task rebuilds ``invalidate_delay`` seconds later, so a
+        burst of listing writes costs one table reload, not one per write.
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                count = await self.refresh()
+                logger.debug(f"Destination index rebuilt: {count} destinations")
+                delay = self.refresh_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = self.retry_interval
+                logger.warning(f"Destination index rebuild failed, retrying in {delay:.0f}s: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                continue
+            # Invalidated: let further changes arrive before reloading.
+            # Later invalidate() calls only re-set the event, which the next
+            # iteration clears, so they coalesce into this rebuild
+            await asyncio.sleep(self.invalidate_delay)
+
+
+destination_index = DestinationIndex(
+    refresh_interval=settings.search_suggestions_refresh_seconds,
+    invalidate_delay=settings.search_suggestions_invalidate_delay_seconds,
+)
@@ -0,0 +1,124 @@
+"""
+Write-behind engagement counters for travel guides and user stories.
+
+Views and likes are counted in Redis hashes on the request path (one
+HINCRBY, no database row lock) and folded into the ``view_count`` /
+``like_count`` columns by a periodic task, one batched
+``UPDATE ... SET view_count = view_count + n FROM (VALUES ...)`` per
+table and counter.
+
+A flush first renames the pending hash, so increments arriving during the
+flush start a new hash. The renamed hash is only deleted after the UPDATE
+commits; a failed flush leaves it to be applied by the next run (a crash
+between commit and delete can count that batch twice, which is acceptable
+for engagement counters).
+"""
+import logging
+from typing import Dict
+
+from sqlalchemy import Integer, String, column, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infrastructure.cache.redis import get_redis
+from app.modules.travel_guides.models import TravelGuide, UserStory
+from app.core.id import ID
+
+logger = logging.getLogger(__name__)
+
+GUIDE = "guide"
+STORY = "story"
+VIEW_COUNT = "view_count"
+LIKE_COUNT = "like_count"
+
+COUNTER_MODELS = {GUIDE: TravelGuide, STORY: UserStory}
+COUNTER_COLUMNS = (VIEW_COUNT, LIKE_COUNT)
+
+# Rows per UPDATE statement when flushing
+FLUSH_BATCH_SIZE = 1000
+
+# Only one flush at a time, so a batch left by a failed flush isn't applied twice
+FLUSH_LOCK_KEY = "engagement:flush_lock"
+FLUSH_LOCK_SECONDS = 300
+
+
+def pending_key(kind: str, counter: str) -> str:
+    # Hash tag keeps the pending and flushing keys in one cluster slot (RENAME needs that)
+    return f"engagement:{{{kind}:{counter}}}"
+
+
+def flushing_key(kind: str, counter: str) -> str:
+    return f"{pending_key(kind, counter)}:flushing"
+
+
+async def record_engagement(kind: str, counter: str, entity_id: ID, amount: int = 1) -> bool:
+    """Count a view or like for later flushing.
+
+    Returns False if Redis is unavailable; the increment is not recorded.
+    """
+    try:
+        redis = await get_redis()
+        await redis.hincrby(pending_key(kind, counter), entity_id, amount)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not record {kind} {counter} for {entity_id}: {e}")
+        return False
+
+
+async def _take_pending(redis, kind: str, counter: str) -> Dict[str, int]:
+    """Move pending increments aside for flushing and return them."""
+    pending, flushing = pending_key(kind, counter), flushing_key(kind, counter)
+    # A batch left behind by a failed flush is applied before taking new increments
+    if not await redis.exists(flushing):
+        if not await redis.exists(pending):
+            return {}
+        await redis.rename(pending, flushing)
+    increments = await redis.hgetall(flushing)
+    return {entity_id: int(amount) for entity_id, amount in increments.items() if int(amount)}
+
+
+async def apply_increments(db: AsyncSession, kind: str, counter: str, increments: Dict[str, int]) -> int:
+    """Add ``increments`` (entity id -> amount) to a counter column in batched UPDATEs.
+
+    Doesn't commit. Returns the number of rows updated.
+    """
+    model = COUNTER_MODELS[kind]
+    rows = list(increments.items())
+    updated = 0
+    for start in range(0, len(rows), FLUSH_BATCH_SIZE):
+        batch = values(
+            column("id", String), column("amount", Integer), name="increments"
+        ).data(rows[start:start + FLUSH_BATCH_SIZE])
+        result = await db.execute(
+            update(model)
+            .where(model.id == batch.c.id)
+            # Counting engagement doesn't modify the guide or story itself
+            .values({counter: getattr(model, counter) + batch.c.amount, "updated_at": model.updated_at})
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
+    return updated
+
+
+async def flush_engagement_counters(db: AsyncSession, redis=None) -> int:
+    """Apply all pending view and like increments to the database.
+
+    Returns the number of rows updated. Skipped (returning 0) while another
+    flush holds the lock.
+    """
+    redis = redis or await get_redis()
+    if not await redis.set(FLUSH_LOCK_KEY, "1", nx=True, ex=FLUSH_LOCK_SECONDS):
+        logger.info("Engagement counter flush already running, skipping")
+        return 0
+    updated = 0
+    try:
+        for kind in COUNTER_MODELS:
+            for counter in COUNTER_COLUMNS:
+                increments = await _take_pending(redis, kind, counter)
+                if increments:
+                    updated += await apply_increments(db, kind, counter, increments)
+                    await db.commit()
+                await redis.delete(flushing_key(kind, counter))
+    finally:
+        await redis.delete(FLUSH_LOCK_KEY)
+    return updated
+
@@ -5,14 +5,28 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
     Column, String, Boolean, Integer, DateTime, Text,
-    Index, ForeignKey, Numeric, ARRAY
+    Index, ForeignKey, Numeric, ARRAY, Computed
 )
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 
 from app.shared.base import BaseModel
 
 
+# Place names are indexed with the 'simple' configuration (no stemming or stop
+# words) so "Les Arcs" or "Nice" match as written; prose uses 'english'.
+TRAVEL_GUIDE_LOCATION_VECTOR_SQL = (
+    "to_tsvector('simple', coalesce(destination, '') || ' ' || "
+    "coalesce(city, '') || ' ' || coalesce(country, ''))"
+)
+TRAVEL_GUIDE_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(destination, '') || ' ' || coalesce(city, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(country, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'C')"
+)
+
+
 class TravelGuide(BaseModel):
     """
     Travel guides table.
@@ -35,12 +49,20 @@ class TravelGuide(BaseModel):
     city = Column(String(100), nullable=True, index=True)
     country = Column(String(100), nullable=False, index=True)
     region = Column(String(100), nullable=True)
+    # Word index over destination/city/country for the location filters
+    location_vector = deferred(
+        Column(TSVECTOR, Computed(TRAVEL_GUIDE_LOCATION_VECTOR_SQL, persisted=True), nullable=True)
+    )
     
     # Content
     cover_image_url = Column(String(1000), nullable=True)
     image_urls = Column(ARRAY(String), default=[], nullable=False)
     tags = Column(ARRAY(String), default=[], nullable=False, index=True)
     categories = Column(ARRAY(String), default=[], nullable=False)  # adventure, culture, food, etc.
+    # Weighted full-text document for guide search (place > title > country > summary)
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(TRAVEL_GUIDE_SEARCH_VECTOR_SQL, persisted=True), nullable=True)
+    )
     
     # Metadata
     reading_time_minutes = Column(Integer, nullable=True)
@@ -52,6 +74,8 @@ class TravelGuide(BaseModel):
     like_count = Column(Integer, default=0, nullable=False)
     share_count = Column(Integer, default=0, nullable=False)
     bookmark_count = Column(Integer, default=0, nullable=False)
+    # Ranking for sort_by="popular"; kept current by the engagement counter flush
+    popularity_score = Column(Integer, Computed("view_count + 10 * like_count", persisted=True))
     
     # Status
     status = Column(String(50), default="draft", nullable=False, index=True)  # draft, published, archived
@@ -72,6 +96,11 @@ class TravelGuide(BaseModel):
         Index("idx_travel_guide_author_status", "author_id", "status"),
         Index("idx_travel_guide_published", "published_at", "status"),
         Index("idx_travel_guide_tags", "tags", postgresql_using="gin"),
+        Index("idx_travel_guide_categories", "categories", postgresql_using="gin"),
+        Index("idx_travel_guide_location_vector", "location_vector", postgresql_using="gin"),
+        Index("idx_travel_guide_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_travel_guide_popular", "status", "popularity_score", "id"),
+        Index("idx_travel_guide_recent", "status", "published_at", "id"),
     )
 
 
@@ -111,6 +140,7 @@ class UserStory(BaseModel):
     like_count = Column(Integer, default=0, nullable=False)
     comment_count = Column(Integer, default=0, nullable=False)
     share_count = Column(Integer, default=0, nullable=False)
+    popularity_score = Column(Integer, Computed("view_count + 10 * like_count", persisted=True))
     
     # Relationships
     guide_id = Column(String(40), ForeignKey("travel_guides.id", ondelete="SET NULL"), nullable=True, index=True)
@@ -131,6 +161,7 @@ class UserStory(BaseModel):
         Index("idx_user_story_destination", "destination", "country", "status"),
         Index("idx_user_story_published", "published_at", "status"),
         Index("idx_user_story_tags", "tags", postgresql_using="gin"),
+        Index("idx_user_story_popular", "status", "popularity_score", "id"),
     )
 
 
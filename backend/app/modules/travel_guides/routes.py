@@ -10,7 +10,7 @@ from app.core.dependencies import get_current_active_user
 from app.modules.users.models import User
 from app.modules.travel_guides.service import TravelGuideService
 from app.modules.travel_guides.schemas import (
-    TravelGuideCreate, TravelGuideResponse,
+    TravelGuideCreate, TravelGuideResponse, TravelGuideSearchResponse,
     UserStoryCreate, UserStoryResponse
 )
 from app.modules.travel_guides.models import TravelGuide, UserStory
@@ -86,6 +86,50 @@ async def get_guides(
     return guides
 
 
+@router.get("/search", response_model=TravelGuideSearchResponse)
+async def search_guides(
+    q: Optional[str] = Query(None, description="Full-text query over destination, title, country and summary"),
+    destination: Optional[str] = Query(None),
+    country: Optional[str] = Query(None),
+    city: Optional[str] = Query(None),
+    tags: Optional[List[str]] = Query(None),
+    category: Optional[str] = Query(None),
+    is_official: Optional[bool] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides skip)"),
+    sort_by: Optional[str] = Query(None, description="Sort by: relevance (default with q), popular, recent, newest"),
+    db: AsyncSession = Depends(get_db)
+) -> Any:
+    """
+    Search published travel guides.
+    
+    - Results with ``q`` are ranked by text relevance boosted by popularity
+    - Location filters match whole words, case-insensitively
+    - Keyset pagination: pass ``next_cursor`` back as ``cursor`` for the next page
+    """
+    page = await TravelGuideService.search_guides(
+        db=db,
+        query=q,
+        destination=destination,
+        country=country,
+        city=city,
+        tags=tags,
+        category=category,
+        is_official=is_official,
+        skip=skip,
+        limit=limit,
+        sort_by=sort_by,
+        cursor=cursor
+    )
+    return {
+        "items": page.items,
+        "has_more": page.has_more,
+        "next_cursor": page.next_cursor,
+        "sort_by": page.sort_by
+    }
+
+
 @router.get("/{guide_id}", response_model=TravelGuideResponse)
 async def get_guide(
     guide_id: ID,
@@ -108,8 +152,8 @@ async def get_guide(
             detail="Travel guide not found"
         )
     
-    # Increment view count (don't commit, let the route handler's session commit)
-    await TravelGuideService.increment_view_count(db, guide_id=guide_id, commit=False)
+    # Count the view (written behind, outside this request's transaction)
+    await TravelGuideService.increment_view_count(guide_id=guide_id)
     
     # Explicitly convert to Pydantic model while session is still open
     # This ensures all attributes are accessed before session closes
@@ -232,8 +276,8 @@ async def get_story(
             detail="User story not found"
         )
     
-    # Increment view count (don't commit, let the route handler's session commit)
-    await TravelGuideService.increment_view_count(db, story_id=story_id, commit=False)
+    # Count the view (written behind, outside this request's transaction)
+    await TravelGuideService.increment_view_count(story_id=story_id)
     
     # Explicitly convert to Pydantic model while session is still open
     # This ensures all attributes are accessed before session closes
@@ -50,6 +50,14 @@ class TravelGuideResponse(BaseModel):
         from_attributes = True
 
 
+class TravelGuideSearchResponse(BaseModel):
+    """Schema for a page of travel guide search results."""
+    items: List[TravelGuideResponse]
+    has_more: bool
+    next_cursor: Optional[str] = None
+    sort_by: str
+
+
 class UserStoryCreate(BaseModel):
     """Schema for creating a user story."""
     title: str = Field(..., min_length=1, max_length=500)
@@ -3,11 +3,12 @@ Travel Guides and User Stories Service.
 """
 import logging
 import re
+from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, desc, case, String
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, and_, or_, func, desc, case, String, Float, update
+from sqlalchemy.orm import selectinload, raiseload
 from sqlalchemy.dialects.postgresql import ARRAY
 from fastapi import HTTPException, status
 
@@ -15,10 +16,33 @@ from app.modules.travel_guides.models import (
     TravelGuide, UserStory, TravelGuideBookmark, TravelGuideLike,
     UserStoryLike, UserStoryComment
 )
+from app.modules.travel_guides.engagement import (
+    GUIDE, STORY, VIEW_COUNT, LIKE_COUNT, record_engagement
+)
+from app.shared.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_condition
 from app.core.id import ID
 
 logger = logging.getLogger(__name__)
 
+# How much engagement lifts a text match: relevance = rank * (1 + w * ln(1 + popularity))
+GUIDE_POPULARITY_WEIGHT = 0.2
+
+
+def guide_relevance(text_query):
+    """Combined relevance of a guide for ``text_query``: weighted text rank boosted by popularity."""
+    rank = func.ts_rank(TravelGuide.search_vector, text_query, type_=Float)
+    popularity = func.greatest(func.coalesce(TravelGuide.popularity_score, 0), 0)
+    return rank * (1.0 + GUIDE_POPULARITY_WEIGHT * func.ln(1.0 + popularity))
+
+
+@dataclass
+class GuideSearchPage:
+    """A page of travel guide search results."""
+    items: List[TravelGuide]
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # Opaque keyset cursor for the next page
+    sort_by: str = "popular"  # Sort actually applied (cursors are tied to it)
+
 
 class TravelGuideService:
     """Service for managing travel guides and user stories."""
@@ -145,14 +169,61 @@ class TravelGuideService:
         sort_by: str = "popular"  # popular, recent, rating
     ) -> List[TravelGuide]:
         """Get travel guides with filters."""
+        page = await TravelGuideService.search_guides(
+            db=db,
+            destination=destination,
+            country=country,
+            city=city,
+            tags=tags,
+            category=category,
+            author_id=author_id,
+            is_official=is_official,
+            status=status,
+            skip=skip,
+            limit=limit,
+            sort_by=sort_by
+        )
+        return page.items
+    
+    @staticmethod
+    async def search_guides(
+        db: AsyncSession,
+        query: Optional[str] = None,
+        destination: Optional[str] = None,
+        country: Optional[str] = None,
+        city: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        category: Optional[str] = None,
+        author_id: Optional[ID] = None,
+        is_official: Optional[bool] = None,
+        status: str = "published",
+        skip: int = 0,
+        limit: int = 20,
+        sort_by: Optional[str] = None,  # relevance, popular, recent, newest
+        cursor: Optional[str] = None  # Keyset cursor from a previous page (takes precedence over skip)
+    ) -> GuideSearchPage:
+        """
+        Search travel guides.
+        
+        Every filter is served by an index: ``query`` and the location filters
+        match the stored tsvector columns (GIN), tags and categories use the
+        GIN-indexed array operators. Location filters match whole words
+        case-insensitively ("lisbon" finds "Lisbon, Portugal").
+        
+        ``sort_by`` defaults to ``relevance`` when ``query`` is given (text
+        rank boosted by popularity) and to ``popular`` otherwise.
+        """
         conditions = [TravelGuide.status == status]
         
-        if destination:
-            conditions.append(TravelGuide.destination.ilike(f"%{destination}%"))
-        if country:
-            conditions.append(TravelGuide.country.ilike(f"%{country}%"))
-        if city:
-            conditions.append(TravelGuide.city.ilike(f"%{city}%"))
+        location_terms = [term for term in (destination, city, country) if term]
+        if location_terms:
+            location_query = func.plainto_tsquery('simple', location_terms[0])
+            for term in location_terms[1:]:
+                location_query = location_query.op('&&')(func.plainto_tsquery('simple', term))
+            conditions.append(TravelGuide.location_vector.op('@@')(location_query))
+        if query:
+            text_query = func.plainto_tsquery('english', query)
+            conditions.append(TravelGuide.search_vector.op('@@')(text_query))
         if tags:
             # For PostgreSQL ARRAY, check if any of the tags exist in the array
             # Using array overlap operator (&&) to check if arrays have any common elements
@@ -173,25 +244,59 @@ class TravelGuideService:
         if is_official is not None:
             conditions.append(TravelGuide.is_official == is_official)
         
-        query = select(TravelGuide).where(and_(*conditions)).options(
-            selectinload(TravelGuide.author)
+        # Every sort is a single-direction key ending in TravelGuide.id, so
+        # pages are stable and cursors can use a row comparison.
+        if sort_by is None:
+            sort_by = "relevance" if query else "popular"
+        if sort_by == "relevance" and query:
+            sort_keys = [guide_relevance(text_query)]
+        elif sort_by in ("relevance", "popular"):
+            sort_by = "popular"
+            sort_keys = [TravelGuide.popularity_score]
+        elif sort_by == "recent" and status == "published":
+            # Published guides always have published_at (idx_travel_guide_recent)
+            sort_keys = [TravelGuide.published_at]
+        else:
+            sort_by = "newest"
+            sort_keys = [TravelGuide.created_at]
+        sort_keys.append(TravelGuide.id)
+        
+        sort_columns = [key.label(f"sort_key_{i}") for i, key in enumerate(sort_keys)]
+        search_query = (
+            select(TravelGuide, *sort_columns)
+            .where(and_(*conditions))
+            .order_by(*[column.desc() for column in sort_columns])
+            # Responses only carry guide columns
+            .options(raiseload("*"))
         )
         
-        # Sorting
-        if sort_by == "recent":
-            query = query.order_by(desc(TravelGuide.published_at))
-        elif sort_by == "popular":
-            query = query.order_by(
-                desc(TravelGuide.view_count),
-                desc(TravelGuide.like_count)
-            )
+        # Keyset pagination: continue strictly after the cursor's sort key
+        if cursor:
+            try:
+                after = decode_cursor(cursor, sort_by, len(sort_keys))
+            except InvalidCursorError as e:
+                # ``status`` is the guide status filter here
+                raise HTTPException(status_code=400, detail=str(e))
+            search_query = search_query.where(keyset_condition(sort_keys, after, True))
         else:
-            query = query.order_by(desc(TravelGuide.created_at))
-        
-        query = query.offset(skip).limit(limit)
-        
-        result = await db.execute(query)
-        return list(result.scalars().all())
+            search_query = search_query.offset(skip)
+        
+        # One extra row tells us whether there is a next page
+        result = await db.execute(search_query.limit(limit + 1))
+        rows = result.all()
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = None
+        if has_more and rows:
+            next_cursor = encode_cursor(sort_by, list(rows[-1][1:]))
+        
+        return GuideSearchPage(
+            items=[row[0] for row in rows],
+            has_more=has_more,
+            next_cursor=next_cursor,
+            sort_by=sort_by
+        )
     
     @staticmethod
     async def create_story(
@@ -305,8 +410,8 @@ class TravelGuideService:
         # Sorting
         if sort_by == "popular":
             query = query.order_by(
-                desc(UserStory.view_count),
-                desc(UserStory.like_count)
+                desc(UserStory.popularity_score),
+                desc(UserStory.id)
             )
         else:
             query = query.order_by(desc(UserStory.published_at))
@@ -344,13 +449,13 @@ class TravelGuideService:
         
         db.add(bookmark)
         
-        # Update bookmark count
-        guide_result = await db.execute(
-            select(TravelGuide).where(TravelGuide.id == guide_id)
+        # Update bookmark count (atomically, without loading the guide)
+        await db.execute(
+            update(TravelGuide)
+            .where(TravelGuide.id == guide_id)
+            .values(bookmark_count=TravelGuide.bookmark_count + 1, updated_at=TravelGuide.updated_at)
+            .execution_options(synchronize_session=False)
         )
-        guide = guide_result.scalar_one_or_none()
-        if guide:
-            guide.bookmark_count += 1
         
         await db.commit()
         await db.refresh(bookmark)
@@ -384,52 +489,38 @@ class TravelGuideService:
         )
         
         db.add(like)
-        
-        # Update like count
-        guide_result = await db.execute(
-            select(TravelGuide).where(TravelGuide.id == guide_id)
-        )
-        guide = guide_result.scalar_one_or_none()
-        if guide:
-            guide.like_count += 1
-        
         await db.commit()
         await db.refresh(like)
         
+        # Like count is written behind; update the row directly if Redis is down
+        if not await record_engagement(GUIDE, LIKE_COUNT, guide_id):
+            await db.execute(
+                update(TravelGuide)
+                .where(TravelGuide.id == guide_id)
+                .values(like_count=TravelGuide.like_count + 1, updated_at=TravelGuide.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        
         return like
     
     @staticmethod
     async def increment_view_count(
-        db: AsyncSession,
         guide_id: Optional[ID] = None,
-        story_id: Optional[ID] = None,
-        commit: bool = False
+        story_id: Optional[ID] = None
     ) -> None:
-        """Increment view count for a guide or story.
+        """Count a view of a guide or story.
+        
+        Views are buffered in Redis and added to ``view_count`` in batches by
+        the ``travel_guides.flush_engagement_counters`` task, so a page view
+        never locks or writes the row. Views are dropped if Redis is down.
         
         Args:
-            db: Database session
             guide_id: Guide ID to increment view count for
             story_id: Story ID to increment view count for
-            commit: Whether to commit the transaction (default: False, let caller handle commit)
         """
         if guide_id:
-            result = await db.execute(
-                select(TravelGuide).where(TravelGuide.id == guide_id)
-            )
-            guide = result.scalar_one_or_none()
-            if guide:
-                guide.view_count += 1
-                if commit:
-                    await db.commit()
+            await record_engagement(GUIDE, VIEW_COUNT, guide_id)
         
         if story_id:
-            result = await db.execute(
-                select(UserStory).where(UserStory.id == story_id)
-            )
-            story = result.scalar_one_or_none()
-            if story:
-                story.view_count += 1
-                if commit:
-                    await db.commit()
-
+            await record_engagement(STORY, VIEW_COUNT, story_id)
@@ -0,0 +1,30 @@
+"""
+Travel guide background tasks.
+"""
+import asyncio
+import logging
+
+from app.core.celery_app import celery_app
+from app.core.database import AsyncSessionLocal
+from app.infrastructure.cache.redis import close_redis
+from app.modules.travel_guides.engagement import flush_engagement_counters
+
+logger = logging.getLogger(__name__)
+
+
+async def _flush_engagement_counters_async() -> int:
+    """Apply buffered guide/story view and like counts to the database."""
+    try:
+        async with AsyncSessionLocal() as db:
+            updated = await flush_engagement_counters(db)
+            logger.info(f"Engagement counters flushed: {updated} rows updated")
+            return updated
+    finally:
+        # The shared client is bound to this task's event loop
+        await close_redis()
+
+
+@celery_app.task(name="travel_guides.flush_engagement_counters")
+def flush_travel_guide_engagement():
+    """Flush write-behind engagement counters (Celery periodic task)."""
+    return asyncio.run(_flush_engagement_counters_async())
@@ -96,7 +96,7 @@ class User(BaseModel):
     user_metadata = Column("metadata", JSONB, default=dict, nullable=True)
     
     # Relationships - Existing
-    listings = relationship("Listing", foreign_keys="Listing.host_id", back_populates="host", lazy="selectin")
+    listings = relationship("Listing", foreign_keys="Listing.host_id", back_populates="host", lazy="raise_on_sql")
     bookings_as_guest = relationship("Booking", foreign_keys="Booking.guest_id", back_populates="guest", lazy="selectin")
     reviews_as_guest = relationship("Review", foreign_keys="Review.guest_id", back_populates="guest", lazy="selectin")
     reviews_as_host = relationship("Review", foreign_keys="Review.host_id", back_populates="host", lazy="selectin")
@@ -164,7 +164,7 @@ class Agency(BaseModel):
     
     # Relationships
     users = relationship("User", back_populates="agency", lazy="selectin")
-    listings = relationship("Listing", foreign_keys="Listing.agency_id", back_populates="agency", lazy="selectin")
+    listings = relationship("Listing", foreign_keys="Listing.agency_id", back_populates="agency", lazy="raise_on_sql")
 
 
 class UserVerification(BaseModel):
@@ -334,7 +334,7 @@ class HostProfile(BaseModel):
     user = relationship("User", back_populates="host_profile", uselist=False, lazy="selectin")
     tax_documents = relationship("TaxDocument", back_populates="host", cascade="all, delete-orphan", lazy="selectin")
     co_hosts = relationship("CoHost", back_populates="host", cascade="all, delete-orphan", lazy="selectin")
-    listings = relationship("Listing", foreign_keys="Listing.host_profile_id", back_populates="host_profile", lazy="selectin")
+    listings = relationship("Listing", foreign_keys="Listing.host_profile_id", back_populates="host_profile", lazy="raise_on_sql")
     payouts = relationship("Payout", back_populates="host_profile", lazy="selectin")
     review_responses = relationship("ReviewResponse", back_populates="host", lazy="selectin")
     
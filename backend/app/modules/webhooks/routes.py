@@ -283,10 +283,21 @@ async def handle_payment_intent_succeeded(
     # Update booking (within locked transaction)
     booking.payment_status = PaymentStatus.COMPLETED
     booking.payment_intent_id = payment_intent_id
+    previous_status = booking.status
     booking.status = BookingStatus.CONFIRMED
     
+    from app.modules.listings.popularity_service import ListingPopularityService
+    from app.modules.listings.availability_service import ListingAvailabilityService
+    await ListingPopularityService.apply_booking_transition(
+        db, booking.listing_id, previous_status, BookingStatus.CONFIRMED.value
+    )
+    
     try:
         await db.flush()  # Flush to check for constraint violations
+        # Rebuilds the bitmap from the flushed booking row
+        await ListingAvailabilityService.apply_booking_transition(
+            db, booking.listing_id, previous_status, BookingStatus.CONFIRMED.value
+        )
     except IntegrityError as e:
         # Handle duplicate payment_intent_id (shouldn't happen with lock, but safety net)
         await db.rollback()
@@ -15,6 +15,7 @@ from app.core.dependencies import (
 from app.repositories.unit_of_work import IUnitOfWork
 from app.modules.users.models import User
 from app.modules.wishlist.models import Wishlist, WishlistShare
+from app.modules.listings.load_profiles import CARD, listing_load_options
 from app.modules.wishlist.schemas import (
     WishlistItemCreate,
     WishlistItemResponse,
@@ -74,8 +75,7 @@ async def add_to_wishlist(
         select(Wishlist)
         .where(Wishlist.id == wishlist_item.id)
         .options(
-            selectinload(Wishlist.listing).selectinload("images"),
-            selectinload(Wishlist.listing).selectinload("photos"),
+            selectinload(Wishlist.listing).options(*listing_load_options(CARD)),
         )
     )
     wishlist_item = result.scalar_one()
@@ -210,8 +210,7 @@ async def get_shared_wishlist_by_token(
         select(Wishlist)
         .where(Wishlist.id == share.wishlist_id)
         .options(
-            selectinload(Wishlist.listing).selectinload("images"),
-            selectinload(Wishlist.listing).selectinload("photos"),
+            selectinload(Wishlist.listing).options(*listing_load_options(CARD)),
         )
     )
     wishlist_item = result.scalar_one_or_none()
@@ -13,7 +13,7 @@ from app.repositories.unit_of_work import IUnitOfWork
 from app.modules.wishlist.models import Wishlist, WishlistShare
 from app.modules.wishlist.schemas import WishlistItemCreate, WishlistShareCreate
 from app.modules.users.models import User
-from app.modules.listings.models import Listing
+from app.modules.listings.load_profiles import CARD, listing_load_options
 from app.core.id import ID
 
 
@@ -110,9 +110,7 @@ class WishlistService:
             select(Wishlist)
             .where(Wishlist.user_id == user_id)
             .options(
-                selectinload(Wishlist.listing).selectinload(Listing.images),
-                selectinload(Wishlist.listing).selectinload(Listing.photos),
-                selectinload(Wishlist.listing).selectinload(Listing.host)
+                selectinload(Wishlist.listing).options(*listing_load_options(CARD))
             )
             .offset(skip)
             .limit(limit)
@@ -4,14 +4,42 @@ Listing Repository
 from typing import Optional, List, Dict, Any
 from sqlalchemy import select, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 from datetime import datetime
 
 from app.repositories.base import BaseRepository
 from app.domain.entities.listing import ListingEntity
 from app.modules.listings.models import Listing, ListingStatus, ListingType
+from app.modules.listings.load_profiles import BOOKING_CHECK, listing_load_options
+from app.shared.pagination import decode_cursor, encode_cursor, keyset_condition
 from app.core.id import ID
 
+# Listing feeds are ordered newest first; cursors encode (created_at, id)
+FEED_SORT = "newest"
+
+
+def listing_feed_cursor(listings: List[ListingEntity], limit: int) -> Optional[str]:
+    """Cursor for the feed page after ``listings`` (None when the page wasn't full)."""
+    if not listings or len(listings) < limit:
+        return None
+    last = listings[-1]
+    return encode_cursor(FEED_SORT, [last.created_at, last.id])
+
+
+def _apply_feed_page(query, skip: int, limit: int, cursor: Optional[str]):
+    """Order a listing query newest first and page it by cursor (or legacy offset).
+    
+    Raises:
+        InvalidCursorError: if ``cursor`` is malformed.
+    """
+    if cursor:
+        created_at, listing_id = decode_cursor(cursor, FEED_SORT, 2)
+        query = query.where(keyset_condition(
+            [Listing.created_at, Listing.id], [created_at, listing_id], descending=True
+        ))
+    else:
+        query = query.offset(skip)
+    return query.order_by(Listing.created_at.desc(), Listing.id.desc()).limit(limit)
+
 
 class IListingRepository:
     """Listing repository interface"""
@@ -28,7 +56,8 @@ class IListingRepository:
         self,
         skip: int = 0,
         limit: int = 100,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None
     ) -> List[ListingEntity]:
         """Get all listings with filters"""
         pass
@@ -44,12 +73,19 @@ class IListingRepository:
         min_guests: Optional[int] = None,
         status: Optional[str] = None,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        cursor: Optional[str] = None
     ) -> tuple[List[ListingEntity], int]:
         """Search listings"""
         pass
     
-    async def get_by_host(self, host_id: ID, skip: int = 0, limit: int = 100) -> List[ListingEntity]:
+    async def get_by_host(
+        self,
+        host_id: ID,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[ListingEntity]:
         """Get listings by host"""
         pass
     
@@ -79,7 +115,11 @@ class ListingRepository(BaseRepository[ListingEntity], IListingRepository):
             id: Listing ID
             with_lock: If True, use SELECT FOR UPDATE NOWAIT to lock the row (prevents double-booking)
         """
-        query = select(Listing).where(Listing.id == id)
+        # Entities are built from columns only; never load relationships
+        # while the row may be locked
+        query = select(Listing).where(Listing.id == id).options(
+            *listing_load_options(BOOKING_CHECK)
+        )
         
         if with_lock:
             query = query.with_for_update(nowait=True)
@@ -146,9 +186,10 @@ class ListingRepository(BaseRepository[ListingEntity], IListingRepository):
         self,
         skip: int = 0,
         limit: int = 100,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        cursor: Optional[str] = None
     ) -> List[ListingEntity]:
-        """Get all listings with filters"""
+        """Get all listings with filters, newest first (keyset paged when ``cursor`` is given)"""
         query = select(Listing)
         
         if filters:
@@ -161,12 +202,7 @@ class ListingRepository(BaseRepository[ListingEntity], IListingRepository):
             if filters.get("country"):
                 query = query.where(Listing.country == filters["country"])
         
-        query = query.options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.host_profile)
-        ).offset(skip).limit(limit).order_by(Listing.created_at.desc())
+        query = _apply_feed_page(query, skip, limit, cursor)
         
         result = await self.db.execute(query)
         models = result.scalars().all()
@@ -183,9 +219,10 @@ class ListingRepository(BaseRepository[ListingEntity], IListingRepository):
         min_guests: Optional[int] = None,
         status: Optional[str] = None,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        cursor: Optional[str] = None
     ) -> tuple[List[ListingEntity], int]:
-        """Search listings"""
+        """Search listings, newest first (keyset paged when ``cursor`` is given)"""
         search_query = select(Listing)
         
         if status:
@@ -222,23 +259,24 @@ class ListingRepository(BaseRepository[ListingEntity], IListingRepository):
         total = total_result.scalar()
         
         # Get paginated results
-        search_query = search_query.options(
-            selectinload(Listing.photos),
-            selectinload(Listing.images),
-            selectinload(Listing.host),
-            selectinload(Listing.host_profile)
-        ).offset(skip).limit(limit).order_by(Listing.created_at.desc())
+        search_query = _apply_feed_page(search_query, skip, limit, cursor)
         
         result = await self.db.execute(search_query)
         models = result.scalars().all()
         
         return [self._model_to_entity(model) for model in models], total
     
-    async def get_by_host(self, host_id: ID, skip: int = 0, limit: int = 100) -> List[ListingEntity]:
-        """Get listings by host"""
-        query = select(Listing).where(
-            Listing.host_id == host_id
-        ).offset(skip).limit(limit).order_by(Listing.created_at.desc())
+    async def get_by_host(
+        self,
+        host_id: ID,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[ListingEntity]:
+        """Get listings by host, newest first (keyset paged when ``cursor`` is given)"""
+        query = _apply_feed_page(
+            select(Listing).where(Listing.host_id == host_id), skip, limit, cursor
+        )
         
         result = await self.db.execute(query)
         models = result.scalars().all()
@@ -0,0 +1,82 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque, URL-safe tokens encoding the sort name and the sort key
+values of the last row on a page (always ending with the row id). The next
+page is fetched with a row-value comparison on those keys, which PostgreSQL
+serves as an index range scan instead of walking and discarding OFFSET rows.
+"""
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Sequence
+
+from sqlalchemy import literal, tuple_
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is malformed or was issued for another sort."""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {"d": str(value)}
+    if isinstance(value, datetime):
+        return {"t": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "d" in value:
+            return Decimal(value["d"])
+        if "t" in value:
+            return datetime.fromisoformat(value["t"])
+        raise InvalidCursorError("Invalid cursor value")
+    return value
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    """Encode sort key values into an opaque cursor token."""
+    payload = json.dumps(
+        {"s": sort, "k": [_encode_value(v) for v in values]},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, size: int) -> List[Any]:
+    """Decode a cursor token into sort key values.
+
+    Raises:
+        InvalidCursorError: if the token is malformed, was issued for a
+            different sort, or doesn't carry ``size`` key values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_decode_value(v) for v in payload["k"]]
+        cursor_sort = payload["s"]
+    except InvalidCursorError:
+        raise
+    except Exception as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+    if cursor_sort != sort:
+        raise InvalidCursorError(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+    if len(values) != size:
+        raise InvalidCursorError("Invalid cursor")
+    return values
+
+
+def keyset_condition(keys: Sequence[Any], values: Sequence[Any], descending: bool):
+    """Row-value condition selecting rows strictly after ``values`` in key order.
+
+    All keys must share one direction so the comparison can use a composite index.
+    """
+    row = tuple_(*keys)
+    # Bind each value with its key's type (e.g. timezone-aware timestamps)
+    bound = tuple_(*[literal(value, key.type) for key, value in zip(keys, values)])
+    return row < bound if descending else row > bound
+
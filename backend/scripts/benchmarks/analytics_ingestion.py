@@ -0,0 +1,134 @@
+"""
+Analytics ingestion benchmark: per-event transactions vs buffered COPY batches.
+
+Creates TEMP ``analytics_events``/``users`` tables (cloned from the real ones,
+shadowing them for this session only), then measures events/sec for:
+
+* legacy:   ``db.add`` + ``commit`` + ``refresh`` per event (the old
+            ``AnalyticsService.track_event``)
+* enqueue:  producer-side cost of buffering an event (what a request now pays)
+* buffered: enqueue plus flushing every batch with ``COPY`` through the
+            staging table, i.e. end-to-end ingestion throughput
+
+Connects to ``BENCHMARK_DATABASE_URL`` (else the app's ``DATABASE_URL``).
+Timings depend on the machine and the PostgreSQL version and settings, so
+report them together with those.
+
+Usage:
+    python -m scripts.benchmarks.analytics_ingestion
+    python -m scripts.benchmarks.analytics_ingestion --events 1000,20000 --batch-size 2000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from scripts.benchmarks.common import get_dsn, print_table
+import app.core.models  # noqa: F401  (registers all mappers)
+from app.core.id import generate_typed_id
+from app.modules.analytics.ingestion import AnalyticsEventBuffer, copy_analytics_events, serialize_payload
+from app.modules.analytics.models import AnalyticsEvent
+
+CREATE_TABLES_SQL = [
+    "CREATE TEMP TABLE users (LIKE public.users INCLUDING ALL)",
+    "CREATE TEMP TABLE analytics_events (LIKE public.analytics_events INCLUDING ALL)",
+]
+
+PAYLOAD = {"booking_id": "BOOK_abc123", "old_status": "pending", "new_status": "confirmed"}
+
+
+def make_record(i: int):
+    return (
+        generate_typed_id("ANAL"),
+        None,
+        "booking_status_changed",
+        "api",
+        serialize_payload({**PAYLOAD, "seq": i}),
+        datetime.now(timezone.utc),
+    )
+
+
+async def legacy_ingest(db: AsyncSession, count: int) -> None:
+    for i in range(count):
+        event = AnalyticsEvent(
+            user_id=None,
+            event_name="booking_status_changed",
+            source="api",
+            payload={**PAYLOAD, "seq": i}
+        )
+        db.add(event)
+        await db.commit()
+        await db.refresh(event)
+
+
+async def run(event_counts, batch_size: int, legacy_max: int) -> None:
+    engine = create_async_engine(get_dsn().replace("postgresql://", "postgresql+asyncpg://", 1))
+    rows = []
+    try:
+        async with engine.connect() as conn:
+            for sql in CREATE_TABLES_SQL:
+                await conn.exec_driver_sql(sql)
+            await conn.commit()
+            raw = await conn.get_raw_connection()
+            pg = raw.driver_connection
+
+            for count in event_counts:
+                await pg.execute("TRUNCATE analytics_events")
+
+                legacy_rate = None
+                if count <= legacy_max:
+                    db = AsyncSession(bind=conn, expire_on_commit=False)
+                    start = time.perf_counter()
+                    await legacy_ingest(db, count)
+                    legacy_rate = count / (time.perf_counter() - start)
+                    await db.close()
+                    await conn.commit()
+                    await pg.execute("TRUNCATE analytics_events")
+
+                buffer = AnalyticsEventBuffer(
+                    writer=lambda records: copy_analytics_events(pg, records),
+                    max_events=count + 1,
+                    batch_size=batch_size,
+                    flush_interval=3600,
+                )
+                records = [make_record(i) for i in range(count)]
+                start = time.perf_counter()
+                for record in records:
+                    await buffer.put(record)
+                enqueue_seconds = time.perf_counter() - start
+                while len(buffer):
+                    await buffer.flush()
+                buffered_seconds = time.perf_counter() - start
+                await buffer.stop()
+
+                stored = await pg.fetchval("SELECT count(*) FROM analytics_events")
+                rows.append({
+                    "events": count,
+                    "legacy_events_per_s": legacy_rate if legacy_rate is not None else "skipped",
+                    "enqueue_events_per_s": count / enqueue_seconds,
+                    "buffered_events_per_s": count / buffered_seconds,
+                    "speedup": (count / buffered_seconds) / legacy_rate if legacy_rate else "n/a",
+                    "rows_stored": stored,
+                })
+    finally:
+        await engine.dispose()
+
+    print_table(f"Analytics ingestion throughput (batch_size={batch_size})", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analytics event ingestion")
+    parser.add_argument("--events", default="1000,10000,100000", help="Comma-separated event counts")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Events per COPY batch")
+    parser.add_argument("--legacy-max", type=int, default=10000,
+                        help="Skip the per-event path above this many events")
+    args = parser.parse_args()
+
+    counts = [int(c) for c in args.events.split(",") if c.strip()]
+    asyncio.run(run(counts, args.batch_size, args.legacy_max))
+
+
+if __name__ == "__main__":
+    main()
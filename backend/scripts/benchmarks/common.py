@@ -0,0 +1,91 @@
+"""
+Shared helpers for benchmark scripts.
+
+Benchmarks talk to PostgreSQL directly through asyncpg and only ever create
+TEMP tables, so they are safe to point at a development database.
+"""
+import os
+import sys
+import time
+import statistics
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+def get_dsn() -> str:
+    """Return a plain libpq DSN (asyncpg does not understand ``+asyncpg``)."""
+    dsn = os.getenv("BENCHMARK_DATABASE_URL") or str(settings.database_url)
+    return dsn.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+async def connect():
+    """Open a dedicated asyncpg connection for a benchmark run."""
+    import asyncpg
+    return await asyncpg.connect(get_dsn())
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (pct in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Summarize latency samples (milliseconds)."""
+    return {
+        "p50": percentile(samples_ms, 50),
+        "p95": percentile(samples_ms, 95),
+        "p99": percentile(samples_ms, 99),
+        "mean": statistics.fmean(samples_ms) if samples_ms else 0.0,
+    }
+
+
+async def time_async(fn: Callable[[], Awaitable[object]], runs: int = 20, warmup: int = 3) -> Dict[str, float]:
+    """Time an async callable ``runs`` times after ``warmup`` untimed calls."""
+    for _ in range(warmup):
+        await fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def time_sync(fn: Callable[[], object], runs: int = 20, warmup: int = 3) -> Dict[str, float]:
+    """Time a synchronous callable ``runs`` times after ``warmup`` untimed calls."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def print_table(title: str, rows: List[Dict[str, object]]) -> None:
+    """Print benchmark rows as an aligned text table."""
+    print(f"\n{title}")
+    if not rows:
+        print("  (no results)")
+        return
+    columns = list(rows[0].keys())
+    formatted = [
+        [f"{row[c]:.3f}" if isinstance(row[c], float) else str(row[c]) for c in columns]
+        for row in rows
+    ]
+    widths = [max(len(c), *(len(r[i]) for r in formatted)) for i, c in enumerate(columns)]
+    print("  " + "  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in formatted:
+        print("  " + "  ".join(v.ljust(w) for v, w in zip(r, widths)))
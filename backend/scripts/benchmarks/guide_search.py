@@ -0,0 +1,218 @@
+"""
+Travel guide search benchmark: ILIKE / unindexed array filters with OFFSET
+paging vs tsvector + GIN filters with keyset paging.
+
+Builds a TEMP copy of the travel guide search columns, times the query shapes
+``TravelGuideService.get_guides`` used before the guide search indexes, then
+adds the GIN indexes and times the shapes ``TravelGuideService.search_guides``
+issues now.
+
+Connects to ``BENCHMARK_DATABASE_URL`` (else the app's ``DATABASE_URL``).
+Timings depend on the machine and the PostgreSQL version and settings, so
+report them together with those.
+
+Usage:
+    python -m scripts.benchmarks.guide_search
+    python -m scripts.benchmarks.guide_search --size 100000 --runs 30 --page-depth 5000
+"""
+import argparse
+import asyncio
+
+from scripts.benchmarks.common import connect, time_async, print_table
+
+CITIES = [
+    "Lisbon", "Porto", "Paris", "Lyon", "Nice", "Tokyo", "Kyoto", "Osaka", "Cairo", "Luxor",
+    "Dubai", "Riyadh", "Jeddah", "Nairobi", "Mombasa", "Rome", "Milan", "Venice", "Madrid", "Seville",
+    "Berlin", "Munich", "Vienna", "Prague", "Athens", "Istanbul", "Marrakesh", "Fez", "Tunis", "Amman",
+    "Bangkok", "Hanoi", "Bali", "Sydney", "Auckland", "Lima", "Cusco", "Bogota", "Havana", "Miami",
+]
+AREAS = ["Old Town", "Harbour", "Hills", "Riverside", "Market", "Coast", "Valley", "Centre", "Gardens", "Islands"]
+COUNTRIES = ["Portugal", "France", "Japan", "Egypt", "UAE", "Saudi Arabia", "Kenya", "Italy", "Spain", "Germany"]
+TAGS = [
+    "food", "beach", "hiking", "museums", "nightlife", "budget", "luxury", "family", "romantic", "history",
+    "architecture", "markets", "wine", "coffee", "street-food", "festivals", "diving", "photography", "spa", "shopping",
+]
+CATEGORIES = ["adventure", "culture", "food", "nature", "city", "relaxation", "sports", "history"]
+WORDS = ["guide", "weekend", "hidden", "best", "local", "walking", "tour", "cheap", "eats", "views", "sunset", "days"]
+
+CREATE_TABLE_SQL = """
+CREATE TEMP TABLE bench_guides (
+    id bigint PRIMARY KEY,
+    title text NOT NULL,
+    summary text,
+    destination text NOT NULL,
+    city text,
+    country text NOT NULL,
+    tags varchar[] NOT NULL,
+    categories varchar[] NOT NULL,
+    status text NOT NULL,
+    view_count integer NOT NULL,
+    like_count integer NOT NULL,
+    popularity_score integer GENERATED ALWAYS AS (view_count + 10 * like_count) STORED,
+    location_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(destination, '') || ' ' || coalesce(city, '') || ' ' || coalesce(country, ''))
+    ) STORED,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(destination, '') || ' ' || coalesce(city, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(country, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'C')
+    ) STORED
+)
+"""
+
+# Seeded random() keeps runs comparable while avoiding correlated columns
+POPULATE_SQL = """
+INSERT INTO bench_guides (id, title, summary, destination, city, country, tags, categories, status, view_count, like_count)
+SELECT
+    g,
+    w[1 + floor(random() * cardinality(w))::int] || ' ' || w[1 + floor(random() * cardinality(w))::int]
+        || ' in ' || c[1 + city_i],
+    w[1 + floor(random() * cardinality(w))::int] || ' ' || w[1 + floor(random() * cardinality(w))::int] || ' and '
+        || t[1 + floor(random() * cardinality(t))::int] || ' ' || w[1 + floor(random() * cardinality(w))::int],
+    c[1 + city_i] || ' ' || a[1 + floor(random() * cardinality(a))::int],
+    c[1 + city_i],
+    k[1 + city_i % cardinality(k)],
+    ARRAY[t[1 + floor(random() * cardinality(t))::int], t[1 + floor(random() * cardinality(t))::int]],
+    ARRAY[cat[1 + floor(random() * cardinality(cat))::int]],
+    CASE WHEN random() < 0.1 THEN 'draft' ELSE 'published' END,
+    floor(random() * 5000)::int,
+    floor(random() * 200)::int
+FROM (SELECT g, floor(random() * $8)::int AS city_i FROM generate_series(1, $1) AS g) AS rows,
+     (SELECT $2::text[] AS c, $3::text[] AS a, $4::text[] AS k, $5::text[] AS t,
+             $6::text[] AS cat, $7::text[] AS w) AS vocab
+"""
+
+# Indexes that existed before guide search (tags GIN, popularity keyset btree)
+LEGACY_INDEXES_SQL = [
+    "CREATE INDEX bench_guides_tags ON bench_guides USING gin (tags)",
+    "CREATE INDEX bench_guides_popular ON bench_guides (status, popularity_score, id)",
+]
+SEARCH_INDEXES_SQL = [
+    "CREATE INDEX bench_guides_categories ON bench_guides USING gin (categories)",
+    "CREATE INDEX bench_guides_location ON bench_guides USING gin (location_vector)",
+    "CREATE INDEX bench_guides_search ON bench_guides USING gin (search_vector)",
+]
+
+LEGACY_DESTINATION = """
+SELECT id FROM bench_guides
+WHERE status = 'published' AND destination ILIKE '%' || $1 || '%'
+ORDER BY popularity_score DESC, id DESC OFFSET $2 LIMIT 21
+"""
+INDEXED_DESTINATION = """
+SELECT id FROM bench_guides
+WHERE status = 'published' AND location_vector @@ plainto_tsquery('simple', $1)
+ORDER BY popularity_score DESC, id DESC LIMIT 21
+"""
+
+LEGACY_CATEGORY_TAGS = """
+SELECT id FROM bench_guides
+WHERE status = 'published' AND categories @> ARRAY[$1]::varchar[] AND tags && $2::varchar[]
+ORDER BY popularity_score DESC, id DESC OFFSET $3 LIMIT 21
+"""
+INDEXED_CATEGORY_TAGS = """
+SELECT id FROM bench_guides
+WHERE status = 'published' AND categories @> ARRAY[$1]::varchar[] AND tags && $2::varchar[]
+ORDER BY popularity_score DESC, id DESC LIMIT 21
+"""
+
+INDEXED_TEXT = """
+SELECT id, ts_rank(search_vector, plainto_tsquery('english', $1))
+           * (1.0 + 0.2 * ln(1.0 + greatest(popularity_score, 0))) AS relevance
+FROM bench_guides
+WHERE status = 'published' AND search_vector @@ plainto_tsquery('english', $1)
+ORDER BY relevance DESC, id DESC LIMIT 21
+"""
+
+# Keyset continuation of the popularity-ordered queries from a given row
+KEYSET_SUFFIX = "AND (popularity_score, id) < ($%d, $%d)\n"
+
+
+def keyset(query: str, first_param: int) -> str:
+    """Add a ``(popularity_score, id) < cursor`` condition to a popularity-ordered query."""
+    head, order = query.split("ORDER BY")
+    return head + KEYSET_SUFFIX % (first_param, first_param + 1) + "ORDER BY" + order
+
+
+async def cursor_at(conn, query: str, args, depth: int):
+    """Sort key of the row just before ``depth`` (what a client's cursor would carry)."""
+    head, order = query.split("ORDER BY")
+    probe = head.replace("SELECT id", "SELECT popularity_score, id", 1) + "ORDER BY" + order.replace(
+        "LIMIT 21", "OFFSET %d LIMIT 1" % (depth - 1)
+    )
+    row = await conn.fetchrow(probe, *args)
+    return (row["popularity_score"], row["id"]) if row else (0, 0)
+
+
+async def run(size: int, runs: int, depth: int, destination: str, category: str, tags, text: str) -> None:
+    conn = await connect()
+    rows = []
+    try:
+        await conn.execute("DROP TABLE IF EXISTS bench_guides")
+        await conn.execute(CREATE_TABLE_SQL)
+        await conn.execute("SELECT setseed(0.42)")
+        await conn.execute(POPULATE_SQL, size, CITIES, AREAS, COUNTRIES, TAGS, CATEGORIES, WORDS, len(CITIES))
+        for sql in LEGACY_INDEXES_SQL:
+            await conn.execute(sql)
+        await conn.execute("ANALYZE bench_guides")
+
+        scenarios = [
+            ("destination", LEGACY_DESTINATION, INDEXED_DESTINATION, (destination,)),
+            ("category+tags", LEGACY_CATEGORY_TAGS, INDEXED_CATEGORY_TAGS, (category, tags)),
+            # No legacy equivalent: get_guides had no free-text query
+            ("text", None, INDEXED_TEXT, (text,)),
+        ]
+        legacy = {}
+        for name, legacy_sql, _, args in scenarios:
+            if legacy_sql is None:
+                continue
+            first = await time_async(lambda: conn.fetch(legacy_sql, *args, 0), runs=runs)
+            deep = await time_async(lambda: conn.fetch(legacy_sql, *args, depth), runs=runs)
+            legacy[name] = (first, deep)
+
+        for sql in SEARCH_INDEXES_SQL:
+            await conn.execute(sql)
+        await conn.execute("ANALYZE bench_guides")
+
+        for name, _, indexed_sql, args in scenarios:
+            first = await time_async(lambda: conn.fetch(indexed_sql, *args), runs=runs)
+            if "ORDER BY popularity_score" in indexed_sql:
+                after = await cursor_at(conn, indexed_sql, args, depth)
+                deep_sql = keyset(indexed_sql, len(args) + 1)
+                deep = await time_async(lambda: conn.fetch(deep_sql, *args, *after), runs=runs)
+                deep_p50 = deep["p50"]
+            else:
+                deep_p50 = None
+            legacy_first, legacy_deep = legacy.get(name, (None, None))
+            rows.append({
+                "scenario": name,
+                "legacy_p50_ms": legacy_first["p50"] if legacy_first else "-",
+                "indexed_p50_ms": first["p50"],
+                "indexed_p95_ms": first["p95"],
+                f"legacy_offset_{depth}_p50_ms": legacy_deep["p50"] if legacy_deep else "-",
+                f"keyset_{depth}_p50_ms": deep_p50 if deep_p50 is not None else "-",
+                "speedup_p50": legacy_first["p50"] / first["p50"] if legacy_first and first["p50"] else "-",
+            })
+    finally:
+        await conn.close()
+
+    print_table(f"Travel guide search latency ({size} guides, runs={runs})", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark travel guide search")
+    parser.add_argument("--size", type=int, default=500000, help="Number of guides")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--page-depth", type=int, default=1000, help="Row offset for the deep-page comparison")
+    parser.add_argument("--destination", default="kyoto gardens", help="Destination filter")
+    parser.add_argument("--category", default="nature", help="Category filter")
+    parser.add_argument("--tags", default="diving,wine", help="Comma-separated tags filter")
+    parser.add_argument("--text", default="kyoto sunset diving", help="Full-text query")
+    args = parser.parse_args()
+
+    tags = [t for t in args.tags.split(",") if t.strip()]
+    asyncio.run(run(args.size, args.runs, args.page_depth, args.destination, args.category, tags, args.text))
+
+
+if __name__ == "__main__":
+    main()
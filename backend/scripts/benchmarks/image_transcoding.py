@@ -0,0 +1,135 @@
+"""
+Image transcoding benchmark: inline Pillow conversion vs the off-loop pipeline.
+
+Generates synthetic camera-sized JPEGs, then reports:
+
+1. Throughput (photos/sec per core): the legacy ``CDNService.convert_to_webp``
+   + ``convert_to_avif`` calls vs ``transcode_image`` producing every
+   responsive size and format from one decode.
+2. API latency under concurrent uploads: a probe coroutine issues a trivial
+   "request" every few milliseconds while uploads are processed either inline
+   on the event loop (legacy) or in the transcode process pool. The probe's
+   p50/p99 latency is what every other request on that worker would see.
+
+No database or network is needed.
+
+Usage:
+    python -m scripts.benchmarks.image_transcoding
+    python -m scripts.benchmarks.image_transcoding --photos 16 --size 4000x3000 --uploads 8
+"""
+import argparse
+import asyncio
+import os
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from scripts.benchmarks.common import summarize, print_table
+from app.infrastructure.storage.cdn import CDNService
+from app.infrastructure.storage.image_transcoding import (
+    get_transcode_executor, run_in_transcode_pool, shutdown_transcode_executor, transcode_image
+)
+
+PROBE_INTERVAL_SECONDS = 0.005
+
+
+def make_photo(width: int, height: int, seed: int) -> bytes:
+    """A JPEG with gradients and sensor-like noise (compresses like a real photo)."""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40 + seed % 20)
+    img = Image.merge("RGB", (gradient, noise, gradient.rotate(90, expand=False)))
+    output = BytesIO()
+    img.save(output, format="JPEG", quality=90)
+    return output.getvalue()
+
+
+def legacy_convert(image_data: bytes) -> None:
+    CDNService.convert_to_webp(image_data)
+    CDNService.convert_to_avif(image_data)
+
+
+def throughput(fn, photos) -> float:
+    start = time.perf_counter()
+    for photo in photos:
+        fn(photo)
+    return len(photos) / (time.perf_counter() - start)
+
+
+async def probe_latency(stop: asyncio.Event, samples: list) -> None:
+    """Measure how late a trivial request gets to run on the event loop."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        scheduled = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+        samples.append((loop.time() - scheduled - PROBE_INTERVAL_SECONDS) * 1000)
+
+
+async def upload_inline(photo: bytes) -> None:
+    # Legacy: conversion runs on the event loop
+    legacy_convert(photo)
+    await asyncio.sleep(0)
+
+
+async def upload_offloaded(photo: bytes) -> None:
+    await run_in_transcode_pool(transcode_image, photo)
+
+
+async def latency_under_uploads(upload, photos, concurrency: int) -> dict:
+    stop = asyncio.Event()
+    samples = []
+    probe = asyncio.create_task(probe_latency(stop, samples))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(photo):
+        async with semaphore:
+            await upload(photo)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(photo) for photo in photos))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    stats = summarize(samples)
+    return {"photos_per_s": len(photos) / elapsed, "probe_p50_ms": stats["p50"], "probe_p99_ms": stats["p99"]}
+
+
+async def run(photo_count: int, width: int, height: int, uploads: int) -> None:
+    photos = [make_photo(width, height, seed) for seed in range(photo_count)]
+    cores = os.cpu_count() or 1
+
+    rows = [
+        {"path": "legacy webp+avif (full size only)", "photos_per_s_per_core": throughput(legacy_convert, photos)},
+        {"path": "transcode_image (4 sizes x all formats)", "photos_per_s_per_core": throughput(transcode_image, photos)},
+    ]
+    print_table(f"Transcoding throughput, one core ({width}x{height}, {photo_count} photos)", rows)
+
+    # Warm the pool so process start-up isn't measured
+    get_transcode_executor()
+    await run_in_transcode_pool(transcode_image, photos[0])
+    try:
+        rows = []
+        for name, upload in (("inline on event loop", upload_inline), ("process pool", upload_offloaded)):
+            result = await latency_under_uploads(upload, photos, uploads)
+            rows.append({"path": name, **result})
+        print_table(
+            f"Concurrent uploads ({uploads} in flight, {cores} cores): throughput and probe request latency",
+            rows
+        )
+    finally:
+        shutdown_transcode_executor()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image transcoding")
+    parser.add_argument("--photos", type=int, default=8, help="Number of synthetic photos")
+    parser.add_argument("--size", default="4000x3000", help="Photo size WIDTHxHEIGHT")
+    parser.add_argument("--uploads", type=int, default=4, help="Concurrent uploads in flight")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    asyncio.run(run(args.photos, width, height, args.uploads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Recommendation scoring benchmark: per-candidate queries vs bulk NumPy scoring.
+
+Creates a TEMP ``bookings`` table (it shadows the real one for this session
+only) with synthetic guests/bookings, then times the legacy hybrid scoring
+loop (two collaborative queries per candidate, scalar Python scoring) against
+``MLRecommendationEngine._hybrid_scoring`` for growing candidate sets.
+
+Connects to ``BENCHMARK_DATABASE_URL`` (else the app's ``DATABASE_URL``).
+Timings depend on the machine and the PostgreSQL version and settings, so
+report them together with those.
+
+Usage:
+    python -m scripts.benchmarks.recommendation_scoring
+    python -m scripts.benchmarks.recommendation_scoring --candidates 50,200,1000 --runs 10
+"""
+import argparse
+import asyncio
+import math
+import random
+from decimal import Decimal
+from types import SimpleNamespace
+
+from sqlalchemy import and_, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from scripts.benchmarks.common import get_dsn, time_async, print_table
+import app.core.models  # noqa: F401  (registers all mappers)
+from app.modules.bookings.models import Booking, BookingStatus
+from app.modules.recommendations.ml_service import MLRecommendationEngine
+
+CREATE_TABLE_SQL = """
+CREATE TEMP TABLE bookings (
+    id text PRIMARY KEY,
+    listing_id text NOT NULL,
+    guest_id text NOT NULL,
+    status text NOT NULL
+)
+"""
+
+POPULATE_SQL = text("""
+INSERT INTO bookings (id, listing_id, guest_id, status)
+SELECT
+    'BOOK_' || g,
+    'LIST_' || (1 + (g::bigint * 7919) % :listings),
+    'USER_' || (1 + (g::bigint * 104729) % :guests),
+    CASE WHEN g % 4 = 0 THEN 'cancelled' WHEN g % 3 = 0 THEN 'completed' ELSE 'confirmed' END
+FROM generate_series(1, :bookings) AS g
+""")
+
+USER_ID = "USER_1"
+USER_FEATURES = {
+    "preferred_types": [{"type": "villa", "count": 3}],
+    "preferred_locations": [{"city": "Paris", "country": "France", "count": 2}],
+    "avg_price": 200.0,
+    "min_price": 150.0,
+    "max_price": 250.0,
+}
+
+
+def make_candidates(count: int):
+    rng = random.Random(42)
+    return [
+        SimpleNamespace(
+            id=f"LIST_{i + 1}",
+            listing_type=rng.choice(["villa", "house", "room", "cabin"]),
+            city=rng.choice(["Paris", "Lyon", "Miami", "Oslo"]),
+            country=rng.choice(["France", "USA", "Norway"]),
+            rating=Decimal(str(round(rng.uniform(3.5, 5.0), 2))),
+            review_count=rng.randint(0, 500),
+            base_price=Decimal(str(rng.randint(50, 600))),
+        )
+        for i in range(count)
+    ]
+
+
+# --- Legacy path (pre-vectorization), kept here for comparison only ---------
+
+async def legacy_collaborative_score(db: AsyncSession, user_id, listing_id) -> float:
+    counted = [BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value]
+    similar_users_result = await db.execute(
+        select(Booking.guest_id)
+        .where(
+            and_(
+                Booking.listing_id == listing_id,
+                Booking.guest_id != user_id,
+                Booking.status.in_(counted)
+            )
+        )
+        .distinct()
+        .limit(100)
+    )
+    similar_users = [row[0] for row in similar_users_result.all()]
+    if not similar_users:
+        return 0.0
+    common_bookings_result = await db.execute(
+        select(func.count(Booking.id))
+        .where(
+            and_(
+                Booking.guest_id.in_(similar_users),
+                Booking.guest_id != user_id,
+                Booking.status.in_(counted)
+            )
+        )
+    )
+    return min(1.0, (common_bookings_result.scalar() or 0) / 10.0)
+
+
+def legacy_scalar_scores(user_features, listing):
+    preferred_types = [pt["type"] for pt in user_features["preferred_types"]]
+    content = 0.2 + (0.4 if listing.listing_type in preferred_types else 0.0)
+    content += 0.4 if listing.rating >= 4.5 else 0.2 if listing.rating >= 4.0 else 0.0
+    content = min(1.0, content)
+
+    popularity = float(listing.rating) / 5.0 * 0.6 + min(1.0, math.log10(listing.review_count + 1) / 3.0) * 0.4
+
+    location = 0.3
+    for loc in user_features["preferred_locations"]:
+        if listing.city == loc["city"]:
+            location = 1.0
+            break
+        elif listing.country == loc["country"]:
+            location = 0.7
+            break
+
+    price = float(listing.base_price)
+    avg = user_features["avg_price"]
+    if user_features["min_price"] <= price <= user_features["max_price"]:
+        price_score = 1.0
+    elif avg * 0.7 <= price <= avg * 1.3:
+        price_score = 0.8
+    elif avg * 0.5 <= price <= avg * 1.5:
+        price_score = 0.5
+    else:
+        price_score = 0.2
+    return content, popularity, location, price_score
+
+
+async def legacy_hybrid_scoring(db: AsyncSession, user_id, user_features, candidates):
+    scores = []
+    for listing in candidates:
+        collab = await legacy_collaborative_score(db, user_id, listing.id)
+        content, popularity, location, price = legacy_scalar_scores(user_features, listing)
+        scores.append(collab * 0.3 + content * 0.25 + popularity * 0.2 + location * 0.15 + price * 0.1)
+    return scores
+
+
+# ---------------------------------------------------------------------------
+
+async def run(candidate_counts, runs: int, bookings: int, listings: int, guests: int) -> None:
+    engine = create_async_engine(get_dsn().replace("postgresql://", "postgresql+asyncpg://", 1))
+    ml_engine = MLRecommendationEngine()
+    rows = []
+    try:
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql(CREATE_TABLE_SQL)
+            await conn.execute(
+                POPULATE_SQL,
+                {"bookings": bookings, "listings": listings, "guests": guests}
+            )
+            await conn.exec_driver_sql("CREATE INDEX ON bookings (listing_id)")
+            await conn.exec_driver_sql("CREATE INDEX ON bookings (guest_id)")
+            await conn.exec_driver_sql("ANALYZE bookings")
+
+            db = AsyncSession(bind=conn)
+            for count in candidate_counts:
+                candidates = make_candidates(count)
+
+                legacy_scores = await legacy_hybrid_scoring(db, USER_ID, USER_FEATURES, candidates)
+                bulk_scores = await ml_engine._hybrid_scoring(db, USER_ID, USER_FEATURES, candidates)
+                max_diff = max(abs(a - b) for a, b in zip(legacy_scores, bulk_scores))
+
+                legacy = await time_async(
+                    lambda: legacy_hybrid_scoring(db, USER_ID, USER_FEATURES, candidates), runs=runs
+                )
+                bulk = await time_async(
+                    lambda: ml_engine._hybrid_scoring(db, USER_ID, USER_FEATURES, candidates), runs=runs
+                )
+                rows.append({
+                    "candidates": count,
+                    "legacy_p50_ms": legacy["p50"],
+                    "legacy_p95_ms": legacy["p95"],
+                    "bulk_p50_ms": bulk["p50"],
+                    "bulk_p95_ms": bulk["p95"],
+                    "speedup_p50": legacy["p50"] / bulk["p50"] if bulk["p50"] else 0.0,
+                    "max_score_diff": max_diff,
+                })
+            await db.close()
+    finally:
+        await engine.dispose()
+
+    print_table(f"Hybrid recommendation scoring (bookings={bookings}, runs={runs})", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recommendation scoring")
+    parser.add_argument("--candidates", default="10,50,200,1000", help="Comma-separated candidate counts")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per path")
+    parser.add_argument("--bookings", type=int, default=200000, help="Synthetic bookings")
+    parser.add_argument("--listings", type=int, default=5000, help="Distinct listings booked")
+    parser.add_argument("--guests", type=int, default=20000, help="Distinct guests")
+    args = parser.parse_args()
+
+    counts = [int(c) for c in args.candidates.split(",") if c.strip()]
+    asyncio.run(run(counts, args.runs, args.bookings, args.listings, args.guests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Date-availability filter benchmark: probing bookings and blocks per listing vs
+reading the per-listing availability bitmap.
+
+Builds TEMP copies of listings, bookings, blocked dates and availability
+bitmaps at each size, then times probing every listing's bookings and blocks
+against the query shape ``availability_filter`` produces (the bitmaps joined
+once, with probes only for listings without a row), both for a full count of
+available listings and for a first page of 50.
+
+Connects to ``BENCHMARK_DATABASE_URL`` (else the app's ``DATABASE_URL``).
+Timings depend on the machine and the PostgreSQL version and settings, so
+report them together with those.
+
+Usage:
+    python -m scripts.benchmarks.search_availability
+    python -m scripts.benchmarks.search_availability --sizes 100000,1000000 --runs 30 --nights 7
+"""
+import argparse
+import asyncio
+
+from scripts.benchmarks.common import connect, time_async, print_table
+
+HORIZON_DAYS = 365
+
+CREATE_SQL = [
+    "CREATE TEMP TABLE bench_av_listings (id bigint PRIMARY KEY, status text NOT NULL)",
+    """CREATE TEMP TABLE bench_av_bookings (
+        listing_id bigint NOT NULL, check_in date NOT NULL, check_out date NOT NULL, status text NOT NULL
+    )""",
+    "CREATE TEMP TABLE bench_av_blocked (listing_id bigint NOT NULL, date date NOT NULL)",
+    """CREATE TEMP TABLE bench_av_bitmaps (
+        listing_id bigint PRIMARY KEY, horizon_start date NOT NULL, blocked_nights bit varying NOT NULL
+    )""",
+]
+
+# About a third of the horizon booked per listing (stays of 2-8 nights), plus a few blocked days
+POPULATE_SQL = [
+    """
+    INSERT INTO bench_av_listings
+    SELECT g, CASE WHEN g % 10 = 0 THEN 'draft' ELSE 'active' END FROM generate_series(1, $1) AS g
+    """,
+    """
+    INSERT INTO bench_av_bookings
+    SELECT l.id, current_date + s * 18 + (l.id % 7)::int,
+           current_date + s * 18 + (l.id % 7)::int + 2 + ((l.id + s) % 7)::int,
+           CASE WHEN (l.id + s) % 9 = 0 THEN 'cancelled' ELSE 'confirmed' END
+    FROM bench_av_listings l, generate_series(0, 19) AS s
+    """,
+    """
+    INSERT INTO bench_av_blocked
+    SELECT l.id, current_date + ((l.id * 31 + k * 97) % 365)::int
+    FROM bench_av_listings l, generate_series(1, 3) AS k
+    """,
+    f"""
+    INSERT INTO bench_av_bitmaps
+    SELECT l.id, current_date, coalesce(m.bits, CAST(repeat('0', {HORIZON_DAYS}) AS bit({HORIZON_DAYS})))
+    FROM bench_av_listings l
+    LEFT JOIN (
+        SELECT listing_id, bit_or(CAST(
+            repeat('0', first_night - current_date)
+            || repeat('1', end_night - first_night)
+            || repeat('0', current_date + {HORIZON_DAYS} - end_night)
+        AS bit({HORIZON_DAYS}))) AS bits
+        FROM (
+            SELECT listing_id, greatest(check_in, current_date) AS first_night,
+                   least(check_out, current_date + {HORIZON_DAYS}) AS end_night
+            FROM bench_av_bookings WHERE status = 'confirmed'
+            UNION ALL
+            SELECT listing_id, date, date + 1 FROM bench_av_blocked
+        ) spans
+        WHERE end_night > first_night
+        GROUP BY listing_id
+    ) m ON m.listing_id = l.id
+    """,
+    "CREATE INDEX bench_av_bookings_listing ON bench_av_bookings (listing_id, check_in, check_out)",
+    "CREATE UNIQUE INDEX bench_av_blocked_listing ON bench_av_blocked (listing_id, date)",
+]
+
+PROBE_PREDICATE = """
+    NOT EXISTS (
+        SELECT 1 FROM bench_av_bookings b
+        WHERE b.listing_id = l.id AND b.status = 'confirmed'
+          AND b.check_in < $2 AND b.check_out > $1
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM bench_av_blocked d
+        WHERE d.listing_id = l.id AND d.date >= $1 AND d.date < $2
+    )
+"""
+
+BITMAP_JOIN = "LEFT JOIN bench_av_bitmaps m ON m.listing_id = l.id"
+
+BITMAP_PREDICATE = f"""
+    CASE WHEN m.listing_id IS NOT NULL
+              AND $1 - m.horizon_start >= 0 AND m.horizon_start + length(m.blocked_nights) >= $2
+         THEN strpos(CAST(substring(m.blocked_nights FROM ($1 - m.horizon_start) + 1 FOR $2 - $1) AS text), '1') = 0
+         ELSE {PROBE_PREDICATE}
+    END
+"""
+
+
+def _count_query(predicate: str, join: str = "") -> str:
+    return f"SELECT count(*) FROM bench_av_listings l {join} WHERE l.status = 'active' AND {predicate}"
+
+
+def _page_query(predicate: str, join: str = "") -> str:
+    return (
+        f"SELECT l.id FROM bench_av_listings l {join} WHERE l.status = 'active' AND {predicate} "
+        f"ORDER BY l.id LIMIT 50"
+    )
+
+
+async def run(sizes, runs: int, nights: int) -> None:
+    conn = await connect()
+    rows = []
+    try:
+        for size in sizes:
+            for table in ("bench_av_bitmaps", "bench_av_blocked", "bench_av_bookings", "bench_av_listings"):
+                await conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in CREATE_SQL:
+                await conn.execute(statement)
+            await conn.execute(POPULATE_SQL[0], size)
+            for statement in POPULATE_SQL[1:]:
+                await conn.execute(statement)
+            for table in ("bench_av_listings", "bench_av_bookings", "bench_av_blocked", "bench_av_bitmaps"):
+                await conn.execute(f"ANALYZE {table}")
+
+            for offset in (14, 90, 300):
+                check_in = await conn.fetchval("SELECT current_date + $1::int", offset)
+                check_out = await conn.fetchval("SELECT current_date + $1::int", offset + nights)
+                for shape, build in (("count", _count_query), ("page", _page_query)):
+                    probe_sql, bitmap_sql = build(PROBE_PREDICATE), build(BITMAP_PREDICATE, BITMAP_JOIN)
+                    probe = await time_async(lambda: conn.fetch(probe_sql, check_in, check_out), runs=runs)
+                    bitmap = await time_async(lambda: conn.fetch(bitmap_sql, check_in, check_out), runs=runs)
+                    rows.append({
+                        "listings": size,
+                        "days_ahead": offset,
+                        "query": shape,
+                        "probe_p50_ms": probe["p50"],
+                        "bitmap_p50_ms": bitmap["p50"],
+                        "bitmap_p95_ms": bitmap["p95"],
+                        "speedup_p50": probe["p50"] / bitmap["p50"] if bitmap["p50"] else 0.0,
+                    })
+    finally:
+        await conn.close()
+
+    print_table(f"Availability filter latency (stay={nights} nights, runs={runs})", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the listing date-availability filter")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated listing counts")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--nights", type=int, default=5, help="Length of the searched stay")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    asyncio.run(run(sizes, args.runs, args.nights))
+
+
+if __name__ == "__main__":
+    main()
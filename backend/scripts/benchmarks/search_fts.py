@@ -0,0 +1,129 @@
+"""
+Full-text search benchmark: inline to_tsvector vs stored, GIN-indexed search_vector.
+
+Builds a TEMP copy of the listings search columns at each size, then times the
+query shape used by ``SearchService.search_listings`` before and after the
+stored ``search_vector`` column was introduced.
+
+Connects to ``BENCHMARK_DATABASE_URL`` (else the app's ``DATABASE_URL``).
+Timings depend on the machine and the PostgreSQL version and settings, so
+report them together with those.
+
+Usage:
+    python -m scripts.benchmarks.search_fts
+    python -m scripts.benchmarks.search_fts --sizes 10000,100000 --runs 30 --query "beach house"
+"""
+import argparse
+import asyncio
+
+from scripts.benchmarks.common import connect, time_async, print_table
+
+WORDS = [
+    "beach", "house", "villa", "cozy", "apartment", "luxury", "modern", "pool",
+    "garden", "view", "ocean", "mountain", "cabin", "loft", "studio", "central",
+    "quiet", "family", "historic", "downtown", "lake", "river", "desert", "forest",
+]
+CITIES = ["Miami", "Paris", "Dubai", "Tokyo", "Cairo", "Lisbon", "Nairobi", "Riyadh"]
+COUNTRIES = ["USA", "France", "UAE", "Japan", "Egypt", "Portugal", "Kenya", "Saudi Arabia"]
+
+CREATE_TABLE_SQL = """
+CREATE TEMP TABLE bench_listings (
+    id bigint PRIMARY KEY,
+    title text NOT NULL,
+    summary text,
+    description text,
+    city text NOT NULL,
+    country text NOT NULL,
+    status text NOT NULL,
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(city, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(country, '')), 'C')
+    ) STORED
+)
+"""
+
+POPULATE_SQL = """
+INSERT INTO bench_listings (id, title, summary, description, city, country, status)
+SELECT
+    g,
+    w[1 + (g * 7) % cardinality(w)] || ' ' || w[1 + (g * 13) % cardinality(w)] || ' ' || w[1 + (g * 17) % cardinality(w)],
+    NULL,
+    w[1 + (g * 3) % cardinality(w)] || ' ' || w[1 + (g * 11) % cardinality(w)] || ' stay with '
+        || w[1 + (g * 19) % cardinality(w)] || ' and ' || w[1 + (g * 23) % cardinality(w)],
+    c[1 + g % cardinality(c)],
+    k[1 + g % cardinality(k)],
+    CASE WHEN g % 10 = 0 THEN 'draft' ELSE 'active' END
+FROM generate_series(1, $1) AS g,
+     (SELECT $2::text[] AS w, $3::text[] AS c, $4::text[] AS k) AS vocab
+"""
+
+INLINE_QUERY = """
+SELECT id, ts_rank(
+    to_tsvector('english', concat_ws(' ', coalesce(title, ''), coalesce(description, ''),
+                                          coalesce(city, ''), coalesce(country, ''))),
+    plainto_tsquery('english', $1)) AS relevance
+FROM bench_listings
+WHERE status = 'active'
+  AND to_tsvector('english', concat_ws(' ', coalesce(title, ''), coalesce(description, ''),
+                                            coalesce(city, ''), coalesce(country, '')))
+      @@ plainto_tsquery('english', $1)
+ORDER BY relevance DESC
+LIMIT 50
+"""
+
+STORED_QUERY = """
+SELECT id, ts_rank(search_vector, plainto_tsquery('english', $1)) AS relevance
+FROM bench_listings
+WHERE status = 'active'
+  AND search_vector @@ plainto_tsquery('english', $1)
+ORDER BY relevance DESC
+LIMIT 50
+"""
+
+
+async def run(sizes, runs: int, query: str) -> None:
+    conn = await connect()
+    rows = []
+    try:
+        for size in sizes:
+            await conn.execute("DROP TABLE IF EXISTS bench_listings")
+            await conn.execute(CREATE_TABLE_SQL)
+            await conn.execute(POPULATE_SQL, size, WORDS, CITIES, COUNTRIES)
+            await conn.execute(
+                "CREATE INDEX bench_listings_search_vector ON bench_listings USING gin (search_vector)"
+            )
+            await conn.execute("ANALYZE bench_listings")
+
+            inline = await time_async(lambda: conn.fetch(INLINE_QUERY, query), runs=runs)
+            stored = await time_async(lambda: conn.fetch(STORED_QUERY, query), runs=runs)
+
+            rows.append({
+                "listings": size,
+                "inline_p50_ms": inline["p50"],
+                "inline_p95_ms": inline["p95"],
+                "stored_gin_p50_ms": stored["p50"],
+                "stored_gin_p95_ms": stored["p95"],
+                "speedup_p50": inline["p50"] / stored["p50"] if stored["p50"] else 0.0,
+            })
+    finally:
+        await conn.close()
+
+    print_table(f"Full-text search latency (query={query!r}, runs={runs})", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listing full-text search")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated listing counts")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--query", default="beach villa", help="Search text")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    asyncio.run(run(sizes, args.runs, args.query))
+
+
+if __name__ == "__main__":
+    main()
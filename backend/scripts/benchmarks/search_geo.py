@@ -0,0 +1,135 @@
+"""
+Radius search benchmark: on-the-fly degree math vs stored, GiST-indexed geography.
+
+Builds a TEMP copy of the listings location columns at each size (requires the
+PostGIS extension), then times the radius filter and distance sort used by
+``SearchService.search_page`` before and after the stored ``geo_point`` column
+was introduced.
+
+Usage:
+    python -m scripts.benchmarks.search_geo
+    python -m scripts.benchmarks.search_geo --sizes 100000,1000000 --runs 30 --radius-km 10
+"""
+import argparse
+import asyncio
+
+from scripts.benchmarks.common import connect, time_async, print_table
+
+# Search centers spread across latitudes (degree math error grows away from the equator)
+CENTERS = [
+    ("Nairobi", -1.29, 36.82),
+    ("Miami", 25.76, -80.19),
+    ("Paris", 48.86, 2.35),
+    ("Oslo", 59.91, 10.75),
+]
+
+CREATE_TABLE_SQL = """
+CREATE TEMP TABLE bench_geo_listings (
+    id bigint PRIMARY KEY,
+    status text NOT NULL,
+    latitude numeric(10, 8),
+    longitude numeric(11, 8),
+    geo_point geography(Point, 4326) GENERATED ALWAYS AS (
+        CASE WHEN latitude IS NOT NULL AND longitude IS NOT NULL THEN
+            ST_SetSRID(ST_MakePoint(longitude::double precision, latitude::double precision), 4326)::geography
+        END
+    ) STORED
+)
+"""
+
+# Listings clustered around the search centers (plus uniform background noise)
+POPULATE_SQL = """
+INSERT INTO bench_geo_listings (id, status, latitude, longitude)
+SELECT
+    g,
+    CASE WHEN g % 10 = 0 THEN 'draft' ELSE 'active' END,
+    CASE WHEN g % 5 = 0 THEN -60 + random() * 130
+         ELSE lat[1 + g % cardinality(lat)] + (random() - 0.5) * 4 END,
+    CASE WHEN g % 5 = 0 THEN -180 + random() * 360
+         ELSE lng[1 + g % cardinality(lng)] + (random() - 0.5) * 4 END
+FROM generate_series(1, $1) AS g,
+     (SELECT $2::float8[] AS lat, $3::float8[] AS lng) AS centers
+"""
+
+DEGREES_QUERY = """
+SELECT id, ST_Distance(ST_MakePoint(longitude, latitude), ST_MakePoint($2, $1)) * 111.0 AS distance_km
+FROM bench_geo_listings
+WHERE status = 'active'
+  AND ST_DWithin(ST_MakePoint(longitude, latitude), ST_MakePoint($2, $1), $3 / 111.0)
+ORDER BY distance_km
+LIMIT 50
+"""
+
+GEOGRAPHY_QUERY = """
+SELECT id, ST_Distance(geo_point, ST_SetSRID(ST_MakePoint($2, $1), 4326)::geography) / 1000.0 AS distance_km
+FROM bench_geo_listings
+WHERE status = 'active'
+  AND ST_DWithin(geo_point, ST_SetSRID(ST_MakePoint($2, $1), 4326)::geography, $3 * 1000.0)
+ORDER BY geo_point <-> ST_SetSRID(ST_MakePoint($2, $1), 4326)::geography
+LIMIT 50
+"""
+
+# How many listings each approach considers "within the radius" (shows the degree error)
+DEGREES_COUNT = """
+SELECT count(*) FROM bench_geo_listings
+WHERE ST_DWithin(ST_MakePoint(longitude, latitude), ST_MakePoint($2, $1), $3 / 111.0)
+"""
+
+GEOGRAPHY_COUNT = """
+SELECT count(*) FROM bench_geo_listings
+WHERE ST_DWithin(geo_point, ST_SetSRID(ST_MakePoint($2, $1), 4326)::geography, $3 * 1000.0)
+"""
+
+
+async def run(sizes, runs: int, radius_km: float) -> None:
+    conn = await connect()
+    rows = []
+    try:
+        await conn.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+        lats = [c[1] for c in CENTERS]
+        lngs = [c[2] for c in CENTERS]
+        for size in sizes:
+            await conn.execute("DROP TABLE IF EXISTS bench_geo_listings")
+            await conn.execute(CREATE_TABLE_SQL)
+            await conn.execute(POPULATE_SQL, size, lats, lngs)
+            await conn.execute(
+                "CREATE INDEX bench_geo_listings_geo_point ON bench_geo_listings USING gist (geo_point)"
+            )
+            await conn.execute("ANALYZE bench_geo_listings")
+
+            for name, lat, lng in CENTERS:
+                degrees = await time_async(
+                    lambda: conn.fetch(DEGREES_QUERY, lat, lng, radius_km), runs=runs
+                )
+                geography = await time_async(
+                    lambda: conn.fetch(GEOGRAPHY_QUERY, lat, lng, radius_km), runs=runs
+                )
+                rows.append({
+                    "listings": size,
+                    "center": name,
+                    "degrees_p50_ms": degrees["p50"],
+                    "geography_p50_ms": geography["p50"],
+                    "geography_p95_ms": geography["p95"],
+                    "speedup_p50": degrees["p50"] / geography["p50"] if geography["p50"] else 0.0,
+                    "degrees_matches": await conn.fetchval(DEGREES_COUNT, lat, lng, radius_km),
+                    "geography_matches": await conn.fetchval(GEOGRAPHY_COUNT, lat, lng, radius_km),
+                })
+    finally:
+        await conn.close()
+
+    print_table(f"Radius search latency (radius={radius_km} km, runs={runs})", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark listing radius search")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated listing counts")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--radius-km", type=float, default=25.0, help="Search radius in kilometers")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    asyncio.run(run(sizes, args.runs, args.radius_km))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Search suggestion benchmark: ILIKE '%q%' DISTINCT over listings vs the
+prefix-indexed listing_destinations table vs the in-process destination index.
+
+Builds TEMP listings (city, country, status) and the destinations derived
+from them, then times each way of answering one suggestion request.
+
+Connects to ``BENCHMARK_DATABASE_URL`` (else the app's ``DATABASE_URL``).
+Timings depend on the machine and the PostgreSQL version and settings, so
+report them together with those.
+
+Usage:
+    python -m scripts.benchmarks.search_suggestions
+    python -m scripts.benchmarks.search_suggestions --listings 200000 --cities 5000 --queries pa,new,lis
+"""
+import argparse
+import asyncio
+
+from scripts.benchmarks.common import connect, time_async, time_sync, print_table
+from app.modules.search.suggestions import DestinationIndex
+
+SYLLABLES = ["pa", "ri", "lis", "bon", "new", "york", "ma", "drid", "to", "kyo", "ca", "iro", "san", "ta", "la", "na"]
+COUNTRIES = ["Portugal", "France", "Japan", "Egypt", "USA", "Spain", "Italy", "Kenya", "Peru", "Chile"]
+
+CREATE_SQL = [
+    "CREATE TEMP TABLE bench_listings (id bigint PRIMARY KEY, city text NOT NULL, country text NOT NULL, status text NOT NULL)",
+    """CREATE TEMP TABLE bench_destinations (
+        city text NOT NULL, country text NOT NULL,
+        city_key text GENERATED ALWAYS AS (lower(btrim(city))) STORED,
+        country_key text GENERATED ALWAYS AS (lower(btrim(country))) STORED,
+        listing_count integer NOT NULL, booking_count integer NOT NULL,
+        popularity_score integer GENERATED ALWAYS AS (listing_count + 2 * booking_count) STORED
+    )""",
+]
+
+# City names are 2-3 syllables; city popularity is skewed (low ids are common)
+POPULATE_SQL = """
+INSERT INTO bench_listings (id, city, country, status)
+SELECT g,
+       initcap(s[1 + c % 16] || s[1 + (c / 16) % 16] || CASE WHEN c >= 256 THEN s[1 + (c / 256) % 16] ELSE '' END)
+           || CASE WHEN c >= 4096 THEN ' ' || (c / 4096)::text ELSE '' END,
+       k[1 + c % cardinality(k)],
+       CASE WHEN g % 10 = 0 THEN 'draft' ELSE 'active' END
+FROM (SELECT g, floor($3 * power(random(), 3))::int AS c FROM generate_series(1, $1) AS g) AS rows,
+     (SELECT $2::text[] AS s, $4::text[] AS k) AS vocab
+"""
+
+DERIVE_SQL = """
+INSERT INTO bench_destinations (city, country, listing_count, booking_count)
+SELECT min(city), min(country), count(*) FILTER (WHERE status = 'active'), 0
+FROM bench_listings GROUP BY lower(btrim(country)), lower(btrim(city))
+"""
+
+INDEX_SQL = [
+    "CREATE INDEX bench_listings_city ON bench_listings (city)",
+    "CREATE INDEX bench_listings_country ON bench_listings (country)",
+    "CREATE UNIQUE INDEX bench_destinations_key ON bench_destinations (country_key, city_key)",
+    "CREATE INDEX bench_destinations_city ON bench_destinations (city_key text_pattern_ops)",
+    "CREATE INDEX bench_destinations_country ON bench_destinations (country_key text_pattern_ops)",
+]
+
+# The two queries get_search_suggestions used to run per request
+LEGACY_SQL = [
+    "SELECT DISTINCT city FROM bench_listings WHERE city ILIKE '%' || $1 || '%' AND status = 'active' LIMIT 10",
+    "SELECT DISTINCT country FROM bench_listings WHERE country ILIKE '%' || $1 || '%' AND status = 'active' LIMIT 10",
+]
+TABLE_SQL = [
+    """SELECT city FROM bench_destinations WHERE city_key LIKE $1 AND listing_count > 0
+       ORDER BY popularity_score DESC, city_key LIMIT 20""",
+    """SELECT min(country) FROM bench_destinations WHERE country_key LIKE $1 AND listing_count > 0
+       GROUP BY country_key ORDER BY sum(popularity_score) DESC, country_key LIMIT 10""",
+]
+
+
+async def run(listings: int, cities: int, queries, runs: int) -> None:
+    conn = await connect()
+    rows = []
+    try:
+        for sql in ("DROP TABLE IF EXISTS bench_listings", "DROP TABLE IF EXISTS bench_destinations"):
+            await conn.execute(sql)
+        for sql in CREATE_SQL:
+            await conn.execute(sql)
+        await conn.execute("SELECT setseed(0.42)")
+        await conn.execute(POPULATE_SQL, listings, SYLLABLES, cities, COUNTRIES)
+        await conn.execute(DERIVE_SQL)
+        for sql in INDEX_SQL:
+            await conn.execute(sql)
+        await conn.execute("ANALYZE bench_listings")
+        await conn.execute("ANALYZE bench_destinations")
+
+        destinations = await conn.fetch(
+            "SELECT city, country, popularity_score FROM bench_destinations WHERE listing_count > 0"
+        )
+        index = DestinationIndex()
+        build = time_sync(lambda: index.build([tuple(row) for row in destinations]), runs=3, warmup=0)
+
+        for query in queries:
+            async def legacy():
+                for sql in LEGACY_SQL:
+                    await conn.fetch(sql, query)
+
+            async def table():
+                for sql in TABLE_SQL:
+                    await conn.fetch(sql, query.lower() + "%")
+
+            legacy_stats = await time_async(legacy, runs=runs)
+            table_stats = await time_async(table, runs=runs)
+            memory_stats = time_sync(lambda: index.suggest(query, 10), runs=runs * 50)
+            rows.append({
+                "query": query,
+                "legacy_ilike_p50_ms": legacy_stats["p50"],
+                "table_prefix_p50_ms": table_stats["p50"],
+                "in_memory_p50_us": memory_stats["p50"] * 1000,
+                "in_memory_p99_us": memory_stats["p99"] * 1000,
+            })
+    finally:
+        await conn.close()
+
+    print_table(
+        f"Suggestion latency ({listings} listings, {len(destinations)} destinations, "
+        f"index build {build['p50']:.1f}ms)",
+        rows
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search suggestions")
+    parser.add_argument("--listings", type=int, default=1000000, help="Number of listings")
+    parser.add_argument("--cities", type=int, default=50000, help="Upper bound on distinct cities")
+    parser.add_argument("--queries", default="pa,lisb,newyo,z", help="Comma-separated queries")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per query")
+    args = parser.parse_args()
+
+    queries = [q for q in args.queries.split(",") if q.strip()]
+    asyncio.run(run(args.listings, args.cities, queries, args.runs))
+
+
+if __name__ == "__main__":
+    main()
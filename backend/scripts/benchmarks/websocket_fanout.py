@@ -0,0 +1,166 @@
+"""
+WebSocket fan-out benchmark: sequential sends vs per-socket queues.
+
+Simulates thousands of connected sockets in one room, a few of them slow
+(each send takes ``--slow-delay`` seconds, like a client on a bad network),
+and publishes a steady stream of messages to the room. Reports:
+
+- publish time: how long ``send_to_room`` blocks the caller (e.g. the
+  booking request that emits the event);
+- fan-out latency: time from publish until every connected *healthy* socket
+  has the message (p50/p99 over messages);
+- how many slow (and healthy) sockets were disconnected for falling behind.
+  Healthy sockets only fall behind when the CPU can't keep up with
+  sockets x message rate; lower the rate if that column is non-zero.
+
+The legacy path is the previous implementation: ``await send_json`` for
+each socket in turn, encoding the message once per socket. The new path is
+``ConnectionManager.send_to_room`` without a Redis backplane, which encodes
+once and queues on every socket. No database, Redis or network is needed.
+
+Usage:
+    python -m scripts.benchmarks.websocket_fanout
+    python -m scripts.benchmarks.websocket_fanout --sockets 10000 --slow 8 --interval 0.2
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from scripts.benchmarks.common import summarize, print_table
+from app.infrastructure.websocket.manager import ConnectionManager
+
+ROOM_ID = "host_dashboard_USER_bench"
+
+
+class SimulatedSocket:
+    """Records when each message arrives; slow sockets take ``delay`` per send."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.arrivals = []
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.arrivals.append(time.perf_counter())
+
+    async def send_json(self, message: dict):
+        await self.send_text(json.dumps(message))
+
+
+def make_message(seq: int) -> dict:
+    return {
+        "type": "booking_updated",
+        "seq": seq,
+        "booking_id": f"BOOK_{seq:024d}",
+        "status": "confirmed",
+        "booking_number": f"SAF-{seq:08d}",
+        "listing": {"id": "LIST_000000000000000000000001", "title": "Sea view apartment", "city": "Dubrovnik"},
+        "check_in": "2026-11-02",
+        "check_out": "2026-11-09",
+    }
+
+
+async def legacy_send_to_room(sockets, message: dict) -> None:
+    # Previous ConnectionManager.send_to_room: one awaited send per socket, in order
+    for socket in sockets:
+        try:
+            await socket.send_json(message)
+        except Exception:
+            pass
+
+
+async def wait_for_arrivals(sockets, count: int, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while any(len(s.arrivals) < count for s in sockets) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.001)
+
+
+async def run_path(name: str, socket_count: int, slow_count: int, slow_delay: float,
+                   messages: int, interval: float, queue_size: int) -> dict:
+    healthy = [SimulatedSocket() for _ in range(socket_count - slow_count)]
+    slow = [SimulatedSocket(delay=slow_delay) for _ in range(slow_count)]
+    # Slow clients sit anywhere in the room's iteration order
+    sockets = healthy + slow
+    random.Random(42).shuffle(sockets)
+
+    manager = None
+    if name == "queued":
+        manager = ConnectionManager(queue_size=queue_size, send_timeout=slow_delay * 100)
+        for i, socket in enumerate(sockets):
+            await manager.connect(socket, f"USER_{i}")
+            await manager.join_room(socket, ROOM_ID)
+
+    publish_ms, sent_at = [], []
+    for seq in range(messages):
+        message = make_message(seq)
+        start = time.perf_counter()
+        sent_at.append(start)
+        if manager:
+            await manager.send_to_room(message, ROOM_ID)
+        else:
+            await legacy_send_to_room(sockets, message)
+        publish_ms.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+
+    connected = healthy
+    if manager:
+        connected = [s for s in healthy if s in manager._connections]
+    await wait_for_arrivals(connected, messages, timeout=60)
+    fanout_ms = [
+        (max(s.arrivals[seq] for s in connected) - sent_at[seq]) * 1000
+        for seq in range(messages)
+    ]
+    slow_evicted = healthy_evicted = 0
+    if manager:
+        slow_evicted = sum(1 for s in slow if s not in manager._connections)
+        healthy_evicted = len(healthy) - len(connected)
+        await manager.stop()
+
+    publish, fanout = summarize(publish_ms), summarize(fanout_ms)
+    return {
+        "path": name,
+        "publish_p50_ms": publish["p50"],
+        "publish_p99_ms": publish["p99"],
+        "fanout_p50_ms": fanout["p50"],
+        "fanout_p99_ms": fanout["p99"],
+        "slow_evicted": slow_evicted,
+        "healthy_evicted": healthy_evicted,
+    }
+
+
+async def run(socket_count: int, slow_count: int, slow_delay: float, messages: int,
+              interval: float, queue_size: int) -> None:
+    rows = []
+    for name in ("sequential (legacy)", "queued"):
+        rows.append(await run_path(name, socket_count, slow_count, slow_delay, messages, interval, queue_size))
+    print_table(
+        f"Room fan-out: {socket_count} sockets ({slow_count} slow, {slow_delay * 1000:.0f}ms/send), "
+        f"{messages} messages every {interval * 1000:.0f}ms",
+        rows
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket room fan-out")
+    parser.add_argument("--sockets", type=int, default=5000, help="Sockets in the room")
+    parser.add_argument("--slow", type=int, default=4, help="How many of them are slow")
+    parser.add_argument("--slow-delay", type=float, default=0.25, help="Seconds per send for slow sockets")
+    parser.add_argument("--messages", type=int, default=40, help="Messages published to the room")
+    parser.add_argument("--interval", type=float, default=0.1, help="Seconds between messages")
+    parser.add_argument("--queue-size", type=int, default=16, help="Per-socket send queue size")
+    args = parser.parse_args()
+
+    asyncio.run(run(args.sockets, args.slow, args.slow_delay, args.messages, args.interval, args.queue_size))
+
+
+if __name__ == "__main__":
+    main()
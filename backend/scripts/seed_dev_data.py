@@ -56,6 +56,7 @@ from app.modules.listings.models import (
 )
 
 # Bookings (must import Dispute before Booking to satisfy relationship)
+from app.modules.listings.pricing import pricing_engine
 from app.modules.disputes.models import Dispute, DisputeEvidence
 from app.modules.bookings.models import Booking, BookingStatus, Payment, PaymentStatus, PaymentMethodType
 
@@ -271,6 +272,8 @@ class DevDataSeeder:
         await self._seed_loyalty()
         
         await self.session.commit()
+        # Running API processes may hold compiled pricing for these listings
+        await pricing_engine.invalidate(*[listing.id for listing in self.listings])
         print("✅ Development data seeding completed successfully!")
         
     async def _clear_data(self):
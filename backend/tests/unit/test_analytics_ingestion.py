@@ -0,0 +1,71 @@
+"""
+Unit tests for the buffered analytics ingestion pipeline.
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+from app.modules.analytics.ingestion import AnalyticsEventBuffer
+
+
+def _record(i):
+    return (f"ANAL_{i}", None, "listing_viewed", "web", "{}", datetime.now(timezone.utc))
+
+
+class _FlakyWriter:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    async def __call__(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append([record[0] for record in records])
+
+
+async def test_flush_writes_in_batches_in_order():
+    """Events are written oldest first, at most batch_size per write."""
+    writer = _FlakyWriter()
+    buffer = AnalyticsEventBuffer(writer=writer, batch_size=2, flush_interval=3600)
+    for i in range(5):
+        assert await buffer.put(_record(i))
+
+    while len(buffer):
+        await buffer.flush()
+    await buffer.stop()
+
+    assert writer.batches == [["ANAL_0", "ANAL_1"], ["ANAL_2", "ANAL_3"], ["ANAL_4"]]
+
+
+async def test_failed_batch_stays_buffered():
+    """A batch leaves the buffer only after the writer succeeds (at-least-once)."""
+    writer = _FlakyWriter(failures=1)
+    buffer = AnalyticsEventBuffer(writer=writer, batch_size=10, flush_interval=3600)
+    await buffer.put(_record(1))
+
+    with pytest.raises(ConnectionError):
+        await buffer.flush()
+    assert len(buffer) == 1
+
+    assert await buffer.flush() == 1
+    assert writer.batches == [["ANAL_1"]]
+    await buffer.stop()
+
+
+async def test_full_buffer_applies_backpressure_then_drops():
+    """Producers wait for space; if the flusher can't catch up the event is dropped."""
+    writer = _FlakyWriter(failures=100)
+    buffer = AnalyticsEventBuffer(
+        writer=writer, max_events=2, batch_size=10, flush_interval=3600, enqueue_timeout=0.05
+    )
+    assert await buffer.put(_record(1))
+    assert await buffer.put(_record(2))
+
+    assert not await buffer.put(_record(3))
+    assert buffer.dropped == 1
+    assert len(buffer) == 2
+
+    writer.failures = 0
+    await buffer.stop()
+    assert writer.batches == [["ANAL_1", "ANAL_2"]]
@@ -0,0 +1,33 @@
+"""
+Unit tests for presigned direct-to-storage uploads.
+"""
+import base64
+import json
+
+from minio import Minio
+
+from app.infrastructure.storage.minio_service import MinIOStorageService
+
+
+def _service():
+    # Bypass __init__ (bucket check); a fixed region means no network calls
+    service = MinIOStorageService.__new__(MinIOStorageService)
+    service.client = Minio("localhost:9000", access_key="minioadmin", secret_key="minioadmin", secure=False, region="us-east-1")
+    service.bucket_name = "safar-files"
+    return service
+
+
+def test_presigned_upload_form_pins_key_type_and_size():
+    upload = _service().presigned_upload_form(
+        "listing_photo/abc.jpg", "image/jpeg", max_size=5000, expires_seconds=600
+    )
+
+    assert upload["url"].endswith("/safar-files")
+    fields = upload["fields"]
+    assert fields["key"] == "listing_photo/abc.jpg"
+    assert fields["Content-Type"] == "image/jpeg"
+
+    conditions = json.loads(base64.b64decode(fields["policy"]))["conditions"]
+    assert ["eq", "$key", "listing_photo/abc.jpg"] in conditions
+    assert ["eq", "$Content-Type", "image/jpeg"] in conditions
+    assert ["content-length-range", 1, 5000] in conditions
@@ -0,0 +1,164 @@
+"""
+Unit tests for write-behind travel guide/story engagement counters.
+
+The batched UPDATE test runs against PostgreSQL (``pg_session``) and is
+skipped when none is reachable.
+"""
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.id import generate_typed_id
+from app.modules.travel_guides import engagement
+from app.modules.travel_guides.engagement import (
+    GUIDE, LIKE_COUNT, STORY, VIEW_COUNT, apply_increments, flush_engagement_counters, flushing_key,
+    record_engagement
+)
+from app.modules.travel_guides.models import TravelGuide
+
+
+class _FakeRedis:
+    """Just the hash/key commands the counters use."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def hincrby(self, key, field, amount):
+        bucket = self.data.setdefault(key, {})
+        bucket[field] = str(int(bucket.get(field, 0)) + amount)
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def rename(self, source, destination):
+        self.data[destination] = self.data.pop(source)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+
+class _RecordingSession:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.statements.append(statement)
+        # Every id in the VALUES list matches a row
+        return type("Result", (), {"rowcount": _sql(statement).count("('")})()
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = _FakeRedis()
+
+    async def get_redis():
+        return fake
+
+    monkeypatch.setattr(engagement, "get_redis", get_redis)
+    return fake
+
+
+def _sql(statement):
+    from sqlalchemy.dialects import postgresql
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+async def test_views_are_flushed_as_one_batched_update_per_counter(redis):
+    """Many views on the request path become a single UPDATE ... FROM (VALUES ...)."""
+    for _ in range(3):
+        await record_engagement(GUIDE, VIEW_COUNT, "TRAV_a")
+    await record_engagement(GUIDE, VIEW_COUNT, "TRAV_b")
+    await record_engagement(GUIDE, LIKE_COUNT, "TRAV_a")
+    await record_engagement(STORY, VIEW_COUNT, "USER_s")
+    db = _RecordingSession()
+
+    assert await flush_engagement_counters(db) == 4
+
+    sql = [_sql(s) for s in db.statements]
+    assert sql[0] == (
+        "UPDATE travel_guides SET view_count=(travel_guides.view_count + increments.amount), "
+        "updated_at=travel_guides.updated_at FROM (VALUES ('TRAV_a', 3), ('TRAV_b', 1)) "
+        "AS increments (id, amount) WHERE travel_guides.id = increments.id"
+    )
+    assert sql[1].startswith("UPDATE travel_guides SET like_count=(travel_guides.like_count + increments.amount)")
+    assert sql[2].startswith("UPDATE user_stories SET view_count=")
+    assert db.commits == 3
+    assert redis.data == {}
+
+
+async def test_batched_update_adds_counts_and_keeps_updated_at(pg_session):
+    edited = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    guides = [
+        TravelGuide(
+            title=f"Guide {n}", slug=f"engagement-guide-{n}-{generate_typed_id('TRAV')}", content="...",
+            destination="Lisbon", country="Portugal", view_count=5, like_count=1, updated_at=edited,
+        )
+        for n in range(2)
+    ]
+    pg_session.add_all(guides)
+    await pg_session.flush()
+
+    increments = {guides[0].id: 3, generate_typed_id("TRAV"): 7}
+    assert await apply_increments(pg_session, GUIDE, VIEW_COUNT, increments) == 1
+
+    rows = await pg_session.execute(
+        select(TravelGuide.id, TravelGuide.view_count, TravelGuide.popularity_score, TravelGuide.updated_at)
+        .where(TravelGuide.id.in_([guide.id for guide in guides]))
+        .execution_options(populate_existing=True)
+    )
+    by_id = {row.id: row for row in rows}
+    assert (by_id[guides[0].id].view_count, by_id[guides[0].id].popularity_score) == (8, 18)
+    assert (by_id[guides[1].id].view_count, by_id[guides[1].id].popularity_score) == (5, 15)
+    assert by_id[guides[0].id].updated_at == edited
+
+
+async def test_failed_flush_keeps_its_batch_for_the_next_run(redis):
+    await record_engagement(GUIDE, VIEW_COUNT, "TRAV_a")
+
+    with pytest.raises(RuntimeError):
+        await flush_engagement_counters(_RecordingSession(fail=True))
+    # New views during the outage accumulate separately
+    await record_engagement(GUIDE, VIEW_COUNT, "TRAV_a")
+    assert redis.data[flushing_key(GUIDE, VIEW_COUNT)] == {"TRAV_a": "1"}
+
+    db = _RecordingSession()
+    await flush_engagement_counters(db)
+    await flush_engagement_counters(db)
+
+    assert [_sql(s).split("VALUES ")[1].split(")")[0] for s in db.statements] == ["('TRAV_a', 1", "('TRAV_a', 1"]
+    assert redis.data == {}
+
+
+async def test_concurrent_flush_is_skipped(redis):
+    await record_engagement(GUIDE, VIEW_COUNT, "TRAV_a")
+    redis.data[engagement.FLUSH_LOCK_KEY] = "1"
+    db = _RecordingSession()
+
+    assert await flush_engagement_counters(db) == 0
+    assert db.statements == []
+
+
+async def test_record_reports_redis_outage(monkeypatch):
+    async def get_redis():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(engagement, "get_redis", get_redis)
+
+    assert await record_engagement(GUIDE, LIKE_COUNT, "TRAV_a") is False
@@ -0,0 +1,175 @@
+"""
+Unit tests for the file routes, called through the API with an in-memory session.
+"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_active_user
+from app.core.id import generate_typed_id
+from app.main import app
+from app.infrastructure.storage import minio_service
+from app.modules.files import services as file_services, tasks as file_tasks
+from app.modules.files.models import File, FileCategory, FileProcessingStatus, FileType
+
+USER_ID = generate_typed_id("USER")
+
+
+class _FakeSession:
+    """Stores files in a dict and fills server defaults on refresh."""
+
+    def __init__(self):
+        self.files = {}
+
+    async def get(self, model, file_id):
+        return self.files.get(file_id)
+
+    def add(self, file_record):
+        file_record.id = file_record.id or generate_typed_id("FILE")
+        self.files[file_record.id] = file_record
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, file_record):
+        file_record.created_at = file_record.created_at or datetime.now(timezone.utc)
+
+
+def _file(**overrides) -> File:
+    values = dict(
+        id=generate_typed_id("FILE"),
+        filename="abc.jpg",
+        original_filename="beach.jpg",
+        file_path="listing_photo/abc.jpg",
+        file_url="http://minio.test/safar-files/listing_photo/abc.jpg",
+        file_type=FileType.IMAGE,
+        file_category=FileCategory.LISTING_PHOTO,
+        mime_type="image/jpeg",
+        file_size=2048,
+        uploaded_by=USER_ID,
+        processing_status=FileProcessingStatus.READY,
+        created_at=datetime(2026, 10, 1, tzinfo=timezone.utc),
+    )
+    values.update(overrides)
+    return File(**values)
+
+
+@pytest.fixture
+async def session():
+    fake = _FakeSession()
+
+    async def override_get_db():
+        yield fake
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(id=USER_ID)
+    yield fake
+    app.dependency_overrides.clear()
+
+
+class _FakeMinIO:
+    """Presigns without signing and reports ``uploaded`` objects as stored."""
+
+    def __init__(self):
+        self.uploaded = {}
+
+    def presigned_upload_form(self, object_name, content_type, max_size, expires_seconds):
+        return {
+            "url": "http://minio.test/safar-files",
+            "fields": {"key": object_name, "Content-Type": content_type, "policy": "p"},
+            "expires_at": datetime(2026, 10, 1, 12, tzinfo=timezone.utc),
+        }
+
+    def get_file_url(self, object_name):
+        return f"http://minio.test/safar-files/{object_name}"
+
+    def file_exists(self, object_name):
+        return object_name in self.uploaded
+
+    def get_file_info(self, object_name):
+        return {"size": self.uploaded[object_name]}
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    fake = _FakeMinIO()
+    monkeypatch.setattr(file_services.settings, "storage_type", "minio")
+    monkeypatch.setattr(minio_service, "get_minio_service", lambda: fake)
+    queued = []
+    monkeypatch.setattr(file_tasks.process_direct_upload, "delay", queued.append)
+    fake.queued = queued
+    return fake
+
+
+@pytest.fixture
+async def files_client(session):
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        yield ac
+
+
+async def test_get_file_returns_metadata(session, files_client):
+    file_record = _file(variants={"w640.webp": {"url": "http://minio.test/w640.webp", "width": 640}})
+    session.add(file_record)
+
+    response = await files_client.get(f"/api/v1/files/{file_record.id}")
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["id"] == file_record.id
+    assert body["processing_status"] == "ready"
+    assert body["variants"]["w640.webp"]["width"] == 640
+    assert datetime.fromisoformat(body["created_at"]) == file_record.created_at
+
+
+async def test_get_file_hides_other_users_files(session, files_client):
+    file_record = _file(uploaded_by=generate_typed_id("USER"))
+    session.add(file_record)
+
+    response = await files_client.get(f"/api/v1/files/{file_record.id}")
+
+    assert response.status_code == 404
+
+
+async def test_direct_upload_returns_presigned_form(session, storage, files_client):
+    response = await files_client.post("/api/v1/files/direct-uploads", json={
+        "filename": "beach.jpg", "content_type": "image/jpeg", "file_size": 4096, "category": "listing_photo"
+    })
+
+    assert response.status_code == 201, response.text
+    body = response.json()
+    assert body["upload_url"] == "http://minio.test/safar-files"
+    assert body["fields"]["key"] == body["file"]["file_url"].removeprefix("http://minio.test/safar-files/")
+    assert body["file"]["processing_status"] == "awaiting_upload"
+    assert body["file"]["created_at"]
+    assert body["file"]["id"] in session.files
+
+
+async def test_confirm_direct_upload_queues_processing(session, storage, files_client):
+    file_record = _file(processing_status=FileProcessingStatus.AWAITING_UPLOAD, file_size=4096)
+    session.add(file_record)
+    storage.uploaded[file_record.file_path] = 3000
+
+    response = await files_client.post(f"/api/v1/files/{file_record.id}/confirm")
+
+    assert response.status_code == 202, response.text
+    body = response.json()
+    assert body["processing_status"] == "pending"
+    assert body["file_size"] == 3000
+    assert storage.queued == [file_record.id]
+
+    # A second confirm is rejected
+    response = await files_client.post(f"/api/v1/files/{file_record.id}/confirm")
+    assert response.status_code == 409
+
+
+async def test_confirm_before_upload_is_rejected(session, storage, files_client):
+    file_record = _file(processing_status=FileProcessingStatus.AWAITING_UPLOAD)
+    session.add(file_record)
+
+    response = await files_client.post(f"/api/v1/files/{file_record.id}/confirm")
+
+    assert response.status_code == 400
+    assert storage.queued == []
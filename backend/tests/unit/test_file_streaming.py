@@ -0,0 +1,56 @@
+"""
+Unit tests for streaming file uploads.
+"""
+import hashlib
+import io
+import os
+import tracemalloc
+
+import pytest
+
+from app.modules.files.services import (
+    UPLOAD_CHUNK_SIZE, FileTooLargeError, HashingReader, stream_to_disk
+)
+
+
+def test_hashing_reader_counts_and_hashes_incrementally():
+    data = os.urandom(3 * 1024 + 17)
+    reader = HashingReader(io.BytesIO(data), max_size=len(data))
+
+    chunks = []
+    while chunk := reader.read(1024):
+        chunks.append(chunk)
+
+    assert [len(c) for c in chunks] == [1024, 1024, 1024, 17]
+    assert reader.size == len(data)
+    assert reader.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+def test_oversized_upload_is_rejected_without_leaving_files(tmp_path):
+    destination = tmp_path / "photo.jpg"
+
+    with pytest.raises(FileTooLargeError):
+        stream_to_disk(io.BytesIO(b"x" * 2048), destination, max_size=2047)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stream_to_disk_memory_is_independent_of_file_size(tmp_path):
+    """Peak allocations stay around one chunk for a file many chunks long."""
+    source_path = tmp_path / "source.bin"
+    with open(source_path, "wb") as out:
+        for _ in range(32):
+            out.write(os.urandom(UPLOAD_CHUNK_SIZE))
+    destination = tmp_path / "copy.bin"
+
+    tracemalloc.start()
+    try:
+        with open(source_path, "rb") as source:
+            size, checksum = stream_to_disk(source, destination, max_size=64 * UPLOAD_CHUNK_SIZE)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert size == 32 * UPLOAD_CHUNK_SIZE == destination.stat().st_size
+    assert checksum == hashlib.sha256(source_path.read_bytes()).hexdigest()
+    assert peak < 3 * UPLOAD_CHUNK_SIZE
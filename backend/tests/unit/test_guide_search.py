@@ -0,0 +1,90 @@
+"""
+Unit tests for travel guide search query building and keyset paging.
+"""
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.core.id import generate_typed_id
+from app.modules.travel_guides.models import TravelGuide
+from app.modules.travel_guides.service import TravelGuideService
+from app.shared.pagination import encode_cursor
+
+
+class _RecordingSession:
+    """Records statements and returns ``rows`` as (guide, *sort keys) tuples."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        rows = self.rows
+        return type("Result", (), {"all": lambda self: rows})()
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def _guide_rows(count):
+    return [(TravelGuide(id=generate_typed_id("TRAV")), 100 - n, f"id-{n}") for n in range(count)]
+
+
+async def test_location_filters_use_the_indexed_tsvector_not_ilike():
+    db = _RecordingSession()
+
+    await TravelGuideService.search_guides(
+        db, destination="Lisbon", city="Alfama", country="Portugal", tags=["food"], category="culture"
+    )
+
+    sql = _sql(db.statements[0])
+    assert "ILIKE" not in sql.upper()
+    assert "travel_guides.location_vector @@ ((plainto_tsquery" in sql
+    assert sql.count("plainto_tsquery(") == 3
+    assert "travel_guides.tags && " in sql
+    assert "travel_guides.categories @> " in sql
+
+
+async def test_text_query_defaults_to_relevance_ranking():
+    db = _RecordingSession()
+
+    page = await TravelGuideService.search_guides(db, query="street food")
+
+    sql = _sql(db.statements[0])
+    assert page.sort_by == "relevance"
+    assert "travel_guides.search_vector @@ plainto_tsquery" in sql
+    assert "ts_rank(travel_guides.search_vector" in sql
+    assert "ORDER BY sort_key_0 DESC, sort_key_1 DESC" in sql
+
+
+async def test_next_cursor_carries_the_last_rows_sort_keys():
+    db = _RecordingSession(_guide_rows(3))
+
+    page = await TravelGuideService.search_guides(db, limit=2)
+
+    assert len(page.items) == 2
+    assert page.has_more
+    assert page.next_cursor == encode_cursor("popular", [99, "id-1"])
+
+    await TravelGuideService.search_guides(db, limit=2, cursor=page.next_cursor, skip=40)
+    sql = _sql(db.statements[1])
+    assert "(travel_guides.popularity_score, travel_guides.id) < (" in sql
+    assert "OFFSET" not in sql
+
+
+async def test_last_page_has_no_cursor():
+    page = await TravelGuideService.search_guides(_RecordingSession(_guide_rows(2)), limit=2)
+
+    assert not page.has_more
+    assert page.next_cursor is None
+
+
+async def test_cursor_from_another_sort_is_rejected():
+    cursor = encode_cursor("popular", [10, "id"])
+
+    with pytest.raises(HTTPException) as exc:
+        await TravelGuideService.search_guides(_RecordingSession(), sort_by="recent", cursor=cursor)
+
+    assert exc.value.status_code == 400
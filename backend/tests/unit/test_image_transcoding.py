@@ -0,0 +1,45 @@
+"""
+Unit tests for responsive image transcoding.
+"""
+from io import BytesIO
+
+from PIL import Image
+
+from app.infrastructure.storage.image_transcoding import AVIF_AVAILABLE, transcode_image
+from app.modules.files.services import variant_storage_path
+
+
+def _photo(width, height, mode="RGB", fmt="JPEG"):
+    output = BytesIO()
+    Image.new(mode, (width, height), (200, 120, 40, 128)[:len(mode)]).save(output, format=fmt)
+    return output.getvalue()
+
+
+def test_transcode_generates_every_size_and_format():
+    """One call yields each width in each format, with matching dimensions."""
+    variants = transcode_image(_photo(2000, 1000), widths=(1024, 320), formats=("webp", "avif", "jpeg"))
+
+    formats = ["webp", "jpeg"] + (["avif"] if AVIF_AVAILABLE else [])
+    assert set(variants) == {f"w{w}.{fmt}" for w in (1024, 320) for fmt in formats}
+
+    small = variants["w320.webp"]
+    assert (small.width, small.height) == (320, 160)
+    assert small.content_type == "image/webp"
+    with Image.open(BytesIO(variants["w1024.jpeg"].data)) as decoded:
+        assert decoded.format == "JPEG"
+        assert decoded.size == (1024, 512)
+
+
+def test_transcode_never_upscales_and_keeps_alpha_for_webp():
+    """Widths above the source collapse to the source size; JPEG drops alpha."""
+    variants = transcode_image(_photo(500, 250, mode="RGBA", fmt="PNG"), widths=(1600, 1024, 320), formats=("webp", "jpeg"))
+
+    assert set(variants) == {"w500.webp", "w500.jpeg", "w320.webp", "w320.jpeg"}
+    with Image.open(BytesIO(variants["w500.webp"].data)) as decoded:
+        assert decoded.mode == "RGBA"
+    with Image.open(BytesIO(variants["w500.jpeg"].data)) as decoded:
+        assert decoded.mode == "RGB"
+
+
+def test_variant_storage_path():
+    assert variant_storage_path("uploads/listing_photo/abc.jpg", "w640.webp") == "uploads/listing_photo/abc/w640.webp"
@@ -0,0 +1,83 @@
+"""
+Unit tests for the offline item-item collaborative filtering model.
+"""
+import numpy as np
+import pytest
+
+from app.modules.recommendations.cf_model import (
+    build_item_cf_arrays, save_item_cf_model, load_item_cf_model, KEEP_VERSIONS
+)
+
+# Guests who book the beach villa also book the beach house; city flats go together
+INTERACTIONS = [
+    ("USER_a", "LIST_villa", 3.0), ("USER_a", "LIST_house", 3.0),
+    ("USER_b", "LIST_villa", 3.0), ("USER_b", "LIST_house", 2.0), ("USER_b", "LIST_cabin", 0.5),
+    ("USER_c", "LIST_villa", 2.0),
+    ("USER_d", "LIST_flat", 3.0), ("USER_d", "LIST_loft", 3.0),
+    ("USER_e", "LIST_flat", 2.0), ("USER_e", "LIST_loft", 0.5),
+]
+
+
+@pytest.fixture
+def model(tmp_path):
+    users, listings, weights = zip(*INTERACTIONS)
+    arrays = build_item_cf_arrays(users, listings, weights, top_k=3)
+    save_item_cf_model(arrays, {"training_samples": len(INTERACTIONS)}, str(tmp_path))
+    return load_item_cf_model(str(tmp_path))
+
+
+def test_similar_listings(model):
+    """Co-engaged listings are most similar; unrelated ones never appear."""
+    similar = model.similar("LIST_villa", 5)
+
+    assert similar[0][0] == "LIST_house"
+    assert "LIST_flat" not in [listing_id for listing_id, _ in similar]
+    assert model.similar("LIST_unknown", 5) == []
+
+
+def test_recommend_excludes_seen_and_excluded(model):
+    """Recommendations skip the user's own listings and explicit exclusions."""
+    recommended = [listing_id for listing_id, _ in model.recommend("USER_c", 5)]
+
+    assert recommended[0] == "LIST_house"
+    assert "LIST_villa" not in recommended
+    assert "LIST_house" not in [lid for lid, _ in model.recommend("USER_c", 5, exclude=["LIST_house"])]
+    assert model.recommend("USER_unknown", 5) == []
+
+
+def test_score_is_normalized(model):
+    """Per-candidate scores are relative to the user's best match."""
+    scores = model.score("USER_c", ["LIST_house", "LIST_cabin", "LIST_flat", "LIST_unknown"])
+
+    assert scores[0] == pytest.approx(1.0)
+    assert 0.0 < scores[1] < 1.0
+    assert scores[2] == 0.0
+    assert scores[3] == 0.0
+    assert model.has_user("USER_c")
+    assert not model.has_user("USER_unknown")
+
+
+def test_score_without_positive_weights_is_zero(tmp_path):
+    """A user whose only interactions carry no weight gets zeros, not NaN."""
+    interactions = INTERACTIONS + [("USER_z", "LIST_villa", 0.0)]
+    users, listings, weights = zip(*interactions)
+    save_item_cf_model(build_item_cf_arrays(users, listings, weights, top_k=3), {}, str(tmp_path))
+    model = load_item_cf_model(str(tmp_path))
+
+    scores = model.score("USER_z", ["LIST_house", "LIST_villa"])
+
+    assert scores.tolist() == [0.0, 0.0]
+
+
+def test_artifact_is_memory_mapped_and_versioned(tmp_path):
+    """Arrays load memory-mapped; LATEST tracks the newest version and old ones are pruned."""
+    users, listings, weights = zip(*INTERACTIONS)
+    arrays = build_item_cf_arrays(users, listings, weights, top_k=3)
+    versions = [save_item_cf_model(arrays, {}, str(tmp_path)).name for _ in range(KEEP_VERSIONS + 1)]
+
+    loaded = load_item_cf_model(str(tmp_path))
+
+    assert loaded.version == versions[-1]
+    assert isinstance(loaded.neighbors, np.memmap)
+    assert not (tmp_path / "item_cf" / versions[0]).exists()
+    assert load_item_cf_model(str(tmp_path / "missing")) is None
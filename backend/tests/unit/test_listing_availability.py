@@ -0,0 +1,207 @@
+"""
+Unit tests for listing availability bitmaps and the search date filter.
+
+The bitmap tests run against PostgreSQL (``pg_session``) and are skipped when
+none is reachable.
+"""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Text, cast, select
+from sqlalchemy.dialects import postgresql
+
+from app.modules.bookings.models import Booking, BookingStatus
+from app.modules.listings.availability_service import (
+    ListingAvailabilityService, availability_filter, holds_nights_changed, join_availability_bitmap
+)
+from app.modules.listings.models import BlockedDate, Listing, ListingAvailabilityBitmap, PriceCalendar
+from app.modules.search.services import SearchService, SearchCountMode
+from app.modules.users.models import User, UserRole
+
+CITY = "Availabilityville"
+
+
+@pytest.mark.parametrize("old_status,new_status,expected", [
+    (None, BookingStatus.PENDING.value, True),
+    (None, BookingStatus.CONFIRMED.value, True),
+    (BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value, False),
+    (BookingStatus.CONFIRMED.value, BookingStatus.CHECKED_IN.value, False),
+    (BookingStatus.PENDING.value, BookingStatus.CANCELLED.value, True),
+    (BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value, True),
+    (BookingStatus.CANCELLED.value, BookingStatus.REFUNDED.value, False),
+])
+def test_holds_nights_changed(old_status, new_status, expected):
+    """Only transitions into or out of the held set touch the bitmap."""
+    assert holds_nights_changed(old_status, new_status) is expected
+
+
+def test_holds_nights_changed_accepts_enums():
+    assert holds_nights_changed(BookingStatus.PENDING, BookingStatus.CANCELLED)
+    assert not holds_nights_changed(BookingStatus.PENDING, BookingStatus.CONFIRMED)
+
+
+def test_availability_filter_rejects_empty_stays():
+    with pytest.raises(ValueError):
+        availability_filter(date(2026, 11, 3), date(2026, 11, 3))
+
+
+def test_availability_filter_reads_the_joined_bitmap_before_source_tables():
+    sql = str(
+        join_availability_bitmap(
+            select(Listing.id).where(availability_filter(date(2026, 11, 1), date(2026, 11, 4)))
+        ).compile(dialect=postgresql.dialect())
+    )
+
+    # One join, not a bitmap lookup per listing
+    assert "LEFT OUTER JOIN listing_availability_bitmaps" in sql
+    assert "FROM listing_availability_bitmaps" not in sql
+    # Bookings/blocks only when the row is missing or doesn't cover the stay
+    assert sql.index("listing_availability_bitmaps.listing_id IS NOT NULL") < sql.index("ELSE NOT (EXISTS")
+    assert sql.index("ELSE") < sql.index("FROM bookings")
+
+
+async def test_search_requires_both_dates():
+    from fastapi import HTTPException
+
+    # Rejected while building the query, before touching the database
+    with pytest.raises(HTTPException) as exc_info:
+        await SearchService.search_page(None, check_in=date(2026, 11, 1))
+    assert exc_info.value.status_code == 400
+
+
+async def _seed(db, today):
+    host = User(email="availability-host@example.com", role=UserRole.HOST)
+    db.add(host)
+    await db.flush()
+
+    listings = {}
+    for name in ("free", "booked", "blocked", "calendar_blocked"):
+        listing = Listing(
+            title=f"Availability {name}",
+            slug=f"availability-{name}",
+            listing_type="apartment",
+            status="active",
+            host_id=host.id,
+            address_line1="1 Calendar Street",
+            city=CITY,
+            country="Testland",
+            base_price=Decimal("100.00"),
+        )
+        db.add(listing)
+        await db.flush()
+        listings[name] = listing
+
+    check_in = datetime.combine(today + timedelta(days=10), datetime.min.time(), timezone.utc)
+    db.add(Booking(
+        booking_number="AVAIL-1",
+        listing_id=listings["booked"].id,
+        guest_id=host.id,
+        check_in=check_in,
+        check_out=check_in + timedelta(days=3),
+        nights=3,
+        guests=1,
+        base_price=Decimal("300.00"),
+        total_amount=Decimal("300.00"),
+        status=BookingStatus.CONFIRMED.value,
+    ))
+    db.add(BlockedDate(listing_id=listings["blocked"].id, date=today + timedelta(days=12)))
+    db.add(PriceCalendar(
+        listing_id=listings["calendar_blocked"].id,
+        date=today + timedelta(days=11),
+        nightly_rate=Decimal("100.00"),
+        is_blocked=True,
+    ))
+    await db.flush()
+    return listings
+
+
+async def _available_titles(db, check_in, check_out):
+    listings, _ = await SearchService.search_listings(
+        db, city=CITY, check_in=check_in, check_out=check_out,
+        count_mode=SearchCountMode.NONE, enable_personalization=False
+    )
+    return sorted(listing.title.split()[-1] for listing in listings)
+
+
+async def test_rebuild_sets_booked_and_blocked_nights(pg_session):
+    today = datetime.now(timezone.utc).date()
+    listings = await _seed(pg_session, today)
+
+    await ListingAvailabilityService.rebuild(pg_session, today)
+
+    rows = await pg_session.execute(
+        select(ListingAvailabilityBitmap.listing_id, cast(ListingAvailabilityBitmap.blocked_nights, Text))
+        .where(ListingAvailabilityBitmap.listing_id.in_([listing.id for listing in listings.values()]))
+    )
+    bits = dict(rows.all())
+    assert bits[listings["free"].id] == "0" * 365
+    assert bits[listings["booked"].id][10:13] == "111"
+    assert bits[listings["booked"].id].count("1") == 3
+    assert bits[listings["blocked"].id].index("1") == 12
+    assert bits[listings["calendar_blocked"].id].index("1") == 11
+
+
+async def test_search_excludes_unavailable_listings(pg_session):
+    today = datetime.now(timezone.utc).date()
+    await _seed(pg_session, today)
+    await ListingAvailabilityService.rebuild(pg_session, today)
+
+    stay = today + timedelta(days=10), today + timedelta(days=13)
+    assert await _available_titles(pg_session, *stay) == ["free"]
+    # Checking out on the booking's check-in night is fine
+    assert await _available_titles(pg_session, today + timedelta(days=5), today + timedelta(days=10)) == [
+        "blocked", "booked", "calendar_blocked", "free"
+    ]
+
+
+async def test_search_falls_back_past_the_horizon(pg_session):
+    """Stays the bitmaps don't cover are checked against bookings and blocks."""
+    today = datetime.now(timezone.utc).date()
+    listings = await _seed(pg_session, today)
+    # Horizon ended before the stay
+    await ListingAvailabilityService.rebuild(pg_session, today - timedelta(days=360))
+
+    stay = today + timedelta(days=10), today + timedelta(days=13)
+    assert await _available_titles(pg_session, *stay) == ["free"]
+
+    # Rows missing entirely behave the same
+    for listing in listings.values():
+        row = (await pg_session.execute(
+            select(ListingAvailabilityBitmap).where(ListingAvailabilityBitmap.listing_id == listing.id)
+        )).scalar_one()
+        await pg_session.delete(row)
+    await pg_session.flush()
+    assert await _available_titles(pg_session, *stay) == ["free"]
+
+
+async def test_cancelling_a_booking_frees_its_nights(pg_session):
+    today = datetime.now(timezone.utc).date()
+    listings = await _seed(pg_session, today)
+    await ListingAvailabilityService.rebuild(pg_session, today)
+
+    booking = (await pg_session.execute(
+        select(Booking).where(Booking.listing_id == listings["booked"].id)
+    )).scalar_one()
+    booking.status = BookingStatus.CANCELLED.value
+    await ListingAvailabilityService.apply_booking_transition(
+        pg_session, booking.listing_id, BookingStatus.CONFIRMED.value, BookingStatus.CANCELLED.value
+    )
+
+    stay = today + timedelta(days=10), today + timedelta(days=13)
+    assert await _available_titles(pg_session, *stay) == ["booked", "free"]
+
+
+async def test_refresh_builds_a_missing_row(pg_session):
+    today = datetime.now(timezone.utc).date()
+    listings = await _seed(pg_session, today)
+
+    # No rebuild yet: refresh creates and locks the row before recomputing it
+    await ListingAvailabilityService.refresh(pg_session, listings["booked"].id)
+
+    bits = await pg_session.scalar(
+        select(cast(ListingAvailabilityBitmap.blocked_nights, Text))
+        .where(ListingAvailabilityBitmap.listing_id == listings["booked"].id)
+    )
+    assert bits[10:13] == "111"
+    assert bits.count("1") == 3
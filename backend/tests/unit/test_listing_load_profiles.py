@@ -0,0 +1,142 @@
+"""
+Unit tests for listing load profiles, and per-endpoint SQL statement budgets.
+
+The budget tests run against PostgreSQL (``pg_session``) and are skipped when
+none is reachable. A budget failing means an endpoint started loading
+relationships per row or beyond its profile; the assertion message lists the
+statements that ran.
+"""
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import inspect
+
+from app.core.dependencies import require_host
+from app.main import app
+from app.modules.listings.load_profiles import CARD, listing_load_options
+from app.modules.listings.models import (
+    Amenity, Listing, ListingAmenity, ListingImage, ListingPhoto, ListingRule
+)
+from app.modules.users.models import Agency, HostProfile, User, UserRole
+from app.repositories.unit_of_work import UnitOfWork
+
+CITY = "Budgetville"
+
+
+def test_listing_relationships_never_load_implicitly():
+    lazy = {rel.key: rel.lazy for rel in inspect(Listing).relationships}
+
+    assert len(lazy) >= 20
+    assert set(lazy.values()) == {"raise_on_sql"}, lazy
+    # Loading a host, agency or amenity must not pull in their listings either
+    for model in (User, HostProfile, Agency):
+        assert inspect(model).relationships["listings"].lazy == "raise_on_sql"
+    assert inspect(Amenity).relationships["listings"].lazy == "raise_on_sql"
+
+
+def test_unknown_profile_is_rejected():
+    assert listing_load_options(CARD)
+    with pytest.raises(ValueError):
+        listing_load_options("everything")
+
+
+async def _seed_listings(db, count):
+    host = User(email="budget-host@example.com", role=UserRole.HOST)
+    db.add(host)
+    await db.flush()
+    amenity = Amenity(key="budget-wifi", name="Wifi")
+    db.add(amenity)
+    await db.flush()
+
+    listings = []
+    for n in range(count):
+        listing = Listing(
+            title=f"Budget listing {n}",
+            slug=f"budget-listing-{n}",
+            listing_type="apartment",
+            status="active",
+            host_id=host.id,
+            address_line1="1 Budget Street",
+            city=CITY,
+            country="Testland",
+            base_price=Decimal("100.00"),
+        )
+        db.add(listing)
+        await db.flush()
+        db.add_all([ListingPhoto(listing_id=listing.id, url=f"https://cdn.test/{n}/{k}.jpg") for k in range(3)])
+        db.add(ListingImage(listing_id=listing.id, url=f"https://cdn.test/{n}/cover.jpg"))
+        db.add(ListingAmenity(listing_id=listing.id, amenity_id=amenity.id))
+        db.add(ListingRule(listing_id=listing.id, key="pets", value="allowed"))
+        listings.append(listing)
+    await db.commit()
+    # Requests must load what they need themselves
+    db.expunge_all()
+    return listings
+
+
+async def test_listing_page_statement_budget_is_independent_of_page_size(pg_session, pg_client, count_statements):
+    await _seed_listings(pg_session, 6)
+
+    counts = []
+    for limit in (2, 6):
+        with count_statements() as statements:
+            response = await pg_client.get("/api/v1/listings", params={"city": CITY, "limit": limit})
+        pg_session.expunge_all()
+        assert response.status_code == 200, response.text
+        items = response.json()["items"]
+        assert len(items) == limit
+        assert all(len(item["photos"]) == 3 and len(item["images"]) == 1 for item in items)
+        # count, page, card listings, photos, images, location
+        assert statements.count <= 6, statements
+        counts.append(statements.count)
+
+    assert counts[0] == counts[1]
+
+
+async def test_listing_detail_statement_budget(pg_session, pg_client, count_statements):
+    listing_id = (await _seed_listings(pg_session, 1))[0].id
+
+    with count_statements() as statements:
+        response = await pg_client.get(f"/api/v1/listings/{listing_id}")
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()["photos"]) == 3
+    # listing, detail listing, photos, images, location, host, amenities, amenity, rules
+    assert statements.count <= 9, statements
+
+
+async def test_host_listings_page_by_cursor(pg_session, pg_client):
+    listings = await _seed_listings(pg_session, 5)
+    host = User(id=listings[0].host_id, email="budget-host@example.com", role=UserRole.HOST)
+    app.dependency_overrides[require_host] = lambda: host
+    try:
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = await pg_client.get("/api/v1/listings/mine", params=params)
+            assert response.status_code == 200, response.text
+            body = response.json()
+            assert body["total"] == 5
+            seen.extend(item["id"] for item in body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        response = await pg_client.get("/api/v1/listings/mine", params={"cursor": "garbage"})
+    finally:
+        app.dependency_overrides.pop(require_host, None)
+
+    assert len(seen) == len(set(seen)) == 5
+    assert set(seen) == {str(listing.id) for listing in listings}
+    assert response.status_code == 400, response.text
+
+
+async def test_booking_check_lock_is_a_single_statement(pg_session, count_statements):
+    listing_id = (await _seed_listings(pg_session, 1))[0].id
+
+    async with UnitOfWork(pg_session) as uow:
+        with count_statements() as statements:
+            listing = await uow.listings.get_by_id(listing_id, with_lock=True)
+
+    assert listing.id == listing_id
+    assert statements.count == 1, statements
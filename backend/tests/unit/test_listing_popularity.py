@@ -0,0 +1,27 @@
+"""
+Unit tests for materialized listing popularity maintenance.
+"""
+import pytest
+
+from app.modules.bookings.models import BookingStatus
+from app.modules.listings.popularity_service import popularity_delta
+
+
+@pytest.mark.parametrize("old_status,new_status,expected", [
+    (BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value, 1),
+    (None, BookingStatus.CONFIRMED.value, 1),
+    (BookingStatus.CONFIRMED.value, BookingStatus.COMPLETED.value, 0),
+    (BookingStatus.CONFIRMED.value, BookingStatus.CANCELLED.value, -1),
+    (BookingStatus.COMPLETED.value, BookingStatus.REFUNDED.value, -1),
+    (BookingStatus.PENDING.value, BookingStatus.CANCELLED.value, 0),
+    (None, BookingStatus.PENDING.value, 0),
+])
+def test_popularity_delta(old_status, new_status, expected):
+    """Booking transitions adjust booking_count only when crossing the counted set."""
+    assert popularity_delta(old_status, new_status) == expected
+
+
+def test_popularity_delta_accepts_enums():
+    """Enum statuses (as set on ORM models) are normalized to their values."""
+    assert popularity_delta(BookingStatus.PENDING, BookingStatus.CONFIRMED) == 1
+    assert popularity_delta(BookingStatus.COMPLETED, BookingStatus.CANCELLED) == -1
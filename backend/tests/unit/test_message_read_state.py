@@ -0,0 +1,174 @@
+"""
+Unit tests for conversation read state and message history cursors.
+
+The read state tests run against PostgreSQL (``pg_session``) and are skipped
+when none is reachable.
+"""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.id import generate_typed_id
+from app.modules.messages.models import Conversation, Message, conversation_participants
+from app.modules.messages.schemas import ConversationResponse, MessageCreate
+from app.modules.messages.services import HISTORY_SORT, MessageService, message_history_cursor
+from app.modules.users.models import User, UserRole
+from app.shared.pagination import decode_cursor
+
+
+class _RecordingSession:
+    """Records executed statements; every execute reports ``rowcount`` rows."""
+
+    def __init__(self, rowcount=1):
+        self.rowcount = rowcount
+        self.statements = []
+        self.added = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return SimpleNamespace(rowcount=self.rowcount)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+
+CONVERSATION_ID = generate_typed_id("CONV")
+USER_A, USER_B = generate_typed_id("USER"), generate_typed_id("USER")
+
+
+def _message(n):
+    return SimpleNamespace(id=f"MESS_{n}", created_at=datetime(2026, 1, 1, 12, n, tzinfo=timezone.utc))
+
+
+def test_history_cursor_points_past_last_message():
+    """Full pages yield a cursor for their oldest message; short pages end the history."""
+    page = [_message(3), _message(2)]
+
+    cursor = message_history_cursor(page, limit=2)
+
+    assert decode_cursor(cursor, HISTORY_SORT, 2) == [page[-1].created_at, "MESS_2"]
+    assert message_history_cursor(page, limit=3) is None
+    assert message_history_cursor([], limit=2) is None
+
+
+async def _conversation(db):
+    users = [User(email=f"reader-{n}@example.com", role=UserRole.GUEST) for n in range(3)]
+    db.add_all(users)
+    conversation = Conversation()
+    db.add(conversation)
+    await db.flush()
+    await db.execute(conversation_participants.insert(), [
+        {"conversation_id": conversation.id, "user_id": user.id} for user in users
+    ])
+    return conversation.id, [user.id for user in users]
+
+
+async def _send(db, conversation_id, sender_id, body):
+    return await MessageService.create_message(
+        db, MessageCreate(conversation_id=conversation_id, body=body), sender_id
+    )
+
+
+async def _read_state(db, conversation_id):
+    rows = await db.execute(
+        select(
+            conversation_participants.c.user_id,
+            conversation_participants.c.unread_count,
+            conversation_participants.c.last_read_message_id,
+        ).where(conversation_participants.c.conversation_id == conversation_id)
+    )
+    return {user_id: (unread, last_read) for user_id, unread, last_read in rows}
+
+
+async def test_new_message_counts_as_unread_for_other_participants(pg_session):
+    conversation_id, (sender, reader, other) = await _conversation(pg_session)
+
+    await _send(pg_session, conversation_id, sender, "hi")
+    await _send(pg_session, conversation_id, sender, "anyone there?")
+
+    state = await _read_state(pg_session, conversation_id)
+    assert state[sender] == (0, None)
+    assert state[reader] == (2, None)
+    assert state[other] == (2, None)
+
+
+async def test_mark_conversation_read_clears_only_the_readers_state(pg_session):
+    conversation_id, (sender, reader, other) = await _conversation(pg_session)
+    sent = [
+        await _send(pg_session, conversation_id, sender, "hi"),
+        await _send(pg_session, conversation_id, sender, "dinner?"),
+        await _send(pg_session, conversation_id, reader, "sure"),
+    ]
+
+    assert await MessageService.mark_conversation_read(pg_session, conversation_id, reader) == 2
+
+    latest = max(sent, key=lambda message: (message.created_at, message.id))
+    state = await _read_state(pg_session, conversation_id)
+    assert state[reader] == (0, latest.id)
+    assert state[other] == (3, None)
+    read_flags = dict((await pg_session.execute(
+        select(Message.id, Message.is_read).where(Message.conversation_id == conversation_id)
+    )).all())
+    # The reader's own message is for the others to read
+    assert read_flags == {sent[0].id: True, sent[1].id: True, sent[2].id: False}
+
+    # Nothing new to mark the second time
+    assert await MessageService.mark_conversation_read(pg_session, conversation_id, reader) == 0
+
+
+async def test_reading_a_message_updates_each_readers_own_count(pg_session):
+    conversation_id, (sender, reader, other) = await _conversation(pg_session)
+    first = await _send(pg_session, conversation_id, sender, "hi")
+    second = await _send(pg_session, conversation_id, sender, "dinner?")
+
+    await MessageService.mark_as_read(pg_session, first.id, reader)
+    # Someone else already read it; it still counts for this participant
+    await MessageService.mark_as_read(pg_session, first.id, other)
+
+    state = await _read_state(pg_session, conversation_id)
+    assert state[reader] == (1, first.id)
+    assert state[other] == (1, first.id)
+
+    await MessageService.mark_as_read(pg_session, second.id, reader)
+    # Reading an older message again doesn't move the pointer back
+    await MessageService.mark_as_read(pg_session, first.id, reader)
+
+    state = await _read_state(pg_session, conversation_id)
+    assert state[reader] == (0, second.id)
+    assert state[other] == (1, first.id)
+
+
+async def test_mark_conversation_read_rejects_non_participants():
+    db = _RecordingSession(rowcount=0)
+
+    with pytest.raises(HTTPException) as exc:
+        await MessageService.mark_conversation_read(db, CONVERSATION_ID, USER_B)
+
+    assert exc.value.status_code == 403
+    assert len(db.statements) == 1
+
+
+def test_conversation_response_lists_participant_ids():
+    conversation = SimpleNamespace(
+        id=CONVERSATION_ID, booking_id=None, listing_id=None,
+        participants=[SimpleNamespace(id=USER_A), SimpleNamespace(id=USER_B)],
+        messages=[], unread_count=2, last_read_message_id=None,
+        created_at=datetime.now(timezone.utc), updated_at=datetime.now(timezone.utc),
+    )
+
+    response = ConversationResponse.model_validate(conversation)
+
+    assert response.participants == [USER_A, USER_B]
+    assert response.unread_count == 2
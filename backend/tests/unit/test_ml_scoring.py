@@ -0,0 +1,107 @@
+"""
+Unit tests for vectorized recommendation scoring.
+"""
+import math
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules.recommendations.ml_service import MLRecommendationEngine
+
+
+USER_FEATURES = {
+    "preferred_types": [{"type": "villa", "count": 3}, {"type": "house", "count": 1}],
+    "preferred_locations": [
+        {"city": "Paris", "country": "France", "count": 2},
+        {"city": "Miami", "country": "USA", "count": 1},
+    ],
+    "avg_price": 200.0,
+    "min_price": 150.0,
+    "max_price": 250.0,
+}
+
+
+def _listing(listing_type, city, country, rating, review_count, base_price):
+    return SimpleNamespace(
+        listing_type=listing_type,
+        city=city,
+        country=country,
+        rating=Decimal(str(rating)),
+        review_count=review_count,
+        base_price=Decimal(str(base_price)),
+    )
+
+
+CANDIDATES = [
+    _listing("villa", "Paris", "France", 4.8, 120, 200),
+    _listing("room", "Lyon", "France", 4.1, 3, 145),
+    _listing("house", "Miami", "USA", 3.6, 0, 90),
+    _listing("cabin", "Oslo", "Norway", 4.5, 999, 600),
+    # Country matches the first preference, city matches the second: first match wins
+    _listing("studio", "Miami", "France", 4.0, 10, 130),
+]
+
+
+def _expected_content(listing):
+    score = 0.2
+    if listing.listing_type in ("villa", "house"):
+        score += 0.4
+    if listing.rating >= 4.5:
+        score += 0.4
+    elif listing.rating >= 4.0:
+        score += 0.2
+    return min(1.0, score)
+
+
+def _expected_popularity(listing):
+    return float(listing.rating) / 5.0 * 0.6 + min(1.0, math.log10(listing.review_count + 1) / 3.0) * 0.4
+
+
+def _expected_location(listing):
+    for loc in USER_FEATURES["preferred_locations"]:
+        if listing.city == loc["city"]:
+            return 1.0
+        elif listing.country == loc["country"]:
+            return 0.7
+    return 0.3
+
+
+def _expected_price(listing):
+    price = float(listing.base_price)
+    if 150.0 <= price <= 250.0:
+        return 1.0
+    elif 140.0 <= price <= 260.0:
+        return 0.8
+    elif 100.0 <= price <= 300.0:
+        return 0.5
+    return 0.2
+
+
+@pytest.mark.parametrize("scorer,expected", [
+    ("_content_scores", _expected_content),
+    ("_location_scores", _expected_location),
+    ("_price_scores", _expected_price),
+])
+def test_vectorized_scores_match_per_listing_rules(scorer, expected):
+    """Array scoring reproduces the per-listing rules for every candidate."""
+    features = MLRecommendationEngine._candidate_feature_arrays(CANDIDATES)
+    scores = getattr(MLRecommendationEngine, scorer)(USER_FEATURES, features)
+
+    assert scores.tolist() == pytest.approx([expected(listing) for listing in CANDIDATES])
+
+
+def test_vectorized_popularity_scores():
+    """Popularity blends normalized rating and log-scaled review count."""
+    features = MLRecommendationEngine._candidate_feature_arrays(CANDIDATES)
+    scores = MLRecommendationEngine._popularity_scores(features)
+
+    assert scores.tolist() == pytest.approx([_expected_popularity(listing) for listing in CANDIDATES])
+
+
+def test_vectorized_scores_neutral_without_history():
+    """Users without location/price history get neutral scores."""
+    features = MLRecommendationEngine._candidate_feature_arrays(CANDIDATES)
+
+    assert MLRecommendationEngine._location_scores({}, features).tolist() == [0.5] * len(CANDIDATES)
+    assert MLRecommendationEngine._price_scores({}, features).tolist() == [0.5] * len(CANDIDATES)
@@ -0,0 +1,38 @@
+"""
+Unit tests for keyset (cursor) pagination helpers.
+"""
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.shared.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    """Cursors preserve Decimal, datetime, float and id sort keys exactly."""
+    values = [
+        Decimal("199.99"),
+        datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+        0.123456789012345,
+        "LIST_abc123",
+    ]
+    cursor = encode_cursor("price_asc", values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, "price_asc", 4) == values
+
+
+def test_cursor_rejects_other_sort():
+    """A cursor issued for one sort can't be replayed against another."""
+    cursor = encode_cursor("newest", [datetime.now(timezone.utc), "LIST_abc123"])
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "price_asc", 2)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor("newest", ["LIST_abc123"])])
+def test_cursor_rejects_malformed(cursor):
+    """Garbage and wrong-arity cursors raise InvalidCursorError."""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, "newest", 2)
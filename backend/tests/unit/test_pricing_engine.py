@@ -0,0 +1,268 @@
+"""
+Unit tests for the nightly pricing engine.
+"""
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules.listings import pricing
+from app.modules.listings.models import PriceCalendar, PricingRule, SeasonalOverride
+from app.modules.listings.pricing import PricingEngine, compile_pricing, nightly_rates, stay_night_limits
+
+# Monday 2026-11-02 to Monday 2026-11-09: seven nights, Friday and Saturday at index 4 and 5
+MONDAY = date(2026, 11, 2)
+NEXT_MONDAY = date(2026, 11, 9)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.calls.append((name, args))
+        return queue
+
+    async def execute(self):
+        return [getattr(self.redis, f"_{name}")(*args) for name, args in self.calls]
+
+
+class _FakeRedis:
+    """Just the string commands the pricing versions use (shared by all engines)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def _get(self, key):
+        return self.data.get(key)
+
+    def _incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    fake = _FakeRedis()
+
+    async def get_redis():
+        return fake
+
+    monkeypatch.setattr(pricing, "get_redis", get_redis)
+    return fake
+
+
+def _rule(**kwargs) -> PricingRule:
+    kwargs.setdefault("is_active", True)
+    kwargs.setdefault("modifier_type", "percentage")
+    return PricingRule(listing_id="LIST_1", **kwargs)
+
+
+def _rates(rules=(), seasons=(), calendar=(), check_out=NEXT_MONDAY, currency=None):
+    compiled = compile_pricing(rules, seasons, calendar, currency=currency)
+    return nightly_rates(compiled, 100.0, MONDAY, check_out).tolist()
+
+
+def test_base_price_without_rules():
+    assert _rates() == [100.0] * 7
+
+
+def test_weekend_rule_targets_friday_and_saturday_nights():
+    rates = _rates([_rule(rule_type="weekend", price_modifier=Decimal("20"))])
+    assert rates == [100.0, 100.0, 100.0, 100.0, 120.0, 120.0, 100.0]
+
+
+def test_day_of_week_and_date_window():
+    rates = _rates([
+        _rule(rule_type="custom", day_of_week=2, price_modifier=Decimal("-10")),
+        _rule(
+            rule_type="event", modifier_type="fixed", price_modifier=Decimal("15"),
+            start_date=date(2026, 11, 7), end_date=date(2026, 11, 8)
+        ),
+    ])
+    assert rates == [100.0, 100.0, 90.0, 100.0, 100.0, 115.0, 115.0]
+
+
+def test_percentage_applies_before_fixed_amount():
+    rates = _rates([
+        _rule(rule_type="custom", modifier_type="fixed", price_modifier=Decimal("10")),
+        _rule(rule_type="custom", price_modifier=Decimal("50")),
+    ], check_out=date(2026, 11, 3))
+    assert rates == [160.0]
+
+
+def test_season_factor_and_calendar_override():
+    season = SeasonalOverride(
+        listing_id="LIST_1",
+        starts_at=datetime(2026, 11, 4, tzinfo=timezone.utc),
+        ends_at=datetime(2026, 11, 6, tzinfo=timezone.utc),
+        price_factor=Decimal("1.50"),
+    )
+    day = PriceCalendar(listing_id="LIST_1", date=date(2026, 11, 5), nightly_rate=Decimal("80.00"))
+    rates = _rates(seasons=[season], calendar=[day])
+    assert rates == [100.0, 100.0, 150.0, 80.0, 100.0, 100.0, 100.0]
+
+
+def test_length_of_stay_discount_respects_min_nights_and_covers_calendar_nights():
+    weekly = _rule(rule_type="length_of_stay", min_nights=7, price_modifier=Decimal("-10"))
+    day = PriceCalendar(listing_id="LIST_1", date=MONDAY, nightly_rate=Decimal("200.00"))
+
+    assert _rates([weekly], calendar=[day]) == [180.0] + [90.0] * 6
+    # A six-night stay doesn't qualify
+    assert _rates([weekly], calendar=[day], check_out=date(2026, 11, 8)) == [200.0] + [100.0] * 5
+
+
+def test_inactive_rules_are_ignored():
+    assert _rates([_rule(rule_type="custom", price_modifier=Decimal("50"), is_active=False)]) == [100.0] * 7
+
+
+def _season(starts, ends, **kwargs) -> SeasonalOverride:
+    return SeasonalOverride(
+        listing_id="LIST_1",
+        starts_at=datetime.combine(starts, datetime.min.time(), timezone.utc),
+        ends_at=datetime.combine(ends, datetime.min.time(), timezone.utc),
+        **kwargs
+    )
+
+
+def test_last_minute_rules_are_skipped(caplog):
+    last_minute = _rule(rule_type="last_minute", price_modifier=Decimal("-30"))
+    assert _rates([last_minute]) == [100.0] * 7
+    assert "last_minute" in caplog.text
+
+
+def test_seasonal_rules_use_their_date_window():
+    seasonal = _rule(
+        rule_type="seasonal", price_modifier=Decimal("25"),
+        start_date=date(2026, 11, 3), end_date=date(2026, 11, 4)
+    )
+    assert _rates([seasonal]) == [100.0, 125.0, 125.0, 100.0, 100.0, 100.0, 100.0]
+
+
+def test_calendar_days_in_another_currency_are_skipped(caplog):
+    days = [
+        PriceCalendar(listing_id="LIST_1", date=MONDAY, nightly_rate=Decimal("80.00"), currency="USD"),
+        PriceCalendar(listing_id="LIST_1", date=date(2026, 11, 3), nightly_rate=Decimal("70.00"), currency="EUR"),
+    ]
+    assert _rates(calendar=days, currency="USD") == [80.0] + [100.0] * 6
+    assert "EUR" in caplog.text
+
+
+def test_season_stay_limits_cover_seasons_in_the_stay():
+    seasons = [
+        _season(date(2026, 11, 6), date(2026, 11, 8), min_nights=5, price_factor=Decimal("1.20")),
+        _season(date(2026, 11, 1), date(2026, 11, 3), max_nights=10),
+        _season(date(2026, 11, 20), date(2026, 11, 30), min_nights=14),
+    ]
+    compiled = compile_pricing([], seasons, [])
+
+    assert stay_night_limits(compiled, MONDAY, NEXT_MONDAY) == (5, 10)
+    # Leaving on the season's first day doesn't touch it
+    assert stay_night_limits(compiled, MONDAY, date(2026, 11, 6)) == (None, 10)
+    assert stay_night_limits(compiled, date(2026, 11, 10), date(2026, 11, 12)) == (None, None)
+    assert stay_night_limits(compile_pricing([], [], []), MONDAY, NEXT_MONDAY) == (None, None)
+
+
+async def test_quote_many_uses_cached_rule_sets(monkeypatch):
+    engine = PricingEngine()
+    loads = []
+
+    async def fake_load(db, currencies):
+        loads.append(list(currencies))
+        weekend = _rule(rule_type="weekend", price_modifier=Decimal("20"))
+        return {
+            listing_id: compile_pricing([weekend], [], [], currency=currency)
+            for listing_id, currency in currencies.items()
+        }
+
+    monkeypatch.setattr(engine, "_load", fake_load)
+    listings = [
+        SimpleNamespace(id="LIST_1", base_price=Decimal("100.00"), currency="USD"),
+        SimpleNamespace(id="LIST_2", base_price=Decimal("50.00"), currency="EUR"),
+    ]
+
+    quotes = await engine.quote_many(None, listings, MONDAY, NEXT_MONDAY)
+    assert quotes["LIST_1"].total == Decimal("740.00")
+    assert quotes["LIST_2"].total == Decimal("370.00")
+    assert quotes["LIST_2"].currency == "EUR"
+    assert quotes["LIST_1"].average_nightly_rate == Decimal("105.71")
+
+    await engine.quote_many(None, listings, MONDAY, NEXT_MONDAY)
+    assert loads == [["LIST_1", "LIST_2"]]
+
+    with pytest.raises(ValueError):
+        await engine.quote_many(None, listings, MONDAY, MONDAY)
+
+    # A currency change recompiles the listing's calendar
+    listings[1].currency = "GBP"
+    await engine.quote_many(None, listings, MONDAY, NEXT_MONDAY)
+    assert loads == [["LIST_1", "LIST_2"], ["LIST_2"]]
+
+
+async def test_quote_reports_season_stay_limits(monkeypatch):
+    engine = PricingEngine()
+
+    async def fake_load(db, currencies):
+        season = _season(MONDAY, NEXT_MONDAY, min_nights=3, max_nights=5)
+        return {listing_id: compile_pricing([], [season], []) for listing_id in currencies}
+
+    monkeypatch.setattr(engine, "_load", fake_load)
+    listing = SimpleNamespace(id="LIST_1", base_price=Decimal("100.00"), currency="USD")
+
+    quote = await engine.quote(None, listing, MONDAY, date(2026, 11, 4))
+    assert (quote.min_nights, quote.max_nights) == (3, 5)
+
+
+async def test_invalidate_recompiles_in_every_process(monkeypatch):
+    rules = [_rule(rule_type="weekend", price_modifier=Decimal("20"))]
+
+    async def fake_load(db, currencies):
+        return {
+            listing_id: compile_pricing(list(rules), [], [], currency=currency)
+            for listing_id, currency in currencies.items()
+        }
+
+    # Two API processes sharing one Redis
+    editor, other = PricingEngine(), PricingEngine()
+    monkeypatch.setattr(editor, "_load", fake_load)
+    monkeypatch.setattr(other, "_load", fake_load)
+    listing = SimpleNamespace(id="LIST_1", base_price=Decimal("100.00"), currency="USD")
+    for engine in (editor, other):
+        assert (await engine.quote(None, listing, MONDAY, NEXT_MONDAY)).total == Decimal("740.00")
+
+    rules[0] = _rule(rule_type="weekend", price_modifier=Decimal("50"))
+    await editor.invalidate(listing.id)
+
+    for engine in (editor, other):
+        assert (await engine.quote(None, listing, MONDAY, NEXT_MONDAY)).total == Decimal("800.00")
+
+
+async def test_pricing_falls_back_to_the_ttl_without_redis(monkeypatch):
+    async def unavailable():
+        raise ConnectionError("redis down")
+
+    loads = []
+
+    async def fake_load(db, currencies):
+        loads.append(list(currencies))
+        return {listing_id: compile_pricing([], [], [], currency=currency) for listing_id, currency in currencies.items()}
+
+    monkeypatch.setattr(pricing, "get_redis", unavailable)
+    engine = PricingEngine()
+    monkeypatch.setattr(engine, "_load", fake_load)
+    listing = SimpleNamespace(id="LIST_1", base_price=Decimal("100.00"), currency="USD")
+
+    await engine.quote(None, listing, MONDAY, NEXT_MONDAY)
+    await engine.quote(None, listing, MONDAY, NEXT_MONDAY)
+    assert loads == [["LIST_1"]]
+
+    # The editing process still drops its own copy
+    await engine.invalidate(listing.id)
+    await engine.quote(None, listing, MONDAY, NEXT_MONDAY)
+    assert loads == [["LIST_1"], ["LIST_1"]]
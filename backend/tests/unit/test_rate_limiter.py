@@ -0,0 +1,147 @@
+"""
+Unit tests for the local token bucket rate limiter and its Redis reconciliation.
+"""
+import pytest
+from fastapi import FastAPI
+from redis.exceptions import NoScriptError
+from starlette.requests import Request
+
+from app.core.rate_limiter import (
+    SlidingWindowRateLimiter, UNMATCHED_ROUTE, get_route_template, rate_limit_key
+)
+
+
+class _RecordingPipeline:
+    """Pipeline stand-in that answers every window script with a fixed global count."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.results = []
+
+    def evalsha(self, sha, numkeys, key, now_ms, window_ms, hits, limit, prefix):
+        if not self.redis.script_loaded:
+            self.results.append(NoScriptError("No matching script"))
+            return
+        self.redis.flushed[key] = self.redis.flushed.get(key, 0) + hits
+        self.results.append(self.redis.global_count)
+
+    def incrby(self, key, amount):
+        self.redis.counters[key] = self.redis.counters.get(key, 0) + amount
+        self.results.append(self.redis.counters[key])
+
+    def expire(self, key, seconds):
+        self.results.append(True)
+
+    async def execute(self, raise_on_error=True):
+        self.redis.round_trips += 1
+        return self.results
+
+
+class _RecordingRedis:
+    def __init__(self, global_count=0, script_loaded=True):
+        self.global_count = global_count
+        self.script_loaded = script_loaded
+        self.flushed = {}
+        self.counters = {}
+        self.round_trips = 0
+
+    async def script_load(self, script):
+        self.script_loaded = True
+
+    def pipeline(self, transaction=False):
+        return _RecordingPipeline(self)
+
+
+def test_local_bucket_enforces_limit_and_refills():
+    """Requests beyond the limit are rejected until tokens refill."""
+    limiter = SlidingWindowRateLimiter(window_seconds=60)
+
+    allowed = [limiter.check("1.2.3.4", "/api/v1/listings", 5, now=0.0).allowed for _ in range(6)]
+    assert allowed == [True] * 5 + [False]
+
+    denied = limiter.check("1.2.3.4", "/api/v1/listings", 5, now=0.0)
+    assert denied.retry_after == 12
+
+    # One token per 12 seconds at 5 requests per minute
+    assert limiter.check("1.2.3.4", "/api/v1/listings", 5, now=12.0).allowed
+    # Other clients and routes have their own buckets
+    assert limiter.check("5.6.7.8", "/api/v1/listings", 5, now=0.0).allowed
+    assert limiter.check("1.2.3.4", "/api/v1/search", 5, now=0.0).allowed
+
+
+@pytest.mark.asyncio
+async def test_sync_batches_hits_and_applies_global_count():
+    """One round trip flushes every bucket; the global count caps local tokens."""
+    limiter = SlidingWindowRateLimiter(window_seconds=60)
+    redis = _RecordingRedis(global_count=9)
+    for _ in range(3):
+        limiter.check("1.2.3.4", "/api/v1/listings/{listing_id}", 10, now=0.0)
+    limiter.check("5.6.7.8", "/api/v1/search", 10, now=0.0)
+
+    flushed = await limiter.sync(redis, now=0.0)
+
+    assert flushed == 2
+    assert redis.round_trips == 1
+    assert redis.flushed[rate_limit_key("1.2.3.4", "/api/v1/listings/{listing_id}")] == 3
+    assert redis.counters["request_count:1.2.3.4:3600"] == 3
+    # Other workers used the rest of the window: one request left, then rejected
+    assert limiter.check("1.2.3.4", "/api/v1/listings/{listing_id}", 10, now=0.0).allowed
+    assert not limiter.check("1.2.3.4", "/api/v1/listings/{listing_id}", 10, now=0.0).allowed
+
+    # Nothing pending: no round trip
+    await limiter.sync(redis, now=1.0)
+    assert redis.round_trips == 2
+    assert await limiter.sync(_RecordingRedis(), now=2.0) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_sync_keeps_pending_hits():
+    """Hits are retried on the next sync after a Redis failure."""
+    class _BrokenRedis(_RecordingRedis):
+        def pipeline(self, transaction=False):
+            raise ConnectionError("redis down")
+
+    limiter = SlidingWindowRateLimiter(window_seconds=60)
+    limiter.check("1.2.3.4", "/api/v1/search", 10, now=0.0)
+    limiter.check("1.2.3.4", "/api/v1/search", 10, now=0.0)
+
+    with pytest.raises(ConnectionError):
+        await limiter.sync(_BrokenRedis(), now=0.0)
+
+    redis = _RecordingRedis()
+    await limiter.sync(redis, now=1.0)
+    assert redis.flushed[rate_limit_key("1.2.3.4", "/api/v1/search")] == 2
+    assert redis.counters["request_count:1.2.3.4:3600"] == 2
+
+
+@pytest.mark.asyncio
+async def test_script_cache_miss_reruns_only_the_window_scripts():
+    """Counters are not applied twice when the window script has to be loaded."""
+    limiter = SlidingWindowRateLimiter(window_seconds=60)
+    redis = _RecordingRedis(global_count=4, script_loaded=False)
+    for _ in range(3):
+        limiter.check("1.2.3.4", "/api/v1/search", 10, now=0.0)
+
+    assert await limiter.sync(redis, now=0.0) == 1
+
+    assert redis.round_trips == 2
+    assert redis.flushed[rate_limit_key("1.2.3.4", "/api/v1/search")] == 3
+    assert redis.counters["request_count:1.2.3.4:3600"] == 3
+
+
+def test_route_template_resolution():
+    """Paths collapse to their route template; unknown paths share one key."""
+    app = FastAPI()
+
+    @app.get("/api/v1/listings/{listing_id}")
+    async def get_listing(listing_id: str):
+        return {}
+
+    def request(path):
+        return Request({"type": "http", "app": app, "method": "GET", "path": path,
+                        "query_string": b"", "headers": [], "root_path": ""})
+
+    assert get_route_template(request("/api/v1/listings/LIST_1")) == "/api/v1/listings/{listing_id}"
+    assert get_route_template(request("/api/v1/listings/LIST_2")) == "/api/v1/listings/{listing_id}"
+    assert get_route_template(request("/wp-admin/setup.php")) == UNMATCHED_ROUTE
+    assert "{" not in rate_limit_key("1.2.3.4", "/api/v1/listings/{listing_id}")
@@ -0,0 +1,90 @@
+"""
+Unit tests for the buffered request-log pipeline.
+"""
+import json
+
+from app.core.request_telemetry import REQUEST_LOG_KEY, RequestLogPipeline
+
+
+class _RecordingPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.results = []
+
+    def lpush(self, key, *values):
+        self.redis.lists.setdefault(key, [])[:0] = list(reversed(values))
+        self.results.append(len(self.redis.lists[key]))
+
+    def ltrim(self, key, start, end):
+        self.results.append(True)
+
+    def sadd(self, key, *members):
+        self.redis.sets.setdefault(key, set()).update(members)
+        self.results.append(len(members))
+
+    def scard(self, key):
+        self.results.append(len(self.redis.sets.get(key, ())))
+
+    def incrby(self, key, amount):
+        self.redis.values[key] = int(self.redis.values.get(key, 0)) + amount
+        self.results.append(self.redis.values[key])
+
+    def expire(self, key, seconds):
+        self.results.append(True)
+
+    def get(self, key):
+        self.results.append(self.redis.values.get(key))
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return self.results
+
+
+class _RecordingRedis:
+    def __init__(self):
+        self.lists = {}
+        self.sets = {}
+        self.values = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=False):
+        return _RecordingPipeline(self)
+
+
+def _entry(client_ip, endpoint):
+    return {"endpoint": endpoint, "client_ip": client_ip, "status_code": 200, "response_time": 1.5}
+
+
+def test_record_is_bounded_and_counts_drops():
+    """A full queue drops the oldest records instead of blocking."""
+    pipeline = RequestLogPipeline(max_queue=3, batch_size=10)
+    for i in range(5):
+        pipeline.record(_entry("1.2.3.4", f"/api/v1/listings/{i}"))
+
+    assert len(pipeline) == 3
+    assert pipeline.dropped == 2
+
+
+async def test_flush_writes_json_batch_in_one_round_trip():
+    """One pipeline writes the logs and refreshes every client's counters."""
+    redis = _RecordingRedis()
+    redis.values["request_count:5.6.7.8:3600"] = "500"
+    pipeline = RequestLogPipeline(batch_size=100)
+    pipeline.record(_entry("1.2.3.4", "/api/v1/listings"))
+    pipeline.record(_entry("1.2.3.4", "/api/v1/search"))
+    pipeline.record(_entry("5.6.7.8", "/api/v1/listings"))
+
+    written = await pipeline.flush(redis)
+
+    assert written == 3
+    assert redis.round_trips == 1
+    assert [json.loads(v)["endpoint"] for v in reversed(redis.lists[REQUEST_LOG_KEY])] == [
+        "/api/v1/listings", "/api/v1/search", "/api/v1/listings"
+    ]
+    assert redis.sets["endpoints:1.2.3.4:3600"] == {"/api/v1/listings", "/api/v1/search"}
+    assert redis.values["recent_requests:1.2.3.4"] == 2
+    assert not pipeline.is_suspicious("1.2.3.4")
+    assert pipeline.is_suspicious("5.6.7.8")
+    assert await pipeline.flush(redis) == 0
+
+    await pipeline.stop()
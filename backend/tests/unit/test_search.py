@@ -5,7 +5,7 @@ import pytest
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.modules.search.services import SearchService
+from app.modules.search.services import SearchService, SearchCountMode, resolve_sort
 from app.modules.listings.models import Listing, ListingStatus, ListingType
 from app.modules.users.models import User, UserRole
 from app.core.id import generate_typed_id
@@ -251,6 +251,34 @@ async def test_search_sorting(db_session: AsyncSession, test_listings):
     assert len(results) > 0
 
 
+@pytest.mark.asyncio
+async def test_search_count_modes(db_session: AsyncSession, test_listings):
+    """Test exact, estimated and skipped totals on the single-query search page."""
+    exact = await SearchService.search_page(db_session, limit=1)
+    assert exact.total >= 2
+    assert exact.total_is_exact
+    assert exact.has_more
+    assert len(exact.items) == 1
+    
+    estimate = await SearchService.search_page(
+        db_session, limit=1, count_mode=SearchCountMode.ESTIMATE
+    )
+    assert estimate.total == exact.total
+    assert estimate.has_more
+    
+    no_total = await SearchService.search_page(
+        db_session, limit=1, count_mode=SearchCountMode.NONE
+    )
+    assert no_total.total is None
+    assert no_total.has_more
+    
+    # Paging past the end still reports the total
+    past_end = await SearchService.search_page(db_session, skip=1000, limit=10)
+    assert past_end.items == []
+    assert past_end.total == exact.total
+    assert not past_end.has_more
+
+
 @pytest.mark.asyncio
 async def test_search_suggestions(db_session: AsyncSession, test_listings):
     """Test search suggestions."""
@@ -274,3 +302,10 @@ async def test_search_suggestions(db_session: AsyncSession, test_listings):
     assert len(suggestions) > 0
     assert any(s["type"] == "country" and "USA" in s["text"] for s in suggestions)
 
+
+def test_location_searches_default_to_distance_sort():
+    assert resolve_sort(None, has_location=True) == "distance"
+    assert resolve_sort(None, has_location=False) == "relevance"
+    assert resolve_sort("relevance", has_location=True) == "relevance"
+    assert resolve_sort("price_asc", has_location=True) == "price_asc"
+    assert resolve_sort("distance", has_location=False) == "relevance"
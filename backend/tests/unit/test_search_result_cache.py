@@ -0,0 +1,183 @@
+"""
+Unit tests for the tag-invalidated search result cache.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules.search import result_cache
+from app.modules.search.result_cache import (
+    ALL_TAG, SearchResultCache, scope_tags, search_cache_key, search_cache_tags, search_scope
+)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [getattr(self.redis, f"_{name}")(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class _FakeRedis:
+    """Just the string/set commands the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    async def delete(self, key):
+        self.round_trips += 1
+        return self._delete(key)
+
+    def _set(self, key, value, ex=None):
+        self.data[key] = value
+        return True
+
+    def _sadd(self, key, member):
+        self.data.setdefault(key, set()).add(member)
+        return 1
+
+    def _expire(self, key, seconds):
+        return True
+
+    def _exists(self, key):
+        return int(key in self.data)
+
+    def _smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    def _delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = _FakeRedis()
+
+    async def get_redis():
+        return fake
+
+    monkeypatch.setattr(result_cache, "get_redis", get_redis)
+    return fake
+
+
+def _listing(city="Paris", country="France", listing_type="apartment", status="active"):
+    return SimpleNamespace(city=city, country=country, listing_type=listing_type, status=status)
+
+
+def test_equivalent_requests_share_a_key():
+    base = {"query": "Sea  View", "city": "Paris", "limit": 20, "cursor": None}
+    assert search_cache_key(base) == search_cache_key({"query": "sea view", "city": "PARIS", "limit": 20})
+    assert search_cache_key(base) != search_cache_key({**base, "limit": 50})
+    assert search_cache_key(base) != search_cache_key({**base, "user_id": "USER_1"})
+
+
+def test_page_tags_use_the_narrowest_filter():
+    assert search_cache_tags("Par", "France", "villa", ["LST_1"]) == ["city:par", "listing:LST_1"]
+    assert search_cache_tags(None, "France", "villa", []) == ["country:france"]
+    assert search_cache_tags(None, None, "villa", []) == ["type:villa"]
+    assert search_cache_tags(None, None, None, []) == [ALL_TAG]
+    # ILIKE wildcards can't be matched by substring tags
+    assert search_cache_tags("p%s", None, None, []) == [ALL_TAG]
+
+
+def test_listing_scope_tags_cover_the_city_and_its_words():
+    tags = scope_tags(search_scope(_listing(city="New  York")))
+    assert tags == {"city:new york", "city:new", "city:york", "country:france", "type:apartment", ALL_TAG}
+    assert search_cache_tags(" NEW york", None, None, []) == ["city:new york"]
+    assert search_scope(_listing(status="draft")) is None
+
+
+def test_long_city_names_invalidate_a_handful_of_tags():
+    tags = scope_tags(search_scope(_listing(city="Llanfairpwllgwyngyllgogerychwyrndrobwllllantysiliogogogoch")))
+    assert len(tags) == 4
+
+
+async def test_get_serves_from_local_cache_after_first_read(redis):
+    cache = SearchResultCache()
+    await cache.set("search:result:a", {"items": []}, ["city:paris"])
+    cache.clear_local()
+
+    assert await cache.get("search:result:a") == {"items": []}
+    reads = redis.round_trips
+    assert await cache.get("search:result:a") == {"items": []}
+    assert redis.round_trips == reads
+    assert await cache.get("search:result:missing") is None
+
+
+async def test_listing_change_invalidates_only_affected_pages(redis):
+    cache = SearchResultCache()
+    await cache.set("search:result:paris", {"page": 1}, search_cache_tags("Paris", None, None, ["LST_1"]))
+    await cache.set("search:result:lyon", {"page": 2}, search_cache_tags("Lyon", None, None, ["LST_2"]))
+    await cache.set("search:result:spain", {"page": 3}, search_cache_tags(None, "Spain", None, []))
+    await cache.set("search:result:villas", {"page": 4}, search_cache_tags(None, None, "villa", []))
+    await cache.set("search:result:everything", {"page": 5}, search_cache_tags(None, None, None, ["LST_2"]))
+
+    round_trips = redis.round_trips
+    # A Paris apartment appears: pages it could now match go, the rest stay
+    deleted = await cache.invalidate_listing("LST_9", after=search_scope(_listing()))
+
+    assert deleted == 2
+    assert redis.round_trips - round_trips == 2
+    assert await cache.get("search:result:paris") is None
+    assert await cache.get("search:result:everything") is None
+    for key in ("search:result:lyon", "search:result:spain", "search:result:villas"):
+        assert await cache.get(key) is not None
+
+
+async def test_card_changes_invalidate_pages_showing_the_listing(redis):
+    cache = SearchResultCache()
+    await cache.set("search:result:lyon", {"page": 1}, search_cache_tags("Lyon", None, None, ["LST_2"]))
+    await cache.set("search:result:nice", {"page": 2}, search_cache_tags("Nice", None, None, ["LST_3"]))
+
+    assert await cache.invalidate_listings(["LST_2"]) == 1
+    assert await cache.get("search:result:lyon") is None
+    assert await cache.get("search:result:nice") == {"page": 2}
+
+
+async def test_pages_read_before_the_replica_caught_up_are_not_cached(redis):
+    cache = SearchResultCache()
+    await cache.invalidate_listing("LST_9", after=search_scope(_listing()))
+
+    # A replica query that started before the change may not include it
+    await cache.set("search:result:paris", {"page": 1}, search_cache_tags("Paris", None, None, ["LST_1"]))
+    await cache.set("search:result:lyon", {"page": 2}, search_cache_tags("Lyon", None, None, ["LST_2"]))
+
+    assert await cache.get("search:result:paris") is None
+    assert await cache.get("search:result:lyon") == {"page": 2}
+
+
+async def test_invalidation_grace_can_be_disabled(redis, monkeypatch):
+    monkeypatch.setattr(result_cache.settings, "search_cache_invalidation_grace_seconds", 0)
+    cache = SearchResultCache()
+    await cache.invalidate([ALL_TAG])
+
+    await cache.set("search:result:a", {"items": []}, [ALL_TAG])
+    assert await cache.get("search:result:a") == {"items": []}
+
+
+async def test_redis_failures_are_cache_misses(monkeypatch):
+    async def unavailable():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(result_cache, "get_redis", unavailable)
+    cache = SearchResultCache()
+
+    await cache.set("search:result:a", {"items": []}, [ALL_TAG])
+    assert await cache.get("search:result:a") is None
+    assert await cache.invalidate([ALL_TAG]) == 0
@@ -0,0 +1,116 @@
+"""
+Unit tests for listing search snapshots and snapshot-backed search cards.
+
+The snapshot tests run against PostgreSQL (``pg_session``) and are skipped
+when none is reachable.
+"""
+import re
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.dependencies import get_current_user
+from app.main import app
+from app.modules.analytics.models import SearchSnapshot, SearchSnapshotOutbox
+from app.modules.listings.models import Amenity, Listing, ListingAmenity, ListingImage, ListingPhoto
+from app.modules.listings.snapshot_service import CARD_PAYLOAD_SQL, SearchSnapshotService
+from app.modules.search.schemas import ListingCardResponse
+from app.modules.search.services import SearchService, SearchCountMode
+from app.modules.users.models import User, UserRole
+
+CITY = "Snapshotville"
+
+
+def test_card_payload_matches_card_schema():
+    """Every snapshot key is a card field, and every card field but the stay quote is in the snapshot."""
+    payload_keys = set(re.findall(r"^\s+'(\w+)',", CARD_PAYLOAD_SQL, re.MULTILINE))
+    card_fields = set(ListingCardResponse.model_fields) - {"stay_total_price", "stay_average_nightly_rate"}
+    assert payload_keys == card_fields
+
+
+async def _seed(db):
+    host = User(email="snapshot-host@example.com", role=UserRole.HOST, first_name="Dana", last_name="Host")
+    db.add(host)
+    await db.flush()
+    amenities = [Amenity(key=key, name=key.title()) for key in ("snapshot-wifi", "snapshot-pool")]
+    db.add_all(amenities)
+    await db.flush()
+
+    listings = []
+    for n in range(3):
+        listing = Listing(
+            title=f"Snapshot listing {n}",
+            slug=f"snapshot-listing-{n}",
+            listing_type="apartment",
+            status="active",
+            host_id=host.id,
+            address_line1="1 Snapshot Street",
+            city=CITY,
+            country="Testland",
+            base_price=Decimal("100.00") + n,
+        )
+        db.add(listing)
+        await db.flush()
+        db.add_all([
+            ListingPhoto(listing_id=listing.id, url=f"https://cdn.test/{n}/first.jpg", display_order=0),
+            ListingPhoto(listing_id=listing.id, url=f"https://cdn.test/{n}/primary.jpg", display_order=1, is_primary=True),
+            ListingImage(listing_id=listing.id, url=f"https://cdn.test/{n}/cover.jpg"),
+        ])
+        db.add_all([ListingAmenity(listing_id=listing.id, amenity_id=amenity.id) for amenity in amenities])
+        listings.append(listing)
+    await db.flush()
+    return listings
+
+
+async def test_refresh_drains_outbox_into_snapshots(pg_session):
+    listings = await _seed(pg_session)
+    await SearchSnapshotService.enqueue(pg_session, *[listing.id for listing in listings], listings[0].id)
+
+    refreshed = await SearchSnapshotService.refresh_pending(pg_session, batch_size=2)
+
+    assert refreshed == 3
+    pending = await pg_session.scalar(select(func.count()).select_from(SearchSnapshotOutbox))
+    assert pending == 0
+    payload = await pg_session.scalar(
+        select(SearchSnapshot.payload).where(SearchSnapshot.listing_id == listings[1].id)
+    )
+    card = ListingCardResponse.model_validate(payload)
+    assert card.primary_photo_url == "https://cdn.test/1/primary.jpg"
+    assert card.host_display_name == "Dana Host"
+    assert card.amenity_keys == ["snapshot-pool", "snapshot-wifi"]
+    assert card.base_price == Decimal("101.00")
+    assert card.min_calendar_rate == card.max_calendar_rate == Decimal("101.00")
+
+
+async def test_card_search_builds_missing_snapshots(pg_session):
+    listings = await _seed(pg_session)
+    await SearchSnapshotService.enqueue(pg_session, listings[0].id)
+    await SearchSnapshotService.refresh_pending(pg_session)
+
+    page = await SearchService.search_page(
+        pg_session, city=CITY, sort_by="price_asc", count_mode=SearchCountMode.NONE,
+        enable_personalization=False, as_cards=True
+    )
+
+    # Only the first listing has a snapshot; the others are built on the fly
+    assert [card["slug"] for card in page.items] == [f"snapshot-listing-{n}" for n in range(3)]
+    assert all(card["primary_photo_url"].endswith("/primary.jpg") for card in page.items)
+
+
+async def test_search_route_serves_cards_in_one_statement(pg_session, pg_client, count_statements):
+    listings = await _seed(pg_session)
+    await SearchSnapshotService.enqueue(pg_session, *[listing.id for listing in listings])
+    await SearchSnapshotService.refresh_pending(pg_session)
+    pg_session.expunge_all()
+    app.dependency_overrides[get_current_user] = lambda: None
+
+    with count_statements() as statements:
+        response = await pg_client.get("/api/v1/search/listings", params={"city": CITY, "limit": 2})
+
+    assert response.status_code == 200, response.text
+    items = response.json()["items"]
+    assert len(items) == 2
+    assert all(item["host_display_name"] == "Dana Host" for item in items)
+    # Page, total and cards together; no relationship loads
+    assert statements.count == 1, statements
@@ -0,0 +1,157 @@
+"""
+Unit tests for destination search suggestions: the in-process prefix index and
+the incremental destination maintenance on listing writes.
+"""
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+from app.modules.listings.destination_service import ListingDestinationService
+from app.modules.search.services import SearchService
+from app.modules.search.suggestions import DestinationIndex
+
+ROWS = [
+    ("Paris", "France", 120),
+    ("Paris", "USA", 3),
+    ("Palermo", "Italy", 40),
+    ("New York", "USA", 300),
+    ("Porto", "Portugal", 60),
+    ("Lisbon", "Portugal", 90),
+    ("Nice", "France", 10),
+]
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_cities_then_countries_each_ranked_by_popularity():
+    index = DestinationIndex()
+    index.build(ROWS)
+
+    assert [(s["type"], s["text"]) for s in index.suggest("p", 10)] == [
+        ("city", "Paris"), ("city", "Porto"), ("city", "Palermo"), ("country", "Portugal"),
+    ]
+    assert [s["text"] for s in index.suggest("  PORT ", 10)] == ["Porto", "Portugal"]
+    assert index.suggest("p", 2) == [
+        {"type": "city", "text": "Paris", "value": "Paris"},
+        {"type": "city", "text": "Porto", "value": "Porto"},
+    ]
+
+
+def test_countries_rank_by_all_their_destinations():
+    index = DestinationIndex()
+    index.build([("Lima", "Peru", 100), ("Lisbon", "Portugal", 90), ("Porto", "Portugal", 60)])
+
+    # Portugal (150) ahead of Peru (100) although Peru has the top city
+    assert [(s["type"], s["text"]) for s in index.suggest("p", 10)] == [
+        ("city", "Porto"), ("country", "Portugal"), ("country", "Peru"),
+    ]
+
+
+def test_later_words_match_and_names_are_not_repeated():
+    index = DestinationIndex()
+    index.build(ROWS + [("York", "UK", 1)])
+
+    assert [s["text"] for s in index.suggest("york", 10)] == ["New York", "York"]
+    assert [s["text"] for s in index.suggest("new yo", 10)] == ["New York"]
+    assert [s["text"] for s in index.suggest("pari", 10)] == ["Paris"]
+
+
+def test_unbuilt_index_returns_none():
+    assert DestinationIndex().suggest("pa", 10) is None
+
+
+async def test_service_serves_from_a_built_index_without_the_database(monkeypatch):
+    from app.modules.search import services
+
+    index = DestinationIndex()
+    index.build(ROWS)
+    monkeypatch.setattr(services, "destination_index", index)
+
+    suggestions = await SearchService.get_search_suggestions(None, "lis", 5)
+
+    assert suggestions == [
+        {"type": "city", "text": "Lisbon", "value": "Lisbon"},
+    ]
+
+
+async def test_background_refresh_rebuilds_after_invalidate():
+    rows = [("Lisbon", "Portugal", 5)]
+
+    async def loader():
+        return list(rows)
+
+    index = DestinationIndex(loader=loader, refresh_interval=60, invalidate_delay=0)
+    await index.start()
+    try:
+        for _ in range(100):
+            if index.ready:
+                break
+            await asyncio.sleep(0.01)
+        assert [s["text"] for s in index.suggest("li", 10)] == ["Lisbon"]
+
+        rows.append(("Lima", "Peru", 50))
+        index.invalidate()
+        for _ in range(100):
+            if len(index.suggest("li", 10)) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert [s["text"] for s in index.suggest("li", 10)] == ["Lima", "Lisbon"]
+    finally:
+        await index.stop()
+
+
+async def test_burst_of_invalidations_shares_one_rebuild():
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return [("Lisbon", "Portugal", 5)]
+
+    index = DestinationIndex(loader=loader, refresh_interval=60, invalidate_delay=0.05)
+    await index.start()
+    try:
+        for _ in range(100):
+            if index.ready:
+                break
+            await asyncio.sleep(0.01)
+        assert len(loads) == 1
+
+        for _ in range(20):
+            index.invalidate()
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.2)
+        assert len(loads) == 2
+    finally:
+        await index.stop()
+
+
+async def test_listing_moves_between_destinations_as_two_upserts():
+    db = _RecordingSession()
+
+    assert await ListingDestinationService.apply_listing_change(db, ("Paris", "France"), ("Lyon", "France"))
+
+    assert len(db.statements) == 2
+    decrement, increment = (_sql(statement) for statement in db.statements)
+    assert "ON CONFLICT (country_key, city_key) DO UPDATE" in decrement
+    assert "greatest(listing_destinations.listing_count + %(listing_count_1)s" in decrement
+    assert db.statements[0].compile().params["listing_count_1"] == -1
+    assert db.statements[1].compile().params["listing_count_1"] == 1
+
+
+async def test_same_destination_with_different_spelling_is_a_no_op():
+    db = _RecordingSession()
+
+    changed = await ListingDestinationService.apply_listing_change(db, ("Paris ", "FRANCE"), ("paris", "France"))
+
+    assert not changed
+    assert db.statements == []
@@ -0,0 +1,242 @@
+"""
+Unit tests for travel plan caching, request coalescing and streaming,
+against a local fake of the OpenAI chat completions API.
+"""
+import asyncio
+import json
+import re
+from contextlib import asynccontextmanager
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.database import get_db
+from app.core.dependencies import get_current_active_user
+from app.infrastructure.cache.redis import CacheService
+from app.infrastructure.external_apis import openai_client
+from app.main import app
+from app.modules.ai_trip_planner import routes as planner_routes
+from app.modules.ai_trip_planner.plan_cache import plan_cache_key
+from app.modules.ai_trip_planner.services import AITravelPlannerService
+from app.modules.ai_trip_planner.streaming import ItineraryStreamParser
+
+PLAN = {
+    "title": "Lisbon in three days",
+    "summary": "Trams, tiles and pastéis",
+    "daily_itinerary": [
+        {"day": n, "date": f"2026-05-0{n}", "activities": [{"name": f"Stop {n}", "cost": 10}],
+         "restaurants": [], "notes": "Bring \"comfortable\" shoes {or not}"}
+        for n in (1, 2, 3)
+    ],
+    "activities": [],
+    "restaurants": [],
+    "transportation": [],
+    "costs": {"accommodation": 300, "activities": 30, "food": 120, "transportation": 40, "total": 490},
+}
+
+
+class _FakeLLMServer:
+    """Minimal OpenAI-compatible endpoint that streams ``PLAN`` in small SSE chunks."""
+
+    def __init__(self, chunk_size=40, delay=0.005):
+        self.chunk_size = chunk_size
+        self.delay = delay
+        self.requests = []
+        self.finished = 0
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.base_url = f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/v1"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(re.search(rb"content-length: *(\d+)", head, re.I).group(1))
+        self.requests.append(json.loads(await reader.readexactly(length)))
+
+        writer.write(b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\nconnection: close\r\n\r\n")
+        text = json.dumps(PLAN)
+        for start in range(0, len(text), self.chunk_size):
+            chunk = {
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": "fake",
+                "choices": [{"index": 0, "delta": {"content": text[start:start + self.chunk_size]}, "finish_reason": None}],
+            }
+            writer.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await writer.drain()
+            await asyncio.sleep(self.delay)
+        writer.write(b"data: [DONE]\n\n")
+        await writer.drain()
+        self.finished += 1
+        writer.close()
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+
+@pytest.fixture
+async def llm(monkeypatch):
+    cache = {}
+
+    async def cache_get(key):
+        return cache.get(key)
+
+    async def cache_set(key, value, expire=3600):
+        cache[key] = value
+        return True
+
+    monkeypatch.setattr(CacheService, "get", staticmethod(cache_get))
+    monkeypatch.setattr(CacheService, "set", staticmethod(cache_set))
+
+    async with _FakeLLMServer() as server:
+        monkeypatch.setattr(openai_client.settings, "openai_api_key", "test-key")
+        monkeypatch.setattr(openai_client.settings, "openai_base_url", server.base_url)
+        monkeypatch.setattr(openai_client, "openai_client", None)
+        server.cache = cache
+        yield server
+        await openai_client.close_openai_client()
+
+
+def _request(start_date=date(2026, 5, 1), budget="1200"):
+    return dict(
+        user_id="USER_test", destination="Lisbon", start_date=start_date,
+        end_date=date(start_date.year, start_date.month, start_date.day + 3), duration_days=3,
+        budget=Decimal(budget), currency="EUR", travelers_count=2, travel_style="Couple",
+    )
+
+
+def test_cache_key_ignores_case_whitespace_and_small_budget_changes():
+    key = plan_cache_key("Lisbon", 3, Decimal("1050"), "eur", 2, "couple")
+
+    assert plan_cache_key("  lisbon ", 3, Decimal("1150"), "EUR", 2, "Couple ") == key
+    assert plan_cache_key("Lisbon", 3, Decimal("2000"), "EUR", 2, "couple") != key
+    assert plan_cache_key("Lisbon", 4, Decimal("1050"), "EUR", 2, "couple") != key
+    assert plan_cache_key("Porto", 3, Decimal("1050"), "EUR", 2, "couple") != key
+
+
+def test_parser_emits_each_day_as_soon_as_it_is_complete():
+    """Days come out while the rest of the document is still streaming."""
+    text = json.dumps(PLAN)
+    parser = ItineraryStreamParser()
+    seen_before_costs = []
+    for start in range(0, len(text), 7):
+        days = parser.feed(text[start:start + 7])
+        if '"costs"' not in parser.text:
+            seen_before_costs.extend(days)
+
+    assert seen_before_costs == PLAN["daily_itinerary"]
+    assert parser.result() == PLAN
+
+
+async def test_concurrent_requests_share_one_completion_then_hit_cache(llm):
+    """Five equivalent requests make one API call; a later one is served from cache."""
+    starts = [date(2026, 5, day) for day in (1, 2, 3, 4, 5)]
+
+    plans = await asyncio.gather(*(
+        AITravelPlannerService.generate_travel_plan(_RecordingSession(), **_request(start))
+        for start in starts
+    ))
+
+    assert len(llm.requests) == 1
+    assert llm.requests[0]["stream"] is True
+    for start, plan in zip(starts, plans):
+        assert plan.plan_title == PLAN["title"]
+        assert plan.daily_itinerary[0]["date"] == start.isoformat()
+    assert len(llm.cache) == 1
+
+    cached = await AITravelPlannerService.generate_travel_plan(_RecordingSession(), **_request(budget="1250"))
+    assert len(llm.requests) == 1
+    assert cached.total_estimated_cost == Decimal("490")
+
+
+async def test_stream_yields_days_before_the_completion_ends(llm):
+    events = []
+    async for event in AITravelPlannerService.stream_travel_plan(_RecordingSession(), **_request()):
+        events.append((event, llm.finished))
+
+    days = [event["day"]["day"] for event, _ in events if event["type"] == "day"]
+    assert days == [1, 2, 3]
+    first_day_finished = events[0][1]
+    assert first_day_finished == 0
+    final, _ = events[-1]
+    assert final["type"] == "plan"
+    assert final["plan"].daily_itinerary[2]["date"] == "2026-05-03"
+
+
+async def test_generation_failure_falls_back_to_basic_plan(llm, monkeypatch):
+    monkeypatch.setattr(openai_client.settings, "openai_base_url", "http://127.0.0.1:9/v1")
+    monkeypatch.setattr(openai_client.settings, "openai_max_retries", 0)
+
+    plan = await AITravelPlannerService.generate_travel_plan(_RecordingSession(), **_request())
+
+    assert plan.plan_title == "Trip to Lisbon"
+    assert "error" in plan.ai_response
+    assert llm.cache == {}
+
+
+@pytest.fixture
+async def planner_client(monkeypatch):
+    async def override_get_db():
+        yield _RecordingSession()
+
+    @asynccontextmanager
+    async def stream_session():
+        yield _RecordingSession()
+
+    monkeypatch.setattr(planner_routes.settings, "openai_api_key", "test-key")
+    monkeypatch.setattr(planner_routes, "AsyncSessionLocal", stream_session)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: SimpleNamespace(id="USER_test")
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.clear()
+
+
+PLAN_REQUEST = {
+    "destination": "Lisbon", "start_date": "2026-05-01", "end_date": "2026-05-04",
+    "budget": "1200", "currency": "EUR", "travelers_count": 2,
+}
+
+
+async def test_stream_reports_unavailable_provider_before_streaming(planner_client, monkeypatch):
+    def unavailable():
+        raise ValueError("OpenAI API key is not configured")
+
+    monkeypatch.setattr(planner_routes, "get_openai_client", unavailable)
+
+    response = await planner_client.post("/api/v1/ai/travel-planner?stream=true", json=PLAN_REQUEST)
+
+    assert response.status_code == 503
+    assert "AI service is not configured" in response.text
+
+
+async def test_stream_ends_with_error_event_when_generation_fails(planner_client, monkeypatch):
+    async def failing_stream(db, **kwargs):
+        yield {"type": "day", "day": {"day": 1}}
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(planner_routes, "get_openai_client", lambda: object())
+    monkeypatch.setattr(AITravelPlannerService, "stream_travel_plan", staticmethod(failing_stream))
+
+    response = await planner_client.post("/api/v1/ai/travel-planner?stream=true", json=PLAN_REQUEST)
+
+    assert response.status_code == 201
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [event["type"] for event in events] == ["day", "error"]
@@ -0,0 +1,183 @@
+"""
+Unit tests for the WebSocket connection manager and its Redis pub/sub backplane.
+"""
+import asyncio
+import json
+
+from app.infrastructure.websocket.manager import ConnectionManager, room_channel, user_channel
+
+
+class _FakeWebSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+
+class _FakePipeline:
+    def __init__(self, broker):
+        self.broker = broker
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    async def execute(self):
+        return [await getattr(self.broker, name)(*args) for name, args in self.calls]
+
+
+class _FakeBroker:
+    """In-memory stand-in for Redis pub/sub and presence shared by several nodes."""
+
+    def __init__(self):
+        self.pubsubs = []
+        self.published = []
+        self.zsets = {}
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zrem(self, key, member):
+        self.zsets.get(key, {}).pop(member, None)
+
+    async def zcount(self, key, low, high):
+        return sum(1 for score in self.zsets.get(key, {}).values() if score >= low)
+
+    async def expire(self, key, seconds):
+        pass
+
+    async def execute_command(self, command, channel, data):
+        assert command == "PUBLISH"
+        self.published.append(channel)
+        receivers = [p for p in self.pubsubs if channel in p.channels]
+        for pubsub in receivers:
+            pubsub.inbox.put_nowait({"type": "message", "channel": channel, "data": data})
+        return len(receivers)
+
+
+class _FakePubSub:
+    def __init__(self, broker):
+        self.channels = set()
+        self.inbox = asyncio.Queue()
+        broker.pubsubs.append(self)
+
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        try:
+            return await asyncio.wait_for(self.inbox.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def _node(broker):
+    node = ConnectionManager(queue_size=16)
+    node._redis = broker
+    node._pubsub = _FakePubSub(broker)
+    node._tasks = [asyncio.create_task(node._listen())]
+    return node
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+async def test_messages_reach_sockets_on_other_nodes():
+    """A publish on one node reaches only the node holding the user or room."""
+    broker = _FakeBroker()
+    node_a, node_b = _node(broker), _node(broker)
+    alice, bob = _FakeWebSocket(), _FakeWebSocket()
+    await node_a.connect(alice, "USER_alice")
+    await node_b.connect(bob, "USER_bob")
+    await node_b.join_room(bob, "host_dashboard_USER_bob")
+
+    await node_a.send_personal_message({"type": "new_message"}, "USER_bob")
+    await node_a.send_to_room({"type": "booking_updated"}, "host_dashboard_USER_bob")
+    await _settle()
+
+    assert bob.sent == [{"type": "new_message"}, {"type": "booking_updated"}]
+    assert alice.sent == []
+    assert node_a._pubsub.channels == {user_channel("USER_alice")}
+    assert node_b._pubsub.channels == {user_channel("USER_bob"), room_channel("host_dashboard_USER_bob")}
+
+    assert await node_a.is_user_online("USER_bob")
+    await node_b.disconnect(bob, "USER_bob")
+    assert node_b._pubsub.channels == set()
+    assert not await node_a.is_user_online("USER_bob")
+    await node_a.stop()
+    await node_b.stop()
+
+
+async def test_slow_socket_does_not_stall_room_delivery():
+    """send_to_room only enqueues; each socket drains on its own writer task."""
+    manager = ConnectionManager(queue_size=16)
+    slow, fast = _FakeWebSocket(delay=1.0), _FakeWebSocket()
+    await manager.connect(slow, "USER_slow")
+    await manager.connect(fast, "USER_fast")
+    await manager.join_room(slow, "room")
+    await manager.join_room(fast, "room")
+
+    await asyncio.wait_for(manager.send_to_room({"n": 1}, "room"), timeout=0.1)
+    await _settle()
+
+    assert fast.sent == [{"n": 1}]
+    assert slow.sent == []
+    await manager.stop()
+
+
+async def test_client_that_falls_behind_is_disconnected():
+    """Once a socket's send queue is full it is closed and unregistered."""
+    manager = ConnectionManager(queue_size=2, send_timeout=5)
+    stuck, healthy = _FakeWebSocket(delay=10), _FakeWebSocket()
+    stuck.closed_with = None
+
+    async def close(code=1000, reason=""):
+        stuck.closed_with = code
+    stuck.close = close
+
+    await manager.connect(stuck, "USER_stuck")
+    await manager.connect(healthy, "USER_ok")
+    for room_member in (stuck, healthy):
+        await manager.join_room(room_member, "room")
+
+    for n in range(5):
+        await manager.send_to_room({"n": n}, "room")
+        await asyncio.sleep(0.001)
+    await _settle()
+
+    assert stuck.closed_with == 1013
+    assert "USER_stuck" not in manager.active_connections
+    assert manager.room_connections["room"] == {healthy}
+    assert [m["n"] for m in healthy.sent] == [0, 1, 2, 3, 4]
+    await manager.stop()
+
+
+async def test_replies_to_one_socket_go_through_its_queue():
+    """A pong is queued behind pending messages, never sent alongside them."""
+    manager = ConnectionManager(queue_size=2, send_timeout=5)
+    client, other = _FakeWebSocket(delay=0.01), _FakeWebSocket()
+    await manager.connect(client, "USER_a")
+    await manager.connect(other, "USER_a")
+
+    await manager.send_personal_message({"type": "new_message"}, "USER_a")
+    assert await manager.send_to_socket(client, {"type": "pong"})
+    await _settle()
+
+    assert client.sent == [{"type": "new_message"}, {"type": "pong"}]
+    assert other.sent == [{"type": "new_message"}]
+    assert not await manager.send_to_socket(_FakeWebSocket(), {"type": "pong"})
+    await manager.stop()